@@ -10,6 +10,7 @@ from datetime import datetime, timedelta
 from time import time
 from typing import Optional
 import re
+from array import array
 
 from PyQt5.QtWidgets import (
   QApplication,
@@ -32,6 +33,7 @@ from PyQt5.QtWidgets import (
   QLineEdit, QGroupBox,
   QGraphicsDropShadowEffect,
   QTabWidget,
+  QSpinBox,
   QDialogButtonBox,
   QPlainTextEdit,
   QMenuBar,
@@ -65,8 +67,13 @@ from utils.const import *
 from utils.docker import _DockerUtilsMixin
 from utils.docker_commands import DockerCommandHandler
 from utils.updater import _UpdaterMixin
-from utils.docker_utils import get_volume_name, generate_container_name
+from utils.docker_utils import get_volume_name
+from utils.name_allocator import HostNameAllocators, NameAllocator
 from utils.config_manager import ConfigManager, ContainerConfig
+from utils.log_store import LogEntry, LogStore, level_from_color
+from utils.metrics_stats import NodeMetricsStats, format_window, HOUR, DAY
+from utils.image_prefetch import ImagePrefetcher, ImagePrefetchThread
+from utils.idle_monitor import IdleMonitor
 
 from utils.icon import ICON_BASE64
 
@@ -84,6 +91,10 @@ from widgets.ModeSwitch import ModeSwitch
 from widgets.dialogs.DockerCheckDialog import DockerCheckDialog
 from widgets.CenteredComboBox import CenteredComboBox
 from widgets.LoadingDialog import LoadingDialog
+from widgets.LogView import LogView, LogFilterBar
+from widgets.dialogs.ContainerLogsDialog import ContainerLogsDialog
+from widgets.dialogs.FleetDashboardDialog import FleetDashboardDialog
+from widgets.dialogs.BulkOperationsDialog import BulkOperationsDialog
 
 
 def get_platform_and_os_info():
@@ -115,7 +126,7 @@ def log_with_color(message, color="gray"):
 class EdgeNodeLauncher(QWidget, _DockerUtilsMixin, _UpdaterMixin):
   def __init__(self, app_icon=None):
     self.logView = None
-    self.log_buffer = []
+    self.log_buffer = LogStore()
     self.__force_debug = False
     super().__init__()
 
@@ -130,8 +141,17 @@ class EdgeNodeLauncher(QWidget, _DockerUtilsMixin, _UpdaterMixin):
 
     self._current_stylesheet = DARK_STYLESHEET  # Default to dark theme
     self.__last_plot_data = None
+    self.__metrics_stats = {}  # container name -> NodeMetricsStats
+    self.__log_panes = {}  # container name -> ContainerLogsDialog
+    self.__fleet_dashboard = None
+    self.__bulk_operations = None
     self.__last_auto_update_check = 0
     self.__last_docker_image_check = 0
+    self.__image_prefetch_thread = None
+    self.__launch_thread = None
+    self.__exit_shutdown_thread = None
+    self.__exit_shutdown_done = False
+    self.__image_prefetch_pending = False  # a paused prefetch resumes as soon as the launcher is idle again
     
     self.__version__ = __version__
     self.__last_timesteps = []
@@ -158,14 +178,25 @@ class EdgeNodeLauncher(QWidget, _DockerUtilsMixin, _UpdaterMixin):
 
     # Initialize config manager for container configurations
     self.config_manager = ConfigManager()
+    # Node info and metric samples are kept in the same state store as the config
+    self.state_store = self.config_manager.store
 
     # Initialize force debug from saved settings
     self.__force_debug = self.config_manager.get_force_debug()
 
+    # New image versions are only prefetched while nobody uses the launcher
+    self.idle_monitor = IdleMonitor()
+    self.idle_monitor.activity.connect(self._pause_image_prefetch)
+    QApplication.instance().aboutToQuit.connect(lambda: self._pause_image_prefetch(wait=True))
+    QApplication.instance().aboutToQuit.connect(lambda: self._cancel_launch_watch(wait=True))
+    QApplication.instance().aboutToQuit.connect(self._stop_log_panes)
+    QApplication.instance().aboutToQuit.connect(self.state_store.wait_for_writes)
+
     self.initUI()
     
     # Set initial theme class
     self.force_debug_checkbox.setProperty('class', 'dark')
+    self.stop_on_exit_checkbox.setProperty('class', 'dark')
 
     self.__cwd = os.getcwd()
     
@@ -184,6 +215,7 @@ class EdgeNodeLauncher(QWidget, _DockerUtilsMixin, _UpdaterMixin):
 
     self.docker_initialize()
     self.docker_handler = DockerCommandHandler(DOCKER_CONTAINER_NAME)
+    self._name_allocators = HostNameAllocators()
 
     # Initialize container list
     self.refresh_container_list()
@@ -340,19 +372,28 @@ class EdgeNodeLauncher(QWidget, _DockerUtilsMixin, _UpdaterMixin):
     return not (self.runs_from_ipython() or self.runs_with_debugger() or self.not_running_from_exe())
   
   
-  def add_log(self, line, debug=False, color="gray"):
+  def add_log(self, line, debug=False, color="gray", container=None, source=None, level=None):
+    """Add a line to the console log.
+
+    The entry is stored as a structured record: `level` defaults to the one implied by the
+    color/debug flag, `container` is the node the line is about and `source` the subsystem
+    that produced it (e.g. 'docker', 'updater'), both left empty unless the caller passes
+    them, so the console can filter on them.
+    """
     show = (debug and not self.runs_in_production) or not debug
     show = show or self.__force_debug
     if show:      
-      timestamp = datetime.now().strftime("[%Y-%m-%d %H:%M:%S]")
-      line = f'{timestamp} {line}'
+      entry = LogEntry(
+        time=time(), message=line, color=color, debug=debug,
+        level=level or level_from_color(color, debug), container=container, source=source,
+      )
       if self.logView is not None:
-        self.logView.append(line)
+        self.logView.append_entry(entry)
       else:
-        self.log_buffer.append(line)
+        self.log_buffer.append(entry)
       QApplication.processEvents()  # Flush the event queue
       if debug or self.__force_debug:
-        log_with_color(line, color=color)
+        log_with_color(entry.format(), color=color)
     return  
   
   def center(self):
@@ -538,6 +579,23 @@ class EdgeNodeLauncher(QWidget, _DockerUtilsMixin, _UpdaterMixin):
     self.node_version.setObjectName("infoBoxText")
     self.node_version.setFont(QFont("Courier New"))
     info_box_layout.addWidget(self.node_version)
+
+    # Rolling statistics over the metrics history
+    self.node_cpu_stats = QLabel(CPU_STATS_LABEL)
+    self.node_cpu_stats.setObjectName("infoBoxText")
+    self.node_cpu_stats.setFont(QFont("Courier New"))
+    info_box_layout.addWidget(self.node_cpu_stats)
+
+    self.node_mem_stats = QLabel(MEMORY_STATS_LABEL)
+    self.node_mem_stats.setObjectName("infoBoxText")
+    self.node_mem_stats.setFont(QFont("Courier New"))
+    info_box_layout.addWidget(self.node_mem_stats)
+
+    self.node_gpu_stats = QLabel(GPU_TEMP_STATS_LABEL)
+    self.node_gpu_stats.setObjectName("infoBoxText")
+    self.node_gpu_stats.setFont(QFont("Courier New"))
+    self.node_gpu_stats.setVisible(False)
+    info_box_layout.addWidget(self.node_gpu_stats)
     
     info_box.setLayout(info_box_layout)
     top_button_area.addWidget(info_box)
@@ -558,6 +616,21 @@ class EdgeNodeLauncher(QWidget, _DockerUtilsMixin, _UpdaterMixin):
     self.renameNodeButton.clicked.connect(self.show_rename_dialog)
     bottom_button_area.addWidget(self.renameNodeButton)
 
+    # Live container logs button
+    self.nodeLogsButton = QPushButton(NODE_LOGS_BUTTON_TEXT)
+    self.nodeLogsButton.clicked.connect(self.show_container_logs)
+    bottom_button_area.addWidget(self.nodeLogsButton)
+
+    # Fleet dashboard button
+    self.fleetDashboardButton = QPushButton(FLEET_DASHBOARD_BUTTON_TEXT)
+    self.fleetDashboardButton.clicked.connect(self.show_fleet_dashboard)
+    bottom_button_area.addWidget(self.fleetDashboardButton)
+
+    # Bulk start/stop/restart button
+    self.bulkActionsButton = QPushButton(BULK_ACTIONS_BUTTON_TEXT)
+    self.bulkActionsButton.clicked.connect(self.show_bulk_operations)
+    bottom_button_area.addWidget(self.bulkActionsButton)
+
     # Toggle theme button
     self.themeToggleButton = QPushButton(LIGHT_DASHBOARD_BUTTON_TEXT)
     # self.themeToggleButton.setCheckable(True)
@@ -583,6 +656,27 @@ class EdgeNodeLauncher(QWidget, _DockerUtilsMixin, _UpdaterMixin):
     self.force_debug_checkbox.stateChanged.connect(self.toggle_force_debug)
     bottom_button_area.addWidget(self.force_debug_checkbox)
 
+    # add a checkbox item to stop every node when the launcher is closed
+    self.stop_on_exit_checkbox = QCheckBox('Stop Nodes on Exit')
+    self.stop_on_exit_checkbox.setChecked(self.config_manager.get_stop_all_on_exit())
+    self.stop_on_exit_checkbox.setFont(QFont("Courier New", 9, QFont.Bold))
+    self.stop_on_exit_checkbox.setToolTip("Closing the launcher stops every node gracefully first")
+    self.stop_on_exit_checkbox.setStyleSheet(self.force_debug_checkbox.styleSheet())
+    self.stop_on_exit_checkbox.stateChanged.connect(
+      lambda state: self.config_manager.set_stop_all_on_exit(state == Qt.Checked))
+    bottom_button_area.addWidget(self.stop_on_exit_checkbox)
+
+    # bandwidth used to download new image versions in the background
+    self.prefetch_bandwidth_spin = QSpinBox()
+    self.prefetch_bandwidth_spin.setRange(0, 1000)
+    self.prefetch_bandwidth_spin.setSuffix(" MB/s")
+    self.prefetch_bandwidth_spin.setSpecialValueText("Unlimited")
+    self.prefetch_bandwidth_spin.setValue(round(self.config_manager.get_prefetch_bandwidth_limit() / 1_000_000))
+    self.prefetch_bandwidth_spin.setToolTip("Bandwidth used to download new image versions in the background")
+    self.prefetch_bandwidth_spin.valueChanged.connect(self.set_prefetch_bandwidth_limit)
+    bottom_button_area.addWidget(QLabel("Image prefetch:"))
+    bottom_button_area.addWidget(self.prefetch_bandwidth_spin)
+
     bottom_button_area.addStretch()
     menu_layout.addLayout(bottom_button_area)
     
@@ -663,16 +757,17 @@ class EdgeNodeLauncher(QWidget, _DockerUtilsMixin, _UpdaterMixin):
     right_panel_layout.setSpacing(10)
 
     # the log scroll text area
-    self.logView = QTextEdit()
-    self.logView.setReadOnly(True)
+    self.logView = LogView(max_blocks=self.config_manager.get_log_max_lines())
     self.logView.setStyleSheet(self._current_stylesheet)
     self.logView.setFixedHeight(150)
     self.logView.setFont(QFont("Courier New"))
+    self.logFilterBar = LogFilterBar(self.logView)
+    right_panel_layout.addWidget(self.logFilterBar)
     right_panel_layout.addWidget(self.logView)
     if self.log_buffer:
-        for line in self.log_buffer:
-            self.logView.append(line)
-        self.log_buffer = []
+        for entry in self.log_buffer:
+            self.logView.append_entry(entry)
+        self.log_buffer.clear()
 
     right_container_layout.addWidget(right_panel)
     
@@ -692,11 +787,13 @@ class EdgeNodeLauncher(QWidget, _DockerUtilsMixin, _UpdaterMixin):
         self._current_stylesheet = LIGHT_STYLESHEET
         self.themeToggleButton.setText(DARK_DASHBOARD_BUTTON_TEXT)
         self.force_debug_checkbox.setProperty('class', 'light')
+        self.stop_on_exit_checkbox.setProperty('class', 'light')
         is_dark = False
     else:
         self._current_stylesheet = DARK_STYLESHEET
         self.themeToggleButton.setText(LIGHT_DASHBOARD_BUTTON_TEXT)
         self.force_debug_checkbox.setProperty('class', 'dark')
+        self.stop_on_exit_checkbox.setProperty('class', 'dark')
         is_dark = True
     
     # Update button colors for the new theme
@@ -725,8 +822,9 @@ class EdgeNodeLauncher(QWidget, _DockerUtilsMixin, _UpdaterMixin):
         self.container_combo.apply_default_theme()
     
     # Force style update
-    self.force_debug_checkbox.style().unpolish(self.force_debug_checkbox)
-    self.force_debug_checkbox.style().polish(self.force_debug_checkbox)
+    for checkbox in (self.force_debug_checkbox, self.stop_on_exit_checkbox):
+      checkbox.style().unpolish(checkbox)
+      checkbox.style().polish(checkbox)
 
   def update_copy_button_icons(self):
     """Update the copy button icons based on the current theme."""
@@ -779,10 +877,9 @@ class EdgeNodeLauncher(QWidget, _DockerUtilsMixin, _UpdaterMixin):
         self.copyEthButton.setText("Copy")
 
   def change_text_color(self):
-    if self._current_stylesheet == DARK_STYLESHEET:
-      self.force_debug_checkbox.setStyleSheet(DETAILED_CHECKBOX_STYLE.format(debug_checkbox_color=DARK_COLORS["debug_checkbox_color"]))
-    else:
-      self.force_debug_checkbox.setStyleSheet(DETAILED_CHECKBOX_STYLE.format(debug_checkbox_color=LIGHT_COLORS["debug_checkbox_color"]))
+    colors = DARK_COLORS if self._current_stylesheet == DARK_STYLESHEET else LIGHT_COLORS
+    for checkbox in (self.force_debug_checkbox, self.stop_on_exit_checkbox):
+      checkbox.setStyleSheet(DETAILED_CHECKBOX_STYLE.format(debug_checkbox_color=colors["debug_checkbox_color"]))
 
   def apply_stylesheet(self):
     is_dark = self._current_stylesheet == DARK_STYLESHEET
@@ -808,7 +905,7 @@ class EdgeNodeLauncher(QWidget, _DockerUtilsMixin, _UpdaterMixin):
       
       # Apply margin directly to logView with its own stylesheet
       self.logView.setStyleSheet("""
-        QTextEdit#logView {
+        QPlainTextEdit#logView {
           margin-bottom: 6px;
         }
       """)
@@ -877,6 +974,7 @@ class EdgeNodeLauncher(QWidget, _DockerUtilsMixin, _UpdaterMixin):
         # Update loading dialog with progress
         if hasattr(self, 'toggle_dialog') and self.toggle_dialog is not None and self.toggle_dialog.isVisible():
             self.toggle_dialog.update_progress("Stopping Docker container...")
+        self._cancel_launch_watch()
         
         # Define success callback for threaded operation
         def on_stop_success(result):
@@ -945,7 +1043,8 @@ class EdgeNodeLauncher(QWidget, _DockerUtilsMixin, _UpdaterMixin):
             self.toast.show_notification(NotificationType.ERROR, f"Error stopping container: {error_msg}")
         
         # Pass the container name explicitly to ensure we're stopping the right one
-        self.docker_handler.stop_container_threaded(container_name, on_stop_success, on_stop_error)
+        self.docker_handler.stop_container_threaded(container_name, on_stop_success, on_stop_error,
+                                                    self.config_manager.get_stop_grace_period(container_name))
         
     except Exception as e:
         # Stop loading indicator in case of error
@@ -1022,8 +1121,11 @@ class EdgeNodeLauncher(QWidget, _DockerUtilsMixin, _UpdaterMixin):
         self.add_log(f"Error launching container: {str(e)}", color="red")
         self.toast.show_notification(NotificationType.ERROR, f"Error launching container: {str(e)}")
 
-  def plot_data(self):
-    """Plot container metrics data."""
+  def plot_data(self, fetch=None):
+    """Plot container metrics data.
+
+    `fetch(callback, error_callback)` gets the history, get_node_history by default.
+    """
     # Get the currently selected container
     container_name = self.container_combo.currentText()
     if not container_name:
@@ -1034,7 +1136,7 @@ class EdgeNodeLauncher(QWidget, _DockerUtilsMixin, _UpdaterMixin):
     self.docker_handler.set_container_name(container_name)
     
     if not self.is_container_running():
-        self.add_log(f"Container {container_name} is not running, skipping plot data", debug=True)
+        self.add_log(f"Container {container_name} is not running, skipping plot data", debug=True, container=container_name)
         return
 
     def on_success(history: NodeHistory) -> None:
@@ -1044,7 +1146,9 @@ class EdgeNodeLauncher(QWidget, _DockerUtilsMixin, _UpdaterMixin):
             return
             
         self.__last_plot_data = history
+        self._record_refresh(container_name, history=history)
         self.plot_graphs()
+        self.update_metrics_stats(container_name, history)
         
         # Update uptime and other metrics
         self.__current_node_uptime = history.uptime
@@ -1053,7 +1157,7 @@ class EdgeNodeLauncher(QWidget, _DockerUtilsMixin, _UpdaterMixin):
         self.__current_node_ver = history.version
         
         self.maybe_refresh_uptime()
-        self.add_log(f"Updated metrics for container {container_name}", debug=True)
+        self.add_log(f"Updated metrics for container {container_name}", debug=True, container=container_name)
 
     def on_error(error):
         # Make sure we're still on the same container
@@ -1061,17 +1165,17 @@ class EdgeNodeLauncher(QWidget, _DockerUtilsMixin, _UpdaterMixin):
             self.add_log(f"Container changed during data plotting, ignoring error", debug=True)
             return
             
-        self.add_log(f'Error getting metrics for {container_name}: {error}', debug=True)
+        self.add_log(f'Error getting metrics for {container_name}: {error}', debug=True, container=container_name)
         
         # If this is a timeout error, log it more prominently
         if "timed out" in error.lower():
-            self.add_log(f"Metrics request for {container_name} timed out. This may indicate network issues or high load on the remote host.", color="red")
+            self.add_log(f"Metrics request for {container_name} timed out. This may indicate network issues or high load on the remote host.", color="red", container=container_name)
 
     try:
-        self.add_log(f"Plotting data for container: {container_name}", debug=True)
-        self.docker_handler.get_node_history(on_success, on_error)
+        self.add_log(f"Plotting data for container: {container_name}", debug=True, container=container_name)
+        (fetch or self.docker_handler.get_node_history)(on_success, on_error)
     except Exception as e:
-        self.add_log(f"Failed to start metrics request for {container_name}: {str(e)}", debug=True, color="red")
+        self.add_log(f"Failed to start metrics request for {container_name}: {str(e)}", debug=True, color="red", container=container_name)
         on_error(str(e))
 
   def plot_graphs(self, history: Optional[NodeHistory] = None, limit: int = 100) -> None:
@@ -1092,12 +1196,12 @@ class EdgeNodeLauncher(QWidget, _DockerUtilsMixin, _UpdaterMixin):
        history = self.__last_plot_data
      
     if history is None:
-        self.add_log(f"No history data available for container {container_name}", debug=True)
+        self.add_log(f"No history data available for container {container_name}", debug=True, container=container_name)
         return
     
     # Make sure we have timestamps
     if not history.timestamps or len(history.timestamps) == 0:
-        self.add_log(f"No timestamps in history data for container {container_name}", debug=True)
+        self.add_log(f"No timestamps in history data for container {container_name}", debug=True, container=container_name)
         return
     
     # Clean and limit data
@@ -1117,8 +1221,13 @@ class EdgeNodeLauncher(QWidget, _DockerUtilsMixin, _UpdaterMixin):
                 data = data[-len(timestamps):]
             elif len(data) < len(timestamps):
                 # Pad with zeros if needed
-                data = [0] * (len(timestamps) - len(data)) + data
+                data = [0] * (len(timestamps) - len(data)) + list(data)
             
+            # NodeHistory already holds timestamps as POSIX seconds
+            if isinstance(timestamps, array):
+                plot_widget.plot(timestamps, data, pen=color, name=name)
+                return
+
             # Convert string timestamps to numeric values for plotting
             numeric_timestamps = []
             for ts in timestamps:
@@ -1137,51 +1246,52 @@ class EdgeNodeLauncher(QWidget, _DockerUtilsMixin, _UpdaterMixin):
             plot_widget.plot(numeric_timestamps, data, pen=color, name=name)
     
     # CPU Plot
-    cpu_date_axis = DateAxisItem(orientation='bottom')
-    cpu_date_axis.setTimestamps(timestamps, parent="cpu")
-    self.cpu_plot.getAxis('bottom').setTickSpacing(60, 10)
-    self.cpu_plot.getAxis('bottom').setStyle(tickTextOffset=10)
-    self.cpu_plot.setAxisItems({'bottom': cpu_date_axis})
+    self._set_date_axis(self.cpu_plot, timestamps, parent="cpu")
     self.cpu_plot.setTitle(CPU_LOAD_TITLE)
     update_plot(self.cpu_plot, timestamps, history.cpu_load, 'CPU Load', colors["graph_cpu_color"])
     
     # Memory Plot
-    mem_date_axis = DateAxisItem(orientation='bottom')
-    mem_date_axis.setTimestamps(timestamps, parent="mem")
-    self.memory_plot.getAxis('bottom').setTickSpacing(60, 10)
-    self.memory_plot.getAxis('bottom').setStyle(tickTextOffset=10)
-    self.memory_plot.setAxisItems({'bottom': mem_date_axis})
+    self._set_date_axis(self.memory_plot, timestamps, parent="mem")
     self.memory_plot.setTitle(MEMORY_USAGE_TITLE)
     update_plot(self.memory_plot, timestamps, history.occupied_memory, 'Occupied Memory', colors["graph_memory_color"])
     
     # GPU Plot if available
     if history and history.gpu_load:
-      gpu_date_axis = DateAxisItem(orientation='bottom')
-      gpu_date_axis.setTimestamps(timestamps, parent="gpu")
-      self.gpu_plot.getAxis('bottom').setTickSpacing(60, 10)
-      self.gpu_plot.getAxis('bottom').setStyle(tickTextOffset=10)
-      self.gpu_plot.setAxisItems({'bottom': gpu_date_axis})
+      self._set_date_axis(self.gpu_plot, timestamps, parent="gpu")
       self.gpu_plot.setTitle(GPU_LOAD_TITLE)
       update_plot(self.gpu_plot, timestamps, history.gpu_load, 'GPU Load', colors["graph_gpu_color"])
 
     # GPU Memory if available
     if history and history.gpu_occupied_memory:
-      gpumem_date_axis = DateAxisItem(orientation='bottom')
-      gpumem_date_axis.setTimestamps(timestamps, parent="gpu_mem")
-      self.gpu_memory_plot.getAxis('bottom').setTickSpacing(60, 10)
-      self.gpu_memory_plot.getAxis('bottom').setStyle(tickTextOffset=10)
-      self.gpu_memory_plot.setAxisItems({'bottom': gpumem_date_axis})
+      self._set_date_axis(self.gpu_memory_plot, timestamps, parent="gpu_mem")
       self.gpu_memory_plot.setTitle(GPU_MEMORY_LOAD_TITLE)
       update_plot(self.gpu_memory_plot, timestamps, history.gpu_occupied_memory, 'Occupied GPU Memory', colors["graph_gpu_memory_color"])
       
-    self.add_log(f"Updated graphs for container {container_name} with {len(timestamps)} data points", debug=True)
+    self.add_log(f"Updated graphs for container {container_name} with {len(timestamps)} data points", debug=True, container=container_name)
+
+  def _set_date_axis(self, plot_widget, timestamps, parent):
+    """Point the bottom axis of a plot at the given timestamps.
+
+    The DateAxisItem is created once per plot and reused on every refresh, so its
+    tick label cache stays warm and the plot layout is not rebuilt each time.
+    """
+    date_axis = plot_widget.getAxis('bottom')
+    if not isinstance(date_axis, DateAxisItem):
+      date_axis = DateAxisItem(orientation='bottom')
+      date_axis.setStyle(tickTextOffset=10)
+      plot_widget.setAxisItems({'bottom': date_axis})
+    date_axis.setTimestamps(timestamps, parent=parent)
+    return date_axis
 
   def update_plot(plot_widget, timestamps, data, name, color):
     """Update a plot with the given data."""
     plot_widget.setTitle(name)
 
-  def refresh_local_address(self):
-    """Refresh the node address display."""
+  def refresh_local_address(self, fetch=None):
+    """Refresh the node address display.
+
+    `fetch(callback, error_callback)` gets the node info, get_node_info by default.
+    """
     # Get the current index and container name from the data
     current_index = self.container_combo.currentIndex()
     if current_index < 0:
@@ -1259,13 +1369,17 @@ class EdgeNodeLauncher(QWidget, _DockerUtilsMixin, _UpdaterMixin):
         self.add_log(f"Container changed during address refresh, ignoring results", debug=True)
         return
 
-      # Get current config to check for changes
+      # Update the config in memory, it is stored with the node info in one transaction
       config_container = self.config_manager.get_container(container_name)
-      
+      previous_alias = config_container.node_alias if config_container else None
+      config = self.config_manager.update_node_info(
+        container_name, node_alias=node_info.alias, node_address=node_info.address,
+        eth_address=node_info.eth_address, save=False)
+      self._record_refresh(container_name, node_info=node_info, config=config)
+
       # Check if node alias has changed
-      if config_container and node_info.alias != config_container.node_alias:
-          self.add_log(f"Node alias changed from '{config_container.node_alias}' to '{node_info.alias}', updating config", debug=True)
-          self.config_manager.update_node_alias(container_name, node_info.alias)
+      if config is not None and node_info.alias != previous_alias:
+          self.add_log(f"Node alias changed from '{previous_alias}' to '{node_info.alias}', updating config", debug=True, container=container_name)
           # Refresh container list to update display in dropdown
           current_container = container_name  # Store current selection
           self.refresh_container_list()
@@ -1300,15 +1414,7 @@ class EdgeNodeLauncher(QWidget, _DockerUtilsMixin, _UpdaterMixin):
           self.copyEthButton.setVisible(bool(self.node_eth_address))
 
         self.add_log(
-          f'Node info updated for {container_name}: {self.node_addr} : {self.node_name}, ETH: {self.node_eth_address}')
-
-        # Save addresses to config for this specific container
-        if container_name:
-          # Update node address in config
-          self.config_manager.update_node_address(container_name, self.node_addr)
-          # Update ETH address in config
-          self.config_manager.update_eth_address(container_name, self.node_eth_address)
-          self.add_log(f"Saved node address and ETH address to config for {container_name}", debug=True)
+          f'Node info updated for {container_name}: {self.node_addr} : {self.node_name}, ETH: {self.node_eth_address}', container=container_name)
 
     def on_error(error):
       # Make sure we're still on the same container
@@ -1318,15 +1424,15 @@ class EdgeNodeLauncher(QWidget, _DockerUtilsMixin, _UpdaterMixin):
 
       # Don't clear the display if we already have data - just log the error
       if hasattr(self, 'node_addr') and self.node_addr:
-        self.add_log(f'Error getting node info for {container_name}: {error}', debug=True)
+        self.add_log(f'Error getting node info for {container_name}: {error}', debug=True, container=container_name)
         
         # If this is a timeout error, log it more prominently
         if "timed out" in error.lower():
           self.add_log(
             f"Node info request for {container_name} timed out. This may indicate network issues or high load on the remote host.",
-            color="red")
+            color="red", container=container_name)
       else:
-        self.add_log(f'Error getting node info for {container_name}: {error}', debug=True)
+        self.add_log(f'Error getting node info for {container_name}: {error}', debug=True, container=container_name)
         self.addressDisplay.setText('Address: Error getting node info')
         self.ethAddressDisplay.setText('ETH Address: Not available')
         self.nameDisplay.setText('')
@@ -1337,15 +1443,77 @@ class EdgeNodeLauncher(QWidget, _DockerUtilsMixin, _UpdaterMixin):
         if "timed out" in error.lower():
           self.add_log(
             f"Node info request for {container_name} timed out. This may indicate network issues or high load on the remote host.",
-            color="red")
+            color="red", container=container_name)
 
     try:
-      self.add_log(f"Refreshing address for container: {container_name}", debug=True)
-      self.docker_handler.get_node_info(on_success, on_error)
+      self.add_log(f"Refreshing address for container: {container_name}", debug=True, container=container_name)
+      (fetch or self.docker_handler.get_node_info)(on_success, on_error)
     except Exception as e:
-      self.add_log(f"Failed to start node info request for {container_name}: {str(e)}", debug=True, color="red")
+      self.add_log(f"Failed to start node info request for {container_name}: {str(e)}", debug=True, color="red", container=container_name)
       on_error(str(e))
 
+  def _record_refresh(self, container_name, node_info=None, history=None, config=None):
+    """Store the results of a refresh in one transaction, on the state store writer thread."""
+    self.state_store.submit(self.state_store.record_refresh, container_name,
+                            node_info=node_info, history=history, config=config)
+    return
+
+  def update_metrics_stats(self, container_name, history):
+    """Feed the new samples of a history payload to the rolling stats and refresh the panel."""
+    stats = self.__metrics_stats.get(container_name)
+    if stats is None:
+      stats = self.__metrics_stats[container_name] = NodeMetricsStats()
+      # Start from the stored samples, so the windows survive a launcher restart
+      try:
+        stats.ingest(self.state_store.load_metric_samples(container_name, since=time() - max(stats.windows)))
+      except Exception as e:
+        self.add_log(f"Failed to load stored metrics of {container_name}: {str(e)}", debug=True, container=container_name)
+    new_samples = stats.ingest(history)
+    if new_samples:
+      self.add_log(f"Added {new_samples} samples to metrics stats of {container_name}", debug=True, container=container_name)
+    self._show_metrics_stats(stats)
+    return
+
+  def _show_metrics_stats(self, stats=None):
+    """Show the rolling statistics in the node info panel, or the empty labels without stats."""
+    def fmt(value, unit=''):
+      return '-' if value is None else f'{value:.1f}{unit}'
+
+    if stats is None:
+      self.node_cpu_stats.setText(CPU_STATS_LABEL)
+      self.node_mem_stats.setText(MEMORY_STATS_LABEL)
+      self.node_gpu_stats.setText(GPU_TEMP_STATS_LABEL)
+      self.node_gpu_stats.setVisible(False)
+      return
+
+    cpu = stats.get('cpu_load', HOUR)
+    self.node_cpu_stats.setText(f'{CPU_STATS_LABEL} {fmt(cpu.mean, "%")} (max {fmt(cpu.max, "%")})')
+    self.node_cpu_stats.setToolTip(self._metrics_stats_tooltip(stats, 'cpu_load', '%'))
+
+    mem = stats.get('occupied_memory', DAY)
+    self.node_mem_stats.setText(f'{MEMORY_STATS_LABEL} {fmt(mem.percentile(95), " GB")}')
+    self.node_mem_stats.setToolTip(self._metrics_stats_tooltip(stats, 'occupied_memory', ' GB'))
+
+    has_gpu = stats.has_data('gpu_temp')
+    self.node_gpu_stats.setVisible(has_gpu)
+    if has_gpu:
+      self.node_gpu_stats.setText(f'{GPU_TEMP_STATS_LABEL} {fmt(stats.get("gpu_temp", DAY).max, "°C")}')
+      self.node_gpu_stats.setToolTip(self._metrics_stats_tooltip(stats, 'gpu_temp', '°C'))
+    return
+
+  @staticmethod
+  def _metrics_stats_tooltip(stats, metric, unit):
+    lines = []
+    for window in stats.windows:
+      summary = stats.summary(metric, window)
+      if not summary['count']:
+        continue
+      lines.append(
+        f"{format_window(window)}: min {summary['min']:.1f}{unit}, mean {summary['mean']:.1f}{unit}, "
+        f"p95 {summary['p95']:.1f}{unit}, max {summary['max']:.1f}{unit} ({summary['count']} samples)"
+      )
+    return '\n'.join(lines)
+
   def maybe_refresh_uptime(self):
     """Update uptime, epoch and epoch availability displays.
     
@@ -1386,7 +1554,7 @@ class EdgeNodeLauncher(QWidget, _DockerUtilsMixin, _UpdaterMixin):
       self.node_version.setText(f'Running ver: {ver}')
 
       self.__display_uptime = uptime
-      self.add_log(f"Updated uptime display for container {container_name}", debug=True)
+      self.add_log(f"Updated uptime display for container {container_name}", debug=True, container=container_name)
     return
 
   def copy_address(self):
@@ -1410,7 +1578,7 @@ class EdgeNodeLauncher(QWidget, _DockerUtilsMixin, _UpdaterMixin):
     clipboard = QApplication.clipboard()
     clipboard.setText(self.node_addr)
     self.toast.show_notification(NotificationType.SUCCESS, NOTIFICATION_ADDRESS_COPIED.format(address=self.node_addr))
-    self.add_log(f"Copied node address for container {container_name}", debug=True)
+    self.add_log(f"Copied node address for container {container_name}", debug=True, container=container_name)
     return
 
   def copy_eth_address(self):
@@ -1434,7 +1602,7 @@ class EdgeNodeLauncher(QWidget, _DockerUtilsMixin, _UpdaterMixin):
     clipboard = QApplication.clipboard()
     clipboard.setText(self.node_eth_address)
     self.toast.show_notification(NotificationType.SUCCESS, NOTIFICATION_ADDRESS_COPIED.format(address=self.node_eth_address))
-    self.add_log(f"Copied ETH address for container {container_name}", debug=True)
+    self.add_log(f"Copied ETH address for container {container_name}", debug=True, container=container_name)
     return
 
   def refresh_all(self):
@@ -1447,37 +1615,108 @@ class EdgeNodeLauncher(QWidget, _DockerUtilsMixin, _UpdaterMixin):
       self.__last_auto_update_check = time()
       self.check_for_updates(verbose=verbose or FULL_DEBUG)
 
-    # Check for Docker image updates every 5 minutes (300 seconds)
-    if (time() - self.__last_docker_image_check) > DOCKER_IMAGE_AUTO_UPDATE_CHECK_INTERVAL:
+    # Prefetch new Docker image versions in the background while the launcher is idle
+    if self.idle_monitor.idle_for() >= IMAGE_PREFETCH_IDLE_TIME and (
+        self.__image_prefetch_pending
+        or (time() - self.__last_docker_image_check) > DOCKER_IMAGE_AUTO_UPDATE_CHECK_INTERVAL):
       self.__last_docker_image_check = time()
       self._check_docker_image_updates()
 
+  def set_prefetch_bandwidth_limit(self, megabytes_per_second):
+    """Save the image prefetch bandwidth, a prefetch already running uses it right away."""
+    limit = megabytes_per_second * 1_000_000
+    self.config_manager.set_prefetch_bandwidth_limit(limit)
+    if self.__image_prefetch_thread is not None and self.__image_prefetch_thread.isRunning():
+      self.__image_prefetch_thread.prefetcher.set_bandwidth_limit(limit)
+
   def _check_docker_image_updates(self):
-    """Check if there's an updated Docker image and pull it if available."""
-    try:
-      # First ensure we have Docker
-      if not self.check_docker():
-        return
-        
-      # Get proper image name and tag
-      from utils.const import DOCKER_IMAGE, DOCKER_TAG
-      
-      self.add_log(f"Checking for Docker image updates...", debug=True)
-      
-      # Use the docker_handler service to check for and pull updates
-      was_updated, message = self.docker_handler.check_and_pull_image_updates(
-        image_name=DOCKER_IMAGE,
-        tag=DOCKER_TAG
-      )
-      
-      # Log the result
-      if was_updated:
-        self.add_log(message, color="green")
-      else:
-        self.add_log(message, debug=True)
-        
-    except Exception as e:
-      self.add_log(f"Error checking for Docker image updates: {str(e)}", debug=True)
+    """Download a new version of the Docker image, if any, without blocking the UI.
+
+    The download is capped to the configured bandwidth, paused on user input and
+    resumed where it stopped, the image is loaded locally once complete.
+    """
+    if self.__image_prefetch_thread is not None and self.__image_prefetch_thread.isRunning():
+      return
+    self.__image_prefetch_pending = False
+    prefetcher = ImagePrefetcher(
+      f"{DOCKER_IMAGE}:{DOCKER_TAG}",
+      bandwidth_limit=self.config_manager.get_prefetch_bandwidth_limit(),
+    )
+    self.add_log("Checking for Docker image updates...", debug=True)
+    self.__image_prefetch_thread = ImagePrefetchThread(prefetcher)
+    self.__image_prefetch_thread.prefetch_finished.connect(self._on_image_prefetch_finished)
+    self.__image_prefetch_thread.start()
+
+  def closeEvent(self, event):
+    """With 'Stop Nodes on Exit', every node is stopped gracefully before the launcher closes."""
+    if self.__exit_shutdown_done or not self.config_manager.get_stop_all_on_exit():
+      super().closeEvent(event)
+      return
+    event.ignore()
+    if self.__exit_shutdown_thread is not None:
+      return  # Already stopping, the launcher closes once every node has exited
+    grace_periods = {
+      container.name: self.config_manager.get_stop_grace_period(container.name)
+      for container in self.config_manager.get_all_containers()
+    }
+    self._cancel_launch_watch()
+    self.add_log(f"Stopping {len(grace_periods)} nodes before exit "
+                 f"(up to {max(grace_periods.values(), default=0)}s each, all at once)", color="yellow")
+    self.exit_dialog = LoadingDialog(self, title="Stopping Nodes",
+                                     message="Stopping every node before exit...", size=50)
+    self.exit_dialog.show()
+    pending = set(grace_periods)
+
+    def on_update(state):
+      if state.done:
+        pending.discard(state.container)
+      if self.exit_dialog is not None:
+        self.exit_dialog.update_progress(f"Waiting for {len(pending)} of {len(grace_periods)} nodes to exit...",
+                                         process_events=False)
+
+    def on_finished(states):
+      for state in states.values():
+        if state.phase == 'failed':
+          self.add_log(f"Failed to stop {state.container}: {state.error}", color="red")
+        elif state.phase == 'stopped':
+          killed = ', killed at the end of its grace period' if state.killed else ''
+          self.add_log(f"Stopped {state.container} in {state.duration:.1f}s{killed}")
+      self.__exit_shutdown_done = True
+      self.exit_dialog.safe_close()
+      self.exit_dialog = None
+      self.close()
+
+    self.__exit_shutdown_thread = self.docker_handler.stop_containers_threaded(grace_periods, on_finished, on_update)
+    return
+
+  def _cancel_launch_watch(self, wait=False):
+    """Stop waiting for the first heartbeat of the last launched node."""
+    thread = self.__launch_thread
+    if thread is not None and thread.isRunning():
+      thread.cancel()
+      if wait:
+        thread.wait(2000)
+
+  def _pause_image_prefetch(self, wait=False):
+    """Stop the running image prefetch, it resumes from the downloaded layers later.
+
+    The pause aborts the download and kills `docker load`, so waiting (on exit) lasts
+    until the thread is done rather than for a fixed time Qt could outlive.
+    """
+    thread = self.__image_prefetch_thread
+    if thread is not None and thread.isRunning():
+      thread.pause()
+      if wait:
+        thread.wait()
+
+  def _on_image_prefetch_finished(self, result):
+    if result.status == 'loaded':
+      self.add_log(result.message, color="green")
+    elif result.status == 'paused':
+      self.__image_prefetch_pending = True
+      self.add_log(f"{result.message}, {result.downloaded / 1e6:.1f} MB downloaded before the pause", debug=True)
+    else:
+      self.add_log(result.message, debug=True)
 
   def _refresh_local_containers(self):
     """Refresh local container list and info."""
@@ -1496,17 +1735,18 @@ class EdgeNodeLauncher(QWidget, _DockerUtilsMixin, _UpdaterMixin):
         
         # Update container info if running
         if self.is_container_running():
+            # Node info and history are read in one batch (one round trip on a remote host)
+            snapshot = self.docker_handler.node_snapshot_request()
             try:
-                # Refresh address first (usually faster)
-                self.refresh_local_address()
+                self.refresh_local_address(fetch=snapshot.fetch_node_info)
                 
-                # Then plot data (can be slower)
                 try:
-                    self.plot_data()
+                    self.plot_data(fetch=snapshot.fetch_node_history)
                 except Exception as e:
                     self.add_log(f"Error plotting data for local container: {str(e)}", debug=True, color="red")
             except Exception as e:
                 self.add_log(f"Error refreshing local container info: {str(e)}", color="red")
+            snapshot.start()
         
         # Always update the toggle button text
         self.update_toggle_button_text()
@@ -1570,6 +1810,73 @@ class EdgeNodeLauncher(QWidget, _DockerUtilsMixin, _UpdaterMixin):
     if self.is_container_running():
         self.add_log("Note: You may need to restart the container for debug mode changes to take effect", color="yellow")
 
+  def show_container_logs(self):
+    """Open the live log pane of the selected container.
+
+    Panes are kept per container: reopening one resumes the stream from the last line
+    shown instead of reading the whole container log again.
+    """
+    container_name = self.container_combo.currentText()
+    if not container_name:
+      self.toast.show_notification(NotificationType.ERROR, "No container selected")
+      return
+    pane = self.__log_panes.get(container_name)
+    if pane is None:
+      pane = ContainerLogsDialog(self, self.docker_handler, container_name, icon=self._icon)
+      self.__log_panes[container_name] = pane
+    pane.start_stream()
+    pane.show()
+    pane.raise_()
+    pane.activateWindow()
+    self.add_log(f"Opened live logs of {container_name}", debug=True, container=container_name)
+    return
+
+  def _stop_log_panes(self):
+    """Stop following the logs of every open pane, so no `docker logs -f` outlives the launcher."""
+    for pane in self.__log_panes.values():
+      pane.stop_stream()
+    return
+
+  def show_fleet_dashboard(self):
+    """Open the table of every node of every host of the inventory."""
+    if self.__fleet_dashboard is None:
+      self.__fleet_dashboard = FleetDashboardDialog(self, icon=self._icon)
+    self.__fleet_dashboard.show()
+    self.__fleet_dashboard.raise_()
+    self.__fleet_dashboard.activateWindow()
+    return
+
+  def show_bulk_operations(self):
+    """Open the dialog starting, stopping or restarting many nodes of the current host at once."""
+    if self.__bulk_operations is None:
+      self.__bulk_operations = BulkOperationsDialog(self.docker_handler, self.config_manager, self, icon=self._icon)
+      self.__bulk_operations.operation_finished.connect(self._on_bulk_operation_finished)
+    self.__bulk_operations.load_containers()
+    self.__bulk_operations.show()
+    self.__bulk_operations.raise_()
+    self.__bulk_operations.activateWindow()
+    return
+
+  def _on_bulk_operation_finished(self, action, results):
+    now = datetime.now().isoformat()
+    failed = 0
+    for result in results:
+      if result.phase == 'done' and action != 'stop':
+        self.config_manager.update_last_used(result.container, now)
+      if result.phase == 'failed':
+        failed += 1
+        self.add_log(f"Bulk {action} of {result.container} failed: {result.error}", color="red")
+    done = sum(1 for result in results if result.phase == 'done')
+    self.add_log(f"Bulk {action}: {done} done, {failed} failed out of {len(results)} nodes")
+    if failed:
+      self.toast.show_notification(NotificationType.ERROR, f"Bulk {action}: {failed} of {len(results)} nodes failed")
+    else:
+      self.toast.show_notification(NotificationType.SUCCESS, f"Bulk {action} of {len(results)} nodes finished")
+    self.update_toggle_button_text()
+    self.refresh_local_address()
+    self.maybe_refresh_uptime()
+    return
+
   def show_rename_dialog(self):
     # Get the current index and container name from the data
     current_index = self.container_combo.currentIndex()
@@ -1714,21 +2021,28 @@ class EdgeNodeLauncher(QWidget, _DockerUtilsMixin, _UpdaterMixin):
                         break
         
         def on_node_info_error(error):
+            # The restart below proceeds even if we couldn't get the node info
             self.add_log(f"Error getting node info after rename: {error}", debug=True)
-            # Still proceed with restart even if we couldn't get the node info
-            self.stop_container()
-            self.launch_container()
-            self.post_launch_setup()
-            self.refresh_local_address()
         
         # Get node info to update config with actual container name
         self.docker_handler.get_node_info(update_config_with_container_name, on_node_info_error)
         
-        # Stop and restart the container
-        self.stop_container()
-        self.launch_container()
-        self.post_launch_setup()
-        self.refresh_local_address()
+        # Stop the container off the GUI thread (it has its grace period to exit), then relaunch it
+        def on_stop_done(result):
+            _, stderr, return_code = result
+            if return_code != 0:
+                on_stop_error(stderr)
+                return
+            self.launch_container()
+            self.post_launch_setup()
+            self.refresh_local_address()
+
+        def on_stop_error(error):
+            self.add_log(f"Error stopping container after rename: {error}", color="red", container=container_name)
+            self.toast.show_notification(NotificationType.ERROR, 'Failed to restart the renamed node')
+
+        self.docker_handler.stop_container_threaded(container_name, on_stop_done, on_stop_error,
+                                                    self.config_manager.get_stop_grace_period(container_name))
 
     def on_error(error: str) -> None:
         self.add_log(f'Error renaming node: {error}', debug=True)
@@ -1824,6 +2138,9 @@ class EdgeNodeLauncher(QWidget, _DockerUtilsMixin, _UpdaterMixin):
     if hasattr(self, 'node_version'):
         self.node_version.setText('')
 
+    if hasattr(self, 'node_cpu_stats'):
+        self._show_metrics_stats()
+
     # Reset state variables
     if hasattr(self, '__display_uptime'):
         self.__display_uptime = None
@@ -1886,7 +2203,7 @@ class EdgeNodeLauncher(QWidget, _DockerUtilsMixin, _UpdaterMixin):
         return
         
     try:
-        self.add_log(f"Selected container: {container_name}", debug=True)
+        self.add_log(f"Selected container: {container_name}", debug=True, container=container_name)
         
         # Get the current index and actual container name from the data
         current_index = self.container_combo.currentIndex()
@@ -1907,7 +2224,7 @@ class EdgeNodeLauncher(QWidget, _DockerUtilsMixin, _UpdaterMixin):
         # If container doesn't exist in Docker but exists in config, show a message
         if not container_exists:
             if config_container:
-                self.add_log(f"Container {container_name} exists in config but not in Docker. It will be recreated when launched.", debug=True)
+                self.add_log(f"Container {container_name} exists in config but not in Docker. It will be recreated when launched.", debug=True, container=container_name)
                 
                 # Display saved addresses if available
                 if config_container.node_address:
@@ -1918,7 +2235,7 @@ class EdgeNodeLauncher(QWidget, _DockerUtilsMixin, _UpdaterMixin):
                       str_display = f"Address: {self.node_addr}"
                     self.addressDisplay.setText(str_display)
                     self.copyAddrButton.setVisible(True)
-                    self.add_log(f"Displaying saved node address for {container_name}", debug=True)
+                    self.add_log(f"Displaying saved node address for {container_name}", debug=True, container=container_name)
                 
                 if config_container.eth_address:
                     self.node_eth_address = config_container.eth_address
@@ -1928,12 +2245,12 @@ class EdgeNodeLauncher(QWidget, _DockerUtilsMixin, _UpdaterMixin):
                       str_eth_display = f"ETH Address: {self.node_eth_address}"
                     self.ethAddressDisplay.setText(str_eth_display)
                     self.copyEthButton.setVisible(True)
-                    self.add_log(f"Displaying saved ETH address for {container_name}", debug=True)
+                    self.add_log(f"Displaying saved ETH address for {container_name}", debug=True, container=container_name)
                 
                 if config_container.node_alias:
                     self.node_name = config_container.node_alias
                     self.nameDisplay.setText('Name: ' + config_container.node_alias)
-                    self.add_log(f"Displaying saved node alias for {container_name}", debug=True)
+                    self.add_log(f"Displaying saved node alias for {container_name}", debug=True, container=container_name)
                 
                 return
         
@@ -1946,7 +2263,7 @@ class EdgeNodeLauncher(QWidget, _DockerUtilsMixin, _UpdaterMixin):
             self.refresh_local_address()  # Updates address displays with cached data
             self.plot_data()  # Updates graphs and metrics
             self.maybe_refresh_uptime()  # Updates uptime, epoch, and version info
-            self.add_log(f"Updated UI with running container data for: {container_name}", debug=True)
+            self.add_log(f"Updated UI with running container data for: {container_name}", debug=True, container=container_name)
         else:
             # Display saved addresses from config if available
             if config_container:
@@ -1958,7 +2275,7 @@ class EdgeNodeLauncher(QWidget, _DockerUtilsMixin, _UpdaterMixin):
                       str_display = f"Address: {self.node_addr}"
                     self.addressDisplay.setText(str_display)
                     self.copyAddrButton.setVisible(True)
-                    self.add_log(f"Displaying saved node address for {container_name}", debug=True)
+                    self.add_log(f"Displaying saved node address for {container_name}", debug=True, container=container_name)
                 
                 if config_container.eth_address:
                     self.node_eth_address = config_container.eth_address
@@ -1968,22 +2285,20 @@ class EdgeNodeLauncher(QWidget, _DockerUtilsMixin, _UpdaterMixin):
                       str_eth_display = f"ETH Address: {self.node_eth_address}"
                     self.ethAddressDisplay.setText(str_eth_display)
                     self.copyEthButton.setVisible(True)
-                    self.add_log(f"Displaying saved ETH address for {container_name}", debug=True)
+                    self.add_log(f"Displaying saved ETH address for {container_name}", debug=True, container=container_name)
                 
-                self.add_log(f"Container {container_name} is not running, displaying saved data", debug=True)
+                self.add_log(f"Container {container_name} is not running, displaying saved data", debug=True, container=container_name)
             
     except Exception as e:
         self._clear_info_display()
-        self.add_log(f"Error selecting container {container_name}: {str(e)}", debug=True, color="red")
+        self.add_log(f"Error selecting container {container_name}: {str(e)}", debug=True, color="red", container=container_name)
         self.toast.show_notification(NotificationType.ERROR, f"Error selecting container: {str(e)}")
 
   def show_add_node_dialog(self):
     """Show confirmation dialog for adding a new node."""
     from PyQt5.QtWidgets import QDialog, QVBoxLayout, QLabel, QHBoxLayout, QPushButton
 
-    # Generate the container name that would be used
-    container_name = generate_container_name()
-    volume_name = get_volume_name(container_name)
+    containers = self.config_manager.get_all_containers()
 
     # Create dialog
     dialog = QDialog(self)
@@ -2014,12 +2329,48 @@ class EdgeNodeLauncher(QWidget, _DockerUtilsMixin, _UpdaterMixin):
     dialog.setLayout(layout)
     dialog.setStyleSheet(self._current_stylesheet)  # Apply current theme
 
-    # Connect buttons
-    create_button.clicked.connect(lambda: self._create_node_with_name(container_name, volume_name, None, dialog))
+    # The name comes after those of the host and the config, Create is enabled once it is known
+    create_button.setEnabled(False)
+
+    def on_allocator(allocator):
+      if not dialog.isVisible():
+        return
+      container_name, volume_name = allocator.allocate()
+      # The name stays reserved until the dialog is cancelled
+      dialog.rejected.connect(lambda: allocator.release(container_name))
+      create_button.clicked.connect(lambda: self._create_node_with_name(container_name, volume_name, None, dialog))
+      create_button.setEnabled(True)
+
     cancel_button.clicked.connect(dialog.reject)
+    self._with_name_allocator(containers, on_allocator)
 
     dialog.exec_()
 
+  def _with_name_allocator(self, containers, callback):
+    """Call `callback` with the name allocator of the current host.
+
+    The allocator is kept per host, so names reserved by one dialog are not handed out by
+    the next. The host is listed off the GUI thread (over SSH for a remote host) when it
+    has no allocator yet, or when the config holds containers its allocator does not know.
+    """
+    host = ' '.join(self.docker_handler.remote_ssh_command or []) or 'local'
+    config_names = [container.name for container in containers]
+    config_volumes = [container.volume for container in containers]
+    allocator = self._name_allocators.get(host, config_names)
+    if allocator is not None:
+      callback(allocator)
+      return
+
+    def on_names_listed(host_names):
+      callback(self._name_allocators.build(host, host_names, config_names, config_volumes))
+
+    def on_names_error(error):
+      # Not kept: the next dialog lists the host again
+      self.add_log(f"Could not list the containers of the host, naming after the config only: {error}", debug=True)
+      callback(NameAllocator(config_names, config_volumes))
+
+    self.docker_handler.list_container_names_threaded(on_names_listed, on_names_error)
+
   def _create_node_with_name(self, container_name, volume_name, display_name, dialog):
     """Create a new node with the given name and close the dialog."""
     dialog.accept()
@@ -2097,7 +2448,7 @@ class EdgeNodeLauncher(QWidget, _DockerUtilsMixin, _UpdaterMixin):
       # 5) Actually start (launch) the container so it shows "active" in the UI
       self.launch_container(volume_name)
 
-      self.add_log(f"Successfully created and started new node: {container_name}", color="green")
+      self.add_log(f"Successfully created and started new node: {container_name}", color="green", container=container_name)
       
       # Show success notification
       node_display_name = "Edge Node"
@@ -2139,7 +2490,7 @@ class EdgeNodeLauncher(QWidget, _DockerUtilsMixin, _UpdaterMixin):
     
     # Ensure volume_name is not None or empty
     if not volume_name:
-        self.add_log(f"Warning: No volume name provided for container {container_name}. Using default.", color="yellow")
+        self.add_log(f"Warning: No volume name provided for container {container_name}. Using default.", color="yellow", container=container_name)
         volume_name = get_volume_name(container_name)
     
     # Check if volume exists in Docker
@@ -2149,7 +2500,7 @@ class EdgeNodeLauncher(QWidget, _DockerUtilsMixin, _UpdaterMixin):
     else:
         self.add_log(f"Using existing volume: {volume_name}", debug=True)
     
-    self.add_log(f'Launching container {container_name} with volume {volume_name}...')
+    self.add_log(f'Launching container {container_name} with volume {volume_name}...', container=container_name)
     
     try:
         # Show loading dialog if not already showing one from add_new_node or toggle_container
@@ -2239,7 +2590,7 @@ class EdgeNodeLauncher(QWidget, _DockerUtilsMixin, _UpdaterMixin):
             # Update loading dialog with progress
             if hasattr(self, 'launcher_dialog') and self.launcher_dialog is not None :
                 self.launcher_dialog.update_progress(f"Removing existing container '{container_name}' before launch...")
-            self.add_log(f"Container {container_name} already exists, removing it first", color="yellow")
+            self.add_log(f"Container {container_name} already exists, removing it first", color="yellow", container=container_name)
         
         # Check if Docker image exists
         image_exists = self.docker_handler._ensure_image_exists()
@@ -2284,13 +2635,17 @@ class EdgeNodeLauncher(QWidget, _DockerUtilsMixin, _UpdaterMixin):
             
             def on_pull_output(line):
                 # Process each line of output in real-time to update the dialog
+                # The dialog only parses the line, its widgets are refreshed on a throttled timer
                 if hasattr(self, 'docker_pull_dialog') and self.docker_pull_dialog is not None :
                     self.docker_pull_dialog.update_pull_progress(line)
-                    # Process events to keep UI responsive
-                    QApplication.processEvents()
+            
+            def on_pull_event(event):
+                # Engine API progress object, with the exact bytes of each layer
+                if hasattr(self, 'docker_pull_dialog') and self.docker_pull_dialog is not None :
+                    self.docker_pull_dialog.update_pull_event(event)
             
             # Start the Docker pull operation with real-time output processing
-            self.docker_handler.pull_image(on_pull_success, on_pull_error, on_pull_output)
+            self.docker_handler.pull_image(on_pull_success, on_pull_error, on_pull_output, on_pull_event)
             
             # Exit this method early - we'll continue after the pull completes
             return
@@ -2587,7 +2942,7 @@ class EdgeNodeLauncher(QWidget, _DockerUtilsMixin, _UpdaterMixin):
         
         # Log status changes for debugging
         if hasattr(self, 'container_last_run_status') and self.container_last_run_status != is_running:
-            self.add_log(f'Container {container_name} status changed: {self.container_last_run_status} -> {is_running}', debug=True)
+            self.add_log(f'Container {container_name} status changed: {self.container_last_run_status} -> {is_running}', debug=True, container=container_name)
             self.container_last_run_status = is_running
             
         return is_running
@@ -2702,17 +3057,18 @@ class EdgeNodeLauncher(QWidget, _DockerUtilsMixin, _UpdaterMixin):
         
         # Update container info if running
         if self.is_container_running():
+            # Node info and history are read in one batch (one round trip on a remote host)
+            snapshot = self.docker_handler.node_snapshot_request()
             try:
-                # Refresh address first (usually faster)
-                self.refresh_local_address()
+                self.refresh_local_address(fetch=snapshot.fetch_node_info)
                 
-                # Then plot data (can be slower)
                 try:
-                    self.plot_data()
+                    self.plot_data(fetch=snapshot.fetch_node_history)
                 except Exception as e:
                     self.add_log(f"Error plotting data for local container: {str(e)}", debug=True, color="red")
             except Exception as e:
                 self.add_log(f"Error refreshing local container info: {str(e)}", color="red")
+            snapshot.start()
         
         # Always update the toggle button text
         self.update_toggle_button_text()
@@ -2820,17 +3176,10 @@ class EdgeNodeLauncher(QWidget, _DockerUtilsMixin, _UpdaterMixin):
         # Log the command without debug flag to ensure it's always visible
         self.add_log(f'Docker command: {" ".join(command)}', color="blue")
         
-        # First check if the container already exists
-        container_exists = self.container_exists_in_docker(container_name)
-        if container_exists:
-            # Update loading dialog with progress
-            if hasattr(self, 'launcher_dialog') and self.launcher_dialog is not None :
-                self.launcher_dialog.update_progress(f"Removing existing container '{container_name}' before launch...")
-            self.add_log(f"Container {container_name} already exists, removing it first", color="yellow")
-        
-        # Check if Docker image exists
-        image_exists = self.docker_handler._ensure_image_exists()
-        if not image_exists:
+        # Define callback for a missing image: pull it, the launch starts over once the pull completes
+        def on_image_missing():
+            self.loading_indicator.stop()
+
             # Close the existing launcher dialog if it's open
             if hasattr(self, 'launcher_dialog') and self.launcher_dialog is not None :
                 self.launcher_dialog.safe_close()
@@ -2871,21 +3220,39 @@ class EdgeNodeLauncher(QWidget, _DockerUtilsMixin, _UpdaterMixin):
             
             def on_pull_output(line):
                 # Process each line of output in real-time to update the dialog
+                # The dialog only parses the line, its widgets are refreshed on a throttled timer
                 if hasattr(self, 'docker_pull_dialog') and self.docker_pull_dialog is not None :
                     self.docker_pull_dialog.update_pull_progress(line)
-                    # Process events to keep UI responsive
-                    QApplication.processEvents()
             
-            # Start the Docker pull operation with real-time output processing
-            self.docker_handler.pull_image(on_pull_success, on_pull_error, on_pull_output)
+            def on_pull_event(event):
+                # Engine API progress object, with the exact bytes of each layer
+                if hasattr(self, 'docker_pull_dialog') and self.docker_pull_dialog is not None :
+                    self.docker_pull_dialog.update_pull_event(event)
             
-            # Exit this method early - we'll continue after the pull completes
-            return
-        
-        # Update loading dialog with progress
-        if hasattr(self, 'launcher_dialog') and self.launcher_dialog is not None :
-            self.launcher_dialog.update_progress("Launching Docker container...")
-        
+            # Start the Docker pull operation with real-time output processing
+            self.docker_handler.pull_image(on_pull_success, on_pull_error, on_pull_output, on_pull_event)
+
+        # Define phase callback: the loading dialogs show the time of each finished phase
+        launch_timings = []
+        def on_launch_phase(timings):
+            launch_timings[:] = [timings]
+            if timings.current == 'remove':
+                self.add_log(f"Container {container_name} already exists, removing it first", color="yellow", container=container_name)
+            if hasattr(self, 'launcher_dialog') and self.launcher_dialog is not None :
+                self.launcher_dialog.update_progress(timings.progress_text())
+            elif hasattr(self, 'startup_dialog') and self.startup_dialog is not None and self.startup_dialog.isVisible():
+                self.startup_dialog.update_progress(timings.progress_text())
+
+        # Define heartbeat callback, called once the node answered after its start, or gave up
+        def on_launch_heartbeat(timings):
+            seconds = timings.phases.get('first_heartbeat')
+            if seconds is not None:
+                self.add_log(f"Node {container_name} sent its first heartbeat {seconds:.1f}s after start "
+                             f"({timings.summary()})", color="green", container=container_name)
+            else:
+                self.add_log(f"No heartbeat from {container_name} after its launch ({timings.summary()})",
+                             color="yellow", container=container_name)
+
         # Define success callback for threaded operation
         def on_launch_success(result):
             stdout, stderr, return_code = result
@@ -2902,6 +3269,9 @@ class EdgeNodeLauncher(QWidget, _DockerUtilsMixin, _UpdaterMixin):
             elif hasattr(self, 'startup_dialog') and self.startup_dialog is not None and self.startup_dialog.isVisible():
                 self.startup_dialog.update_progress("Container launched, updating configuration...")
             
+            if launch_timings:
+                self.add_log(f"Launched {container_name}: {launch_timings[0].summary()}", color="blue", container=container_name)
+
             # Update last used timestamp in config
             from datetime import datetime
             self.config_manager.update_last_used(container_name, datetime.now().isoformat())
@@ -2927,24 +3297,27 @@ class EdgeNodeLauncher(QWidget, _DockerUtilsMixin, _UpdaterMixin):
             # Stop loading indicator
             self.loading_indicator.stop()
             
-            # Update loading dialogs with completion message
+            # Update loading dialogs with completion message, under the time of each phase
+            completion_message = "Container launched successfully!"
+            if launch_timings:
+                completion_message = f"{launch_timings[0].progress_text()}\n{completion_message}"
             if hasattr(self, 'launcher_dialog') and self.launcher_dialog is not None :
-                self.launcher_dialog.update_progress("Container launched successfully!")
+                self.launcher_dialog.update_progress(completion_message)
             elif hasattr(self, 'startup_dialog') and self.startup_dialog is not None and self.startup_dialog.isVisible():
-                self.startup_dialog.update_progress("Container launched successfully!")
-            
-            # Close the loading dialogs immediately
-            launcher_dialog_visible = hasattr(self, 'launcher_dialog') and self.launcher_dialog is not None 
+                self.startup_dialog.update_progress(completion_message)
+
+            # Close the loading dialogs after a short delay to show the timings
+            launcher_dialog_visible = hasattr(self, 'launcher_dialog') and self.launcher_dialog is not None
             if launcher_dialog_visible:
-                self.launcher_dialog.safe_close()
+                QTimer.singleShot(1500, lambda: self.launcher_dialog.safe_close() if hasattr(self, 'launcher_dialog') and self.launcher_dialog is not None else None)
                 # Schedule removal of the reference after a delay
-                QTimer.singleShot(500, lambda: setattr(self, 'launcher_dialog', None) if hasattr(self, 'launcher_dialog') else None)
-            
+                QTimer.singleShot(2000, lambda: setattr(self, 'launcher_dialog', None) if hasattr(self, 'launcher_dialog') else None)
+
             startup_dialog_visible = hasattr(self, 'startup_dialog') and self.startup_dialog is not None and self.startup_dialog.isVisible()
             if startup_dialog_visible:
-                self.startup_dialog.safe_close()
+                QTimer.singleShot(1500, lambda: self.startup_dialog.safe_close() if hasattr(self, 'startup_dialog') and self.startup_dialog is not None else None)
                 # Schedule removal of the reference after a delay
-                QTimer.singleShot(500, lambda: setattr(self, 'startup_dialog', None) if hasattr(self, 'startup_dialog') else None)
+                QTimer.singleShot(2000, lambda: setattr(self, 'startup_dialog', None) if hasattr(self, 'startup_dialog') else None)
             
             # Show success notification
             # Get node alias from config if available
@@ -2987,7 +3360,7 @@ class EdgeNodeLauncher(QWidget, _DockerUtilsMixin, _UpdaterMixin):
                             import time
                             time.sleep(1)
                             # Retry the launch
-                            self.docker_handler.launch_container_threaded(volume_name, on_launch_success, on_launch_error)
+                            launch_container()
                             return
                 except Exception as retry_err:
                     self.add_log(f"Failed to resolve container conflict: {retry_err}", color="red")
@@ -3015,8 +3388,14 @@ class EdgeNodeLauncher(QWidget, _DockerUtilsMixin, _UpdaterMixin):
             self.add_log(error_msg, color="red")
             self.toast.show_notification(NotificationType.ERROR, error_msg)
         
-        # Launch the container in a thread
-        self.docker_handler.launch_container_threaded(volume_name, on_launch_success, on_launch_error)
+        # Launch the container in a thread, then follow it until its first heartbeat
+        def launch_container():
+            self._cancel_launch_watch()
+            self.__launch_thread = self.docker_handler.launch_container_threaded(
+                volume_name, on_launch_success, on_launch_error, on_phase=on_launch_phase,
+                on_image_missing=on_image_missing, on_heartbeat=on_launch_heartbeat)
+
+        launch_container()
         
     except Exception as e:
         # Stop loading indicator on error
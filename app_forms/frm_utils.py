@@ -2,86 +2,14 @@ import sys
 import base64
 import traceback
 from datetime import datetime
-import random
-import subprocess
 import math
+from functools import lru_cache
 
 from PyQt5.QtWidgets import QApplication, QWidget, QVBoxLayout, QAbstractButton, QCheckBox, QRadioButton, QLabel
 from PyQt5.QtCore import Qt, QRect, QPropertyAnimation, QTimer, QSize
 from PyQt5.QtGui import QFont, QPixmap, QIcon, QPainter, QColor, QBrush, QPen
 from pyqtgraph import AxisItem
 
-# List of adjectives and nouns for generating container names
-ADJECTIVES = [
-    "swift", "bright", "calm", "wise", "bold", 
-    "quick", "keen", "brave", "agile", "noble"
-]
-
-NOUNS = [
-    "falcon", "tiger", "eagle", "wolf", "bear",
-    "hawk", "lion", "puma", "lynx", "fox"
-]
-
-def generate_container_name(prefix="r1node"):
-    """Generate a sequential container name.
-    
-    First container is named just "r1node" (no number),
-    subsequent containers are "r1node1", "r1node2", etc.
-    """
-    # Get list of existing containers with the prefix
-    try:
-        result = subprocess.run(
-            ['docker', 'ps', '-a', '--format', '{{.Names}}', '--filter', f'name={prefix}'],
-            capture_output=True, text=True
-        )
-        
-        # Parse existing container names and find the highest index
-        existing_containers = result.stdout.strip().split('\n')
-        existing_containers = [c for c in existing_containers if c]  # Remove empty strings
-        
-        highest_index = -1  # Start from -1 so first container will be r1node0
-        for container in existing_containers:
-            if container.startswith(prefix):
-                try:
-                    # Extract the number after the prefix
-                    index_str = container[len(prefix):]
-                    if index_str.isdigit():
-                        index = int(index_str)
-                        highest_index = max(highest_index, index)
-                except (ValueError, IndexError):
-                    continue
-        
-        # Return next available index
-        return f"{prefix}{highest_index + 1}"
-        
-    except Exception as e:
-        # In case of any error, start from 0
-        return f"{prefix}0"
-
-def get_volume_name(container_name):
-    """Get volume name from container name"""
-    # For legacy container names
-    if "edge_node_container" in container_name:
-        return container_name.replace("container", "volume")
-    
-    # For new r1node naming convention
-    if container_name == "r1node":
-        return "r1vol"  # First container gets simple volume name
-    
-    # For r1node with sequential numbers
-    if container_name.startswith("r1node"):
-        # Extract the number part
-        try:
-            # Get the numeric part after "r1node"
-            number_part = container_name[6:]
-            if number_part.isdigit():
-                return f"r1vol{number_part}"
-        except (ValueError, IndexError):
-            pass
-    
-    # Fallback
-    return f"volume_{container_name}"
-
 def get_icon_from_base64(base64_str):
   icon_data = base64.b64decode(base64_str)
   pixmap = QPixmap()
@@ -99,47 +27,81 @@ class DateAxisItem_OLD(AxisItem):
     return ticks
 
 
+# Tick label formats keyed by the smallest tick spacing (seconds) they are used for.
+# pyqtgraph derives the tick spacing from the visible span, so walking this table
+# with the spacing gives seconds when zoomed in and dates when zoomed out.
+TICK_FORMATS = [
+  (86400, "%Y-%m-%d"),  # days or more between ticks: show dates
+  (3600, "%d %b %H:%M"),  # hours between ticks: day and hour
+  (60, "%H:%M"),  # minutes between ticks
+  (0, "%H:%M:%S"),  # seconds between ticks
+]
+TICK_LABEL_CACHE_SIZE = 1024
+
+
+def get_tick_format(spacing):
+  """Return the strftime format matching the given tick spacing in seconds."""
+  for min_spacing, fmt in TICK_FORMATS:
+    if spacing >= min_spacing:
+      return fmt
+  return TICK_FORMATS[-1][1]
+
+
+@lru_cache(maxsize=TICK_LABEL_CACHE_SIZE)
+def format_tick_label(value, spacing):
+  """Format a single tick value, memoized per (value, spacing).
+
+  Panning and zooming repaint the axes many times per second with mostly the
+  same tick values, and all plots of the dashboard share the same ticks, so a
+  small LRU cache avoids repeating the datetime conversion on every repaint.
+  """
+  try:
+    return datetime.fromtimestamp(value).strftime(get_tick_format(spacing))
+  except (OverflowError, OSError, ValueError):
+    return ""
+
+
 class DateAxisItem(AxisItem):
   def __init__(self, *args, **kwargs):
     super().__init__(*args, **kwargs)
     self.setLabel(text='Time')  # Custom label without scientific notation
     self.timestamps = None  # Store actual timestamps from the data
+    self.start_time = None
+    self.end_time = None
     self.parent = None  # Store the parent widget for debugging
     return
 
   def setTimestamps(self, timestamps, parent):
     """Store the actual timestamps from the data to map axis values."""
     self.parent = parent
-    if isinstance(timestamps[0], str):
+    if timestamps and isinstance(timestamps[0], str):
       self.timestamps = [datetime.fromisoformat(ts).timestamp() for ts in timestamps]
     else:
       self.timestamps = timestamps
+    self.start_time = self.timestamps[0] if self.timestamps else None
+    self.end_time = self.timestamps[-1] if self.timestamps else None
+    # Drop the cached axis picture so labels outside the old range get redrawn
+    self.picture = None
+    self.update()
     return
 
   def tickStrings(self, values, scale, spacing):
     if not self.timestamps or len(self.timestamps) == 0:
       return [""] * len(values)  # Return empty labels if no timestamps available
 
-    # Get the range of actual timestamps
-    start_time = self.timestamps[0]
-    end_time = self.timestamps[-1]
-    time_range = end_time - start_time
+    start_time = self.start_time
+    end_time = self.end_time
 
-    # Map the axis values to actual timestamps
+    # Only label ticks that fall inside the data range
     ticks = []
     for value in values:
-      try:
-        # Scale the value if it's in the range of the timestamp indices
-        if start_time <= value <= end_time:
-          ticks.append(datetime.fromtimestamp(value).strftime("%H:%M:%S"))
-        else:
-          ticks.append("")  # Ignore out-of-range values
-      except Exception as e:
-        ticks.append("")  # Handle exceptions gracefully    
+      if start_time <= value <= end_time:
+        ticks.append(format_tick_label(value, spacing))
+      else:
+        ticks.append("")  # Ignore out-of-range values
     # print(f"Ticks for {self.parent}: {ticks}")
     return ticks
 
-  
       
 class ToggleButton1(QAbstractButton):
   def __init__(self, parent=None):
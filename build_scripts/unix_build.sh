@@ -13,7 +13,8 @@ else
 fi
 
 # Your base PyInstaller command with platform-specific icon
-PYINSTALLER_CMD="pyinstaller -w --onefile -n 'EdgeNodeLauncher' --icon=$ICON_PATH main.py"
+# The metrics agent is sent to the hosts as source, bundle the file itself
+PYINSTALLER_CMD="pyinstaller -w --onefile -n 'EdgeNodeLauncher' --icon=$ICON_PATH --add-data 'utils/metrics_agent.py:utils' main.py"
 
 # Combine the base command with the hidden imports and execute
 echo "$PYINSTALLER_CMD"
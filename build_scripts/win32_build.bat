@@ -18,6 +18,7 @@ set PYINSTALLER_CMD=pyinstaller --noconsole --windowed --onefile --clean --nocon
   --name="EdgeNodeLauncher" ^
   --icon=assets\r1_icon.ico ^
   --add-data "assets\r1_icon.ico;assets" ^
+  --add-data "utils\metrics_agent.py;utils" ^
   --log-level=WARN ^
   launcher.py
 set APP_NAME=EdgeNodeLauncher
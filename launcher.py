@@ -7,38 +7,157 @@ and ensuring no console windows appear when running Docker commands.
 
 import sys
 import os
+import json
+import gzip
+import queue
+import shutil
+import time
+import atexit
+import threading
 import traceback
 import logging
-from logging.handlers import RotatingFileHandler
+import sqlite3
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
+from datetime import datetime
 import ctypes
 import tempfile
 
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+
+_log_listener = None
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per line, for log tooling."""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'message': record.getMessage(),
+        }
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def _compress_rotated_log(source, dest):
+    """gzip a rotated log file, run on a worker thread."""
+    try:
+        with open(source, 'rb') as f_in, gzip.open(dest + '.tmp', 'wb') as f_out:
+            shutil.copyfileobj(f_in, f_out)
+        os.replace(dest + '.tmp', dest)
+        os.remove(source)
+    except Exception as e:
+        logging.error(f"Failed to compress rotated log {source}: {str(e)}")
+
+
+def _gzip_namer(name):
+    return name + '.gz'
+
+
+def _gzip_rotator(source, dest):
+    """Rotate by renaming (cheap) and compress the renamed file in the background."""
+    pending = f"{dest[:-len('.gz')]}.{time.time_ns()}.pending"
+    os.replace(source, pending)
+    threading.Thread(target=_compress_rotated_log, args=(pending, dest), daemon=True,
+                     name="LogCompressor").start()
+
+
+def _sweep_pending_logs(log_dir):
+    """Finish the compressions an exit interrupted, they are on a daemon thread.
+
+    A leftover `.pending` file is gzipped to the slot it was rotated to, or deleted when a
+    later rotation has taken that slot; half-written `.gz.tmp` files are deleted.
+    Returns the compression threads started.
+    """
+    threads = []
+    # The temporary files first, the compressions started below write new ones
+    names = sorted(os.listdir(log_dir), key=lambda name: not name.endswith('.gz.tmp'))
+    for name in names:
+        path = os.path.join(log_dir, name)
+        try:
+            if name.endswith('.gz.tmp'):
+                os.remove(path)
+            elif name.endswith('.pending'):
+                dest = os.path.join(log_dir, name.rsplit('.', 2)[0] + '.gz')
+                if os.path.exists(dest):
+                    os.remove(path)
+                    continue
+                thread = threading.Thread(target=_compress_rotated_log, args=(path, dest), daemon=True,
+                                          name="LogCompressor")
+                thread.start()
+                threads.append(thread)
+        except OSError as e:
+            logging.error(f"Failed to clean up the leftover log {path}: {str(e)}")
+    return threads
+
+
 # Setup logging to file instead of console
-def setup_logging():
-    """Set up logging to file to capture any console output"""
+def setup_logging(json_lines=None):
+    """Set up logging to file to capture any console output.
+
+    Records are put on a queue by the logging thread (often the GUI thread) and written by
+    a QueueListener thread, so logging never waits on disk I/O. Rotated files are gzipped
+    on a separate thread, the ones a previous run exited before compressing are gzipped
+    now. With `json_lines` (default: the `log_json_lines` setting) the
+    file is written as JSON lines to launcher.jsonl.
+    """
+    global _log_listener
+    setting_error = None
     log_dir = os.path.join(tempfile.gettempdir(), "EdgeNodeLauncher")
     if not os.path.exists(log_dir):
         os.makedirs(log_dir)
-        
-    log_file = os.path.join(log_dir, "launcher.log")
+
+    if json_lines is None:
+        # Read straight from the state database, the launcher itself is not loaded yet
+        from utils.state_store import read_setting
+        try:
+            json_lines = bool(read_setting('log_json_lines', False))
+        except (sqlite3.Error, ValueError) as e:
+            json_lines, setting_error = False, e
+    log_file = os.path.join(log_dir, "launcher.jsonl" if json_lines else "launcher.log")
     
-    # Configure rotating file handler
+    # Configure rotating file handler, used only by the listener thread
     handler = RotatingFileHandler(
-        log_file, maxBytes=10*1024*1024, backupCount=5
+        log_file, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding='utf-8'
     )
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    handler.namer = _gzip_namer
+    handler.rotator = _gzip_rotator
+    if json_lines:
+        formatter = JsonLinesFormatter()
+    else:
+        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
     handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    _log_listener = QueueListener(log_queue, handler, respect_handler_level=True)
+    _log_listener.start()
+    atexit.register(stop_logging)
     
     # Configure root logger
     root_logger = logging.getLogger()
-    root_logger.addHandler(handler)
+    root_logger.addHandler(QueueHandler(log_queue))
     root_logger.setLevel(logging.INFO)
     
     # We won't redirect stdout/stderr as it can cause issues with PyQt
     # Just log our own messages
     logging.info("Logging initialized")
+    _sweep_pending_logs(log_dir)
+    if setting_error is not None:
+        logging.warning(f"Could not read the log_json_lines setting, writing plain text: {setting_error}")
     return log_file
 
+def stop_logging():
+    """Flush the pending log records and stop the writer thread."""
+    global _log_listener
+    if _log_listener is not None:
+        _log_listener.stop()
+        _log_listener = None
+
 def hide_console_window():
     """Hide the console window on Windows"""
     if os.name == 'nt':
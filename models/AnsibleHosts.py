@@ -1,8 +1,7 @@
-import os
-import yaml
 from dataclasses import dataclass
-from typing import Dict, Optional
-from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from utils.ansible_inventory import DEFAULT_HOSTS_FILE, InventoryHost, get_ansible_inventory
 
 @dataclass
 class AnsibleHost:
@@ -14,60 +13,60 @@ class AnsibleHost:
     ansible_ssh_private_key_file: Optional[str]
     ansible_ssh_pass: Optional[str]
     ansible_ssh_common_args: Optional[str]
+    groups: Tuple[str, ...] = ()
+
+    @classmethod
+    def from_inventory(cls, host: InventoryHost) -> 'AnsibleHost':
+        host_vars = host.vars
+        return cls(
+            name=host.name,
+            ansible_host=host_vars.get('ansible_host', ''),
+            ansible_user=host_vars.get('ansible_user', ''),
+            ansible_become_password=host_vars.get('ansible_become_password'),
+            ansible_connection=host_vars.get('ansible_connection', 'ssh'),
+            ansible_ssh_private_key_file=host_vars.get('ansible_ssh_private_key_file'),
+            ansible_ssh_pass=host_vars.get('ansible_ssh_pass'),
+            ansible_ssh_common_args=host_vars.get('ansible_ssh_common_args'),
+            groups=host.groups
+        )
 
 class AnsibleHostsManager:
-    def __init__(self):
-        self.hosts_file = os.path.expanduser("~/.ansible/collections/ansible_collections/vitalii_t12/multi_node_launcher/hosts.yml")
+    """Hosts of the Ansible inventory, see utils.ansible_inventory.
+
+    The parsed inventory is shared and cached, `load_hosts()` only re-reads the files
+    that changed since the last call.
+    """
+    def __init__(self, hosts_file: str = DEFAULT_HOSTS_FILE):
+        self.hosts_file = hosts_file
+        self.inventory = get_ansible_inventory(hosts_file)
         self.hosts: Dict[str, AnsibleHost] = {}
+        self._built_from = None
         self.load_hosts()
 
     def load_hosts(self) -> None:
-        """Load hosts from the Ansible hosts file."""
-        try:
-            with open(self.hosts_file, 'r') as f:
-                config = yaml.safe_load(f)
-                
-            if config and 'all' in config and 'children' in config['all']:
-                for group in config['all']['children'].values():
-                    if 'hosts' in group:
-                        for host_name, host_config in group['hosts'].items():
-                            self.hosts[host_name] = AnsibleHost(
-                                name=host_name,
-                                ansible_host=host_config.get('ansible_host', ''),
-                                ansible_user=host_config.get('ansible_user', ''),
-                                ansible_become_password=host_config.get('ansible_become_password'),
-                                ansible_connection=host_config.get('ansible_connection', 'ssh'),
-                                ansible_ssh_private_key_file=host_config.get('ansible_ssh_private_key_file'),
-                                ansible_ssh_pass=host_config.get('ansible_ssh_pass'),
-                                ansible_ssh_common_args=host_config.get('ansible_ssh_common_args')
-                            )
-        except Exception as e:
-            print(f"Error loading hosts file: {e}")
-            self.hosts = {}
+        """Load hosts from the Ansible hosts file, if it changed since the last load."""
+        self.inventory.reload_if_changed()
+        self._sync()
+
+    def _sync(self) -> None:
+        inventory_hosts = self.inventory.hosts
+        if inventory_hosts is not self._built_from:
+            self.hosts = {name: AnsibleHost.from_inventory(host) for name, host in inventory_hosts.items()}
+            self._built_from = inventory_hosts
 
     def get_host_names(self) -> list[str]:
         """Get list of available host names."""
+        self.load_hosts()
         return list(self.hosts.keys())
 
     def get_host(self, host_name: str) -> Optional[AnsibleHost]:
         """Get host configuration by name."""
+        self._sync()
         return self.hosts.get(host_name)
 
     def get_ssh_command(self, host_name: str) -> Optional[str]:
         """Generate SSH command for the given host."""
-        host = self.get_host(host_name)
-        if not host:
+        command = self.inventory.ssh_command(host_name)
+        if not command:
             return None
-        
-        cmd = ['ssh']
-        
-        if host.ansible_ssh_common_args:
-            cmd.extend(host.ansible_ssh_common_args.split())
-            
-        if host.ansible_ssh_private_key_file:
-            key_file = os.path.expanduser(host.ansible_ssh_private_key_file)
-            cmd.extend(['-i', key_file])
-            
-        cmd.extend([f'{host.ansible_user}@{host.ansible_host}'])
-        
-        return ' '.join(cmd) 
\ No newline at end of file
+        return ' '.join(command)
@@ -1,52 +1,99 @@
+from array import array
 from dataclasses import dataclass
-from typing import List, Optional
+from datetime import datetime
+from typing import Iterable, Optional, Tuple
 
-@dataclass
+NAN = float('nan')
+
+
+def _to_series(name: str, values: Optional[Iterable], optional: bool = False) -> Optional[array]:
+    """Convert a list of numbers into a compact array('d').
+
+    Missing samples (None) become NaN so the series keeps its length and stays aligned
+    with the timestamps. For optional series, a list made only of None values (or no list
+    at all) means the metric is not available and None is returned.
+    """
+    if values is None:
+        if optional:
+            return None
+        raise ValueError(f"NodeHistory: '{name}' is required")
+    try:
+        # Fast path, done in C when every sample is a number
+        return array('d', values)
+    except TypeError:
+        pass
+
+    values = list(values)
+    missing = values.count(None)
+    if missing == len(values):
+        return None if optional else array('d', [NAN]) * missing
+    try:
+        return array('d', [NAN if value is None else value for value in values])
+    except TypeError:
+        bad = next(value for value in values if value is not None and not isinstance(value, (int, float)))
+        raise ValueError(f"NodeHistory: '{name}' contains a non-numeric value: {bad!r}") from None
+
+
+def _to_timestamps(values: Iterable) -> array:
+    """Convert ISO formatted (or already numeric) timestamps into POSIX seconds."""
+    if values is None:
+        raise ValueError("NodeHistory: 'timestamps' is required")
+    series = array('d')
+    parse = datetime.fromisoformat
+    for value in values:
+        try:
+            series.append(parse(value).timestamp() if isinstance(value, str) else value)
+        except (ValueError, TypeError):
+            raise ValueError(f"NodeHistory: invalid timestamp {value!r}") from None
+    return series
+
+
+@dataclass(slots=True)
 class NodeHistory:
+    """Metrics history of a node.
+
+    Series are stored as array('d') (8 bytes per sample instead of a boxed float per
+    sample), timestamps are POSIX seconds. GPU series are None when no GPU is available.
+    """
     address: str
     alias: str
-    cpu_load: List[float]
-    cpu_temp: List[float]
+    cpu_load: array
+    cpu_temp: array
     current_epoch: int
     current_epoch_avail: float
     eth_address: str
-    gpu_load: Optional[List[float]]
-    gpu_occupied_memory: Optional[List[float]]
-    gpu_temp: Optional[List[float]]
-    gpu_total_memory: Optional[List[float]]
-    last_epochs: List[int]
+    gpu_load: Optional[array]
+    gpu_occupied_memory: Optional[array]
+    gpu_temp: Optional[array]
+    gpu_total_memory: Optional[array]
+    last_epochs: Tuple[int, ...]
     last_save_time: str
-    occupied_memory: List[float]
-    timestamps: List[str]
-    total_memory: List[float]
+    occupied_memory: array
+    timestamps: array
+    total_memory: array
     uptime: str
     version: str
 
     @classmethod
     def from_dict(cls, data: dict) -> 'NodeHistory':
-        # Clean up GPU-related lists - if all values are None, set the whole list to None
-        gpu_fields = ['gpu_load', 'gpu_occupied_memory', 'gpu_total_memory', 'gpu_temp']
-        for field in gpu_fields:
-            if field in data and all(v is None for v in data[field]):
-                data[field] = None
-
+        # Every field is validated and converted exactly once, the input dict is left untouched
         return cls(
             address=data['address'],
             alias=data['alias'],
-            cpu_load=data['cpu_load'],
-            cpu_temp=data['cpu_temp'],
+            cpu_load=_to_series('cpu_load', data['cpu_load']),
+            cpu_temp=_to_series('cpu_temp', data['cpu_temp']),
             current_epoch=data['current_epoch'],
             current_epoch_avail=data['current_epoch_avail'],
             eth_address=data['eth_address'],
-            gpu_load=data.get('gpu_load'),
-            gpu_occupied_memory=data.get('gpu_occupied_memory'),
-            gpu_temp=data.get('gpu_temp'),
-            gpu_total_memory=data.get('gpu_total_memory'),
-            last_epochs=data['last_epochs'],
+            gpu_load=_to_series('gpu_load', data.get('gpu_load'), optional=True),
+            gpu_occupied_memory=_to_series('gpu_occupied_memory', data.get('gpu_occupied_memory'), optional=True),
+            gpu_temp=_to_series('gpu_temp', data.get('gpu_temp'), optional=True),
+            gpu_total_memory=_to_series('gpu_total_memory', data.get('gpu_total_memory'), optional=True),
+            last_epochs=tuple(data['last_epochs']),
             last_save_time=data['last_save_time'],
-            occupied_memory=data['occupied_memory'],
-            timestamps=data['timestamps'],
-            total_memory=data['total_memory'],
+            occupied_memory=_to_series('occupied_memory', data['occupied_memory']),
+            timestamps=_to_timestamps(data['timestamps']),
+            total_memory=_to_series('total_memory', data['total_memory']),
             uptime=data['uptime'],
             version=data['version']
-        )
\ No newline at end of file
+        )
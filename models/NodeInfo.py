@@ -1,24 +1,27 @@
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Tuple
 
-@dataclass
+@dataclass(slots=True)
 class NodeInfo:
     address: str
     alias: str
     eth_address: str
     version_long: str
     version_short: str
-    whitelist: List[str]
+    whitelist: Tuple[str, ...]
 
     @classmethod
     def from_dict(cls, data: dict) -> 'NodeInfo':
+        whitelist = (data.get('info') or {}).get('whitelist') or ()
+        if isinstance(whitelist, str) or not all(isinstance(addr, str) for addr in whitelist):
+            raise ValueError(f"NodeInfo: invalid whitelist {whitelist!r}")
         return cls(
             address=data['address'],
             alias=data.get('alias', ''),
             eth_address=data.get('eth_address', ''),
             version_long=data.get('version_long', ''),
             version_short=data.get('version_short', ''),
-            whitelist=data.get('info', {}).get('whitelist', [])
+            whitelist=tuple(whitelist)
         )
 
     def to_dict(self) -> dict:
@@ -29,6 +32,6 @@ class NodeInfo:
             'version_long': self.version_long,
             'version_short': self.version_short,
             'info': {
-                'whitelist': self.whitelist
+                'whitelist': list(self.whitelist)
             }
-        }
\ No newline at end of file
+        }
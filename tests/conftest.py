@@ -0,0 +1,17 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from fakes import FakeDocker  # noqa: E402
+
+
+@pytest.fixture
+def fake(tmp_path):
+    """Fake `docker` and `ssh` (POSIX scripts) first on PATH, with their state in tmp_path."""
+    with FakeDocker(str(tmp_path)) as fake:
+        yield fake
@@ -0,0 +1,563 @@
+"""
+Stand-ins for the daemons the launcher talks to, shared by the tests.
+
+- FakeDocker puts a fake `docker` and a fake `ssh` first on PATH. The fake `docker`
+  keeps one file per container and a JSON file of images, per host, and answers `ps`,
+  `images`, `inspect`, `image inspect`, `load`, `run`, `create`, `start`, `stop`, `wait`,
+  `rm` and the `get_node_info` / `get_node_history` execs, each taking FAKE_DELAY
+  seconds like a daemon call would. The fake `ssh` runs the remote command locally with
+  the destination as FAKE_HOST; `host-down*` hosts refuse connections, `host-slow*`
+  hosts hang for FAKE_SLOW seconds first.
+- FakeImage and make_registry_handler: a registry serving an image index behind an
+  anonymous token challenge, with Range requests and an optional dropped connection.
+- make_engine_handler: the Docker Engine API `/_ping` and a simulated `/images/create`.
+"""
+import os
+import sys
+import gzip
+import json
+import stat
+import time
+import random
+import hashlib
+import tempfile
+import threading
+import socketserver
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from utils.pull_progress import format_bytes
+
+LOCAL_HOST = 'local'
+
+FAKE_SSH = r'''#!/bin/sh
+# ssh [options] destination command...
+while [ $# -gt 0 ]; do
+  case "$1" in
+    -o|-i|-p) shift 2 ;;
+    -*) shift ;;
+    *) break ;;
+  esac
+done
+FAKE_HOST="${1#*@}"; shift
+export FAKE_HOST
+case "$FAKE_HOST" in
+  host-down*) echo "ssh: connect to host $FAKE_HOST port 22: Connection refused" >&2; exit 255 ;;
+  host-slow*) sleep "${FAKE_SLOW:-30}" ;;
+esac
+exec "$@"
+'''
+
+FAKE_DOCKER = r'''#!/usr/bin/env python3
+import os, sys, gzip, json, time, zlib, tarfile, hashlib
+host = os.environ.get("FAKE_HOST", "local")
+root = os.environ["FAKE_STATE"].replace("{host}", host)
+containers = os.path.join(root, "containers")
+images_path = os.path.join(root, "images.json")
+os.makedirs(containers, exist_ok=True)
+delay, fail = float(os.environ.get("FAKE_DELAY", "0")), os.environ.get("FAKE_FAIL", "")
+default_image = os.environ.get("FAKE_IMAGE", "image") if os.environ.get("FAKE_HAS_IMAGE", "1") == "1" else None
+
+
+def read(name):
+  path = os.path.join(containers, name)
+  return open(path).read() if os.path.exists(path) else None
+
+
+def write(name, content):
+  open(os.path.join(containers, name), "w").write(content)
+
+
+def load_images():
+  return json.load(open(images_path)) if os.path.exists(images_path) else {"images": {}, "layers": []}
+
+
+def find_image(name):
+  image = load_images()["images"].get(name)
+  if image is None and name == default_image:
+    image = {"Id": "sha256:" + name, "RepoDigests": [], "RootFS": {"Layers": []}}
+  return image
+
+
+def option(args, *names):
+  return [args[i + 1] for i, arg in enumerate(args[:-1]) if arg in names]
+
+
+def status_text(content):
+  if content == "running":
+    return "Up 3 hours"
+  if content == "created":
+    return "Created"
+  return "Exited (%s) 1 hour ago" % content.split()[-1]
+
+
+def node_info(name):
+  key = zlib.crc32((host + name).encode())
+  return {"address": "0xai_%08x" % key, "alias": "%s-%s" % (host, name), "eth_address": "0x%040x" % key,
+          "version_long": "v2.7.%d" % (key % 10), "version_short": "v2.7.%d" % (key % 10),
+          "info": {"whitelist": []}}
+
+
+def node_history(name):
+  key, count = zlib.crc32((host + name).encode()), 24
+  return {
+    "address": "0xai_%08x" % key, "alias": name, "eth_address": "0x0", "version": "v2.7",
+    "cpu_load": [(key >> i) % 100 for i in range(count)], "cpu_temp": [50] * count,
+    "occupied_memory": [8 + (key >> i) % 20 for i in range(count)], "total_memory": [32] * count,
+    "timestamps": ["2026-10-19T%02d:00:00" % i for i in range(count)],
+    "current_epoch": 100, "current_epoch_avail": (key % 1000) / 1000, "last_epochs": [99],
+    "last_save_time": "2026-10-19T23:00:00", "uptime": "%d days" % (key % 30),
+  }
+
+
+args = sys.argv[1:]
+if args[0] == "container":
+  args = args[1:]
+command = args[0]
+time.sleep(delay)
+
+if command == "ps":
+  template = (option(args, "--format") or ["{{.ID}}\t{{.Image}}\t{{.Status}}\t{{.Names}}"])[-1]
+  filters = [value[5:] for value in option(args, "-f", "--filter") if value.startswith("name=")]
+  for name in sorted(os.listdir(containers)):
+    content = read(name)
+    state = content.split()[0]
+    if ("-a" not in args and state != "running") or any(f not in name for f in filters):
+      continue
+    fields = {"Names": name, "State": state, "Status": status_text(content), "Image": "image",
+              "ID": "%012x" % zlib.crc32(name.encode())}
+    if template == "{{json .}}":
+      print(json.dumps(fields))
+    else:
+      line = template
+      for key, value in fields.items():
+        line = line.replace("{{.%s}}" % key, value)
+      print(line)
+elif command == "images":
+  name = [arg for arg in args[1:] if not arg.startswith("-")]
+  print(find_image(name[0])["Id"] if name and find_image(name[0]) else "")
+elif command == "inspect":
+  code = 0
+  for name in [arg for arg in args[1:] if not arg.startswith("-") and not arg.startswith("{{")]:
+    if find_image(name) is not None or read(name) is not None:
+      print("sha256:%s" % name)
+    else:
+      sys.stderr.write("Error: No such object: %s\n" % name)
+      code = 1
+  sys.exit(code)
+elif args[:2] == ["image", "inspect"]:
+  image = find_image(args[2])
+  if image is None:
+    sys.stderr.write("Error: No such image: %s\n" % args[2])
+    sys.exit(1)
+  print(json.dumps([image]))
+elif command == "load":
+  state = load_images()
+  files = {}
+  with tarfile.open(fileobj=sys.stdin.buffer, mode="r|") as archive:
+    for member in archive:
+      files[member.name] = archive.extractfile(member).read()
+  manifest = json.loads(files["manifest.json"])[0]
+  config_bytes = files[manifest["Config"]]
+  diff_ids = json.loads(config_bytes)["rootfs"]["diff_ids"]
+  for name, diff_id in zip(manifest["Layers"], diff_ids):
+    if diff_id in state["layers"]:
+      continue
+    if name not in files:
+      sys.stderr.write("open %s: no such file or directory\n" % name)
+      sys.exit(1)
+    if "sha256:" + hashlib.sha256(gzip.decompress(files[name])).hexdigest() != diff_id:
+      sys.stderr.write("layer %s does not match its diff id\n" % name)
+      sys.exit(1)
+    state["layers"].append(diff_id)
+  image_id = "sha256:" + hashlib.sha256(config_bytes).hexdigest()
+  for tag in manifest["RepoTags"]:
+    state["images"][tag] = {"Id": image_id, "RepoDigests": [], "RootFS": {"Layers": diff_ids}}
+  json.dump(state, open(images_path, "w"))
+  print("Loaded image: %s" % ", ".join(manifest["RepoTags"]))
+elif command == "wait":
+  name = args[1]
+  while read(name) == "running":
+    time.sleep(0.05)
+  content = read(name) or "exited 0"
+  print(content.split()[-1] if content.startswith("exited") else 0)
+elif command == "exec":
+  name, node_command = args[1], args[2]
+  path = os.path.join(containers, name)
+  ready = read(name) == "running" and time.time() - os.path.getmtime(path) > float(os.environ.get("FAKE_BOOT", "0"))
+  if not ready:
+    sys.stderr.write("Error response from daemon: container %s is not running\n" % name)
+    sys.exit(1)
+  if node_command == "get_node_info":
+    print(json.dumps(node_info(name)))
+  elif node_command == "get_node_history":
+    print(json.dumps(node_history(name)))
+  else:
+    sys.stderr.write("OCI runtime exec failed: %s: executable file not found\n" % node_command)
+    sys.exit(126)
+elif command in ("run", "create", "start", "stop", "rm"):
+  name = args[-1] if command in ("stop", "rm", "start") else args[args.index("--name") + 1]
+  content = read(name)
+  if name == fail and command in ("run", "start"):
+    sys.stderr.write("docker: Error response from daemon: %s refused to start.\n" % name)
+    sys.exit(125)
+  if command in ("run", "create"):
+    if content is not None:
+      sys.stderr.write('Conflict. The container name "/%s" is already in use.\n' % name)
+      sys.exit(125)
+    write(name, "running" if command == "run" else "created")
+  elif content is None:
+    sys.stderr.write("Error response from daemon: No such container: %s\n" % name)
+    sys.exit(1)
+  elif command == "stop":
+    if content == "running":
+      # A node takes FAKE_EXIT_TIME seconds to exit after SIGTERM, it is killed after its grace period
+      grace = float(args[args.index("-t") + 1]) if "-t" in args else 10
+      exit_time = float(os.environ.get("FAKE_EXIT_TIME", "0"))
+      time.sleep(min(grace, exit_time))
+      write(name, "exited 137" if exit_time > grace else "exited 143")
+  elif command == "start":
+    write(name, "running")
+  elif command == "rm":
+    if content == "running" and "-f" not in args:
+      sys.stderr.write("Error response from daemon: cannot remove container %s: container is running\n" % name)
+      sys.exit(1)
+    os.remove(os.path.join(containers, name))
+  print(name)
+else:
+  sys.exit("fake docker: unsupported command %s" % args)
+'''
+
+
+class FakeDocker:
+    """Fake `docker` and `ssh` commands in `directory`, first on PATH while entered.
+
+  Each host has its own containers and images, the local ones are those of LOCAL_HOST.
+  The options are the FAKE_* variables of the fake `docker`, without the prefix:
+  delay, fail, image, has_image, boot, exit_time and slow.
+  """
+
+    def __init__(self, directory, **options):
+        self.directory = directory
+        self.bin_dir = os.path.join(directory, 'bin')
+        self.state = os.path.join(directory, 'state', '{host}')
+        self._saved = None
+        os.makedirs(self.bin_dir, exist_ok=True)
+        for name, source in (('docker', FAKE_DOCKER), ('ssh', FAKE_SSH)):
+            path = os.path.join(self.bin_dir, name)
+            with open(path, 'w') as f:
+                f.write(source)
+            os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+        self.env = {'FAKE_STATE': self.state, 'FAKE_DELAY': '0'}
+        self.configure(**options)
+
+    @property
+    def docker(self):
+        return os.path.join(self.bin_dir, 'docker')
+
+    @property
+    def ssh(self):
+        return os.path.join(self.bin_dir, 'ssh')
+
+    def configure(self, **options):
+        """Set FAKE_* variables, applied at once when entered."""
+        self.env.update({f'FAKE_{key.upper()}': str(value) for key, value in options.items()})
+        if self._saved is not None:
+            os.environ.update(self.env)
+
+    def __enter__(self):
+        self._saved = {key: os.environ.get(key) for key in list(self.env) + ['PATH', 'FAKE_HOST']}
+        os.environ.update(self.env)
+        os.environ.pop('FAKE_HOST', None)
+        os.environ['PATH'] = self.bin_dir + os.pathsep + self._saved['PATH']
+        return self
+
+    def __exit__(self, *exc):
+        for key in set(self._saved) | set(self.env):
+            value = self._saved.get(key)
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        self._saved = None
+
+    def _containers_dir(self, host):
+        path = os.path.join(self.state.replace('{host}', host), 'containers')
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def add_container(self, name, state='running', host=LOCAL_HOST):
+        """Create a container, `state` is 'running', 'created' or 'exited <code>'."""
+        with open(self.container_path(name, host), 'w') as f:
+            f.write(state)
+
+    def container_path(self, name, host=LOCAL_HOST):
+        """The state file of a container, its modification time is when the container started."""
+        return os.path.join(self._containers_dir(host), name)
+
+    def container_state(self, name, host=LOCAL_HOST):
+        """The state of a container, None once it is removed."""
+        path = self.container_path(name, host)
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return f.read()
+
+    def containers(self, host=LOCAL_HOST):
+        return sorted(os.listdir(self._containers_dir(host)))
+
+    def clear(self, host=LOCAL_HOST):
+        for name in self.containers(host):
+            os.remove(self.container_path(name, host))
+
+    def images(self, host=LOCAL_HOST):
+        """{tag: image} loaded on a host."""
+        path = os.path.join(self.state.replace('{host}', host), 'images.json')
+        if not os.path.exists(path):
+            return {}
+        with open(path) as f:
+            return json.load(f)['images']
+
+    def ssh_command(self, host):
+        return [self.ssh, '-o', 'BatchMode=yes', f'root@{host}']
+
+    def targets(self, hosts):
+        """{host: ssh command} of the fake hosts."""
+        return {host: self.ssh_command(host) for host in hosts}
+
+
+@contextmanager
+def fake_docker(**options):
+    """A FakeDocker in a temporary directory, entered."""
+    with tempfile.TemporaryDirectory(prefix='fake_docker_') as directory:
+        with FakeDocker(directory, **options) as fake:
+            yield fake
+
+
+def launch_command(name, volume, image='image'):
+    """The `docker run` of a node, as the launcher builds it."""
+    return ['docker', 'run', '-d', '--name', name, '-v', f'{volume}:/edge_node/_local_cache', image]
+
+
+class FakeImage:
+    """A linux/amd64 image of random gzip layers, its manifest and the index listing it.
+
+  With `base`, the image has the layers of `base` and `layers` new ones on top.
+  """
+
+    def __init__(self, layers, size_mb, seed, base=None):
+        self.blobs = {}
+        self.layers = list(base.layers) if base else []
+        self.diff_ids = list(base.diff_ids) if base else []
+        if base:
+            self.blobs.update(base.blobs)
+        for _ in range(layers):
+            raw = os.urandom(int(size_mb * 1e6 / layers))
+            compressed = gzip.compress(raw, compresslevel=1)
+            digest = self._add(compressed)
+            self.layers.append((digest, len(compressed)))
+            self.diff_ids.append('sha256:' + hashlib.sha256(raw).hexdigest())
+        config = json.dumps({'architecture': 'amd64', 'os': 'linux', 'created': str(seed),
+                             'rootfs': {'type': 'layers', 'diff_ids': self.diff_ids}}).encode()
+        self.config_digest = self._add(config)
+        self.config = config
+        manifest = {'schemaVersion': 2, 'mediaType': 'application/vnd.docker.distribution.manifest.v2+json',
+                    'config': {'mediaType': 'application/vnd.docker.container.image.v1+json',
+                               'digest': self.config_digest, 'size': len(config)},
+                    'layers': [{'mediaType': 'application/vnd.docker.image.rootfs.diff.tar.gzip',
+                                'digest': digest, 'size': size} for digest, size in self.layers]}
+        self.manifest = json.dumps(manifest).encode()
+        self.manifest_digest = 'sha256:' + hashlib.sha256(self.manifest).hexdigest()
+        index = {'schemaVersion': 2, 'mediaType': 'application/vnd.docker.distribution.manifest.list.v2+json',
+                 'manifests': [
+                   {'mediaType': 'application/vnd.docker.distribution.manifest.v2+json', 'digest': 'sha256:' + 'a' * 64,
+                    'size': 1, 'platform': {'architecture': 'arm64', 'os': 'linux'}},
+                   {'mediaType': 'application/vnd.docker.distribution.manifest.v2+json', 'digest': self.manifest_digest,
+                    'size': len(self.manifest), 'platform': {'architecture': 'amd64', 'os': 'linux'}}]}
+        self.index = json.dumps(index).encode()
+        self.index_digest = 'sha256:' + hashlib.sha256(self.index).hexdigest()
+
+    @property
+    def size(self):
+        return sum(size for _, size in self.layers)
+
+    def _add(self, data):
+        digest = 'sha256:' + hashlib.sha256(data).hexdigest()
+        self.blobs[digest] = data
+        return digest
+
+
+def registry_state(image):
+    """The mutable state of a fake registry: the image it serves and what it served."""
+    return {'image': image, 'served': 0, 'ranges': 0, 'drop': False, 'stall': False}
+
+
+def make_registry_handler(server_state, bandwidth_mb):
+    class FakeRegistryHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            image = server_state['image']
+            if self.path.startswith('/token'):
+                self._reply(200, json.dumps({'token': 'fake-token'}).encode())
+                return
+            if self.headers.get('Authorization') != 'Bearer fake-token':
+                host = self.headers['Host']
+                self._reply(401, b'{"errors":[{"code":"UNAUTHORIZED"}]}', extra={
+                  'WWW-Authenticate': f'Bearer realm="http://{host}/token",service="fake-registry"'})
+                return
+            reference = self.path.rsplit('/', 1)[-1]
+            if '/manifests/' in self.path:
+                if reference in ('mainnet', image.index_digest):
+                    self._reply(200, image.index, extra={'Docker-Content-Digest': image.index_digest})
+                elif reference == image.manifest_digest:
+                    self._reply(200, image.manifest, extra={'Docker-Content-Digest': image.manifest_digest})
+                else:
+                    self._reply(404, b'{"errors":[{"code":"MANIFEST_UNKNOWN"}]}')
+                return
+            data = image.blobs.get(reference)
+            if data is None:
+                self._reply(404, b'{"errors":[{"code":"BLOB_UNKNOWN"}]}')
+                return
+            start = 0
+            if self.headers.get('Range', '').startswith('bytes='):
+                start = int(self.headers['Range'][6:].split('-')[0])
+                server_state['ranges'] += 1
+            self.send_response(206 if start else 200)
+            self.send_header('Content-Length', str(len(data) - start))
+            self.end_headers()
+            drop = server_state['drop'] and len(data) > 1e6 and not start
+            step = max(1, int(bandwidth_mb * 1e6 / 20))
+            for position in range(start, len(data), step):
+                if drop and position - start > len(data) // 2:
+                    server_state['drop'] = False
+                    self.close_connection = True
+                    return
+                while server_state['stall'] and position - start > len(data) // 2:
+                    time.sleep(0.05)
+                # Counted before the write: the client may be done before the write returns
+                server_state['served'] += min(step, len(data) - position)
+                try:
+                    self.wfile.write(data[position:position + step])
+                except (BrokenPipeError, ConnectionResetError):
+                    return  # the prefetch was paused
+                time.sleep(0.05)
+
+        def _reply(self, code, body, extra=None):
+            self.send_response(code)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            for key, value in (extra or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+    return FakeRegistryHandler
+
+
+def make_engine_handler(layers, size_mb, bandwidth_mb, fail):
+    class FakeEngineHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            if urlparse(self.path).path.endswith('/_ping'):
+                self._reply(200, b'OK', 'text/plain')
+            else:
+                self._reply(404, b'{"message":"page not found"}')
+
+        def do_POST(self):
+            url = urlparse(self.path)
+            if not url.path.endswith('/images/create'):
+                self._reply(404, b'{"message":"page not found"}')
+                return
+            query = parse_qs(url.query)
+            image, tag = query.get('fromImage', [''])[0], query.get('tag', ['latest'])[0]
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            self._send({'status': f'Pulling from {image}', 'id': tag})
+            if fail:
+                self._send({'errorDetail': {'message': f'manifest for {image}:{tag} not found'},
+                            'error': f'manifest for {image}:{tag} not found'})
+                self._end()
+                return
+            rng = random.Random(image)
+            sizes = {f'{rng.getrandbits(48):012x}': int(rng.uniform(0.2, 1.8) * size_mb * 1e6 / layers)
+                     for _ in range(layers)}
+            for layer_id in sizes:
+                self._send({'status': 'Pulling fs layer', 'progressDetail': {}, 'id': layer_id})
+            # Layers download 3 at a time, sharing the bandwidth, like the daemon does
+            pending = list(sizes)
+            active = {}
+            step = 0.1
+            while pending or active:
+                while pending and len(active) < 3:
+                    active[pending.pop(0)] = 0
+                share = bandwidth_mb * 1e6 * step / len(active)
+                time.sleep(step)
+                for layer_id in list(active):
+                    total = sizes[layer_id]
+                    active[layer_id] = min(total, active[layer_id] + int(share))
+                    current = active[layer_id]
+                    self._send({'status': 'Downloading', 'progressDetail': {'current': current, 'total': total},
+                                'progress': f'[=>  ] {format_bytes(current)}/{format_bytes(total)}', 'id': layer_id})
+                    if current >= total:
+                        del active[layer_id]
+                        self._send({'status': 'Verifying Checksum', 'progressDetail': {}, 'id': layer_id})
+                        self._send({'status': 'Download complete', 'progressDetail': {}, 'id': layer_id})
+            for layer_id, total in sizes.items():
+                for current in (total // 2, total):
+                    self._send({'status': 'Extracting', 'progressDetail': {'current': current, 'total': total},
+                                'id': layer_id})
+                self._send({'status': 'Pull complete', 'progressDetail': {}, 'id': layer_id})
+            self._send({'status': 'Digest: sha256:' + '0' * 64})
+            self._send({'status': f'Status: Downloaded newer image for {image}:{tag}'})
+            self._end()
+
+        def _reply(self, code, body, content_type='application/json'):
+            self.send_response(code)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _send(self, obj):
+            data = (json.dumps(obj) + '\r\n').encode()
+            self.wfile.write(f'{len(data):x}\r\n'.encode() + data + b'\r\n')
+            self.wfile.flush()
+
+        def _end(self):
+            self.wfile.write(b'0\r\n\r\n')
+            self.wfile.flush()
+
+    return FakeEngineHandler
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def get_request(self):
+        request, _ = super().get_request()
+        return request, ('local', 0)
+
+
+def start_server(handler, unix_path=None, scheme='http'):
+    """Serve `handler` from a thread, on a unix socket or a local TCP port. Returns (server, base URL)."""
+    if unix_path:
+        if os.path.exists(unix_path):
+            os.unlink(unix_path)
+        server = ThreadingUnixHTTPServer(unix_path, handler)
+        base_url = f'unix://{unix_path}'
+    else:
+        server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        base_url = f'{scheme}://127.0.0.1:{server.server_address[1]}'
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, base_url
@@ -0,0 +1,68 @@
+import time
+
+import pytest
+
+from utils.batch_commands import BatchError, build_batch_script, parse_batch_output, run_batch
+from utils.docker_commands import DockerCommandHandler
+
+COMMANDS = [
+    ('ok', ['echo', 'hello world']),
+    ('fails', ['sh', '-c', 'echo partial; echo broken >&2; exit 3']),
+    ('quoted', ['printf', '%s|', "it's", '@@BATCH lookalike', '$HOME']),
+]
+
+
+def test_each_command_keeps_its_output_and_exit_code():
+    batch = run_batch(COMMANDS)
+
+    assert not batch.remote and not batch.ok
+    assert batch['ok'].ok and batch['ok'].stdout == 'hello world\n'
+    assert batch['fails'].exit_code == 3
+    assert (batch['fails'].stdout, batch['fails'].stderr) == ('partial\n', 'broken\n')
+    assert batch['quoted'].stdout == "it's|@@BATCH lookalike|$HOME|"
+    assert all(batch[name].duration >= 0 for name, _ in COMMANDS)
+    assert [command['name'] for command in batch.to_dict()['commands']] == ['ok', 'fails', 'quoted']
+
+
+def test_parallel_commands_run_concurrently_and_keep_their_order():
+    commands = [(f'sleep{i}', ['sh', '-c', f'sleep 0.5; echo {i}']) for i in range(4)]
+    start = time.monotonic()
+
+    batch = run_batch(commands, parallel=True)
+
+    assert time.monotonic() - start < 1.5  # one after the other would take 2s
+    assert [result.stdout for result in batch.results.values()] == ['0\n', '1\n', '2\n', '3\n']
+
+
+def test_timed_out_batch():
+    with pytest.raises(BatchError, match='timed out'):
+        run_batch([('ok', ['echo', 'ok']), ('hangs', ['sleep', '10'])], timeout=0.5)
+
+
+def test_output_without_frames_fails_the_batch():
+    with pytest.raises(BatchError, match='No result for ok'):
+        parse_batch_output('not a frame\n', COMMANDS[:1], 'token')
+    with pytest.raises(BatchError, match='Batch failed'):
+        run_batch(COMMANDS[:1], shell=['sh', '-c', 'echo garbage'])
+
+
+def test_script_quotes_the_arguments():
+    script = build_batch_script(COMMANDS, 'token', parallel=True)
+
+    assert "run 2 printf '%s|' 'it'\"'\"'s' '@@BATCH lookalike' '$HOME' &" in script
+    assert script.count(' &\n') == 3 and 'wait\n' in script
+    assert run_batch([]).results == {}
+    with pytest.raises(ValueError):
+        run_batch([('same', ['true']), ('same', ['true'])])
+
+
+def test_remote_batch_is_one_ssh_session(fake):
+    fake.add_container('r1node', host='host-01')
+    handler = DockerCommandHandler('r1node')
+
+    batch = run_batch(handler.get_refresh_commands(), fake.ssh_command('host-01'), parallel=True)
+
+    assert batch.remote and batch.ok
+    assert batch['node_info'].json() and batch['node_history'].json()
+    with pytest.raises(BatchError, match='Connection refused'):
+        run_batch(handler.get_refresh_commands(), fake.ssh_command('host-down'))
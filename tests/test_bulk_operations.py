@@ -0,0 +1,103 @@
+import threading
+
+import pytest
+
+from fakes import launch_command
+from utils.bulk_operations import BulkOperation
+
+NODES = [(f'edge_node_{i}', f'edge_node_{i}_volume') for i in range(6)]
+
+
+def phases(results):
+    return {result.container: result.phase for result in results}
+
+
+def test_start_recreates_stopped_nodes_and_reports_failures(fake):
+    fake.configure(fail='edge_node_2')
+    fake.add_container('edge_node_0')
+    fake.add_container('edge_node_1', 'exited 0')
+
+    results = BulkOperation('start', NODES, launch_command).run()
+
+    assert phases(results) == {'edge_node_0': 'skipped', 'edge_node_1': 'done', 'edge_node_2': 'failed',
+                               'edge_node_3': 'done', 'edge_node_4': 'done', 'edge_node_5': 'done'}
+    failed = next(result for result in results if result.phase == 'failed')
+    assert 'refused to start' in failed.error
+    assert [name for name in fake.containers() if fake.container_state(name) == 'running'] == [
+        'edge_node_0', 'edge_node_1', 'edge_node_3', 'edge_node_4', 'edge_node_5']
+
+
+def test_stop_skips_nodes_that_are_not_running(fake):
+    fake.add_container('edge_node_0')
+    fake.add_container('edge_node_1', 'exited 0')
+
+    results = BulkOperation('stop', NODES[:3]).run()
+
+    assert phases(results) == {'edge_node_0': 'done', 'edge_node_1': 'skipped', 'edge_node_2': 'skipped'}
+    assert fake.container_state('edge_node_0') == 'exited 143'
+    assert fake.container_state('edge_node_2') is None
+
+
+def test_restart_goes_through_every_phase(fake):
+    fake.add_container('edge_node_0')
+    updates = []
+
+    results = BulkOperation('restart', NODES[:1], launch_command, on_update=updates.append).run()
+
+    assert phases(results) == {'edge_node_0': 'done'}
+    assert [update.phase for update in updates] == ['queued', 'stopping', 'removing', 'starting', 'done']
+    assert updates[-1].duration > 0
+    assert fake.container_state('edge_node_0') == 'running'
+
+
+@pytest.mark.parametrize('parallelism', [1, 3])
+def test_parallelism_bounds_concurrent_containers(fake, parallelism):
+    fake.configure(delay=0.2)
+    active, counts, lock = set(), [], threading.Lock()
+
+    def on_update(result):
+        with lock:
+            if result.finished:
+                active.discard(result.container)
+            elif result.phase != 'queued':
+                active.add(result.container)
+            counts.append(len(active))
+
+    results = BulkOperation('start', NODES, launch_command, parallelism=parallelism, on_update=on_update).run()
+
+    assert set(phases(results).values()) == {'done'}
+    assert max(counts) == parallelism
+
+
+def test_unreachable_host_fails_every_container(fake):
+    results = BulkOperation('stop', NODES[:2], remote_ssh_command=fake.ssh_command('host-down')).run()
+
+    assert set(phases(results).values()) == {'failed'}
+    assert all('Failed to list containers' in result.error for result in results)
+
+
+def test_remote_host(fake):
+    fake.add_container('edge_node_0', host='host-01')
+
+    results = BulkOperation('restart', NODES[:2], launch_command,
+                            remote_ssh_command=fake.ssh_command('host-01')).run()
+
+    assert phases(results) == {'edge_node_0': 'done', 'edge_node_1': 'done'}
+    assert fake.containers('host-01') == ['edge_node_0', 'edge_node_1']
+    assert fake.containers() == []
+
+
+def test_cancelled_operation(fake):
+    fake.add_container('edge_node_0')
+
+    results = BulkOperation('stop', NODES[:2]).run(should_stop=lambda: True)
+
+    assert set(phases(results).values()) == {'cancelled'}
+    assert fake.container_state('edge_node_0') == 'running'
+
+
+def test_unknown_action():
+    with pytest.raises(ValueError):
+        BulkOperation('pause', NODES)
+    with pytest.raises(ValueError):
+        BulkOperation('start', NODES)
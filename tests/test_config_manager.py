@@ -0,0 +1,52 @@
+import sqlite3
+
+from utils.config_manager import ConfigManager, ContainerConfig
+from utils.state_store import STATE_DB_NAME, read_setting
+
+
+def stored_names(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / STATE_DB_NAME))
+    try:
+        return [row[0] for row in conn.execute("SELECT name FROM containers ORDER BY rowid")]
+    finally:
+        conn.close()
+
+
+def test_changes_made_back_to_back_are_committed_once(tmp_path):
+    config = ConfigManager(str(tmp_path))
+    commits = config.store._commits
+
+    for i in range(50):
+        config.set_bulk_parallelism(i + 1)
+        config.add_container(ContainerConfig(f'edge_node_{i}', f'edge_node_{i}_volume'))
+    config.update_node_alias('edge_node_0', 'alias')
+
+    assert config.get_bulk_parallelism() == 50  # read from memory, before the write
+    assert config.get_container('edge_node_0').node_alias == 'alias'
+    config.store.wait_for_writes()
+    assert config.store._commits == commits + 1
+    assert read_setting('bulk_parallelism', config_dir=str(tmp_path)) == 50
+    assert stored_names(tmp_path) == [f'edge_node_{i}' for i in range(50)]
+
+
+def test_removal_replaces_the_pending_save(tmp_path):
+    config = ConfigManager(str(tmp_path))
+
+    config.add_container(ContainerConfig('edge_node_1', 'edge_node_1_volume'))
+    config.remove_container('edge_node_1')
+    config.add_container(ContainerConfig('edge_node_2', 'edge_node_2_volume'))
+    config.store.wait_for_writes()
+
+    assert stored_names(tmp_path) == ['edge_node_2']
+    assert [container.name for container in ConfigManager(str(tmp_path)).containers] == ['edge_node_2']
+
+
+def test_writes_are_committed_without_waiting(tmp_path):
+    config = ConfigManager(str(tmp_path))
+
+    config.set_stop_grace_period(12)
+    assert config.store.has_pending_writes()
+    config.store.wait_for_writes()
+
+    assert not config.store.has_pending_writes()
+    assert read_setting('stop_grace_period', config_dir=str(tmp_path)) == 12
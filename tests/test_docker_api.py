@@ -0,0 +1,83 @@
+import time
+
+import pytest
+
+from fakes import make_engine_handler, start_server
+from utils.docker_api import DockerAPIError, DockerEngineAPI, split_image
+from utils.pull_progress import PullProgressParser
+
+IMAGE = 'ratio1/edge_node:mainnet'
+
+
+@pytest.fixture
+def engine():
+    servers = []
+
+    def serve(layers=4, size_mb=4, bandwidth_mb=40, fail=False, unix_path=None):
+        server, base_url = start_server(make_engine_handler(layers, size_mb, bandwidth_mb, fail), unix_path, scheme='tcp')
+        servers.append(server)
+        return DockerEngineAPI(base_url)
+
+    yield serve
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.mark.parametrize('image, expected', [
+    ('ratio1/edge_node:mainnet', ('ratio1/edge_node', 'mainnet')),
+    ('ratio1/edge_node', ('ratio1/edge_node', 'latest')),
+    ('localhost:5000/edge_node', ('localhost:5000/edge_node', 'latest')),
+    ('localhost:5000/edge_node:devnet', ('localhost:5000/edge_node', 'devnet')),
+])
+def test_split_image(image, expected):
+    assert split_image(image) == expected
+
+
+def test_pull_reports_exact_bytes(engine):
+    api = engine(layers=4)
+    parser = PullProgressParser()
+    events = []
+
+    def on_event(event):
+        events.append(event)
+        parser.feed_event(event)
+
+    status = api.pull_image(IMAGE, on_event=on_event)
+
+    assert status == f'Status: Downloaded newer image for {IMAGE}'
+    assert parser.total_layers == parser.pulled_layers == 4
+    assert parser.overall_progress() == 100
+    downloaded, total = parser.downloaded_bytes()
+    assert downloaded == total > 0
+    assert any(event.get('status') == 'Downloading' for event in events)
+
+
+def test_pull_error_raises(engine):
+    api = engine(fail=True)
+
+    with pytest.raises(DockerAPIError, match='manifest for ratio1/edge_node:mainnet not found'):
+        api.pull_image(IMAGE)
+
+
+def test_pull_can_be_cancelled(engine):
+    api = engine(size_mb=50, bandwidth_mb=5)
+    start = time.monotonic()
+
+    with pytest.raises(DockerAPIError, match='cancelled'):
+        api.pull_image(IMAGE, should_stop=lambda: time.monotonic() - start > 0.3)
+    assert time.monotonic() - start < 3
+
+
+def test_available_over_unix_socket(engine, tmp_path):
+    api = engine(unix_path=str(tmp_path / 'docker.sock'))
+
+    assert api.scheme == 'unix' and api.available()
+
+
+def test_unreachable_daemon_is_not_available(tmp_path):
+    start = time.monotonic()
+
+    assert not DockerEngineAPI(f'unix://{tmp_path}/missing.sock').available()
+    assert not DockerEngineAPI('ssh://root@host').supported
+    assert time.monotonic() - start < 1
@@ -0,0 +1,117 @@
+import os
+import time
+import threading
+
+import pytest
+
+from utils.fleet import FleetCollector
+
+
+class Collected:
+    """Statuses and host results of a FleetCollector, with the time each host finished."""
+
+    def __init__(self, hosts):
+        self.nodes = {}
+        self.hosts = {}
+        self.finished_at = {}
+        self.start = time.monotonic()
+        self._remaining = set(hosts)
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+
+    def on_node(self, status):
+        with self._lock:
+            self.nodes[status.key] = status
+
+    def on_host_done(self, host, containers, error):
+        with self._lock:
+            self.hosts[host] = (containers, error)
+            self.finished_at[host] = time.monotonic() - self.start
+            self._remaining.discard(host)
+            if not self._remaining:
+                self._done.set()
+
+    def wait(self, timeout):
+        assert self._done.wait(timeout), f"hosts not done: {sorted(self._remaining)}"
+
+
+def collect(targets, host_timeout, wait=15):
+    collected = Collected(targets)
+    collector = FleetCollector(collected.on_node, collected.on_host_done, host_timeout=host_timeout)
+    try:
+        assert sorted(collector.collect(targets)) == sorted(targets)
+        collected.wait(wait)
+        assert not collector.is_collecting()
+    finally:
+        collector.shutdown()
+    return collected
+
+
+@pytest.fixture
+def fleet(fake):
+    fake.configure(slow=5)
+    fake.add_container('r1node', host='host-01')
+    fake.add_container('r1node2', 'exited 0', host='host-01')
+    fake.add_container('r1node', host='host-02')
+    fake.add_container('other', host='host-02')  # not an edge node
+    return fake
+
+
+def test_reports_every_container_of_a_host(fleet):
+    collected = collect(fleet.targets(['host-01']), host_timeout=10)
+
+    assert collected.hosts['host-01'] == (['r1node', 'r1node2'], '')
+    running = collected.nodes[('host-01', 'r1node')]
+    assert running.running and running.status == 'Up 3 hours'
+    assert running.address.startswith('0xai_') and running.alias == 'host-01-r1node'
+    assert running.version.startswith('v2.7.') and running.uptime.endswith('days')
+    assert running.memory_total == 32 and 0 <= running.cpu_load < 100 and running.error == ''
+    stopped = collected.nodes[('host-01', 'r1node2')]
+    assert not stopped.running and stopped.status.startswith('Exited (0)') and stopped.address == ''
+
+
+def test_host_down_fails_fast(fleet):
+    collected = collect(fleet.targets(['host-down']), host_timeout=10)
+
+    containers, error = collected.hosts['host-down']
+    assert containers == [] and 'Connection refused' in error
+    assert collected.finished_at['host-down'] < 2
+    assert collected.nodes == {}
+
+
+def test_slow_host_times_out_without_holding_the_others(fleet):
+    collected = collect(fleet.targets(['host-slow', 'host-01', 'host-down', 'host-02']), host_timeout=1.5)
+
+    containers, error = collected.hosts['host-slow']
+    assert containers == [] and 'timed out' in error
+    assert 1.5 <= collected.finished_at['host-slow'] < 4
+    for host in ('host-01', 'host-02', 'host-down'):
+        assert collected.finished_at[host] < collected.finished_at['host-slow']
+    # The healthy hosts are complete, the failed ones have no nodes
+    assert sorted(collected.nodes) == [('host-01', 'r1node'), ('host-01', 'r1node2'), ('host-02', 'r1node')]
+    assert collected.hosts['host-02'] == (['r1node'], '')
+
+
+def test_failed_node_does_not_fail_its_host(fleet):
+    # r1node of host-02 is still booting: its execs fail, the other nodes are reported
+    fleet.configure(boot=60)
+    started = time.time() - 120
+    os.utime(fleet.container_path('r1node', 'host-01'), (started, started))
+
+    collected = collect(fleet.targets(['host-01', 'host-02']), host_timeout=10)
+
+    assert collected.hosts['host-02'] == (['r1node'], '')
+    booting = collected.nodes[('host-02', 'r1node')]
+    assert booting.running and booting.address == ''
+    assert 'node info: Error response from daemon' in booting.error and 'history:' in booting.error
+    ready = collected.nodes[('host-01', 'r1node')]
+    assert ready.address.startswith('0xai_') and ready.error == ''
+
+
+def test_local_host_without_ssh(fake):
+    fake.add_container('r1node')
+
+    collected = collect({'local': None}, host_timeout=10)
+
+    assert collected.hosts['local'] == (['r1node'], '')
+    assert collected.nodes[('local', 'r1node')].alias == 'local-r1node'
@@ -0,0 +1,91 @@
+import pytest
+
+from fakes import FakeImage, make_registry_handler, registry_state, start_server
+from utils.image_distribution import ImageDistributor
+
+IMAGE = 'ratio1/edge_node:mainnet'
+
+
+@pytest.fixture
+def registry():
+    state = registry_state(FakeImage(2, 2, seed=1))
+    server, state['url'] = start_server(make_registry_handler(state, 40))
+    yield state
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def distribute(fake, registry, tmp_path):
+    def run(hosts, should_stop=None):
+        updates = []
+        distributor = ImageDistributor(IMAGE, on_host=updates.append, cache_dir=str(tmp_path / 'cache'),
+                                       registry_url=registry['url'])
+        registry['served'] = 0
+        states = distributor.distribute(fake.targets(hosts), should_stop)
+        assert all(state.done for state in states.values())
+        return states, updates
+    return run
+
+
+def test_every_host_gets_the_image_from_one_download(fake, registry, distribute):
+    image = registry['image']
+
+    states, updates = distribute(['host-01', 'host-02', 'host-03'])
+
+    assert {state.phase for state in states.values()} == {'loaded'}
+    assert registry['served'] == image.size + len(image.config)
+    for host, state in states.items():
+        assert state.sent == state.total == image.size
+        assert fake.images(host)[IMAGE]['RootFS']['Layers'] == image.diff_ids
+    assert [update.phase for update in updates if update.host == 'host-01'][0] == 'checking'
+
+
+def test_host_down_does_not_fail_the_others(fake, distribute):
+    states, _ = distribute(['host-down', 'host-01'])
+
+    assert states['host-down'].phase == 'failed' and 'Connection refused' in states['host-down'].error
+    assert states['host-01'].phase == 'loaded'
+    assert IMAGE in fake.images('host-01') and fake.images('host-down') == {}
+
+
+def test_host_only_receives_the_layers_it_is_missing(fake, registry, distribute):
+    base = registry['image']
+    distribute(['host-01'])
+    new_image = registry['image'] = FakeImage(1, 1, seed=2, base=base)
+    new_layer_size = new_image.layers[-1][1]
+
+    states, _ = distribute(['host-01', 'host-02'])
+
+    assert states['host-01'].phase == states['host-02'].phase == 'loaded'
+    assert states['host-01'].total == new_layer_size
+    assert states['host-02'].total == new_image.size
+    # The base layers are still in the cache, only the new one is downloaded
+    assert registry['served'] == new_layer_size + len(new_image.config)
+    for host in ('host-01', 'host-02'):
+        assert fake.images(host)[IMAGE]['RootFS']['Layers'] == new_image.diff_ids
+
+
+def test_up_to_date_hosts_download_nothing(registry, distribute):
+    distribute(['host-01'])
+
+    states, _ = distribute(['host-01'])
+
+    assert states['host-01'].phase == 'up_to_date'
+    assert registry['served'] == len(registry['image'].config)
+
+
+def test_registry_down_fails_every_host(fake, tmp_path):
+    distributor = ImageDistributor(IMAGE, cache_dir=str(tmp_path / 'cache'), registry_url='http://127.0.0.1:9')
+
+    states = distributor.distribute(fake.targets(['host-01', 'host-02']))
+
+    assert {state.phase for state in states.values()} == {'failed'}
+    assert all(state.error.startswith('Registry error') for state in states.values())
+
+
+def test_cancelled_distribution(fake, distribute):
+    states, _ = distribute(['host-01', 'host-02'], should_stop=lambda: True)
+
+    assert {state.phase for state in states.values()} == {'cancelled'}
+    assert fake.images('host-01') == {}
@@ -0,0 +1,166 @@
+import threading
+import time
+
+import pytest
+
+from fakes import FakeImage, make_registry_handler, registry_state, start_server
+from utils.image_prefetch import ImagePrefetcher, RateLimiter
+
+IMAGE = 'ratio1/edge_node:mainnet'
+
+
+@pytest.fixture(scope='module')
+def base_image():
+    return FakeImage(2, 3, seed=1)
+
+
+@pytest.fixture
+def registry(base_image):
+    """A fake registry serving 20 MB/s, returns its state."""
+    state = registry_state(base_image)
+    server, state['url'] = start_server(make_registry_handler(state, 20))
+    yield state
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def prefetcher(fake, registry, tmp_path):
+    def make(bandwidth_limit=0):
+        return ImagePrefetcher(IMAGE, cache_dir=str(tmp_path / 'cache'), bandwidth_limit=bandwidth_limit,
+                               registry_url=registry['url'], docker_command=[fake.docker])
+    return make
+
+
+def test_prefetch_loads_the_image(fake, registry, prefetcher, base_image):
+    result = prefetcher().run()
+
+    assert result.status == 'loaded', result.message
+    assert result.downloaded == base_image.size
+    assert registry['served'] == base_image.size + len(base_image.config)
+    assert result.digest == base_image.index_digest
+    assert fake.images()[IMAGE]['RootFS']['Layers'] == base_image.diff_ids
+    assert list(prefetcher().cache_dir.iterdir()) == []  # the cache is emptied once loaded
+
+
+def test_up_to_date_image_is_not_downloaded(registry, prefetcher, base_image):
+    assert prefetcher().run().status == 'loaded'
+    registry['served'] = 0
+
+    result = prefetcher().run()
+
+    assert result.status == 'up_to_date' and result.downloaded == 0
+    assert registry['served'] == len(base_image.config)  # the manifests and config only
+
+
+def test_paused_prefetch_resumes_from_the_partial_layer(fake, registry, prefetcher, base_image):
+    start = time.monotonic()
+    paused = prefetcher(bandwidth_limit=4e6).run(should_stop=lambda: time.monotonic() - start > 0.4)
+    assert paused.status == 'paused'
+    assert 0 < paused.downloaded < base_image.size
+    assert IMAGE not in fake.images()
+
+    result = prefetcher().run()
+
+    assert result.status == 'loaded', result.message
+    assert paused.downloaded + result.downloaded == base_image.size
+    assert registry['ranges'] == 1
+
+
+def test_dropped_connection_fails_then_resumes(fake, registry, prefetcher, base_image):
+    registry['drop'] = True
+
+    failed = prefetcher().run()
+    assert failed.status == 'failed' and 'interrupted' in failed.message
+
+    result = prefetcher().run()
+    assert result.status == 'loaded', result.message
+    assert failed.downloaded + result.downloaded == base_image.size
+    assert registry['ranges'] == 1
+    assert IMAGE in fake.images()
+
+
+def run_and_interrupt(prefetcher, started):
+    """Interrupt `prefetcher` once `started()`, returns its result and how long it took to stop."""
+    results = []
+    runner = threading.Thread(target=lambda: results.append(prefetcher.run()))
+    runner.start()
+    deadline = time.monotonic() + 15
+    while not started() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    start = time.monotonic()
+    prefetcher.interrupt()
+    runner.join(10)
+    assert not runner.is_alive()
+    return results[0], time.monotonic() - start
+
+
+def test_interrupt_aborts_a_stalled_download(fake, registry, prefetcher, base_image):
+    registry['stall'] = True
+    stalled = prefetcher()
+
+    try:
+        paused, stop_time = run_and_interrupt(stalled, lambda: stalled.downloaded > 0)
+    finally:
+        registry['stall'] = False
+
+    assert paused.status == 'paused', paused.message
+    assert stop_time < 2  # not the 30s read timeout
+    result = prefetcher().run()
+    assert result.status == 'loaded', result.message
+    assert paused.downloaded + result.downloaded == base_image.size
+
+
+def test_interrupt_kills_docker_load(fake, registry, tmp_path):
+    started = tmp_path / 'load_started'
+    hanging_load = f'if [ "$1" = load ]; then touch {started}; exec sleep 30; fi; exec "$0" "$@"'
+    loading = ImagePrefetcher(IMAGE, cache_dir=str(tmp_path / 'cache'), registry_url=registry['url'],
+                              docker_command=['sh', '-c', hanging_load, fake.docker])
+
+    paused, stop_time = run_and_interrupt(loading, started.exists)
+
+    assert paused.status == 'paused', paused.message
+    assert stop_time < 2
+    assert IMAGE not in fake.images()
+
+
+def test_new_version_downloads_only_its_new_layers(fake, registry, prefetcher, base_image):
+    assert prefetcher().run().status == 'loaded'
+    new_image = FakeImage(1, 1, seed=2, base=base_image)
+    registry['image'] = new_image
+    registry['served'] = 0
+
+    result = prefetcher().run()
+
+    new_layer_size = new_image.layers[-1][1]
+    assert result.status == 'loaded', result.message
+    assert result.downloaded == new_layer_size
+    assert registry['served'] == new_layer_size + len(new_image.config)
+    assert fake.images()[IMAGE]['RootFS']['Layers'] == new_image.diff_ids
+
+
+def test_bandwidth_limit(registry, prefetcher, base_image):
+    start = time.monotonic()
+
+    result = prefetcher(bandwidth_limit=base_image.size / 0.8).run()
+
+    assert result.status == 'loaded'
+    assert time.monotonic() - start >= 0.7
+
+
+def test_rate_limiter_set_to_zero_stops_limiting():
+    limiter = RateLimiter(1e6)
+    limiter.rate = 0
+    start = time.monotonic()
+
+    limiter.consume(10 ** 9)
+
+    assert time.monotonic() - start < 0.1
+
+
+def test_registry_down_fails(fake, tmp_path):
+    result = ImagePrefetcher(IMAGE, cache_dir=str(tmp_path / 'cache'), registry_url='http://127.0.0.1:9',
+                             docker_command=[fake.docker]).run()
+
+    assert result.status == 'failed'
+    assert IMAGE not in fake.images()
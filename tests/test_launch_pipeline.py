@@ -0,0 +1,102 @@
+import time
+
+import pytest
+
+from fakes import launch_command
+from utils.launch_pipeline import LaunchPipeline, create_command
+
+NAME = 'edge_node_1'
+
+
+def pipeline(**kwargs):
+    return LaunchPipeline(NAME, launch_command(NAME, 'volume'), image='image', **kwargs)
+
+
+def test_create_command():
+    command = create_command(['docker', 'run', '-d', '--name', NAME, 'image'])
+
+    assert command == ['docker', 'create', '--name', NAME, 'image']
+    with pytest.raises(ValueError):
+        create_command(['docker', 'start', NAME])
+
+
+def test_new_container(fake):
+    launch = pipeline()
+
+    result = launch.launch()
+
+    assert result.return_code == 0 and not result.replaced and not result.image_missing
+    assert result.stdout.strip() == NAME
+    assert list(launch.timings.phases) == ['image_check', 'create', 'start']
+    assert fake.container_state(NAME) == 'running'
+
+
+def test_existing_container_is_replaced(fake):
+    fake.add_container(NAME, 'exited 0')
+    updates = []
+    launch = pipeline(on_phase=updates.append)
+
+    result = launch.launch()
+
+    assert result.return_code == 0 and result.replaced
+    assert list(launch.timings.phases) == ['image_check', 'remove', 'create', 'start']
+    assert [update.current for update in updates if update.current] == ['image_check', 'remove', 'create', 'start']
+    assert fake.container_state(NAME) == 'running'
+
+
+def test_missing_image_stops_before_create(fake):
+    fake.configure(has_image=0)
+
+    result = pipeline(stop_if_image_missing=True).launch()
+
+    assert result.image_missing and result.return_code == -1 and 'not found' in result.error
+    assert fake.container_state(NAME) is None
+
+
+def test_missing_image_is_left_to_docker_create(fake):
+    fake.configure(has_image=0)
+
+    result = pipeline().launch()
+
+    assert result.image_missing and result.return_code == 0
+    assert fake.container_state(NAME) == 'running'
+
+
+def test_start_failure_is_returned(fake):
+    fake.configure(fail=NAME)
+
+    result = pipeline().launch()
+
+    assert result.return_code == 125 and 'refused to start' in result.stderr
+    assert fake.container_state(NAME) == 'created'
+
+
+def test_unreachable_host(fake):
+    result = pipeline(remote_ssh_command=fake.ssh_command('host-down')).launch()
+
+    assert result.return_code == 255 and 'Connection refused' in result.error
+
+
+def test_first_heartbeat(fake):
+    fake.configure(boot=1.2)
+    launch = pipeline()
+    launch.launch()
+
+    heartbeat = launch.wait_for_heartbeat(timeout=10)
+
+    assert heartbeat is not None and 1.2 <= heartbeat < 4
+    assert list(launch.timings.phases)[-1] == 'first_heartbeat'
+
+
+def test_heartbeat_timeout_and_cancel(fake):
+    fake.configure(boot=60)
+    launch = pipeline()
+    launch.launch()
+
+    start = time.monotonic()
+    assert launch.wait_for_heartbeat(timeout=1.5) is None
+    assert time.monotonic() - start < 4
+    start = time.monotonic()
+    assert launch.wait_for_heartbeat(should_stop=lambda: time.monotonic() - start > 0.3) is None
+    assert time.monotonic() - start < 2
+    assert 'first_heartbeat' not in launch.timings.phases
@@ -0,0 +1,18 @@
+import gzip
+
+from launcher import _sweep_pending_logs
+
+
+def test_leftover_pending_logs_are_compressed_or_deleted(tmp_path):
+    (tmp_path / 'launcher.log.1.100.pending').write_text('interrupted\n')
+    (tmp_path / 'launcher.log.1.gz.tmp').write_bytes(b'half written')
+    (tmp_path / 'launcher.log.2.200.pending').write_text('older\n')
+    with gzip.open(tmp_path / 'launcher.log.2.gz', 'wt') as f:
+        f.write('rotated since\n')
+
+    for thread in _sweep_pending_logs(str(tmp_path)):
+        thread.join(10)
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['launcher.log.1.gz', 'launcher.log.2.gz']
+    assert gzip.open(tmp_path / 'launcher.log.1.gz', 'rt').read() == 'interrupted\n'
+    assert gzip.open(tmp_path / 'launcher.log.2.gz', 'rt').read() == 'rotated since\n'
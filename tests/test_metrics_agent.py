@@ -0,0 +1,99 @@
+import io
+import json
+import os
+import threading
+import time
+
+import pytest
+from PyQt5.QtCore import Qt
+
+from utils import metrics_stream
+from utils.metrics_agent import MetricsAgent
+from utils.metrics_stream import RemoteMetricsStreamThread
+
+
+def poll(agent):
+    """Messages printed by one poll of the agent."""
+    agent.out.seek(0)
+    agent.out.truncate()
+    agent.run(once=True)
+    return [json.loads(line) for line in agent.out.getvalue().splitlines()]
+
+
+def test_agent_only_prints_what_changed(fake):
+    fake.add_container('r1node')
+    fake.add_container('r1node1', 'exited 0')
+    fake.add_container('other')
+    agent = MetricsAgent(out=io.StringIO(), interval=0)
+
+    first = poll(agent)
+
+    assert [message['type'] for message in first] == ['hello', 'containers', 'node_info', 'samples']
+    assert [container['name'] for container in first[1]['changed']] == ['r1node', 'r1node1']
+    assert first[2]['container'] == first[3]['container'] == 'r1node'
+    assert len(first[3]['timestamps']) == len(first[3]['cpu_load']) > 0
+    # Nothing changed since: the node info and samples are not sent again
+    assert [message['type'] for message in poll(agent)] == ['hello', 'heartbeat']
+
+    fake.add_container('r1node1')
+    os.remove(fake.container_path('r1node'))
+    third = poll(agent)
+
+    assert [message['type'] for message in third] == ['hello', 'containers', 'node_info', 'samples']
+    assert [container['name'] for container in third[1]['changed']] == ['r1node1']
+    assert third[1]['removed'] == ['r1node']
+
+
+def test_agent_lists_an_empty_host_once(fake):
+    agent = MetricsAgent(out=io.StringIO(), interval=0)
+
+    assert [message['type'] for message in poll(agent)] == ['hello', 'containers']
+    assert [message['type'] for message in poll(agent)] == ['hello', 'heartbeat']
+
+
+def test_agent_reports_a_node_that_does_not_answer(fake):
+    fake.configure(boot=60)  # its execs fail until then
+    fake.add_container('r1node')
+
+    messages = poll(MetricsAgent(out=io.StringIO(), interval=0))
+
+    assert messages[-1]['type'] == 'error' and messages[-1]['container'] == 'r1node'
+
+
+def wait_for(condition, timeout=15):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            pytest.fail("timed out")
+        time.sleep(0.05)
+
+
+def test_stream_resyncs_after_reconnecting(fake, monkeypatch):
+    monkeypatch.setattr(metrics_stream, 'RECONNECT_DELAY', 0.5)
+    fake.add_container('r1node')
+    fake.add_container('r1node1')
+    stream = RemoteMetricsStreamThread(interval=0.2)
+    hellos, mirrors, samples = [], [], []
+    stream.agent_started.connect(hellos.append, Qt.DirectConnection)
+    stream.containers_changed.connect(mirrors.append, Qt.DirectConnection)
+    stream.samples_received.connect(lambda name, received: samples.append(name), Qt.DirectConnection)
+    runner = threading.Thread(target=stream.run)
+    runner.start()
+    try:
+        wait_for(lambda: sorted(samples) == ['r1node', 'r1node1'])
+        assert sorted(mirrors[-1]) == ['r1node', 'r1node1']
+
+        # The connection drops, meanwhile a node is removed
+        stream.process.kill()
+        os.remove(fake.container_path('r1node1'))
+        wait_for(lambda: len(hellos) == 2 and stream.messages > 0 and len(mirrors) > 1)
+
+        assert sorted(stream.containers) == ['r1node']
+        assert sorted(mirrors[-1]) == ['r1node']
+        # The new session sends the whole history again, it is not forwarded twice
+        time.sleep(0.5)
+        assert sorted(samples) == ['r1node', 'r1node1']
+    finally:
+        stream.stop()
+        runner.join(10)
+    assert not runner.is_alive()
@@ -0,0 +1,45 @@
+import math
+import random
+
+from utils.metrics_stats import PERCENTILE_ACCURACY, PercentileSketch, RollingWindowStats
+
+
+def exact_percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[max(1, math.ceil(pct / 100 * len(ordered))) - 1]
+
+
+def test_percentiles_are_within_the_sketch_accuracy():
+    rng = random.Random(1)
+    stats = RollingWindowStats(window=1000)
+    values = []
+    for timestamp in range(5000):
+        value = rng.choice([rng.uniform(0, 100), rng.lognormvariate(0, 3), 0.0])
+        stats.add(timestamp, value)
+        values = values[-999:] + [value]  # the samples of the last 1000 seconds
+
+    assert stats.count == len(values) == 1000
+    assert (stats.min, stats.max) == (min(values), max(values))
+    for pct in (1, 25, 50, 95, 99):
+        expected = exact_percentile(values, pct)
+        assert abs(stats.percentile(pct) - expected) <= PERCENTILE_ACCURACY * expected + 1e-9
+    assert stats.percentile(0) == min(values) and stats.percentile(100) == max(values)
+
+
+def test_sketch_size_does_not_grow_with_the_samples():
+    sketch = PercentileSketch()
+    for i in range(100000):
+        sketch.add(i % 100 + 0.5)
+
+    assert sketch.count == 100000 and len(sketch._counts) <= 250
+    for i in range(100000):
+        sketch.remove(i % 100 + 0.5)
+    assert sketch.count == 0 and sketch._counts == {} and sketch.percentile(50) is None
+
+
+def test_negative_values_keep_their_order():
+    sketch = PercentileSketch()
+    for value in (-50, -5, 0, 5, 50):
+        sketch.add(value)
+
+    assert [round(sketch.percentile(pct)) for pct in (20, 40, 60, 80, 100)] == [-50, -5, 0, 5, 50]
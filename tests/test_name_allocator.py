@@ -0,0 +1,76 @@
+from utils.name_allocator import HostNameAllocators, NameAllocator, list_container_names
+
+
+def host_allocator(*config_names):
+    return NameAllocator.from_host(config_names, [name.replace('node', 'vol') for name in config_names])
+
+
+def test_sequence_after_the_names_in_use(fake):
+    fake.add_container('r1node')
+    fake.add_container('r1node1', 'exited 0')
+    fake.add_container('other_container')
+
+    allocator = host_allocator('r1node2')
+
+    assert list_container_names() == ['other_container', 'r1node', 'r1node1']
+    assert allocator.allocate() == ('r1node3', 'r1vol3')
+    assert allocator.allocate() == ('r1node4', 'r1vol4')
+
+
+def test_empty_host_starts_the_sequence(fake):
+    assert host_allocator().reserve(3) == [('r1node', 'r1vol'), ('r1node1', 'r1vol1'), ('r1node2', 'r1vol2')]
+
+
+def test_gaps_left_by_removed_nodes_are_not_filled(fake):
+    for name in ('r1node', 'r1node5'):
+        fake.add_container(name)
+
+    assert host_allocator().allocate() == ('r1node6', 'r1vol6')
+
+
+def test_released_names_are_handed_out_again_first(fake):
+    allocator = host_allocator()
+    names = [name for name, _ in allocator.reserve(4)]
+
+    allocator.release(names[2])
+    allocator.release(names[1])
+    allocator.release('r1node9')  # never handed out
+
+    assert not allocator.is_used(names[1])
+    assert [name for name, _ in allocator.reserve(3)] == [names[1], names[2], 'r1node4']
+
+
+def test_batch_names_are_unique_and_not_on_the_host(fake):
+    for i in (0, 2, 3, 7):
+        fake.add_container('r1node' if i == 0 else f'r1node{i}')
+    allocator = host_allocator('r1node8')
+    allocator.mark_used('r1node12', 'r1vol12')
+
+    batch = allocator.reserve(20)
+
+    names = [name for name, _ in batch]
+    assert len(set(names)) == len(names) == 20
+    assert not set(names) & (set(fake.containers()) | {'r1node8', 'r1node12'})
+    assert len({volume for _, volume in batch}) == 20
+    assert names[0] == 'r1node13'  # after the highest index in use, marked used included
+
+
+def test_unreachable_docker_lists_nothing(fake):
+    assert list_container_names(fake.ssh_command('host-down') + ['docker']) == []
+
+
+def test_host_allocator_is_kept_until_the_config_changes():
+    allocators = HostNameAllocators()
+    allocator = allocators.build('local', ['r1node'], ['r1node1'], ['r1vol1'])
+    reserved, _ = allocator.allocate()
+
+    assert allocators.get('local', ['r1node1']) is allocator
+    assert allocators.get('host-01', []) is None
+    # A container added by another launcher instance
+    assert allocators.get('local', ['r1node1', 'r1node7']) is None
+    assert allocators.get('local', ['r1node1']) is None
+    assert reserved == 'r1node2'
+
+    allocators.build('local', [], [])
+    allocators.invalidate()
+    assert allocators.get('local', []) is None
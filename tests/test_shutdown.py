@@ -0,0 +1,75 @@
+import time
+
+from utils.const import SHUTDOWN_GRACE_PERIOD
+from utils.shutdown import ShutdownCoordinator
+
+NODES = [f'edge_node_{i}' for i in range(6)]
+
+
+def test_nodes_stop_concurrently_with_their_grace_period(fake):
+    fake.configure(exit_time=2)
+    for name in NODES:
+        fake.add_container(name)
+    grace_periods = {name: 5 for name in NODES}
+    grace_periods[NODES[-1]] = 0
+
+    start = time.monotonic()
+    states = ShutdownCoordinator().shutdown(grace_periods)
+    elapsed = time.monotonic() - start
+
+    assert elapsed < 5  # one after the other would take 10s
+    for name in NODES[:-1]:
+        state = states[name]
+        assert state.phase == 'stopped' and state.exit_code == 143 and not state.killed
+        assert 2 <= state.duration < 5
+        assert fake.container_state(name) == 'exited 143'
+    # Killed right away, without waiting for the node to exit
+    killed = states[NODES[-1]]
+    assert killed.phase == 'stopped' and killed.killed and killed.duration < 2
+
+
+def test_remove_after_stop(fake):
+    fake.add_container(NODES[0])
+    fake.add_container(NODES[1], 'exited 0')
+    updates = []
+    coordinator = ShutdownCoordinator(remove=True, on_update=updates.append)
+
+    states = coordinator.shutdown({NODES[0]: 5, NODES[1]: 5, NODES[2]: None})
+
+    assert {name: state.phase for name, state in states.items()} == {
+        NODES[0]: 'removed', NODES[1]: 'removed', NODES[2]: 'not_running'}
+    assert states[NODES[2]].grace_period == SHUTDOWN_GRACE_PERIOD
+    assert fake.containers() == []
+    assert [update.phase for update in updates if update.container == NODES[0]] == ['stopping', 'removed']
+
+
+def test_not_running_nodes_are_not_stopped(fake):
+    fake.add_container(NODES[0], 'exited 0')
+
+    states = ShutdownCoordinator().shutdown({NODES[0]: 5})
+
+    assert states[NODES[0]].phase == 'not_running' and states[NODES[0]].exit_code is None
+    assert fake.container_state(NODES[0]) == 'exited 0'
+
+
+def test_remote_host(fake):
+    fake.add_container(NODES[0], host='host-01')
+
+    states = ShutdownCoordinator(fake.ssh_command('host-01') + ['docker']).shutdown({NODES[0]: 5})
+
+    assert states[NODES[0]].phase == 'stopped'
+    assert fake.container_state(NODES[0], host='host-01') == 'exited 143'
+
+
+def test_unreachable_host_fails_fast(fake):
+    start = time.monotonic()
+
+    states = ShutdownCoordinator(fake.ssh_command('host-down') + ['docker']).shutdown({NODES[0]: 5, NODES[1]: 5})
+
+    assert time.monotonic() - start < 2
+    assert {state.phase for state in states.values()} == {'failed'}
+    assert all('Connection refused' in state.error for state in states.values())
+
+
+def test_nothing_to_stop(fake):
+    assert ShutdownCoordinator().shutdown({}) == {}
@@ -0,0 +1,50 @@
+import stat
+
+from utils.ssh_mux import SSHMultiplexer, without_master
+
+RECORDING_SSH = """#!/bin/sh
+printf '%s\\n' "$@" > "$(dirname "$0")/args"
+"""
+
+
+def options(command):
+    return [command[i + 1] for i, arg in enumerate(command) if arg == '-o']
+
+
+def test_commands_never_become_the_master(tmp_path):
+    mux = SSHMultiplexer(control_dir=str(tmp_path / 'cm'))
+
+    wrapped = mux.wrap(['ssh', '-p', '22', 'user@host'])
+
+    assert wrapped[-1] == 'user@host'
+    assert 'ControlMaster=no' in options(wrapped)
+    assert f'ControlPath={mux.control_path(["ssh", "-p", "22", "user@host"])}' in options(wrapped)
+    assert mux.is_multiplexed(wrapped) and not mux.check(wrapped)
+
+
+def test_commands_with_connection_sharing_are_left_alone(tmp_path):
+    mux = SSHMultiplexer(control_dir=str(tmp_path / 'cm'))
+    command = ['ssh', '-o', 'ControlMaster=auto', '-o', 'ControlPath=/tmp/socket', 'user@host']
+
+    assert mux.wrap(command) == command
+    assert mux.wrap(['docker', 'ps']) == ['docker', 'ps']
+    assert mux.wrap(None) is None
+
+
+def test_ensure_starts_the_master_in_the_background(tmp_path):
+    ssh = tmp_path / 'ssh'
+    ssh.write_text(RECORDING_SSH)
+    ssh.chmod(ssh.stat().st_mode | stat.S_IEXEC)
+    mux = SSHMultiplexer(control_dir=str(tmp_path / 'cm'))
+
+    assert mux.ensure(mux.wrap([str(ssh), 'user@host']))
+
+    args = (tmp_path / 'args').read_text().split('\n')
+    assert 'ControlMaster=auto' in args and 'ControlMaster=no' not in args
+    assert args[-3:] == ['-N', 'user@host', ''] and '-f' in args
+
+
+def test_without_master_replaces_the_option():
+    command = without_master(['ssh', '-oControlMaster=yes', '-o', 'ControlMaster=auto', 'user@host'])
+
+    assert command == ['ssh', '-o', 'ControlMaster=no', 'user@host']
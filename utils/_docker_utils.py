@@ -5,6 +5,8 @@ from typing import Optional, List, Dict, Any, Tuple, Union
 import platform
 from utils.subprocess_utils import run_process_no_window
 
+LOG_SOURCE = 'docker'  # source of the console entries of this module
+
 class _DockerUtilsMixin:
     """Docker utilities mixin class."""
     
@@ -14,7 +16,7 @@ class _DockerUtilsMixin:
         if command[0] != 'docker':
             command = ['docker'] + command
         
-        self.add_log(f"Running Docker command: {' '.join(command)}", debug=True)
+        self.add_log(f"Running Docker command: {' '.join(command)}", debug=True, source=LOG_SOURCE)
         
         try:
             # Use our utility function to hide the console window
@@ -25,11 +27,11 @@ class _DockerUtilsMixin:
             )
             
             if result.returncode != 0 and hasattr(result, 'stderr') and result.stderr:
-                self.add_log(f"Docker command error: {result.stderr}", debug=True)
+                self.add_log(f"Docker command error: {result.stderr}", debug=True, source=LOG_SOURCE)
                 
             return result
         except Exception as e:
-            self.add_log(f"Docker command exception: {str(e)}", debug=True)
+            self.add_log(f"Docker command exception: {str(e)}", debug=True, source=LOG_SOURCE)
             # Return a fake CompletedProcess with error info
             return subprocess.CompletedProcess(
                 args=command,
@@ -56,7 +58,7 @@ class _DockerUtilsMixin:
                 try:
                     containers.append(json.loads(line))
                 except json.JSONDecodeError:
-                    self.add_log(f"Error parsing docker container info: {line}", debug=True)
+                    self.add_log(f"Error parsing docker container info: {line}", debug=True, source=LOG_SOURCE)
         
         return containers
 
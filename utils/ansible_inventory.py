@@ -0,0 +1,335 @@
+"""Cached Ansible inventory shared by the launcher.
+
+The inventory (`hosts.yml`) and its `group_vars/` and `host_vars/` files are parsed with
+the C YAML loader when PyYAML was built with libyaml. Every parsed file is cached by
+(mtime, size): `reload_if_changed()` only stats the files the inventory was built from
+and re-parses the ones that changed, an unchanged inventory costs a few stat calls.
+InventoryWatcher turns changes of those files into a Qt signal.
+
+Groups nest to any depth (`children` of `children`), a host gets the variables of every
+group it belongs to directly or through its parents, with Ansible's precedence:
+
+    all < parent groups < child groups (by depth, then name) < host < host_vars
+
+and for a group, the `vars` of the inventory < its `group_vars` files.
+"""
+import os
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import yaml
+
+from PyQt5.QtCore import QFileSystemWatcher, QObject, QTimer, pyqtSignal
+
+from utils.persistence import file_signature
+
+try:
+    _YamlLoader = yaml.CSafeLoader
+except AttributeError:  # PyYAML without libyaml
+    _YamlLoader = yaml.SafeLoader
+
+DEFAULT_HOSTS_FILE = os.path.expanduser(
+    "~/.ansible/collections/ansible_collections/vitalii_t12/multi_node_launcher/hosts.yml"
+)
+VARS_EXTENSIONS = ('.yml', '.yaml', '.json', '')
+
+_yaml_cache: Dict[str, Tuple[Tuple[int, int], Any]] = {}  # path -> (signature, data)
+_yaml_cache_lock = threading.Lock()
+
+
+def load_yaml(path: str) -> Any:
+    """Parse a YAML file, cached until its mtime or size changes. None if it does not exist."""
+    signature = file_signature(path)
+    if signature is None:
+        return None
+    with _yaml_cache_lock:
+        cached = _yaml_cache.get(path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    with open(path, 'r') as f:
+        data = yaml.load(f, Loader=_YamlLoader)
+    with _yaml_cache_lock:
+        _yaml_cache[path] = (signature, data)
+    return data
+
+
+@dataclass(slots=True)
+class InventoryGroup:
+    name: str
+    vars: Dict[str, Any] = field(default_factory=dict)
+    hosts: Dict[str, Dict[str, Any]] = field(default_factory=dict)  # host -> vars set in this group
+    children: List[str] = field(default_factory=list)
+    parents: List[str] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class InventoryHost:
+    name: str
+    groups: Tuple[str, ...]  # every group of the host, 'all' first, by precedence
+    vars: Dict[str, Any]  # resolved variables
+
+
+class AnsibleInventory:
+    """Ansible YAML inventory with its group_vars and host_vars.
+
+    Use `get_ansible_inventory()` to share the inventory of a file.
+    """
+
+    def __init__(self, hosts_file: str = DEFAULT_HOSTS_FILE):
+        self.hosts_file = hosts_file
+        self.base_dir = os.path.dirname(hosts_file)
+        self.groups: Dict[str, InventoryGroup] = {}
+        self.hosts: Dict[str, InventoryHost] = {}
+        self.error: Optional[str] = None
+        self._sources: Dict[str, Optional[Tuple[int, int]]] = {}  # path -> signature when built
+        self._entries: Dict[str, set] = {}  # group_vars / host_vars -> names in the directory
+        self._lock = threading.RLock()
+        self.reload()
+
+    # Loading
+
+    def _read(self, path: str) -> Any:
+        """Parse a file of the inventory and remember its signature."""
+        self._sources[path] = file_signature(path)
+        return load_yaml(path)
+
+    def _read_vars(self, directory: str, name: str) -> Dict[str, Any]:
+        """Variables of `group_vars/<name>` or `host_vars/<name>`: a file or a directory of files.
+
+        Only files listed when the build started are read: a file added later changes the
+        mtime of its directory, which triggers a new build.
+        """
+        entries = self._entries.get(directory)
+        if not entries:
+            return {}
+        base = os.path.join(self.base_dir, directory, name)
+        if name in entries and os.path.isdir(base):
+            self._sources[base] = file_signature(base)
+            paths = [
+                os.path.join(base, entry) for entry in sorted(os.listdir(base))
+                if os.path.splitext(entry)[1] in VARS_EXTENSIONS[:-1]
+            ]
+        else:
+            paths = [base + extension for extension in VARS_EXTENSIONS if name + extension in entries]
+        result = {}
+        for path in paths:
+            data = self._read(path)
+            if isinstance(data, dict):
+                result.update(data)
+        return result
+
+    def reload(self) -> bool:
+        """Rebuild the inventory. Unchanged files come from the parse cache.
+
+        On error the previous inventory is kept and `error` is set. Returns True on success.
+        """
+        with self._lock:
+            self._sources = {}
+            try:
+                self._entries = {}
+                for directory in ('group_vars', 'host_vars'):
+                    path = os.path.join(self.base_dir, directory)
+                    self._sources[path] = file_signature(path)
+                    self._entries[directory] = set(os.listdir(path)) if os.path.isdir(path) else set()
+                config = self._read(self.hosts_file)
+                groups = self._parse_groups(config)
+                hosts = self._resolve_hosts(groups)
+            except Exception as e:
+                self.error = f"Error loading hosts file: {e}"
+                logging.error(self.error)
+                # The files read until the failure are watched, the build is retried once they change
+                return False
+            self.groups, self.hosts, self.error = groups, hosts, None
+            return True
+
+    def changed(self) -> bool:
+        """Whether a file the inventory was built from changed, was created or was removed."""
+        with self._lock:
+            sources = dict(self._sources)
+        return any(file_signature(path) != signature for path, signature in sources.items())
+
+    def reload_if_changed(self) -> bool:
+        """Rebuild the inventory if one of its files changed. Returns True when it was rebuilt."""
+        if not self.changed():
+            return False
+        return self.reload()
+
+    def watched_paths(self) -> List[str]:
+        """Files and directories the inventory was built from, including missing ones."""
+        with self._lock:
+            return list(self._sources)
+
+    @staticmethod
+    def _parse_groups(config: Any) -> Dict[str, InventoryGroup]:
+        groups: Dict[str, InventoryGroup] = {'all': InventoryGroup('all')}
+        if config is None:
+            return groups
+        if not isinstance(config, dict):
+            raise ValueError("the inventory must be a mapping of groups")
+
+        def add_group(name: str, data: Any, parent: Optional[str]) -> None:
+            group = groups.setdefault(name, InventoryGroup(name))
+            if parent is not None and parent not in group.parents and name != parent:
+                group.parents.append(parent)
+                groups[parent].children.append(name)
+            if not data:
+                return
+            if not isinstance(data, dict):
+                raise ValueError(f"group {name!r} must be a mapping")
+            for host_name, host_vars in (data.get('hosts') or {}).items():
+                group.hosts.setdefault(str(host_name), {}).update(host_vars or {})
+            group.vars.update(data.get('vars') or {})
+            for child_name, child_data in (data.get('children') or {}).items():
+                add_group(str(child_name), child_data, name)
+
+        for name, data in config.items():
+            # Top level groups other than 'all' are implicitly its children
+            add_group(str(name), data, None if name == 'all' else 'all')
+        return groups
+
+    def _resolve_hosts(self, groups: Dict[str, InventoryGroup]) -> Dict[str, InventoryHost]:
+        depths: Dict[str, int] = {}
+
+        def depth(name: str, seen: frozenset = frozenset()) -> int:
+            if name not in depths:
+                parents = [parent for parent in groups[name].parents if parent not in seen]
+                depths[name] = 1 + max((depth(parent, seen | {name}) for parent in parents), default=-1)
+            return depths[name]
+
+        def ancestors(name: str, found: set) -> set:
+            if name not in found:
+                found.add(name)
+                for parent in groups[name].parents:
+                    ancestors(parent, found)
+            return found
+
+        # Variables of each group, parsed once per build whatever the number of hosts
+        group_vars = {}
+        for name, group in groups.items():
+            variables = dict(group.vars)
+            variables.update(self._read_vars('group_vars', name))
+            group_vars[name] = variables
+
+        host_groups: Dict[str, set] = {}
+        for name, group in groups.items():
+            for host_name in group.hosts:
+                host_groups.setdefault(host_name, set()).add(name)
+
+        hosts = {}
+        for host_name, direct in host_groups.items():
+            found = {'all'}
+            for name in direct:
+                ancestors(name, found)
+            ordered = sorted(found, key=lambda name: (depth(name), name))
+            variables = {}
+            for name in ordered:
+                variables.update(group_vars[name])
+            for name in ordered:
+                if name in direct:
+                    variables.update(groups[name].hosts[host_name])
+            variables.update(self._read_vars('host_vars', host_name))
+            hosts[host_name] = InventoryHost(name=host_name, groups=tuple(ordered), vars=variables)
+        return hosts
+
+    # Queries
+
+    def host_names(self, group: str = None) -> List[str]:
+        """Hosts of the inventory, or of a group and its children, in inventory order."""
+        with self._lock:
+            if group is None:
+                return list(self.hosts)
+            return [name for name, host in self.hosts.items() if group in host.groups]
+
+    def get_host(self, host_name: str) -> Optional[InventoryHost]:
+        with self._lock:
+            return self.hosts.get(host_name)
+
+    def get_host_vars(self, host_name: str) -> Dict[str, Any]:
+        host = self.get_host(host_name)
+        return dict(host.vars) if host else {}
+
+    def ssh_command(self, host_name: str) -> Optional[List[str]]:
+        """ssh command of a host as a list: `ssh`, the options, then the destination."""
+        host_vars = self.get_host_vars(host_name)
+        address = host_vars.get('ansible_host') or (host_name if host_vars else '')
+        if not address:
+            return None
+        command = ['ssh']
+        if host_vars.get('ansible_ssh_common_args'):
+            command.extend(str(host_vars['ansible_ssh_common_args']).split())
+        if host_vars.get('ansible_port'):
+            command.extend(['-p', str(host_vars['ansible_port'])])
+        if host_vars.get('ansible_ssh_private_key_file'):
+            command.extend(['-i', os.path.expanduser(str(host_vars['ansible_ssh_private_key_file']))])
+        user = host_vars.get('ansible_user')
+        command.append(f"{user}@{address}" if user else str(address))
+        return command
+
+
+_inventories: Dict[str, AnsibleInventory] = {}
+_inventories_lock = threading.Lock()
+
+
+def get_ansible_inventory(hosts_file: str = None) -> AnsibleInventory:
+    """The inventory of a hosts file (the launcher's by default), shared and kept up to date.
+
+    The cached inventory is rebuilt when one of its files changed since the last call.
+    """
+    hosts_file = os.path.abspath(hosts_file or DEFAULT_HOSTS_FILE)
+    with _inventories_lock:
+        inventory = _inventories.get(hosts_file)
+        if inventory is None:
+            inventory = _inventories[hosts_file] = AnsibleInventory(hosts_file)
+            return inventory
+    inventory.reload_if_changed()
+    return inventory
+
+
+class InventoryWatcher(QObject):
+    """Reloads an inventory when its files change and emits `inventory_changed`.
+
+    Editors often save by replacing the file, which drops it from a QFileSystemWatcher:
+    the watched paths are synced again after every change. Missing files are covered by
+    watching their directory.
+    """
+    inventory_changed = pyqtSignal()
+
+    def __init__(self, inventory: AnsibleInventory, parent=None, delay_ms: int = 300):
+        super().__init__(parent)
+        self.inventory = inventory
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.fileChanged.connect(self._schedule)
+        self._watcher.directoryChanged.connect(self._schedule)
+        # A save is often several writes, reload once they are done
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(delay_ms)
+        self._timer.timeout.connect(self._check)
+        self._sync_paths()
+
+    def _schedule(self, _path: str = None):
+        self._timer.start()
+
+    def _check(self):
+        rebuilt = self.inventory.reload_if_changed()
+        self._sync_paths()
+        if rebuilt:
+            self.inventory_changed.emit()
+
+    def _sync_paths(self):
+        wanted = set()
+        for path in self.inventory.watched_paths() + [self.inventory.base_dir]:
+            while path and not os.path.exists(path):
+                parent = os.path.dirname(path)
+                if parent == path:
+                    break
+                path = parent
+            if path:
+                wanted.add(path)
+        watched = set(self._watcher.files()) | set(self._watcher.directories())
+        if watched - wanted:
+            self._watcher.removePaths(list(watched - wanted))
+        if wanted - watched:
+            self._watcher.addPaths(sorted(wanted - watched))
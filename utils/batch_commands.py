@@ -0,0 +1,227 @@
+"""Run several docker commands on a host in a single round trip.
+
+The commands are sent as one POSIX shell script on the stdin of a single `sh -s`
+process: over SSH (`<ssh prefix> sh -s`) that is one session instead of one connection
+per command, locally it is a plain `sh -s` (the stand-in used for tests and for local
+nodes). The script runs every command with its own exit code and timing and prints one
+frame per command:
+
+    @@BATCH <token> OUT <index>
+    <stdout, base64>
+    @@BATCH <token> ERR <index>
+    <stderr, base64>
+    @@BATCH <token> END <index> <exit code> <start ns> <end ns>
+
+base64 never contains '@', and the token is random per batch, so command output cannot
+be mistaken for a frame. The frames are parsed into a BatchResult, whose `to_dict()` is
+the JSON document of the whole batch.
+
+Where no POSIX shell is available (Windows without a remote host), the commands are run
+one after the other in-process and produce the same BatchResult.
+"""
+import os
+import json
+import time
+import uuid
+import base64
+import shlex
+import subprocess
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+BATCH_TIMEOUT = 30  # seconds, for the whole batch
+FRAME_PREFIX = "@@BATCH"
+
+_SCRIPT_HEADER = """\
+T=$(mktemp -d 2>/dev/null || (mkdir -p /tmp/enl_batch_$$ && echo /tmp/enl_batch_$$))
+trap 'rm -rf "$T"' EXIT
+now() { date +%s%N 2>/dev/null; }
+run() {
+    idx=$1; shift
+    s=$(now)
+    "$@" >"$T/$idx.out" 2>"$T/$idx.err" </dev/null
+    rc=$?
+    e=$(now)
+    {
+        echo "@@BATCH $TOKEN OUT $idx"
+        base64 <"$T/$idx.out"
+        echo "@@BATCH $TOKEN ERR $idx"
+        base64 <"$T/$idx.err"
+        echo "@@BATCH $TOKEN END $idx $rc $s $e"
+    } >"$T/$idx.frame"
+}
+"""
+
+
+@dataclass(slots=True)
+class BatchCommandResult:
+    name: str
+    command: List[str]
+    exit_code: int
+    stdout: str
+    stderr: str
+    duration: Optional[float]  # seconds, None when the host cannot measure it
+
+    @property
+    def ok(self) -> bool:
+        return self.exit_code == 0
+
+    def json(self):
+        """stdout parsed as JSON."""
+        return json.loads(self.stdout)
+
+    def to_dict(self) -> dict:
+        return {
+            'name': self.name,
+            'command': self.command,
+            'exit_code': self.exit_code,
+            'duration_ms': None if self.duration is None else round(self.duration * 1000, 3),
+            'stdout': self.stdout,
+            'stderr': self.stderr,
+        }
+
+
+@dataclass(slots=True)
+class BatchResult:
+    results: Dict[str, BatchCommandResult] = field(default_factory=dict)
+    duration: float = 0.0  # seconds, round trip of the whole batch
+    remote: bool = False
+
+    def __getitem__(self, name: str) -> BatchCommandResult:
+        return self.results[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.results
+
+    @property
+    def ok(self) -> bool:
+        return all(result.ok for result in self.results.values())
+
+    def to_dict(self) -> dict:
+        return {
+            'remote': self.remote,
+            'duration_ms': round(self.duration * 1000, 3),
+            'commands': [result.to_dict() for result in self.results.values()],
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict())
+
+
+class BatchError(Exception):
+    """The batch itself failed (connection, timeout or unreadable output)."""
+
+
+def build_batch_script(commands: Sequence[Tuple[str, List[str]]], token: str, parallel: bool = False) -> str:
+    """Shell script running the commands and printing one frame per command, in order."""
+    lines = [f"TOKEN={token}", _SCRIPT_HEADER]
+    for index, (_, command) in enumerate(commands):
+        lines.append(f"run {index} {' '.join(shlex.quote(arg) for arg in command)}{' &' if parallel else ''}")
+    if parallel:
+        lines.append("wait")
+    lines.append(" ".join(f'cat "$T/{index}.frame";' for index in range(len(commands))) or ":")
+    return "\n".join(lines) + "\n"
+
+
+def parse_batch_output(output: str, commands: Sequence[Tuple[str, List[str]]], token: str) -> Dict[str, BatchCommandResult]:
+    """Parse the frames printed by a batch script."""
+    results = {}
+    marker = f"{FRAME_PREFIX} {token} "
+    section = None
+    chunks = {'OUT': [], 'ERR': []}
+    for line in output.splitlines():
+        if not line.startswith(marker):
+            if section is not None:
+                chunks[section].append(line)
+            continue
+        kind, *fields = line[len(marker):].split()
+        if kind in ('OUT', 'ERR'):
+            section = kind
+            chunks[kind] = []
+            continue
+        if kind != 'END' or len(fields) < 2:
+            raise BatchError(f"Malformed batch frame: {line!r}")
+        index, exit_code = int(fields[0]), int(fields[1])
+        try:
+            duration = (int(fields[3]) - int(fields[2])) / 1e9
+        except (IndexError, ValueError):
+            duration = None  # no nanosecond clock on the host
+        name, command = commands[index]
+        results[name] = BatchCommandResult(
+            name=name,
+            command=list(command),
+            exit_code=exit_code,
+            stdout=base64.b64decode("".join(chunks['OUT'])).decode('utf-8', errors='replace'),
+            stderr=base64.b64decode("".join(chunks['ERR'])).decode('utf-8', errors='replace'),
+            duration=duration,
+        )
+        section = None
+    missing = [name for name, _ in commands if name not in results]
+    if missing:
+        raise BatchError(f"No result for {', '.join(missing)}")
+    return results
+
+
+def _run_in_process(commands: Sequence[Tuple[str, List[str]]], timeout: float) -> Dict[str, BatchCommandResult]:
+    results = {}
+    deadline = time.monotonic() + timeout
+    for name, command in commands:
+        start = time.perf_counter()
+        try:
+            kwargs = {'creationflags': subprocess.CREATE_NO_WINDOW} if os.name == 'nt' else {}
+            completed = subprocess.run(
+                command, capture_output=True, text=True, stdin=subprocess.DEVNULL,
+                timeout=max(0.1, deadline - time.monotonic()), **kwargs
+            )
+            exit_code, stdout, stderr = completed.returncode, completed.stdout, completed.stderr
+        except subprocess.TimeoutExpired:
+            raise BatchError(f"Batch timed out after {timeout} seconds (at {name})") from None
+        except OSError as e:
+            exit_code, stdout, stderr = 127, '', str(e)
+        results[name] = BatchCommandResult(
+            name=name, command=list(command), exit_code=exit_code, stdout=stdout, stderr=stderr,
+            duration=time.perf_counter() - start,
+        )
+    return results
+
+
+def run_batch(commands: Sequence[Tuple[str, List[str]]], remote_ssh_command: List[str] = None,
+              timeout: float = BATCH_TIMEOUT, parallel: bool = False, shell: List[str] = None) -> BatchResult:
+    """Run named commands in one round trip.
+
+    Args:
+        commands: (name, argv) pairs, names must be unique
+        remote_ssh_command: ssh prefix of the host, None to run locally
+        timeout: Timeout of the whole batch, in seconds
+        parallel: Run the commands concurrently on the host (results keep their order)
+        shell: Shell reading the script on stdin, default `sh -s`
+
+    Raises:
+        BatchError: if the batch could not be run or its output could not be read.
+            The failure of a single command is reported in its exit code instead.
+    """
+    commands = [(name, list(command)) for name, command in commands]
+    if len({name for name, _ in commands}) != len(commands):
+        raise ValueError("Batch command names must be unique")
+    start = time.perf_counter()
+    if not commands:
+        return BatchResult(remote=bool(remote_ssh_command))
+    if not remote_ssh_command and shell is None and os.name == 'nt':
+        results = _run_in_process(commands, timeout)
+        return BatchResult(results=results, duration=time.perf_counter() - start)
+
+    token = uuid.uuid4().hex
+    script = build_batch_script(commands, token, parallel=parallel)
+    full_command = list(remote_ssh_command or []) + (shell or ['sh', '-s'])
+    try:
+        completed = subprocess.run(full_command, input=script, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        raise BatchError(f"Batch timed out after {timeout} seconds: {' '.join(full_command)}") from None
+    except OSError as e:
+        raise BatchError(f"Could not run batch: {str(e)}") from None
+    try:
+        results = parse_batch_output(completed.stdout, commands, token)
+    except (BatchError, ValueError) as e:
+        detail = completed.stderr.strip() or str(e)
+        raise BatchError(f"Batch failed (exit code {completed.returncode}): {detail}") from None
+    return BatchResult(results=results, duration=time.perf_counter() - start, remote=bool(remote_ssh_command))
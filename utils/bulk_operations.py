@@ -0,0 +1,179 @@
+"""Start, stop or restart many node containers at once.
+
+Every container is handled by one task of a bounded pool: the parallelism limit keeps
+a host from starting 30 nodes at the same instant, and a parallelism of 1 makes a
+rolling restart. Each container reports its phase as it goes, errors are collected
+per container instead of stopping the whole operation.
+
+Starting a node has the same meaning as in the launcher's single node path: the
+container is recreated from the current image (`docker rm -f` then `docker run`),
+restarting stops it gracefully first.
+"""
+import os
+import time
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from typing import Callable, Dict, List, Optional, Tuple
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from utils.const import BULK_OPERATION_PARALLELISM
+
+ACTIONS = ('start', 'stop', 'restart')
+STOP_TIMEOUT = 10  # seconds docker waits for a node to exit before killing it
+COMMAND_TIMEOUT = 120  # seconds, for one docker command
+
+
+@dataclass
+class ContainerOperationResult:
+    container: str
+    action: str
+    phase: str = 'queued'  # queued, stopping, removing, starting, done, skipped, failed or cancelled
+    error: str = ''
+    started_at: float = 0.0
+    duration: float = 0.0  # seconds, once finished
+
+    @property
+    def finished(self) -> bool:
+        return self.phase in ('done', 'skipped', 'failed', 'cancelled')
+
+
+def _no_such_container(stderr: str) -> bool:
+    return 'no such container' in stderr.lower()
+
+
+class BulkOperation:
+    """One lifecycle action on a set of containers of a host.
+
+    Args:
+        action: 'start', 'stop' or 'restart'
+        containers: (container name, volume name) pairs, the volume is used to (re)create
+        launch_command: returns the `docker run` command of a container, from its name and volume
+        remote_ssh_command: ssh prefix of a remote host, None for the local docker
+        on_update: called with a copy of a container's result whenever its phase changes,
+            from a worker thread
+    """
+
+    def __init__(self, action: str, containers: List[Tuple[str, Optional[str]]],
+                 launch_command: Callable[[str, Optional[str]], List[str]] = None,
+                 remote_ssh_command: List[str] = None, parallelism: int = BULK_OPERATION_PARALLELISM,
+                 stop_timeout: int = STOP_TIMEOUT,
+                 on_update: Callable[[ContainerOperationResult], None] = None):
+        if action not in ACTIONS:
+            raise ValueError(f"Unknown action {action!r}, expected one of {', '.join(ACTIONS)}")
+        if action != 'stop' and launch_command is None:
+            raise ValueError(f"A launch command is needed to {action} containers")
+        self.action = action
+        self.containers = containers
+        self.launch_command = launch_command
+        self.remote_ssh_command = remote_ssh_command
+        self.parallelism = max(1, parallelism)
+        self.stop_timeout = stop_timeout
+        self.on_update = on_update
+
+    def run(self, should_stop: Callable[[], bool] = None) -> List[ContainerOperationResult]:
+        """Run the action on every container. Never raises, the outcome of each container is
+        in its result.
+        """
+        should_stop = should_stop or (lambda: False)
+        results = {name: ContainerOperationResult(name, self.action) for name, _ in self.containers}
+        for result in results.values():
+            self._report(result)
+        try:
+            running = self._running_containers()
+        except RuntimeError as e:
+            for result in results.values():
+                result.phase, result.error = 'failed', str(e)
+                self._report(result)
+            return list(results.values())
+
+        with ThreadPoolExecutor(max_workers=self.parallelism, thread_name_prefix="Bulk") as executor:
+            for name, volume in self.containers:
+                executor.submit(self._run_one, results[name], volume, running.get(name), should_stop)
+        return list(results.values())
+
+    def _report(self, result: ContainerOperationResult) -> None:
+        if self.on_update is not None:
+            self.on_update(replace(result))
+
+    def _execute(self, command: List[str], timeout: float = COMMAND_TIMEOUT) -> Tuple[str, str, int]:
+        full_command = (self.remote_ssh_command or []) + command
+        kwargs = {'creationflags': subprocess.CREATE_NO_WINDOW} if os.name == 'nt' else {}
+        try:
+            result = subprocess.run(full_command, capture_output=True, text=True, timeout=timeout, **kwargs)
+        except subprocess.TimeoutExpired:
+            return '', f"Command timed out after {timeout} seconds: {' '.join(command)}", -1
+        except OSError as e:
+            return '', str(e), -1
+        return result.stdout, result.stderr, result.returncode
+
+    def _running_containers(self) -> Dict[str, bool]:
+        """{name: running} of every container of the host, in one listing."""
+        stdout, stderr, return_code = self._execute(['docker', 'ps', '-a', '--format', '{{.Names}}\t{{.State}}'])
+        if return_code != 0:
+            raise RuntimeError(f"Failed to list containers: {stderr.strip()}")
+        running = {}
+        for line in stdout.splitlines():
+            name, _, state = line.partition('\t')
+            if name:
+                running[name] = state.strip() == 'running'
+        return running
+
+    def _run_one(self, result: ContainerOperationResult, volume: Optional[str], running: Optional[bool],
+                 should_stop: Callable[[], bool]) -> None:
+        result.started_at = time.monotonic()
+        try:
+            if should_stop():
+                result.phase, result.error = 'cancelled', 'Cancelled'
+            elif self.action == 'stop' and not running:
+                result.phase = 'skipped'  # not running, or does not exist
+            elif self.action == 'start' and running:
+                result.phase = 'skipped'
+            else:
+                self._apply(result, volume, running)
+                result.phase = 'done'
+        except RuntimeError as e:
+            result.phase, result.error = 'failed', str(e)
+        except Exception as e:
+            result.phase, result.error = 'failed', f"Error: {str(e)}"
+        result.duration = time.monotonic() - result.started_at
+        self._report(result)
+
+    def _step(self, result: ContainerOperationResult, phase: str, command: List[str],
+              missing_ok: bool = False) -> None:
+        result.phase = phase
+        self._report(result)
+        timeout = COMMAND_TIMEOUT + (self.stop_timeout if phase == 'stopping' else 0)
+        _, stderr, return_code = self._execute(command, timeout)
+        if return_code != 0 and not (missing_ok and _no_such_container(stderr)):
+            raise RuntimeError(f"{' '.join(command[:2])} failed: {stderr.strip()}")
+
+    def _apply(self, result: ContainerOperationResult, volume: Optional[str], running: Optional[bool]) -> None:
+        name = result.container
+        if running and self.action in ('stop', 'restart'):
+            self._step(result, 'stopping', ['docker', 'stop', '-t', str(self.stop_timeout), name], missing_ok=True)
+        if self.action == 'stop':
+            return
+        if running is not None:
+            self._step(result, 'removing', ['docker', 'rm', '-f', name], missing_ok=True)
+        self._step(result, 'starting', self.launch_command(name, volume))
+
+
+class DockerBulkOperationThread(QThread):
+    """Runs a BulkOperation off the GUI thread, `cancel()` leaves the containers not started yet alone."""
+
+    container_updated = pyqtSignal(object)  # ContainerOperationResult
+    operation_finished = pyqtSignal(object)  # list of ContainerOperationResult
+
+    def __init__(self, operation: BulkOperation):
+        super().__init__()
+        self.operation = operation
+        operation.on_update = self.container_updated.emit
+        self._cancelled = False
+
+    def cancel(self) -> None:
+        self._cancelled = True
+
+    def run(self):
+        self.operation_finished.emit(self.operation.run(lambda: self._cancelled))
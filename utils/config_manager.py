@@ -3,7 +3,9 @@ import json
 import logging
 from pathlib import Path
 from typing import List, Dict, Optional, Any
-from utils.const import CONFIG_DIR
+from utils.const import BULK_OPERATION_PARALLELISM, CONFIG_DIR, IMAGE_PREFETCH_BANDWIDTH_LIMIT, SHUTDOWN_GRACE_PERIOD
+from utils.log_store import DEFAULT_LOG_MAX_ENTRIES
+from utils.state_store import get_state_store
 
 # Container configuration structure
 class ContainerConfig:
@@ -42,7 +44,13 @@ class ContainerConfig:
 
 
 class ConfigManager:
-    """Manages container configurations stored in a local config file."""
+    """Manages container configurations and settings stored in the launcher state store.
+
+    Containers and settings live in the SQLite StateStore of the config directory. The
+    containers.json and settings.json files of older versions are imported on first use.
+    Changes are applied in memory and written by the store writer thread, coalesced: the
+    GUI thread never waits for a commit, and changes made back to back cost one.
+    """
     
     def __init__(self, config_dir: str = None):
         """Initialize the config manager.
@@ -59,71 +67,156 @@ class ConfigManager:
         # Ensure config directory exists
         os.makedirs(self.config_dir, exist_ok=True)
         
+        # Files of older versions, migrated to the state store
         self.containers_file = os.path.join(self.config_dir, "containers.json")
         self.settings_file = os.path.join(self.config_dir, "settings.json")
-        self.containers: List[ContainerConfig] = []
+        self.store = get_state_store(self.config_dir)
+        self.store.migrate_containers_json(self.containers_file)
+        self.store.migrate_settings_json(self.settings_file)
+        self._store_version = None
+        # Containers keyed by name (insertion ordered), plus secondary indexes to the name
+        self._containers: Dict[str, ContainerConfig] = {}
+        self._by_volume: Dict[str, str] = {}
+        self._by_node_address: Dict[str, str] = {}
         self.settings = {}
         
         # Load existing configurations
         self.load_containers()
         self.load_settings()
     
+    @property
+    def containers(self) -> List[ContainerConfig]:
+        """Container configurations in insertion order."""
+        return list(self._containers.values())
+
+    def _index(self, container: ContainerConfig) -> None:
+        if container.volume:
+            self._by_volume[container.volume] = container.name
+        if container.node_address:
+            self._by_node_address[container.node_address] = container.name
+
+    def _unindex(self, container: ContainerConfig) -> None:
+        if container.volume and self._by_volume.get(container.volume) == container.name:
+            del self._by_volume[container.volume]
+        if container.node_address and self._by_node_address.get(container.node_address) == container.name:
+            del self._by_node_address[container.node_address]
+
+    def _set_containers(self, containers: List[ContainerConfig]) -> None:
+        self._containers = {}
+        self._by_volume = {}
+        self._by_node_address = {}
+        for container in containers:
+            self._merge_container(container)
+
     def load_containers(self) -> List[ContainerConfig]:
-        """Load container configurations from file."""
+        """Load container configurations from the state store."""
         try:
-            if os.path.exists(self.containers_file):
-                with open(self.containers_file, 'r') as f:
-                    data = json.load(f)
-                    self.containers = [ContainerConfig.from_dict(item) for item in data]
+            version = self._stored_version()
+            self._set_containers([ContainerConfig.from_dict(item) for item in self.store.load_containers()])
+            self._store_version = version
             return self.containers
         except Exception as e:
             logging.error(f"Error loading container configurations: {str(e)}")
             return []
     
     def save_containers(self) -> bool:
-        """Save container configurations to file."""
+        """Save all the container configurations, in a single transaction."""
         try:
-            with open(self.containers_file, 'w') as f:
-                json.dump([container.to_dict() for container in self.containers], f, indent=2)
+            for container in self._containers.values():
+                self._save_container(container)
             return True
         except Exception as e:
             logging.error(f"Error saving container configurations: {str(e)}")
             return False
-    
+
+    def _save_container(self, container: ContainerConfig) -> bool:
+        """Save a single container configuration."""
+        try:
+            self.store.submit_coalesced(('container', container.name), self.store.upsert_container,
+                                        container.to_dict())
+            return True
+        except Exception as e:
+            logging.error(f"Error saving container configuration: {str(e)}")
+            return False
+
+    def flush(self) -> None:
+        """Write the pending changes now, waiting for the commit."""
+        self.store.wait_for_writes()
+
+    def _stored_version(self):
+        return self.store.table_version('containers', 'settings')
+
+    def reload_if_changed(self) -> None:
+        """Reload the state changed by another launcher instance since it was last read.
+
+        Only the version counters of the store tables are compared, so this is cheap
+        enough to be called before every access. Nothing is reloaded while local changes
+        are waiting to be written, the state in memory is the newest then.
+        """
+        if self.store.has_pending_writes():
+            return
+        if self._stored_version() != self._store_version:
+            self.load_containers()
+            self.load_settings()
+
+    def _merge_container(self, container: ContainerConfig) -> None:
+        """Add a container or update the existing one with the same name (no save)."""
+        existing = self._containers.get(container.name)
+        if existing is None:
+            self._containers[container.name] = container
+            self._index(container)
+            return
+        self._unindex(existing)
+        existing.volume = container.volume
+        existing.created_at = container.created_at
+        existing.last_used = container.last_used
+        # Preserve addresses if they exist and new ones are not provided
+        if container.node_address:
+            existing.node_address = container.node_address
+        if container.eth_address:
+            existing.eth_address = container.eth_address
+        self._index(existing)
+
     def add_container(self, container: ContainerConfig) -> bool:
         """Add a new container configuration."""
-        # Check if container already exists
-        for existing in self.containers:
-            if existing.name == container.name:
-                # Update existing container
-                existing.volume = container.volume
-                existing.created_at = container.created_at
-                existing.last_used = container.last_used
-                # Preserve addresses if they exist and new ones are not provided
-                if container.node_address:
-                    existing.node_address = container.node_address
-                if container.eth_address:
-                    existing.eth_address = container.eth_address
-                return self.save_containers()
-        
-        # Add new container
-        self.containers.append(container)
-        return self.save_containers()
+        self.reload_if_changed()
+        self._merge_container(container)
+        return self._save_container(self._containers[container.name])
     
     def remove_container(self, container_name: str) -> bool:
         """Remove a container configuration."""
-        self.containers = [c for c in self.containers if c.name != container_name]
-        return self.save_containers()
+        self.reload_if_changed()
+        container = self._containers.pop(container_name, None)
+        if container is not None:
+            self._unindex(container)
+        try:
+            self.store.submit_coalesced(('container', container_name), self.store.delete_container,
+                                        container_name)
+            return True
+        except Exception as e:
+            logging.error(f"Error removing container configuration: {str(e)}")
+            return False
     
     def get_container(self, container_name: str) -> Optional[ContainerConfig]:
         """Get a container configuration by name."""
-        for container in self.containers:
-            if container.name == container_name:
-                return container
-        return None
+        self.reload_if_changed()
+        return self._containers.get(container_name)
+    
+    def get_container_by_volume(self, volume_name: str) -> Optional[ContainerConfig]:
+        """Get the container configuration using a volume."""
+        self.reload_if_changed()
+        name = self._by_volume.get(volume_name)
+        return self._containers.get(name) if name is not None else None
+    
+    def get_container_by_node_address(self, node_address: str) -> Optional[ContainerConfig]:
+        """Get the container configuration of a node address."""
+        self.reload_if_changed()
+        name = self._by_node_address.get(node_address)
+        return self._containers.get(name) if name is not None else None
     
     def get_all_containers(self) -> List[ContainerConfig]:
         """Get all container configurations."""
+        self.reload_if_changed()
         return self.containers
     
     def update_last_used(self, container_name: str, timestamp: str) -> bool:
@@ -131,7 +224,7 @@ class ConfigManager:
         container = self.get_container(container_name)
         if container:
             container.last_used = timestamp
-            return self.save_containers()
+            return self._save_container(container)
         return False
     
     def update_node_address(self, container_name: str, node_address: str) -> bool:
@@ -146,8 +239,10 @@ class ConfigManager:
         """
         container = self.get_container(container_name)
         if container:
+            self._unindex(container)
             container.node_address = node_address
-            return self.save_containers()
+            self._index(container)
+            return self._save_container(container)
         return False
     
     def update_eth_address(self, container_name: str, eth_address: str) -> bool:
@@ -164,8 +259,7 @@ class ConfigManager:
             container = self.get_container(container_name)
             if container:
                 container.eth_address = eth_address
-                self.save_containers()
-                return True
+                return self._save_container(container)
             return False
         except Exception as e:
             logging.error(f"Error updating ETH address: {str(e)}")
@@ -185,13 +279,38 @@ class ConfigManager:
             container = self.get_container(container_name)
             if container:
                 container.node_alias = node_alias
-                self.save_containers()
-                return True
+                return self._save_container(container)
             return False
         except Exception as e:
             logging.error(f"Error updating node alias: {str(e)}")
             return False
     
+    def update_node_info(self, container_name: str, node_alias: str = None, node_address: str = None,
+                         eth_address: str = None, save: bool = True) -> Optional[Dict[str, Any]]:
+        """Update the alias and addresses reported by a node, values left to None are kept.
+
+        With save=False only the configuration in memory is updated and the caller stores
+        the returned dict itself, e.g. with the rest of a refresh in one transaction.
+        
+        Returns:
+            Dict: The updated configuration, None if the container is unknown or nothing changed
+        """
+        container = self.get_container(container_name)
+        if container is None:
+            return None
+        values = {'node_alias': node_alias, 'node_address': node_address, 'eth_address': eth_address}
+        changes = {key: value for key, value in values.items()
+                   if value is not None and getattr(container, key) != value}
+        if not changes:
+            return None
+        self._unindex(container)
+        for key, value in changes.items():
+            setattr(container, key, value)
+        self._index(container)
+        if save:
+            self._save_container(container)
+        return container.to_dict()
+
     def update_volume(self, container_name: str, volume_name: str) -> bool:
         """Update the volume name for a container.
         
@@ -204,8 +323,10 @@ class ConfigManager:
         """
         container = self.get_container(container_name)
         if container:
+            self._unindex(container)
             container.volume = volume_name
-            return self.save_containers()
+            self._index(container)
+            return self._save_container(container)
         return False
     
     def volume_exists_in_docker(self, volume_name: str) -> bool:
@@ -252,7 +373,7 @@ class ConfigManager:
         """
         try:
             with open(export_file, 'w') as f:
-                json.dump([container.to_dict() for container in self.containers], f, indent=2)
+                json.dump([container.to_dict() for container in self._containers.values()], f, indent=2)
             return True
         except Exception as e:
             logging.error(f"Error exporting container configurations: {str(e)}")
@@ -273,36 +394,42 @@ class ConfigManager:
                     data = json.load(f)
                     imported_containers = [ContainerConfig.from_dict(item) for item in data]
                     
-                    # Merge with existing containers
+                    # Merge with existing containers, then save them in one transaction
+                    self.reload_if_changed()
                     for imported in imported_containers:
-                        self.add_container(imported)
+                        self._merge_container(imported)
                     
-                    return True
+                    return self.save_containers()
             return False
         except Exception as e:
             logging.error(f"Error importing container configurations: {str(e)}")
             return False
     
     def load_settings(self) -> dict:
-        """Load settings from file."""
+        """Load settings from the state store."""
         try:
-            if os.path.exists(self.settings_file):
-                with open(self.settings_file, 'r') as f:
-                    self.settings = json.load(f)
+            self.settings = self.store.load_settings()
             return self.settings
         except Exception as e:
             logging.error(f"Error loading settings: {str(e)}")
             return {}
     
     def save_settings(self) -> bool:
-        """Save settings to file."""
+        """Save all the settings, in a single transaction."""
         try:
-            with open(self.settings_file, 'w') as f:
-                json.dump(self.settings, f, indent=2)
+            for key, value in self.settings.items():
+                self.store.submit_coalesced(('setting', key), self.store.set_setting, key, value)
             return True
         except Exception as e:
             logging.error(f"Error saving settings: {str(e)}")
             return False
+
+    def _save_setting(self, key: str, value) -> bool:
+        """Set and save a single setting."""
+        self.reload_if_changed()
+        self.settings[key] = value
+        self.store.submit_coalesced(('setting', key), self.store.set_setting, key, value)
+        return True
     
     def set_force_debug(self, enabled: bool) -> bool:
         """Set force debug mode.
@@ -314,8 +441,7 @@ class ConfigManager:
             bool: True if successful, False otherwise
         """
         try:
-            self.settings['force_debug'] = enabled
-            return self.save_settings()
+            return self._save_setting('force_debug', enabled)
         except Exception as e:
             logging.error(f"Error setting force debug mode: {str(e)}")
             return False
@@ -326,4 +452,200 @@ class ConfigManager:
         Returns:
             bool: True if force debug is enabled, False otherwise
         """
-        return self.settings.get('force_debug', False) 
\ No newline at end of file
+        self.reload_if_changed()
+        return self.settings.get('force_debug', False)
+
+    def set_log_json_lines(self, enabled: bool) -> bool:
+        """Set whether the launcher log file is written as JSON lines (applies on next start).
+        
+        Args:
+            enabled: Whether to write JSON lines
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            return self._save_setting('log_json_lines', bool(enabled))
+        except Exception as e:
+            logging.error(f"Error setting log JSON lines: {str(e)}")
+            return False
+
+    def get_log_json_lines(self) -> bool:
+        """Get whether the launcher log file is written as JSON lines.
+        
+        Returns:
+            bool: True if JSON lines are enabled, False otherwise
+        """
+        self.reload_if_changed()
+        return bool(self.settings.get('log_json_lines', False))
+
+    def set_log_max_lines(self, max_lines: int) -> bool:
+        """Set the maximum number of lines kept in the console log.
+        
+        Args:
+            max_lines: Number of lines, the oldest lines are dropped first
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            return self._save_setting('log_max_lines', int(max_lines))
+        except Exception as e:
+            logging.error(f"Error setting log max lines: {str(e)}")
+            return False
+
+    def get_log_max_lines(self) -> int:
+        """Get the maximum number of lines kept in the console log.
+        
+        Returns:
+            int: Maximum number of console lines
+        """
+        self.reload_if_changed()
+        try:
+            return max(1, int(self.settings.get('log_max_lines', DEFAULT_LOG_MAX_ENTRIES)))
+        except (TypeError, ValueError):
+            return DEFAULT_LOG_MAX_ENTRIES
+
+    def set_prefetch_bandwidth_limit(self, limit: int) -> bool:
+        """Set the bandwidth used to prefetch new image versions in the background.
+
+        Args:
+            limit: Bytes per second, 0 for unlimited
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            return self._save_setting('prefetch_bandwidth_limit', max(0, int(limit)))
+        except Exception as e:
+            logging.error(f"Error setting prefetch bandwidth limit: {str(e)}")
+            return False
+
+    def get_prefetch_bandwidth_limit(self) -> int:
+        """Get the bandwidth used to prefetch new image versions in the background.
+
+        Returns:
+            int: Bytes per second, 0 for unlimited
+        """
+        self.reload_if_changed()
+        try:
+            return max(0, int(self.settings.get('prefetch_bandwidth_limit', IMAGE_PREFETCH_BANDWIDTH_LIMIT)))
+        except (TypeError, ValueError):
+            return IMAGE_PREFETCH_BANDWIDTH_LIMIT
+
+    def set_bulk_parallelism(self, parallelism: int) -> bool:
+        """Set how many containers bulk actions start or stop at the same time.
+
+        Args:
+            parallelism: Number of containers, 1 for one at a time (rolling)
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            return self._save_setting('bulk_parallelism', max(1, int(parallelism)))
+        except Exception as e:
+            logging.error(f"Error setting bulk parallelism: {str(e)}")
+            return False
+
+    def get_bulk_parallelism(self) -> int:
+        """Get how many containers bulk actions start or stop at the same time.
+
+        Returns:
+            int: Number of containers
+        """
+        self.reload_if_changed()
+        try:
+            return max(1, int(self.settings.get('bulk_parallelism', BULK_OPERATION_PARALLELISM)))
+        except (TypeError, ValueError):
+            return BULK_OPERATION_PARALLELISM
+
+    def set_stop_grace_period(self, seconds: int, container_name: str = None) -> bool:
+        """Set how long a node has to exit when it is stopped, before it is killed.
+        
+        Args:
+            seconds: Grace period in seconds
+            container_name: Container this grace period applies to. If None, sets the
+                default of the containers without their own
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            seconds = max(0, int(seconds))
+            if container_name is None:
+                return self._save_setting('stop_grace_period', seconds)
+            self.reload_if_changed()
+            overrides = dict(self.settings.get('stop_grace_periods') or {})
+            overrides[container_name] = seconds
+            return self._save_setting('stop_grace_periods', overrides)
+        except Exception as e:
+            logging.error(f"Error setting stop grace period: {str(e)}")
+            return False
+
+    def get_stop_grace_period(self, container_name: str = None) -> int:
+        """Get how long a node has to exit when it is stopped, before it is killed.
+        
+        Args:
+            container_name: Container to get the grace period of. If None, or if it has
+                none of its own, returns the default
+            
+        Returns:
+            int: Grace period in seconds
+        """
+        self.reload_if_changed()
+        try:
+            overrides = self.settings.get('stop_grace_periods') or {}
+            if container_name in overrides:
+                return max(0, int(overrides[container_name]))
+            return max(0, int(self.settings.get('stop_grace_period', SHUTDOWN_GRACE_PERIOD)))
+        except (TypeError, ValueError):
+            return SHUTDOWN_GRACE_PERIOD
+
+    def set_stop_all_on_exit(self, enabled: bool) -> bool:
+        """Set whether closing the launcher stops every node of the current host.
+        
+        Args:
+            enabled: Whether to stop the nodes on exit
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            return self._save_setting('stop_all_on_exit', bool(enabled))
+        except Exception as e:
+            logging.error(f"Error setting stop all on exit: {str(e)}")
+            return False
+
+    def get_stop_all_on_exit(self) -> bool:
+        """Get whether closing the launcher stops every node of the current host.
+        
+        Returns:
+            bool: True if the nodes are stopped on exit, False otherwise
+        """
+        self.reload_if_changed()
+        return bool(self.settings.get('stop_all_on_exit', False))
+
+    def set_metrics_agent_enabled(self, enabled: bool) -> bool:
+        """Set whether remote hosts stream their node metrics through the metrics agent.
+        
+        Args:
+            enabled: Whether to run the agent on the remote hosts instead of polling them
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            return self._save_setting('metrics_agent_enabled', bool(enabled))
+        except Exception as e:
+            logging.error(f"Error setting metrics agent: {str(e)}")
+            return False
+
+    def get_metrics_agent_enabled(self) -> bool:
+        """Get whether remote hosts stream their node metrics through the metrics agent.
+        
+        Returns:
+            bool: True if the agent is used, False if the hosts are polled
+        """
+        self.reload_if_changed()
+        return bool(self.settings.get('metrics_agent_enabled', False))
@@ -32,6 +32,10 @@ REFRESH_TIME = 20_000
 MAX_HISTORY_QUEUE = 5 * 60 // 10  # 5 minutes @ 10 seconds each hb
 AUTO_UPDATE_CHECK_INTERVAL = 3600 # 1 hour
 DOCKER_IMAGE_AUTO_UPDATE_CHECK_INTERVAL = 300  # 5 minutes
+IMAGE_PREFETCH_IDLE_TIME = 120  # seconds without user input before new images are prefetched
+IMAGE_PREFETCH_BANDWIDTH_LIMIT = 5_000_000  # bytes per second by default, 0 for unlimited
+BULK_OPERATION_PARALLELISM = 8  # containers started or stopped at the same time by bulk actions
+SHUTDOWN_GRACE_PERIOD = 30  # seconds a node has to exit after SIGTERM before it is killed
 MAX_ALIAS_LENGTH = 15  # Maximum length for aliases (node name and authorized addresses)
 
 # ============================================================================
@@ -50,6 +54,9 @@ REFRESH_LOCAL_ADDRESS_BUTTON_TEXT = 'Refresh Local Address'
 COPY_ADDRESS_BUTTON_TEXT = 'Copy Address'
 COPY_ETHEREUM_ADDRESS_BUTTON_TEXT = 'Copy Ethereum Address'
 RENAME_NODE_BUTTON_TEXT = 'Change Node Alias'
+NODE_LOGS_BUTTON_TEXT = 'View Node Logs'
+FLEET_DASHBOARD_BUTTON_TEXT = 'Fleet Dashboard'
+BULK_ACTIONS_BUTTON_TEXT = 'Bulk Actions'
 LIGHT_DASHBOARD_BUTTON_TEXT = 'Switch to Light Theme'
 DARK_DASHBOARD_BUTTON_TEXT = 'Switch to Dark Theme'
 DOWNLOAD_DOCKER_BUTTON_TEXT = 'Download Docker'
@@ -60,6 +67,9 @@ UPTIME_LABEL = 'Up Time:'
 EPOCH_LABEL = 'Epoch:'
 EPOCH_AVAIL_LABEL = 'Epochs avail:'
 NODE_VERSION_LABEL = 'Running ver:'
+CPU_STATS_LABEL = 'CPU avg 1h:'
+MEMORY_STATS_LABEL = 'Mem p95 24h:'
+GPU_TEMP_STATS_LABEL = 'GPU peak 24h:'
 
 # Status texts
 NO_CONTAINER_SELECTED_TEXT = 'Address: No container selected'
@@ -466,7 +476,7 @@ COMMON_STYLESHEET_TEMPLATE = """
   QDialog, QWidget {{
     background-color: {widget_bg};
   }}
-  QTextEdit {{
+  QTextEdit, QPlainTextEdit {{
     background-color: {log_view_bg};
     color: {log_view_text};
     font-size: {font_size};
@@ -7,7 +7,6 @@ import base64
 
 from pathlib import Path
 from collections import OrderedDict
-from time import sleep
 from uuid import uuid4
 
 from PyQt5.QtCore import Qt, QThread, pyqtSignal
@@ -17,9 +16,14 @@ from PyQt5.QtWidgets import (QApplication, QDialog, QInputDialog, QLabel,
 from .const import *
 from .docker_commands import DockerCommandHandler
 from .ssh_service import SSHService, SSHConfig
+from .ssh_mux import multiplexed
+from .pull_progress import PullProgressParser, Throttle
 from .service_manager import ServiceManager
 from widgets.dialogs.DockerCheckDialog import DockerCheckDialog
 
+PULL_UPDATES_PER_SECOND = 10
+LOG_SOURCE = 'docker'  # source of the console entries of this module
+
 def get_user_folder():
   """
   Returns the user folder.
@@ -33,11 +37,20 @@ class DockerPullThread(QThread):
   def __init__(self, docker_pull_command):
     super().__init__()
     self.docker_pull_command = docker_pull_command
-    self.total_layers = 0
-    self.pulled_layers = 0    
+    self.parser = PullProgressParser()
     return
 
 
+  @property
+  def total_layers(self):
+    return self.parser.total_layers
+
+
+  @property
+  def pulled_layers(self):
+    return self.parser.pulled_layers
+
+
   def run(self):
     try:
       docker_pull_command = self.docker_pull_command    
@@ -46,9 +59,17 @@ class DockerPullThread(QThread):
       else:
         process = subprocess.Popen(docker_pull_command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
 
+      # Lines are sent to the UI in batches, at most PULL_UPDATES_PER_SECOND times per second
+      throttle = Throttle(PULL_UPDATES_PER_SECOND)
+      pending = []
       for line in iter(process.stdout.readline, ''):
         self.parse_output(line)
-        self.progress_update.emit(line.strip(), self.calculate_progress())
+        pending.append(line.strip())
+        if throttle.ready():
+          self.progress_update.emit('\n'.join(pending), self.calculate_progress())
+          pending = []
+      if pending:
+        self.progress_update.emit('\n'.join(pending), self.calculate_progress())
       
       process.stdout.close()
       process.wait()
@@ -64,29 +85,12 @@ class DockerPullThread(QThread):
 
 
   def parse_output(self, line):    
-    DONE = [
-      'Image is up to date',
-      'Pull complete',
-      'Already exists',
-    ]
-    START = [
-      'Already exists',
-      'Pulling fs layer',
-      'Image is up to date',
-    ]
-    for d in DONE:
-      if d in line:
-        self.pulled_layers += 1
-    for s in START:
-      if s in line:
-        self.total_layers += 1
+    self.parser.feed(line)
     return
 
 
   def calculate_progress(self):
-    if self.total_layers == 0:
-      return 0
-    return int((self.pulled_layers / self.total_layers) * 100)
+    return self.parser.overall_progress()
   
 
 
@@ -135,7 +139,7 @@ class ProgressBarWindow(QDialog):
   def on_docker_pull_finished(self, success):
     if success:
       QMessageBox.information(self, 'Docker Pull', 'Docker image pulled successfully.')      
-      self.sender.add_log('Docker image pulled successfully.')
+      self.sender.add_log('Docker image pulled successfully.', source=LOG_SOURCE)
     else:
       QMessageBox.warning(self, 'Docker Pull', 'Failed to pull Docker image.\nCheck if Docker is running.')
     self.accept()  # Close the progress dialog
@@ -174,12 +178,12 @@ class _DockerUtilsMixin:
     path.mkdir(exist_ok=True)
     self.env_file = path / '.env'
     os.chdir(path)
-    self.add_log(f'Working directory: {os.getcwd()}')
+    self.add_log(f'Working directory: {os.getcwd()}', source=LOG_SOURCE)
     return
   
   
   def post_launch_setup(self):
-    self.add_log('Executing post-launch setup...')
+    self.add_log('Executing post-launch setup...', source=LOG_SOURCE)
     return
   
   def docker_initialize(self):
@@ -200,12 +204,12 @@ class _DockerUtilsMixin:
       result = False
       output = str(exc)
     output = output.replace('\n', '') 
-    self.add_log(f'NVIDIA GPU available: {result} ({output})')
+    self.add_log(f'NVIDIA GPU available: {result} ({output})', source=LOG_SOURCE)
     return result
   
   
   def __setup_docker_run(self):
-    self.add_log('Setting up Docker run command...')
+    self.add_log('Setting up Docker run command...', source=LOG_SOURCE)
     self.docker_image = DOCKER_IMAGE + ":" + self.docker_tag
     
     # Base commands without remote prefix
@@ -215,10 +219,10 @@ class _DockerUtilsMixin:
     
     if self._use_gpus:
       str_gpus = '--gpus=all'
-      self.add_log('Using GPU.')
+      self.add_log('Using GPU.', source=LOG_SOURCE)
     else:
       str_gpus = ''
-      self.add_log('Not using GPU.')
+      self.add_log('Not using GPU.', source=LOG_SOURCE)
     
     base_run = ['docker', 'run']
     if len(str_gpus) > 0:
@@ -256,14 +260,14 @@ class _DockerUtilsMixin:
     
     run_cmd = " ".join(self.get_cmd())
     
-    self.add_log('Docker run command setup complete:')
-    self.add_log(f' - Remote mode: {self.is_remote}')
+    self.add_log('Docker run command setup complete:', source=LOG_SOURCE)
+    self.add_log(f' - Remote mode: {self.is_remote}', source=LOG_SOURCE)
     if self.is_remote:
-      self.add_log(f' - SSH command: {" ".join(self.remote_ssh_command)}')
-    self.add_log(' - Run:     {}'.format(run_cmd))
-    self.add_log(' - Clean:   {}'.format(" ".join(self.__CMD_CLEAN)))
-    self.add_log(' - Stop:    {}'.format(" ".join(self.__CMD_STOP)))
-    self.add_log(' - Inspect: {}'.format(" ".join(self.__CMD_INSPECT)))
+      self.add_log(f' - SSH command: {" ".join(self.remote_ssh_command)}', source=LOG_SOURCE)
+    self.add_log(' - Run:     {}'.format(run_cmd), source=LOG_SOURCE)
+    self.add_log(' - Clean:   {}'.format(" ".join(self.__CMD_CLEAN)), source=LOG_SOURCE)
+    self.add_log(' - Stop:    {}'.format(" ".join(self.__CMD_STOP)), source=LOG_SOURCE)
+    self.add_log(' - Inspect: {}'.format(" ".join(self.__CMD_INSPECT)), source=LOG_SOURCE)
     return
   
   
@@ -326,7 +330,7 @@ class _DockerUtilsMixin:
     
     
   def __generate_env_file(self):
-    self.add_log(f'Checking {self.env_file} file...')
+    self.add_log(f'Checking {self.env_file} file...', source=LOG_SOURCE)
     if os.path.exists(self.env_file):
       pass
     else:
@@ -346,14 +350,14 @@ class _DockerUtilsMixin:
             - is_running: bool indicating if Docker daemon is running
             - error_message: str with error details if any, None otherwise
     """
-    self.add_log('Checking Docker status...')
+    self.add_log('Checking Docker status...', source=LOG_SOURCE)
     try:
         # First check if Docker is installed
         if os.name == 'nt':
             output = subprocess.check_output(['docker', '--version'], stderr=subprocess.STDOUT, universal_newlines=True, creationflags=subprocess.CREATE_NO_WINDOW)
         else:
             output = subprocess.check_output(['docker', '--version'], stderr=subprocess.STDOUT, universal_newlines=True)
-        self.add_log("Docker version: " + output.strip())
+        self.add_log("Docker version: " + output.strip(), source=LOG_SOURCE)
         
         # Then check if Docker daemon is running
         if os.name == 'nt':
@@ -361,7 +365,7 @@ class _DockerUtilsMixin:
         else:
             subprocess.check_output(['docker', 'info'], stderr=subprocess.STDOUT, universal_newlines=True)
         
-        self.add_log("Docker daemon is running")
+        self.add_log("Docker daemon is running", source=LOG_SOURCE)
         return True, True, None
     except FileNotFoundError:
         return False, False, "Docker is not installed"
@@ -382,7 +386,7 @@ class _DockerUtilsMixin:
       if container_running != self.container_last_run_status:
         self.add_log('Edge Node container status changed: {} -> {} (status: {})'.format(
           self.container_last_run_status, container_running, status
-        ))
+        ), source=LOG_SOURCE)
         self.container_last_run_status = container_running
         if container_running:
           self.post_launch_setup()
@@ -398,34 +402,34 @@ class _DockerUtilsMixin:
 
     is_env_ok = self.__check_env_keys()
     if not is_env_ok:
-        self.add_log('Environment is not ok. Could not start the container.')
+        self.add_log('Environment is not ok. Could not start the container.', source=LOG_SOURCE)
         return
 
     # If in multi-host mode, use the service command instead
     if self.is_remote:
         try:
-            self.add_log('Starting Edge Node service on remote host...')
+            self.add_log('Starting Edge Node service on remote host...', source=LOG_SOURCE)
             
             success, error = self.service_manager.restart_service('mnl_execution_engine')
             
             if not success:
                 raise Exception(error)
             
-            self.add_log('Edge Node service restarted successfully.')
+            self.add_log('Edge Node service restarted successfully.', source=LOG_SOURCE)
             QMessageBox.information(self, 'Service Restart', 'Edge Node service restarted successfully.')
             self.post_launch_setup()
             return
             
         except Exception as e:
             QMessageBox.warning(self, 'Service Restart', 'Failed to restart Edge Node service')
-            self.add_log(f'Edge Node service restart failed: {str(e)}')
+            self.add_log(f'Edge Node service restart failed: {str(e)}', source=LOG_SOURCE)
             return
 
     # Regular Docker container launch for local mode
-    self.add_log('Updating image...')
+    self.add_log('Updating image...', source=LOG_SOURCE)
     self.__maybe_docker_pull()
     # first try to clean the container
-    self.add_log("Attempting to clean up the container...")
+    self.add_log("Attempting to clean up the container...", source=LOG_SOURCE)
     clean_cmd = self.get_clean_cmd()
     try:
       if os.name == 'nt':
@@ -442,16 +446,16 @@ class _DockerUtilsMixin:
           stderr=subprocess.STDOUT
         )
       # endif windows or not
-      self.add_log('Container cleanup status: {}'.format(output))
+      self.add_log('Container cleanup status: {}'.format(output), source=LOG_SOURCE)
     except subprocess.CalledProcessError as e:
       error_code = e.returncode
       error_output = e.output
-      self.add_log('Edge Node container cleanup failed with code={}: {}'.format(error_code, error_output))
+      self.add_log('Edge Node container cleanup failed with code={}: {}'.format(error_code, error_output), source=LOG_SOURCE)
     except Exception as e:
-      self.add_log('Edge Node container cleanup failed with unknown error: {}'.format(e))
+      self.add_log('Edge Node container cleanup failed with unknown error: {}'.format(e), source=LOG_SOURCE)
     
     try:
-      self.add_log('Starting Edge Node container...')
+      self.add_log('Starting Edge Node container...', source=LOG_SOURCE)
       run_cmd = self.get_cmd()
       if os.name == 'nt':
         # rc = subprocess.call(run_cmd, creationflags=subprocess.CREATE_NO_WINDOW, timeout=20)
@@ -468,51 +472,19 @@ class _DockerUtilsMixin:
           stderr=subprocess.STDOUT, 
         )
       # endif windows or not
-      self.add_log('Container start status: {}'.format(output))
+      self.add_log('Container start status: {}'.format(output), source=LOG_SOURCE)
       QMessageBox.information(self, 'Container Launch', 'Container launched successfully.')
-      self.add_log('Edge Node container launched successfully.')
+      self.add_log('Edge Node container launched successfully.', source=LOG_SOURCE)
       self.post_launch_setup()
       # endif container running
     except subprocess.CalledProcessError as e:
       error_code = e.returncode
       error_output = e.output
       QMessageBox.warning(self, 'Container Launch', 'Failed to launch container')
-      self.add_log('Edge Node container start failed with error code={}: {}'.format(error_code, error_output))
+      self.add_log('Edge Node container start failed with error code={}: {}'.format(error_code, error_output), source=LOG_SOURCE)
     except Exception as e:
       QMessageBox.warning(self, 'Container Launch', 'Failed to launch container')
-      self.add_log('Edge Node container start failed with unknown error: {}'.format(e))
-    return
-
-
-  def stop_container(self, container_name=None):
-    try:
-      name_to_stop = container_name or self.docker_container_name
-      self.add_log(f'Stopping Edge Node container {name_to_stop}...')
-      stop_cmd = self.get_stop_command() + [name_to_stop]  # Append container name to stop command
-      
-      if os.name == 'nt':
-        subprocess.check_call(stop_cmd, creationflags=subprocess.CREATE_NO_WINDOW)
-      else:
-        subprocess.check_call(stop_cmd)
-      sleep(2)
-      QMessageBox.information(self, 'Container Stop', 'Container stopped successfully.')      
-      self.add_log('Edge Node container stopped successfully.')
-      try:
-        self.add_log('Cleaning Edge Node container...')
-        clean_cmd = self.get_clean_cmd()
-        if container_name:
-          # Replace the default container name with the provided one
-          clean_cmd = clean_cmd[:-1] + [name_to_stop]
-        if os.name == 'nt':
-          subprocess.check_call(clean_cmd, creationflags=subprocess.CREATE_NO_WINDOW)
-        else:
-          subprocess.check_call(clean_cmd)
-        self.add_log('Edge Node container removed.')
-      except subprocess.CalledProcessError:
-        self.add_log('Edge Node container removal failed probably due to already being removed.')
-    except subprocess.CalledProcessError:
-      QMessageBox.warning(self, 'Container Stop', 'Failed to stop container.')
-      self.add_log('Edge Node container stop failed.')
+      self.add_log('Edge Node container start failed with unknown error: {}'.format(e), source=LOG_SOURCE)
     return
 
 
@@ -542,7 +514,7 @@ class _DockerUtilsMixin:
     
     # Update Docker settings
     self.is_remote = True
-    self.remote_ssh_command = ssh_command.split()
+    self.remote_ssh_command = multiplexed(ssh_command.split())
     self.__setup_docker_run()
     
     # Update Docker command handler
@@ -0,0 +1,164 @@
+"""Minimal client of the Docker Engine API, with the standard library only.
+
+Used where the CLI output is not precise enough: `/images/create` streams one JSON
+object per progress update, with the exact bytes of each layer (`progressDetail`).
+
+The daemon is reached through DOCKER_HOST when it is set (unix:// or tcp://), the local
+unix socket otherwise. Windows named pipes and ssh:// hosts are not supported, callers
+fall back to the CLI there (`DockerEngineAPI.available()`).
+"""
+import os
+import json
+import socket
+import http.client
+from typing import Callable, Dict, Iterator, Optional, Tuple
+from urllib.parse import urlencode, urlparse
+
+DEFAULT_SOCKET = '/var/run/docker.sock'
+API_TIMEOUT = 10  # seconds, to connect and between two reads of a stream
+PULL_TIMEOUT = 300  # seconds without any progress event before a pull is abandoned
+
+
+class DockerAPIError(Exception):
+    """The daemon answered with an error."""
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path: str, timeout: float):
+        super().__init__('localhost', timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+def split_image(image: str) -> Tuple[str, str]:
+    """`repo[:tag]` -> (repo, tag). A registry port (`host:5000/repo`) is not a tag."""
+    name, _, tag = image.rpartition(':')
+    if not name or '/' in tag:
+        return image, 'latest'
+    return name, tag
+
+
+def iter_json_stream(response, chunk_size: int = 65536) -> Iterator[dict]:
+    """JSON objects of a streamed response, whatever the chunking and separators."""
+    decoder = json.JSONDecoder()
+    buffer = ''
+    while True:
+        chunk = response.read1(chunk_size) if hasattr(response, 'read1') else response.read(chunk_size)
+        if not chunk:
+            break
+        buffer += chunk.decode('utf-8', errors='replace')
+        position = 0
+        while True:
+            while position < len(buffer) and buffer[position] in ' \t\r\n':
+                position += 1
+            if position >= len(buffer):
+                break
+            try:
+                obj, position = decoder.raw_decode(buffer, position)
+            except ValueError:
+                break  # incomplete object, wait for more data
+            yield obj
+        buffer = buffer[position:]
+    if buffer.strip():
+        raise DockerAPIError(f"Truncated response: {buffer[:200]!r}")
+
+
+class DockerEngineAPI:
+    """Docker Engine API client.
+
+    Args:
+        base_url: `unix:///path/docker.sock` or `tcp://host:port` / `http://host:port`,
+            defaults to DOCKER_HOST or the local socket
+    """
+
+    def __init__(self, base_url: str = None, timeout: float = API_TIMEOUT):
+        self.base_url = base_url or os.environ.get('DOCKER_HOST') or f'unix://{DEFAULT_SOCKET}'
+        self.timeout = timeout
+        url = urlparse(self.base_url)
+        self.scheme = url.scheme
+        if url.scheme == 'unix':
+            self._address = url.path
+        elif url.scheme in ('tcp', 'http'):
+            self._address = (url.hostname or 'localhost', url.port or 2375)
+        else:
+            self._address = None  # npipe://, ssh://, https:// (TLS client certificates)
+
+    @property
+    def supported(self) -> bool:
+        """Whether this client can talk to the configured daemon address."""
+        if self._address is None:
+            return False
+        return self.scheme != 'unix' or hasattr(socket, 'AF_UNIX')
+
+    def _connection(self, timeout: float = None) -> http.client.HTTPConnection:
+        timeout = self.timeout if timeout is None else timeout
+        if self.scheme == 'unix':
+            return _UnixHTTPConnection(self._address, timeout)
+        return http.client.HTTPConnection(*self._address, timeout=timeout)
+
+    def request(self, method: str, path: str, params: Dict[str, str] = None, headers: Dict[str, str] = None,
+                timeout: float = None):
+        """Send a request and return the open response. Raises OSError when the daemon cannot be reached."""
+        if not self.supported:
+            raise OSError(f"Unsupported Docker host {self.base_url}")
+        connection = self._connection(timeout)
+        if params:
+            path = f"{path}?{urlencode({key: value for key, value in params.items() if value is not None})}"
+        connection.request(method, path, headers=headers or {})
+        response = connection.getresponse()
+        if response.status >= 400:
+            body = response.read().decode('utf-8', errors='replace')
+            connection.close()
+            try:
+                message = json.loads(body).get('message', body)
+            except ValueError:
+                message = body
+            raise DockerAPIError(f"{method} {path}: {response.status} {message.strip()}")
+        return response
+
+    def available(self) -> bool:
+        """Whether the daemon answers on the API, takes milliseconds on a local socket."""
+        if not self.supported:
+            return False
+        try:
+            response = self.request('GET', '/_ping', timeout=2)
+            ok = response.read().strip() == b'OK'
+            response.close()
+            return ok
+        except (OSError, http.client.HTTPException, DockerAPIError):
+            return False
+
+    def pull_image(self, image: str, on_event: Optional[Callable[[dict], None]] = None,
+                   platform: str = None, should_stop: Callable[[], bool] = None,
+                   timeout: float = PULL_TIMEOUT) -> str:
+        """Pull an image through `/images/create`, calling `on_event` with every progress object.
+
+        Returns:
+            str: the last status of the pull ("Status: Downloaded newer image for ...")
+        Raises:
+            DockerAPIError: the pull failed (unknown image, registry error, ...)
+            OSError: the daemon could not be reached
+        """
+        repository, tag = split_image(image)
+        response = self.request('POST', '/images/create',
+                                params={'fromImage': repository, 'tag': tag, 'platform': platform},
+                                timeout=timeout)
+        last_status = ''
+        try:
+            for event in iter_json_stream(response):
+                if 'error' in event:
+                    detail = (event.get('errorDetail') or {}).get('message') or event['error']
+                    raise DockerAPIError(detail)
+                if 'id' not in event and event.get('status'):
+                    last_status = event['status']
+                if on_event is not None:
+                    on_event(event)
+                if should_stop is not None and should_stop():
+                    raise DockerAPIError("Pull cancelled")
+        finally:
+            response.close()
+        return last_status
@@ -3,7 +3,8 @@ import json
 import subprocess
 from typing import Dict, List, Optional
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timezone
+from collections import deque
 from PyQt5.QtCore import QThread, pyqtSignal
 import logging
 import platform
@@ -15,7 +16,15 @@ from models.NodeInfo import NodeInfo
 from models.NodeHistory import NodeHistory
 from models.StartupConfig import StartupConfig
 from models.ConfigApp import ConfigApp
-from utils.const import DOCKER_VOLUME_PATH
+from utils.const import BULK_OPERATION_PARALLELISM, DOCKER_VOLUME_PATH
+from utils.state_store import StateStore, get_state_store
+from utils.ssh_mux import get_ssh_multiplexer, multiplexed
+from utils.batch_commands import BATCH_TIMEOUT, BatchError, BatchResult, run_batch
+from utils.docker_api import DockerAPIError, DockerEngineAPI
+from utils.bulk_operations import STOP_TIMEOUT, BulkOperation, DockerBulkOperationThread
+from utils.launch_pipeline import LaunchPipeline, LaunchPipelineThread, LaunchResult
+from utils.name_allocator import LIST_COMMAND, parse_container_names
+from utils.shutdown import ShutdownThread
 
 # Docker configuration
 DOCKER_IMAGE = "ratio1/edge_node:mainnet"
@@ -31,36 +40,39 @@ class ContainerInfo:
 
 class ContainerRegistry:
     """Manages persistence of container and volume information"""
-    def __init__(self, storage_path: str = None):
+    def __init__(self, storage_path: str = None, store: StateStore = None):
+        # JSON file of older versions, migrated to the state store
         self.storage_path = storage_path or os.path.expanduser("~/.edge_node/containers.json")
-        self._ensure_storage_exists()
+        self.store = store or get_state_store()
+        self.store.migrate_registry_json(self.storage_path)
+        self._version = None
         self.containers: Dict[str, ContainerInfo] = self._load_containers()
 
-    def _ensure_storage_exists(self) -> None:
-        """Ensure storage directory and file exist"""
-        os.makedirs(os.path.dirname(self.storage_path), exist_ok=True)
-        if not os.path.exists(self.storage_path):
-            self._save_containers({})
-
     def _load_containers(self) -> Dict[str, ContainerInfo]:
         """Load containers from storage"""
         try:
-            with open(self.storage_path, 'r') as f:
-                data = json.load(f)
-                return {
-                    name: ContainerInfo(**info) 
-                    for name, info in data.items()
-                }
+            self._version = self.store.table_version('registry')
+            return {
+                name: ContainerInfo(**info)
+                for name, info in self.store.load_registry().items()
+            }
         except Exception:
             return {}
 
-    def _save_containers(self, containers: dict) -> None:
-        """Save containers to storage"""
-        with open(self.storage_path, 'w') as f:
-            json.dump(containers, f, indent=2)
+    def _save_container(self, info: ContainerInfo) -> None:
+        """Save a container to storage, on the store writer thread"""
+        self.store.submit_coalesced(('registry', info.container_name), self.store.upsert_registry_entry, dict(vars(info)))
+
+    def reload_if_changed(self) -> None:
+        """Reload the registry if another launcher instance changed it since it was last read"""
+        if self.store.has_pending_writes():
+            return  # local changes are not written yet, the registry in memory is the newest
+        if self.store.table_version('registry') != self._version:
+            self.containers = self._load_containers()
 
     def add_container(self, container_name: str, volume_name: str) -> None:
         """Add a new container to registry"""
+        self.reload_if_changed()
         now = datetime.now().isoformat()
         self.containers[container_name] = ContainerInfo(
             container_name=container_name,
@@ -68,22 +80,18 @@ class ContainerRegistry:
             created_at=now,
             last_used=now
         )
-        self._save_containers({
-            name: vars(info)
-            for name, info in self.containers.items()
-        })
+        self._save_container(self.containers[container_name])
 
     def remove_container(self, container_name: str) -> None:
         """Remove a container from registry"""
+        self.reload_if_changed()
         if container_name in self.containers:
             del self.containers[container_name]
-            self._save_containers({
-                name: vars(info)
-                for name, info in self.containers.items()
-            })
+            self.store.submit_coalesced(('registry', container_name), self.store.delete_registry_entry, container_name)
 
     def get_container_info(self, container_name: str) -> Optional[ContainerInfo]:
         """Get container information"""
+        self.reload_if_changed()
         return self.containers.get(container_name)
 
     def get_volume_name(self, container_name: str) -> Optional[str]:
@@ -93,15 +101,14 @@ class ContainerRegistry:
 
     def update_last_used(self, container_name: str) -> None:
         """Update last used timestamp for container"""
+        self.reload_if_changed()
         if container_name in self.containers:
             self.containers[container_name].last_used = datetime.now().isoformat()
-            self._save_containers({
-                name: vars(info)
-                for name, info in self.containers.items()
-            })
+            self._save_container(self.containers[container_name])
 
     def list_containers(self) -> List[ContainerInfo]:
         """List all registered containers"""
+        self.reload_if_changed()
         return list(self.containers.values())
 
 class DockerCommandThread(QThread):
@@ -312,6 +319,174 @@ class DockerStreamingCommandThread(QThread):
             except Exception as e:
                 logging.error(f"Error terminating process: {e}")
 
+class DockerApiPullThread(QThread):
+    """ Thread pulling an image through the Engine API, with byte-accurate progress events
+
+    `event_received` carries the raw progress objects of `/images/create`. When the
+    daemon cannot be reached on the API, `fallback` is set and nothing was pulled: the
+    caller pulls with the CLI instead.
+    """
+    event_received = pyqtSignal(dict)
+
+    def __init__(self, image: str, api: DockerEngineAPI = None, platform: str = None):
+        super().__init__()
+        self.image = image
+        self.api = api or DockerEngineAPI()
+        self.platform = platform
+        # Store the result to be processed in the main thread
+        self.result_data = None
+        self.error_message = None
+        self.fallback = False
+        self._stopping = False
+
+    def run(self):
+        logging.info(f"Pulling {self.image} through the Engine API at {self.api.base_url}")
+        try:
+            status = self.api.pull_image(self.image, on_event=self.event_received.emit, platform=self.platform,
+                                         should_stop=lambda: self._stopping)
+            logging.info(f"Docker pull completed: {status}")
+            self.result_data = (status, '', 0)
+        except DockerAPIError as e:
+            logging.error(f"Docker pull failed with error: {str(e)}")
+            self.result_data = ('', str(e), 1)
+        except OSError as e:
+            logging.warning(f"Engine API not reachable ({str(e)}), pulling with the docker CLI")
+            self.fallback = True
+        except Exception as e:
+            error_msg = f"Error pulling {self.image}: {str(e)}"
+            logging.error(error_msg)
+            self.error_message = error_msg
+
+    def stop(self):
+        """Abandon the pull after the next progress event."""
+        self._stopping = True
+
+class DockerLogStreamThread(QThread):
+    """ Thread following `docker logs -f` of a container with a bounded line buffer.
+
+    The reader never waits for the UI: lines go into a bounded buffer and, when the UI
+    does not drain it fast enough, the oldest buffered lines are dropped and counted.
+    The consumer calls `drain()` periodically (e.g. from a QTimer) to get rate-limited
+    batches. Lines are requested with --timestamps; the timestamp of the last drained
+    line is kept as `offset` so a new stream can resume with `--since offset` instead of
+    reading the whole log again.
+    """
+    stream_finished = pyqtSignal(int)  # docker logs return code
+    stream_error = pyqtSignal(str)
+
+    def __init__(self, container_name: str, since: str = None, tail: int = None,
+                 remote_ssh_command: list = None, max_buffered_lines: int = 5000):
+        super().__init__()
+        self.container_name = container_name
+        self.since = since
+        self.tail = tail
+        self.remote_ssh_command = remote_ssh_command
+        self.process = None
+        self.offset = since
+        self._offset_key = self._timestamp_key(since) if since else None
+        self._buffer = deque(maxlen=max_buffered_lines)
+        self._lock = threading.Lock()
+        self._dropped = 0
+        self._stopping = False
+
+    def get_command(self) -> list:
+        command = ['docker', 'logs', '--follow', '--timestamps']
+        if self.since:
+            command += ['--since', self.since]
+        elif self.tail is not None:
+            command += ['--tail', str(self.tail)]
+        command.append(self.container_name)
+        if self.remote_ssh_command:
+            command = self.remote_ssh_command + command
+        return command
+
+    def run(self):
+        full_command = self.get_command()
+        logging.info(f"Streaming container logs: {' '.join(full_command)}")
+        try:
+            kwargs = {'creationflags': subprocess.CREATE_NO_WINDOW} if os.name == 'nt' else {}
+            # The container stdout and stderr are both part of its log
+            self.process = subprocess.Popen(
+                full_command,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                errors='replace',
+                bufsize=1,
+                **kwargs
+            )
+            buffer, lock = self._buffer, self._lock
+            for line in iter(self.process.stdout.readline, ''):
+                with lock:
+                    if len(buffer) == buffer.maxlen:
+                        self._dropped += 1
+                    buffer.append(line.rstrip('\n'))
+            return_code = self.process.wait()
+            if not self._stopping:
+                self.stream_finished.emit(return_code)
+        except Exception as e:
+            error_msg = f"Error streaming logs of {self.container_name}: {str(e)}"
+            logging.error(error_msg)
+            self.stream_error.emit(error_msg)
+
+    def drain(self, max_lines: int = 500):
+        """Take up to `max_lines` buffered lines.
+
+        Returns:
+            tuple: (list of (timestamp, text) tuples, number of lines dropped since the last drain)
+            where timestamp is the POSIX time of the line or None when it has no timestamp.
+        """
+        with self._lock:
+            count = min(max_lines, len(self._buffer))
+            raw = [self._buffer.popleft() for _ in range(count)]
+            dropped, self._dropped = self._dropped, 0
+
+        lines = []
+        for line in raw:
+            stamp, _, text = line.partition(' ')
+            key = self._timestamp_key(stamp)
+            if key is None:
+                lines.append((None, line))
+                continue
+            if self._offset_key is not None and key <= self._offset_key:
+                continue  # already shown before the stream was resumed
+            self._offset_key = key
+            self.offset = stamp
+            lines.append((self._timestamp_to_posix(key), text))
+        return lines, dropped
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._buffer)
+
+    @staticmethod
+    def _timestamp_key(stamp: str):
+        """Sortable key of a docker RFC3339Nano UTC timestamp, None when `stamp` is not one."""
+        if len(stamp) < 20 or stamp[4] != '-' or stamp[10] != 'T' or not stamp.endswith('Z'):
+            return None
+        seconds, _, fraction = stamp[:-1].partition('.')
+        # Docker trims trailing zeros of the nanoseconds, pad so keys compare correctly
+        return seconds + '.' + fraction.ljust(9, '0')
+
+    @staticmethod
+    def _timestamp_to_posix(key: str) -> Optional[float]:
+        try:
+            seconds, _, fraction = key.partition('.')
+            moment = datetime.strptime(seconds, '%Y-%m-%dT%H:%M:%S').replace(tzinfo=timezone.utc)
+            return moment.timestamp() + int(fraction) / 1e9
+        except ValueError:
+            return None
+
+    def stop(self):
+        """Stop following the log."""
+        self._stopping = True
+        if self.process and self.process.poll() is None:
+            try:
+                self.process.terminate()
+            except Exception as e:
+                logging.error(f"Error stopping log stream: {e}")
+
 class DockerDirectCommandThread(QThread):
     """ Thread to run a direct Docker command (not a container exec command) """
     command_finished = pyqtSignal(object)
@@ -375,6 +550,72 @@ class DockerDirectCommandThread(QThread):
             traceback.print_exc()
             self.error_message = error_msg
 
+class DockerBatchCommandThread(QThread):
+    """ Thread running several commands in a single round trip, see utils.batch_commands """
+
+    def __init__(self, commands: list, remote_ssh_command: list = None, timeout: float = BATCH_TIMEOUT,
+                 parallel: bool = False):
+        super().__init__()
+        self.commands = commands
+        self.remote_ssh_command = remote_ssh_command
+        self.timeout = timeout
+        self.parallel = parallel
+        # Store the result to be processed in the main thread
+        self.result_data = None
+        self.error_message = None
+
+    def run(self):
+        try:
+            logging.info(f"Executing batch: {', '.join(name for name, _ in self.commands)}")
+            self.result_data = run_batch(self.commands, self.remote_ssh_command, timeout=self.timeout,
+                                         parallel=self.parallel)
+            logging.info(f"Batch completed in {self.result_data.duration * 1000:.0f} ms")
+        except (BatchError, ValueError) as e:
+            self.error_message = str(e)
+        except Exception as e:
+            self.error_message = f"Error executing batch: {str(e)}"
+
+class NodeSnapshotRequest:
+    """Serves the get_node_info / get_node_history requests of a refresh with a single
+    get_node_snapshot batch, so a remote refresh is one SSH round trip.
+
+    `fetch_node_info` and `fetch_node_history` take (callback, error_callback) like the
+    handler methods they stand for and only register the callbacks; `start()` then runs
+    the batch once and hands each registered consumer its part, or its error.
+    """
+
+    def __init__(self, handler: 'DockerCommandHandler', container_name: str = None):
+        self.handler = handler
+        self.container_name = container_name
+        self._consumers = {}  # snapshot key -> (callback, error_callback)
+
+    def fetch_node_info(self, callback, error_callback) -> None:
+        self._consumers['node_info'] = (callback, error_callback)
+
+    def fetch_node_history(self, callback, error_callback) -> None:
+        self._consumers['node_history'] = (callback, error_callback)
+
+    def start(self) -> bool:
+        """Run the batch, unless nothing was requested. Returns whether it was started."""
+        if not self._consumers:
+            return False
+        consumers = dict(self._consumers)
+
+        def on_snapshot(snapshot: dict):
+            for key, (callback, error_callback) in consumers.items():
+                if snapshot[key] is not None:
+                    callback(snapshot[key])
+                else:
+                    error_callback(snapshot['errors'].get(key, f"No {key} returned"))
+
+        def on_error(error: str):
+            for _, error_callback in consumers.values():
+                error_callback(error)
+
+        self.handler.get_node_snapshot(on_snapshot, on_error, self.container_name)
+        return True
+
+
 class DockerCommandHandler:
     """ Handles Docker commands """
     def __init__(self, container_name: str = None):
@@ -442,15 +683,39 @@ class DockerCommandHandler:
         # Image doesn't exist, return False
         return False
 
-    def pull_image(self, callback, error_callback, output_callback=None):
+    def pull_image(self, callback, error_callback, output_callback=None, event_callback=None):
         """Pull the Docker image with progress reporting.
         
+        Local pulls go through the Engine API when the daemon answers on it: with an
+        `event_callback`, it receives the progress objects (exact bytes per layer).
+        Remote pulls, and local ones when the API cannot be used, run `docker pull` and
+        report its output lines to `output_callback`.
+        
         Args:
             callback: Success callback function
             error_callback: Error callback function
             output_callback: Optional callback for streaming output
+            event_callback: Optional callback for Engine API progress objects
         """
         logging.info(f"Starting Docker image pull for {DOCKER_IMAGE}")
+        if event_callback and not self.remote_ssh_command:
+            platform_name = 'linux/amd64' if platform.machine() in ['aarch64', 'arm64'] else None
+            thread = DockerApiPullThread(DOCKER_IMAGE, platform=platform_name)
+            thread.event_received.connect(event_callback)
+            thread.finished.connect(lambda: self._handle_api_pull_finished(thread, callback, error_callback,
+                                                                          output_callback))
+            self.threads.append(thread)  # Keep reference to prevent GC
+            thread.start()
+            return
+        self._pull_image_cli(callback, error_callback, output_callback)
+
+    def _handle_api_pull_finished(self, thread, callback, error_callback, output_callback):
+        if thread.fallback:
+            self._pull_image_cli(callback, error_callback, output_callback)
+            return
+        self._handle_streaming_thread_finished(thread, callback, error_callback)
+
+    def _pull_image_cli(self, callback, error_callback, output_callback=None):
         pull_command = ['docker', 'pull', DOCKER_IMAGE]
         logging.info(f"Executing pull command: {' '.join(pull_command)}")
         
@@ -533,43 +798,27 @@ class DockerCommandHandler:
         Returns:
             tuple: (stdout, stderr, return_code) from the command execution
         """
-        # Ensure image exists - but don't pull it here, we'll handle that separately
-        # with the DockerPullDialog if needed
-        if not self._ensure_image_exists():
-            # Image doesn't exist, but we'll handle this in the caller
-            pass
-        
-        # Check if a container with the same name already exists
-        inspect_command = ['docker', 'container', 'inspect', self.container_name]
-        stdout, stderr, return_code = self.execute_command(inspect_command)
-        
-        if return_code == 0:  # Container exists
-            # Remove the existing container
-            logging.info(f"Container {self.container_name} already exists, removing it")
-            remove_command = ['docker', 'rm', '-f', self.container_name]
-            stdout, stderr, return_code = self.execute_command(remove_command)
-            
-            if return_code != 0:
-                raise Exception(f"Failed to remove existing container: {stderr}")
-        
-        # Launch the container
-        launch_command = self.get_launch_command(volume_name)
-        stdout, stderr, return_code = self.execute_command(launch_command)
-        
-        if return_code != 0:
-            raise Exception(f"Failed to launch container: {stderr}")
-        
-        return stdout, stderr, return_code
-
-    def get_launch_command(self, volume_name: str = None) -> list:
+        pipeline = LaunchPipeline(self.container_name, self.get_launch_command(volume_name), DOCKER_IMAGE,
+                                  self.remote_ssh_command)
+        result = pipeline.launch()
+        if result.error:
+            raise Exception(result.error)
+        if result.return_code != 0:
+            raise Exception(f"Failed to launch container: {result.stderr}")
+        logging.info(f"Launched {self.container_name}: {pipeline.timings.summary()}")
+        return result.as_tuple()
+
+    def get_launch_command(self, volume_name: str = None, container_name: str = None) -> list:
         """Get the Docker command that will be used to launch the container.
         
         Args:
             volume_name: Optional volume name to mount
+            container_name: Container to launch. If None, uses self.container_name
             
         Returns:
             list: The Docker command as a list of strings
         """
+        name = container_name or self.container_name
         # Base command with container name
         command = [
             'docker', 'run'
@@ -578,7 +827,7 @@ class DockerCommandHandler:
             command += ['--platform', 'linux/amd64']
         command += [
             '-d',  # Run in detached mode
-            '--name', self.container_name,  # Set container name
+            '--name', name,  # Set container name
             '--restart', 'unless-stopped',  # Restart policy
         ]
         
@@ -587,7 +836,7 @@ class DockerCommandHandler:
             command.extend(['-v', f'{volume_name}:{DOCKER_VOLUME_PATH}'])
             logging.info(f"Using volume mount: {volume_name}:{DOCKER_VOLUME_PATH}")
         else:
-            logging.warning(f"No volume specified for container {self.container_name}")
+            logging.warning(f"No volume specified for container {name}")
         
         # Add the image name from DOCKER_IMAGE constant
         command.append(DOCKER_IMAGE)
@@ -595,13 +844,30 @@ class DockerCommandHandler:
         return command
 
     def set_remote_connection(self, ssh_command: str):
-        """Set up remote connection using SSH command."""
-        self.remote_ssh_command = ssh_command.split() if ssh_command else None
+        """Set up remote connection using SSH command.
+
+        Commands to the host share a persistent SSH master connection, which is started
+        right away so the first refresh does not pay for the handshake.
+        """
+        self.remote_ssh_command = multiplexed(ssh_command.split()) if ssh_command else None
+        if self.remote_ssh_command:
+            get_ssh_multiplexer().ensure_async(self.remote_ssh_command)
 
     def clear_remote_connection(self):
         """Clear remote connection settings."""
         self.remote_ssh_command = None
 
+    def stream_container_logs(self, container_name: str = None, since: str = None, tail: int = None) -> DockerLogStreamThread:
+        """Create (not started) a thread following the logs of a container.
+
+        Args:
+            container_name: Container to follow, defaults to the current container
+            since: Resume after this docker log timestamp (the `offset` of a previous stream)
+            tail: Number of existing lines to start with when not resuming
+        """
+        return DockerLogStreamThread(container_name or self.container_name, since=since, tail=tail,
+                                     remote_ssh_command=self.remote_ssh_command)
+
     def _execute_threaded(self, command: str, callback, error_callback, input_data: str = None) -> None:
         thread = DockerCommandThread(self.container_name, command, input_data, self.remote_ssh_command)
         
@@ -808,6 +1074,10 @@ class DockerCommandHandler:
         if return_code != 0:
             raise Exception(f"Failed to list containers: {stderr}")
             
+        return self._parse_container_list(stdout)
+
+    @staticmethod
+    def _parse_container_list(stdout: str) -> list:
         containers = []
         for line in stdout.splitlines():
             if line.strip():
@@ -820,6 +1090,87 @@ class DockerCommandHandler:
                 })
         return containers
 
+    def run_batch(self, commands: list, timeout: float = BATCH_TIMEOUT, parallel: bool = False) -> BatchResult:
+        """Run several commands on the current host (remote or local) in one round trip.
+        
+        Args:
+            commands: List of (name, argv) pairs
+            timeout: Timeout of the whole batch in seconds
+            parallel: Run the commands concurrently on the host
+            
+        Returns:
+            BatchResult: Exit code, output and timing of every command
+        """
+        return run_batch(commands, self.remote_ssh_command, timeout=timeout, parallel=parallel)
+
+    def run_batch_threaded(self, commands: list, callback, error_callback, timeout: float = BATCH_TIMEOUT,
+                           parallel: bool = False) -> None:
+        """Run a batch in a thread, callback receives the BatchResult."""
+        thread = DockerBatchCommandThread(commands, self.remote_ssh_command, timeout=timeout, parallel=parallel)
+        thread.finished.connect(lambda: self._handle_thread_finished(thread, callback, error_callback))
+        self.threads.append(thread)  # Keep reference to prevent GC
+        thread.start()
+
+    def get_refresh_commands(self, container_name: str = None) -> list:
+        """Commands of a node refresh, as (name, argv) pairs for run_batch."""
+        name = container_name or self.container_name
+        return [
+            ('node_info', ['docker', 'exec', name, 'get_node_info']),
+            ('node_history', ['docker', 'exec', name, 'get_node_history']),
+        ]
+
+    def get_node_snapshot(self, callback, error_callback, container_name: str = None) -> None:
+        """Get the node info and metrics history in a single round trip.
+        
+        Args:
+            callback: Success callback receiving a dict with the keys 'node_info' (NodeInfo),
+                'node_history' (NodeHistory), 'errors' ({command name: message}) and 'batch'
+                (BatchResult). Values of failed commands are None, their error is in 'errors'.
+            error_callback: Error callback, for a failure of the batch itself
+            container_name: Container to refresh, defaults to the current container
+        """
+        parsers = {
+            'node_info': lambda result: NodeInfo.from_dict(result.json()),
+            'node_history': lambda result: NodeHistory.from_dict(result.json()),
+        }
+
+        def process_batch(batch: BatchResult):
+            snapshot = {'errors': {}, 'batch': batch}
+            for name, parse in parsers.items():
+                result = batch[name]
+                snapshot[name] = None
+                if not result.ok:
+                    snapshot['errors'][name] = result.stderr.strip() or f"exit code {result.exit_code}"
+                    continue
+                try:
+                    snapshot[name] = parse(result)
+                except Exception as e:
+                    snapshot['errors'][name] = f"Failed to process {name}: {str(e)}"
+            callback(snapshot)
+
+        self.run_batch_threaded(self.get_refresh_commands(container_name), process_batch, error_callback,
+                                parallel=True)
+
+    def node_snapshot_request(self, container_name: str = None) -> NodeSnapshotRequest:
+        """A NodeSnapshotRequest on this handler, see get_node_snapshot."""
+        return NodeSnapshotRequest(self, container_name)
+
+    def list_container_names_threaded(self, callback, error_callback) -> None:
+        """Names of every container of the host, running or not, listed in a background thread.
+
+        Args:
+            callback: Called with the list of names
+            error_callback: Called with an error message when docker could not list them
+        """
+        def on_listed(result):
+            stdout, stderr, return_code = result
+            if return_code != 0:
+                error_callback(stderr.strip() or f"docker ps exit code {return_code}")
+                return
+            callback(parse_container_names(stdout))
+
+        self._execute_direct_threaded(['docker'] + LIST_COMMAND, on_listed, error_callback)
+
     def stop_container(self, container_name: str = None) -> None:
         """Stop a container.
         
@@ -922,89 +1273,108 @@ class DockerCommandHandler:
         if thread in self.threads:
             self.threads.remove(thread)
 
-    def launch_container_threaded(self, volume_name: str = None, callback=None, error_callback=None) -> None:
+    def launch_container_threaded(self, volume_name: str = None, callback=None, error_callback=None,
+                                  on_phase=None, on_image_missing=None, on_heartbeat=None) -> LaunchPipelineThread:
         """Launch the Docker container in a separate thread.
         
+        The container is replaced in as few docker calls as possible (utils.launch_pipeline),
+        each phase is timed.
+        
         Args:
             volume_name: Optional volume name to mount
-            callback: Function to call on success with result tuple (stdout, stderr, return_code)
+            callback: Function to call with result tuple (stdout, stderr, return_code) of the
+                create or start command
             error_callback: Function to call on error with error message
+            on_phase: Called with the LaunchTimings whenever a phase starts or ends
+            on_image_missing: Called instead of launching when the image is not there yet.
+                If None, `docker create` pulls it
+            on_heartbeat: If set, the node's first heartbeat is awaited after the start and
+                this is called with the final LaunchTimings
+            
+        Returns:
+            LaunchPipelineThread: the running launch, None if it could not start
         """
         try:
             # Make sure we have a valid container name
             if not self.container_name:
                 if error_callback:
                     error_callback("No container name specified")
-                return
+                return None
                 
             logging.info(f"Launching container: {self.container_name} with volume: {volume_name}")
-            
-            # First check if the container already exists
-            inspect_command = ['docker', 'container', 'inspect', self.container_name]
-            self._execute_direct_threaded(
-                inspect_command,
-                lambda result: self._handle_container_inspect_result_remove(result, volume_name, callback, error_callback),
-                error_callback
-            )
+            pipeline = LaunchPipeline(self.container_name, self.get_launch_command(volume_name), DOCKER_IMAGE,
+                                      self.remote_ssh_command, stop_if_image_missing=on_image_missing is not None)
+            thread = LaunchPipelineThread(pipeline, wait_for_heartbeat=on_heartbeat is not None)
+            if on_phase:
+                thread.phase_changed.connect(on_phase)
+            if on_heartbeat:
+                thread.heartbeat_finished.connect(on_heartbeat)
+            thread.launch_finished.connect(
+                lambda result: self._handle_launch_finished(result, callback, error_callback, on_image_missing))
+            thread.finished.connect(lambda: self.threads.remove(thread) if thread in self.threads else None)
+            self.threads.append(thread)  # Keep reference to prevent GC
+            thread.start()
+            return thread
         except Exception as e:
             logging.error(f"Error in launch_container_threaded: {str(e)}")
             if error_callback:
                 error_callback(f"Error launching container: {str(e)}")
-                
-    def _handle_container_inspect_result_remove(self, result, volume_name, callback, error_callback):
-        """Handle the result of container inspection during launch.
-        
-        If container exists, remove it and then create a new one.
-        
-        Args:
-            result: Tuple of (stdout, stderr, return_code) from inspect command
-            volume_name: Volume name to mount
-            callback: Success callback
-            error_callback: Error callback
-        """
-        stdout, stderr, return_code = result
-        
-        if return_code == 0:  # Container exists
-            # Container exists, remove it
-            logging.info(f"Container {self.container_name} already exists, removing it")
-            remove_command = ['docker', 'rm', '-f', self.container_name]
-            self._execute_direct_threaded(
-                remove_command,
-                lambda remove_result: self._handle_container_remove_result(remove_result, volume_name, callback, error_callback),
-                error_callback
-            )
-        else:  # Container doesn't exist, create it
-            # Launch the container
-            launch_command = self.get_launch_command(volume_name)
-            self._execute_direct_threaded(launch_command, callback, error_callback)
-    
-    def _handle_container_remove_result(self, result, volume_name, callback, error_callback):
-        """Handle the result of container removal during launch.
+            return None
+
+    def _handle_launch_finished(self, result: LaunchResult, callback, error_callback, on_image_missing):
+        # This method runs in the main thread
+        if result.image_missing and on_image_missing:
+            on_image_missing()
+        elif result.error:
+            if error_callback:
+                error_callback(result.error)
+        elif callback:
+            callback(result.as_tuple())
+
+    def run_bulk_operation(self, action: str, containers: list, on_update=None, callback=None,
+                           parallelism: int = BULK_OPERATION_PARALLELISM,
+                           stop_timeout: int = STOP_TIMEOUT) -> DockerBulkOperationThread:
+        """Start, stop or restart several containers of the current host concurrently.
         
         Args:
-            result: Tuple of (stdout, stderr, return_code) from remove command
-            volume_name: Volume name to mount
-            callback: Success callback
-            error_callback: Error callback
-        """
-        stdout, stderr, return_code = result
-        
-        if return_code != 0:
-            if error_callback:
-                error_callback(f"Failed to remove existing container: {stderr}")
-            return
+            action: 'start', 'stop' or 'restart'
+            containers: List of (container name, volume name) pairs
+            on_update: Called with each ContainerOperationResult as its phase changes
+            callback: Called with the list of ContainerOperationResult once all are done
+            parallelism: Maximum number of containers handled at the same time
+            stop_timeout: Seconds each node gets to exit before it is killed
             
-        # Container was removed successfully, now launch a new one
-        launch_command = self.get_launch_command(volume_name)
-        self._execute_direct_threaded(launch_command, callback, error_callback)
+        Returns:
+            DockerBulkOperationThread: the running operation, `cancel()` stops it
+        """
+        operation = BulkOperation(action, containers,
+                                  lambda name, volume: self.get_launch_command(volume, name),
+                                  self.remote_ssh_command, parallelism, stop_timeout)
+        thread = DockerBulkOperationThread(operation)
+        if on_update:
+            thread.container_updated.connect(on_update)
+
+        def on_finished(results):
+            if thread in self.threads:
+                self.threads.remove(thread)
+            if callback:
+                callback(results)
+
+        thread.operation_finished.connect(on_finished)
+        logging.info(f"Bulk {action} of {len(containers)} containers, {parallelism} at a time")
+        self.threads.append(thread)  # Keep reference to prevent GC
+        thread.start()
+        return thread
 
-    def stop_container_threaded(self, container_name: str, callback, error_callback) -> None:
+    def stop_container_threaded(self, container_name: str, callback, error_callback, grace_period: int = None) -> None:
         """Stop a container in a background thread.
         
         Args:
             container_name: Name of container to stop
             callback: Success callback that receives (stdout, stderr, return_code)
             error_callback: Error callback that receives error message
+            grace_period: Seconds the node has to exit before it is killed. If None, uses
+                SHUTDOWN_GRACE_PERIOD
         """
         try:
             # Make sure we have a valid container name
@@ -1014,8 +1384,43 @@ class DockerCommandHandler:
                 
             name = container_name or self.container_name
             logging.info(f"Stopping container: {name}")
-            command = ['docker', 'stop', name]
-            self._execute_direct_threaded(command, callback, error_callback)
+
+            def on_finished(states):
+                state = states[name]
+                if state.phase == 'failed':
+                    callback(('', state.error, 1))
+                else:
+                    callback((f"{name}\n", '', 0))
+
+            self.stop_containers_threaded({name: grace_period}, on_finished)
         except Exception as e:
             logging.error(f"Error in stop_container_threaded: {str(e)}")
             error_callback(f"Error stopping container: {str(e)}")
+
+    def stop_containers_threaded(self, grace_periods: dict, callback=None, on_update=None,
+                                 remove: bool = False) -> ShutdownThread:
+        """Stop several containers of the current host concurrently, each with its own grace period.
+        
+        Args:
+            grace_periods: {container name: seconds it has to exit, None for SHUTDOWN_GRACE_PERIOD}
+            callback: Called with {name: ContainerShutdown} once every container has exited
+            on_update: Called with each ContainerShutdown as its phase changes
+            remove: Also remove the containers once stopped
+            
+        Returns:
+            ShutdownThread: the running shutdown
+        """
+        thread = ShutdownThread(grace_periods, (self.remote_ssh_command or []) + ['docker'], remove)
+        if on_update:
+            thread.container_updated.connect(on_update)
+
+        def on_finished(states):
+            if thread in self.threads:
+                self.threads.remove(thread)
+            if callback:
+                callback(states)
+
+        thread.shutdown_finished.connect(on_finished)
+        self.threads.append(thread)  # Keep reference to prevent GC
+        thread.start()
+        return thread
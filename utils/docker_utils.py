@@ -37,9 +37,8 @@ def generate_container_name(prefix="r1node"):
     First container is named just "r1node" (if available),
     subsequent containers are "r1node1", "r1node2", etc.
     
-    This function checks both Docker containers and the config file
-    for the highest index, then increments from there. It also validates
-    that the generated name doesn't exist in Docker but not in the config.
+    The names in use are those of the local Docker containers and of the config,
+    the next name comes after the highest index among them (utils.name_allocator).
     
     Args:
         prefix: Prefix for the container name
@@ -47,101 +46,15 @@ def generate_container_name(prefix="r1node"):
     Returns:
         str: Sequential container name
     """
-    import subprocess
-    import os
-    import json
-    from pathlib import Path
+    from utils.name_allocator import NameAllocator
+    from utils.state_store import get_state_store
 
-    # Config file path
-    config_dir = os.path.join(str(Path.home()), ".ratio1", "edge_node_launcher")
-    containers_file = os.path.join(config_dir, "containers.json")
-    
-    # Find highest index in Docker containers
-    docker_highest_index = -1  # Start from -1 so first container can be r1node (without number)
-    try:
-        result = subprocess.run(
-            ['docker', 'ps', '-a', '--format', '{{.Names}}', '--filter', f'name={prefix}'],
-            capture_output=True, text=True
-        )
-        
-        existing_containers = result.stdout.strip().split('\n')
-        existing_containers = [c for c in existing_containers if c]  # Remove empty strings
-        
-        for container in existing_containers:
-            if container.startswith(prefix):
-                try:
-                    # Extract the number after the prefix
-                    index_str = container[len(prefix):]
-                    if not index_str:  # This is "r1node" with no number
-                        docker_highest_index = max(docker_highest_index, 0)
-                    elif index_str.isdigit():
-                        index = int(index_str)
-                        docker_highest_index = max(docker_highest_index, index)
-                except (ValueError, IndexError):
-                    continue
-    except Exception:
-        docker_highest_index = -1
-    
-    # Find highest index in config file
-    config_highest_index = -1
+    # Containers saved in the launcher config
     try:
-        if os.path.exists(containers_file):
-            with open(containers_file, 'r') as f:
-                data = json.load(f)
-                for container_data in data:
-                    container_name = container_data.get('name', '')
-                    if container_name.startswith(prefix):
-                        try:
-                            # Extract the number after the prefix
-                            index_str = container_name[len(prefix):]
-                            if not index_str:  # This is "r1node" with no number
-                                config_highest_index = max(config_highest_index, 0)
-                            elif index_str.isdigit():
-                                index = int(index_str)
-                                config_highest_index = max(config_highest_index, index)
-                        except (ValueError, IndexError):
-                            continue
+        containers = get_state_store().load_containers()
     except Exception:
-        config_highest_index = -1
-    
-    # Use the highest index from both sources
-    highest_index = max(docker_highest_index, config_highest_index)
-    
-    # Generate the next name
-    while True:
-        next_index = highest_index + 1
-        
-        # Format the name
-        if next_index == 0:  # First container is just "r1node"
-            next_name = prefix
-        else:
-            next_name = f"{prefix}{next_index}"
-        
-        # Check if this name exists in Docker but not in config
-        exists_in_docker = False
-        try:
-            result = subprocess.run(
-                ['docker', 'ps', '-a', '--format', '{{.Names}}', '--filter', f'name={next_name}'],
-                capture_output=True, text=True
-            )
-            docker_containers = [c.strip() for c in result.stdout.split('\n') if c.strip()]
-            exists_in_docker = next_name in docker_containers
-        except Exception:
-            exists_in_docker = False
-        
-        exists_in_config = False
-        try:
-            if os.path.exists(containers_file):
-                with open(containers_file, 'r') as f:
-                    data = json.load(f)
-                    exists_in_config = any(container_data.get('name') == next_name for container_data in data)
-        except Exception:
-            exists_in_config = False
-        
-        # If the name exists in Docker but not in config, we need to try the next index
-        if exists_in_docker and not exists_in_config:
-            highest_index = next_index
-            continue
-        
-        # Otherwise return the name
-        return next_name 
\ No newline at end of file
+        containers = []
+
+    allocator = NameAllocator.from_host([container['name'] for container in containers],
+                                        [container.get('volume') for container in containers], prefix=prefix)
+    return allocator.allocate()[0]
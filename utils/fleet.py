@@ -0,0 +1,192 @@
+"""State of every edge node of the fleet, collected concurrently.
+
+Each host is handled by one task of a bounded pool, so a large inventory does not start
+a thread per host and a slow host only holds one worker. A host costs two round trips
+(utils.batch_commands): one listing its r1node* containers, one fetching the node info
+and history of all its running containers at once. Each host has its own deadline,
+results are reported as soon as a container is parsed.
+"""
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from models.NodeHistory import NodeHistory
+from models.NodeInfo import NodeInfo
+from utils.batch_commands import BatchError, run_batch
+from utils.ssh_mux import CONNECT_TIMEOUT, get_ssh_multiplexer, multiplexed
+
+MAX_FLEET_WORKERS = 8
+HOST_TIMEOUT = 30  # seconds, for all the commands of a host
+CONTAINER_PREFIX = 'r1node'
+LOCAL_HOST = 'local'
+
+_LIST_COMMAND = ['docker', 'ps', '-a', '--format', '{{.Names}}\t{{.Status}}\t{{.State}}', '-f',
+                 f'name={CONTAINER_PREFIX}']
+
+
+@dataclass(slots=True)
+class FleetNodeStatus:
+    host: str
+    container: str
+    running: bool = False
+    status: str = ''
+    address: str = ''
+    alias: str = ''
+    version: str = ''
+    uptime: str = ''
+    epoch_avail: Optional[float] = None
+    cpu_load: Optional[float] = None  # last sample, percent
+    memory_used: Optional[float] = None  # last sample, GB
+    memory_total: Optional[float] = None  # last sample, GB
+    error: str = ''
+    updated_at: float = 0.0
+
+    @property
+    def key(self) -> tuple:
+        return self.host, self.container
+
+
+def last_value(series) -> Optional[float]:
+    if not series:
+        return None
+    value = series[-1]
+    return None if value != value else value  # NaN: missing sample
+
+
+def parse_node_status(status: FleetNodeStatus, info_result, history_result) -> FleetNodeStatus:
+    """Fill a status with the results of `get_node_info` and `get_node_history`."""
+    errors = []
+    if info_result.ok:
+        try:
+            info = NodeInfo.from_dict(info_result.json())
+            status.address, status.alias, status.version = info.address, info.alias, info.version_short
+        except Exception as e:
+            errors.append(f"node info: {str(e)}")
+    else:
+        errors.append(f"node info: {info_result.stderr.strip() or info_result.exit_code}")
+    if history_result.ok:
+        try:
+            history = NodeHistory.from_dict(history_result.json())
+            status.uptime = history.uptime
+            status.epoch_avail = history.current_epoch_avail
+            status.cpu_load = last_value(history.cpu_load)
+            status.memory_used = last_value(history.occupied_memory)
+            status.memory_total = last_value(history.total_memory)
+            if not status.version:
+                status.version = history.version
+        except Exception as e:
+            errors.append(f"history: {str(e)}")
+    else:
+        errors.append(f"history: {history_result.stderr.strip() or history_result.exit_code}")
+    status.error = '; '.join(errors)
+    return status
+
+
+class FleetCollector:
+    """Collects the FleetNodeStatus of every container of a set of hosts.
+
+    Args:
+        on_node: called with each FleetNodeStatus as soon as it is known, from a pool thread
+        on_host_done: called once per host with (host, names of its containers, error
+            message or ''), from a pool thread, after the on_node calls of the host
+    """
+
+    def __init__(self, on_node: Callable[[FleetNodeStatus], None],
+                 on_host_done: Optional[Callable[[str, List[str], str], None]] = None,
+                 max_workers: int = MAX_FLEET_WORKERS, host_timeout: float = HOST_TIMEOUT):
+        self.on_node = on_node
+        self.on_host_done = on_host_done
+        self.host_timeout = host_timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="Fleet")
+        self._in_flight = set()
+        self._lock = threading.Lock()
+
+    def collect(self, targets: Dict[str, Optional[List[str]]]) -> List[str]:
+        """Refresh hosts, given as {host: ssh command, None for the local docker}.
+
+        Hosts still being refreshed are skipped. Returns the hosts submitted.
+        """
+        submitted = []
+        for host, ssh_command in targets.items():
+            with self._lock:
+                if host in self._in_flight:
+                    continue
+                self._in_flight.add(host)
+            try:
+                self._executor.submit(self._collect_host, host, ssh_command)
+            except RuntimeError:  # shut down
+                with self._lock:
+                    self._in_flight.discard(host)
+                break
+            submitted.append(host)
+        return submitted
+
+    def is_collecting(self) -> bool:
+        with self._lock:
+            return bool(self._in_flight)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _collect_host(self, host: str, ssh_command: Optional[List[str]]) -> None:
+        deadline = time.monotonic() + self.host_timeout
+        names, error = [], ''
+        try:
+            if ssh_command:
+                # Commands never start a master, a host without one is reached directly
+                get_ssh_multiplexer().ensure(ssh_command, timeout=min(CONNECT_TIMEOUT, self.host_timeout))
+            listing = run_batch([('containers', _LIST_COMMAND)], ssh_command,
+                                timeout=max(1.0, deadline - time.monotonic()))['containers']
+            if not listing.ok:
+                raise BatchError(listing.stderr.strip() or f"docker ps exit code {listing.exit_code}")
+            statuses = []
+            for line in listing.stdout.splitlines():
+                parts = line.split('\t')
+                if len(parts) != 3 or not parts[0].startswith(CONTAINER_PREFIX):
+                    continue
+                name, status_text, state = parts
+                names.append(name)
+                statuses.append(FleetNodeStatus(
+                    host=host, container=name, running=state == 'running', status=status_text,
+                    updated_at=time.time(),
+                ))
+            running = [status for status in statuses if status.running]
+            # Stopped containers are known already
+            for status in statuses:
+                if not status.running:
+                    self.on_node(status)
+            if running:
+                commands = []
+                for status in running:
+                    commands.append((f'info:{status.container}', ['docker', 'exec', status.container, 'get_node_info']))
+                    commands.append((f'history:{status.container}', ['docker', 'exec', status.container, 'get_node_history']))
+                remaining = max(1.0, deadline - time.monotonic())
+                batch = run_batch(commands, ssh_command, timeout=remaining, parallel=True)
+                for status in running:
+                    parse_node_status(status, batch[f'info:{status.container}'], batch[f'history:{status.container}'])
+                    status.updated_at = time.time()
+                    self.on_node(status)
+        except (BatchError, ValueError) as e:
+            error = str(e)
+        except Exception as e:
+            error = f"Error collecting {host}: {str(e)}"
+        finally:
+            with self._lock:
+                self._in_flight.discard(host)
+        if self.on_host_done is not None:
+            self.on_host_done(host, names, error)
+
+
+def inventory_targets(inventory=None) -> Dict[str, Optional[List[str]]]:
+    """{host: multiplexed ssh command} of the Ansible inventory, the local docker when it is empty."""
+    if inventory is None:
+        from utils.ansible_inventory import get_ansible_inventory
+        inventory = get_ansible_inventory()
+    targets = {}
+    for host in inventory.host_names():
+        ssh_command = inventory.ssh_command(host)
+        if ssh_command:
+            targets[host] = multiplexed(ssh_command)
+    return targets or {LOCAL_HOST: None}
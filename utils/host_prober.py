@@ -0,0 +1,167 @@
+"""Concurrent health probing of the fleet of remote hosts.
+
+Every host is probed on a bounded thread pool, so a fleet of unreachable hosts cannot
+pile up threads and one slow host does not delay the others. Results are cached:
+
+- a host that answered is probed again once its result is older than `ttl`;
+- a host that keeps failing waits `ttl * 2 ** (failures - 1)` seconds between probes,
+  capped at `max_backoff`, so dead hosts do not eat the pool;
+- a host is never probed twice at the same time.
+"""
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from utils.ssh_mux import get_ssh_multiplexer, without_master
+
+MAX_PROBE_WORKERS = 8
+PROBE_TTL = 30  # seconds
+PROBE_MAX_BACKOFF = 300  # seconds
+PROBE_TIMEOUT = 8  # seconds
+
+# Options of the probe connection, unless the host command already sets them. Host keys
+# are verified like for any other command of the launcher.
+PROBE_SSH_OPTIONS = (
+    ('ConnectTimeout', '5'),
+    ('BatchMode', 'yes'),
+    ('ServerAliveInterval', '2'),
+)
+
+
+@dataclass(slots=True)
+class HostProbeResult:
+    host: str
+    online: bool
+    checked_at: float
+    latency: float  # seconds
+    failures: int = 0  # consecutive failed probes
+    error: str = ''
+
+
+def probe_ssh(ssh_command: List[str], timeout: float = PROBE_TIMEOUT) -> Tuple[bool, str]:
+    """Check that a host answers over SSH.
+
+    A live shared master connection answers locally; otherwise a connection of its own is
+    made, which never becomes the shared master of the later commands.
+
+    Returns:
+        tuple: (online, error message)
+    """
+    if get_ssh_multiplexer().check(ssh_command):
+        return True, ''
+    existing = {
+        ssh_command[i + 1].split('=', 1)[0].lower()
+        for i in range(len(ssh_command) - 1) if ssh_command[i] == '-o'
+    }
+    options = []
+    for key, value in PROBE_SSH_OPTIONS:
+        if key.lower() not in existing:
+            options.extend(['-o', f'{key}={value}'])
+    # Options go before the destination (the last item)
+    command = without_master(ssh_command[:-1] + options + [ssh_command[-1]]) + ['echo', 'Connection successful']
+    try:
+        result = subprocess.run(command, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return False, f"timed out after {timeout} seconds"
+    except OSError as e:
+        return False, str(e)
+    if result.returncode == 0 and 'Connection successful' in result.stdout:
+        return True, ''
+    return False, result.stderr.strip() or f"exit code {result.returncode}"
+
+
+class HostHealthProber:
+    """Probes hosts concurrently and caches the results.
+
+    Args:
+        probe: `probe(host) -> (online, error)`, run on the pool threads
+        on_result: called with each HostProbeResult, from a pool thread
+    """
+
+    def __init__(self, probe: Callable[[str], Tuple[bool, str]],
+                 on_result: Optional[Callable[[HostProbeResult], None]] = None,
+                 max_workers: int = MAX_PROBE_WORKERS, ttl: float = PROBE_TTL,
+                 max_backoff: float = PROBE_MAX_BACKOFF):
+        self.probe_host = probe
+        self.on_result = on_result
+        self.ttl = ttl
+        self.max_backoff = max_backoff
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="HostProbe")
+        self._results: Dict[str, HostProbeResult] = {}
+        self._in_flight = set()
+        self._lock = threading.Lock()
+
+    def get(self, host: str) -> Optional[HostProbeResult]:
+        """Last result of a host, None if it was never probed."""
+        with self._lock:
+            return self._results.get(host)
+
+    def next_probe_at(self, host: str) -> float:
+        """Time (time.time()) after which the cached result of a host is stale."""
+        with self._lock:
+            result = self._results.get(host)
+        if result is None:
+            return 0.0
+        if result.online:
+            return result.checked_at + self.ttl
+        return result.checked_at + min(self.max_backoff, self.ttl * 2 ** (result.failures - 1))
+
+    def is_probing(self, host: str) -> bool:
+        with self._lock:
+            return host in self._in_flight
+
+    def probe(self, hosts: Iterable[str], force: bool = False) -> List[str]:
+        """Probe the hosts whose result is stale (all of them with `force`).
+
+        Hosts already being probed are skipped. Returns the hosts submitted.
+        """
+        now = time.time()
+        submitted = []
+        for host in hosts:
+            if not force and self.next_probe_at(host) > now:
+                continue
+            with self._lock:
+                if host in self._in_flight:
+                    continue
+                self._in_flight.add(host)
+            try:
+                self._executor.submit(self._run, host)
+            except RuntimeError:  # shut down
+                with self._lock:
+                    self._in_flight.discard(host)
+                break
+            submitted.append(host)
+        return submitted
+
+    def forget(self, hosts: Iterable[str] = None) -> None:
+        """Drop the cached results of some hosts (all without argument)."""
+        with self._lock:
+            if hosts is None:
+                self._results.clear()
+            else:
+                for host in hosts:
+                    self._results.pop(host, None)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, host: str) -> None:
+        start = time.time()
+        try:
+            online, error = self.probe_host(host)
+        except Exception as e:
+            online, error = False, str(e)
+        end = time.time()
+        with self._lock:
+            previous = self._results.get(host)
+            failures = 0 if online else (previous.failures if previous and not previous.online else 0) + 1
+            result = HostProbeResult(
+                host=host, online=online, checked_at=end, latency=end - start, failures=failures, error=error
+            )
+            self._results[host] = result
+            self._in_flight.discard(host)
+        if self.on_result is not None:
+            self.on_result(result)
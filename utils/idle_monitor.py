@@ -0,0 +1,38 @@
+"""Detection of user inactivity, for work that should only run while nobody waits on the launcher."""
+import time
+
+from PyQt5.QtCore import QEvent, QObject, pyqtSignal
+from PyQt5.QtWidgets import QApplication
+
+_INPUT_EVENTS = frozenset((
+    QEvent.KeyPress, QEvent.MouseButtonPress, QEvent.MouseMove, QEvent.Wheel, QEvent.TouchBegin,
+))
+
+
+class IdleMonitor(QObject):
+    """Watches the input events of the whole application.
+
+    `activity` is emitted on the first input after a second without any, not on every
+    mouse move.
+    """
+
+    activity = pyqtSignal()
+
+    def __init__(self, app: QApplication = None):
+        super().__init__()
+        self._last_input = time.monotonic()
+        (app or QApplication.instance()).installEventFilter(self)
+
+    def idle_for(self) -> float:
+        """Seconds since the last keyboard, mouse or touch input."""
+        return time.monotonic() - self._last_input
+
+    def eventFilter(self, obj, event):
+        if event.type() in _INPUT_EVENTS:
+            now = time.monotonic()
+            if now - self._last_input >= 1:
+                self._last_input = now
+                self.activity.emit()
+            else:
+                self._last_input = now
+        return False
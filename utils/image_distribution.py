@@ -0,0 +1,197 @@
+"""Distribution of the node image to many hosts from a single download.
+
+Racks behind a thin uplink should not pull the same image once per host. The launcher
+downloads the layers once instead (utils.image_prefetch: same bandwidth cap, resumable
+layers verified against their digest) and streams them over ssh to `docker load` on
+every host in parallel. A host only receives the layers it does not have yet.
+
+Layers are sent as the registry serves them (gzip), recompressing them on the way
+would not make them smaller.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from utils.const import CONFIG_DIR, DOCKER_IMAGE, DOCKER_TAG
+from utils.image_prefetch import (
+    REGISTRY_URL, ImagePrefetcher, PrefetchError, PrefetchInterrupted,
+    inspect_image, is_current, load_image, shared_layers,
+)
+from utils.pull_progress import Throttle
+
+MAX_DISTRIBUTION_WORKERS = 4  # hosts receiving the image at the same time
+PROGRESS_UPDATES_PER_SECOND = 4  # per host
+
+
+@dataclass
+class HostDistribution:
+    host: str
+    phase: str = 'checking'  # checking, waiting, sending, loaded, up_to_date, failed or cancelled
+    sent: int = 0  # layer bytes sent to the host
+    total: int = 0  # layer bytes the host needs
+    error: str = ''
+
+    @property
+    def done(self) -> bool:
+        return self.phase in ('loaded', 'up_to_date', 'failed', 'cancelled')
+
+
+def _docker_command(ssh_command: Optional[List[str]]) -> List[str]:
+    return (ssh_command or []) + ['docker']
+
+
+class ImageDistributor:
+    """Downloads an image once and loads it into the daemon of every target host.
+
+    Args:
+        on_host: called with a copy of a host's HostDistribution whenever it changes,
+            from a worker thread
+        on_download: called with (downloaded, total) bytes of the registry download
+        bandwidth_limit: bytes per second for the registry download, 0 for unlimited.
+            Transfers to the hosts are not capped, they stay on the local network
+    """
+
+    def __init__(self, image: str = f'{DOCKER_IMAGE}:{DOCKER_TAG}',
+                 on_host: Callable[[HostDistribution], None] = None,
+                 on_download: Callable[[int, int], None] = None,
+                 bandwidth_limit: float = 0, cache_dir: str = None, registry_url: str = REGISTRY_URL,
+                 max_workers: int = MAX_DISTRIBUTION_WORKERS):
+        self.image = image
+        self.on_host = on_host
+        self.on_download = on_download
+        self.max_workers = max_workers
+        # Kept after a distribution: hosts added later only cost the transfer
+        cache_dir = cache_dir or str(Path.home() / CONFIG_DIR / 'image_distribution')
+        self.prefetcher = ImagePrefetcher(image, cache_dir=cache_dir, bandwidth_limit=bandwidth_limit,
+                                          registry_url=registry_url)
+        self._download_lock = threading.Lock()
+
+    def distribute(self, targets: Dict[str, Optional[List[str]]],
+                   should_stop: Callable[[], bool] = None) -> Dict[str, HostDistribution]:
+        """Bring every host, given as {host: ssh command, None for the local docker}, to the
+        current version of the image. Never raises, the outcome of each host is in its phase.
+        """
+        should_stop = should_stop or (lambda: False)
+        states = {host: HostDistribution(host) for host in targets}
+        for state in states.values():
+            self._report(state)
+        try:
+            remote = self.prefetcher.resolve()
+        except (PrefetchError, OSError, KeyError, ValueError) as e:
+            self._fail_all(states, f"Registry error: {e}")
+            return states
+
+        with ThreadPoolExecutor(max_workers=max(1, self.max_workers), thread_name_prefix="Distribution") as executor:
+            # Which layers every host has, in parallel
+            skipped = dict(zip(targets, executor.map(
+                lambda host: self._check_host(states[host], targets[host], remote), targets)))
+            pending = [host for host in targets if not states[host].done]
+            if not pending:
+                return states
+
+            # One download of every layer a host is missing
+            needed = set()
+            for host in pending:
+                needed.update(digest for digest, _ in remote.layers if digest not in skipped[host])
+            try:
+                self.prefetcher.prune(remote)
+                self.prefetcher.download(remote, {digest for digest, _ in remote.layers} - needed, should_stop,
+                                         self.on_download)
+            except PrefetchInterrupted:
+                self._fail_all(states, 'Cancelled', phase='cancelled')
+                return states
+            except (PrefetchError, OSError) as e:
+                self._fail_all(states, f"Download failed: {e}")
+                return states
+
+            list(executor.map(lambda host: self._send(states[host], targets[host], remote, skipped[host],
+                                                      should_stop), pending))
+        return states
+
+    def _report(self, state: HostDistribution) -> None:
+        if self.on_host is not None:
+            self.on_host(replace(state))
+
+    def _fail_all(self, states: Dict[str, HostDistribution], error: str, phase: str = 'failed') -> None:
+        for state in states.values():
+            if not state.done:
+                state.phase, state.error = phase, error
+                self._report(state)
+
+    def _check_host(self, state: HostDistribution, ssh_command: Optional[List[str]], remote) -> set:
+        try:
+            local = inspect_image(self.image, _docker_command(ssh_command))
+        except (PrefetchError, OSError, ValueError, IndexError) as e:
+            state.phase, state.error = 'failed', str(e)
+            self._report(state)
+            return set()
+        if is_current(local, remote):
+            state.phase, skipped = 'up_to_date', set()
+        else:
+            skipped = shared_layers(remote, local)
+            state.phase = 'waiting'
+            state.total = sum(size for digest, size in remote.layers if digest not in skipped)
+        self._report(state)
+        return skipped
+
+    def _send(self, state: HostDistribution, ssh_command: Optional[List[str]], remote, skipped: set,
+              should_stop: Callable[[], bool]) -> None:
+        if should_stop():
+            state.phase, state.error = 'cancelled', 'Cancelled'
+            self._report(state)
+            return
+        throttle = Throttle(PROGRESS_UPDATES_PER_SECOND)
+
+        def on_sent(amount):
+            if should_stop():
+                raise PrefetchInterrupted()
+            state.sent += amount
+            if throttle.ready():
+                self._report(state)
+
+        state.phase = 'sending'
+        self._report(state)
+        docker_command = _docker_command(ssh_command)
+        try:
+            try:
+                load_image(docker_command, self.image, remote, self.prefetcher.blob_path, skipped, on_sent)
+            except PrefetchError:
+                if not skipped:
+                    raise
+                # Daemons storing images in containerd need every layer in the archive
+                with self._download_lock:
+                    self.prefetcher.download(remote, set(), should_stop)
+                state.sent, state.total = 0, sum(size for _, size in remote.layers)
+                load_image(docker_command, self.image, remote, self.prefetcher.blob_path, set(), on_sent)
+            state.phase = 'loaded'
+        except PrefetchInterrupted:
+            state.phase, state.error = 'cancelled', 'Cancelled'
+        except (PrefetchError, OSError) as e:
+            state.phase, state.error = 'failed', str(e)
+        self._report(state)
+
+
+class ImageDistributionThread(QThread):
+    """Runs an ImageDistributor off the GUI thread, `cancel()` stops it."""
+
+    host_updated = pyqtSignal(object)  # HostDistribution
+    download_progress = pyqtSignal(object, object)  # downloaded bytes, total bytes
+    distribution_finished = pyqtSignal(object)  # {host: HostDistribution}
+
+    def __init__(self, targets: Dict[str, Optional[List[str]]], image: str = f'{DOCKER_IMAGE}:{DOCKER_TAG}',
+                 bandwidth_limit: float = 0):
+        super().__init__()
+        self.targets = targets
+        self.distributor = ImageDistributor(image, self.host_updated.emit, self.download_progress.emit,
+                                            bandwidth_limit=bandwidth_limit)
+        self._cancelled = False
+
+    def cancel(self) -> None:
+        self._cancelled = True
+
+    def run(self):
+        self.distribution_finished.emit(self.distributor.distribute(self.targets, lambda: self._cancelled))
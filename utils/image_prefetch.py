@@ -0,0 +1,545 @@
+"""Background prefetch of new versions of the node image.
+
+The new version is downloaded straight from the registry, layer by layer, while the
+launcher is idle:
+
+- the download is capped to a configurable bandwidth (token bucket, `RateLimiter`);
+- every layer is written to `~/.ratio1/edge_node_launcher/image_cache` as a `.partial`
+  file first, an interrupted download resumes from its last byte (HTTP Range) instead
+  of starting over, and the layer is verified against its digest before it is kept;
+- layers the local image already has are not downloaded at all;
+- once everything is there, the image is streamed to `docker load` as a docker-archive,
+  so the next launch or restart finds it locally and does not wait on the network;
+- a pause does not wait on a stalled read or a long `docker load`: `interrupt()` shuts
+  the download socket down and kills `docker load`.
+
+Only the local Docker daemon is prefetched for, remote hosts keep pulling on launch.
+"""
+import os
+import re
+import io
+import json
+import time
+import socket
+import hashlib
+import logging
+import tarfile
+import threading
+import subprocess
+import urllib.error
+import urllib.parse
+import urllib.request
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from utils.const import CONFIG_DIR, DOCKER_IMAGE, DOCKER_TAG, IMAGE_PREFETCH_BANDWIDTH_LIMIT
+from utils.docker_api import split_image
+
+REGISTRY_URL = 'https://registry-1.docker.io'
+PREFETCH_PLATFORM = ('linux', 'amd64')  # the launcher runs the node as linux/amd64 everywhere
+REGISTRY_TIMEOUT = 30  # seconds, to connect and between two reads
+LOAD_TIMEOUT = 1800  # seconds for `docker load` to import the image
+CHUNK_SIZE = 64 * 1024
+
+_MANIFEST_TYPES = ', '.join((
+    'application/vnd.oci.image.index.v1+json',
+    'application/vnd.docker.distribution.manifest.list.v2+json',
+    'application/vnd.oci.image.manifest.v1+json',
+    'application/vnd.docker.distribution.manifest.v2+json',
+))
+_INDEX_TYPES = ('application/vnd.oci.image.index.v1+json',
+                'application/vnd.docker.distribution.manifest.list.v2+json')
+_CHALLENGE_RE = re.compile(r'(\w+)="([^"]*)"')
+
+
+class PrefetchError(Exception):
+    """The prefetch failed (registry, verification or docker load error)."""
+
+
+class PrefetchInterrupted(Exception):
+    """The prefetch was paused, what was downloaded so far is kept."""
+
+
+@dataclass
+class PrefetchResult:
+    image: str
+    status: str  # 'up_to_date', 'loaded', 'paused' or 'failed'
+    digest: str = ''
+    downloaded: int = 0  # bytes downloaded by this run
+    message: str = ''
+
+
+@dataclass
+class RemoteImage:
+    digest: str  # digest of the tag, what `RepoDigests` records after a pull
+    manifest_digest: str  # digest of the platform manifest
+    config_digest: str  # the image id once loaded
+    config_bytes: bytes  # loaded as is, the image id is its digest
+    layers: List[Tuple[str, int]]  # (digest, size), base layer first
+
+    @property
+    def diff_ids(self) -> List[str]:
+        config = json.loads(self.config_bytes)
+        return (config.get('rootfs') or {}).get('diff_ids') or []
+
+
+class RateLimiter:
+    """Token bucket: `consume()` blocks until the bytes fit in `rate` bytes per second.
+
+    A rate of 0 disables the limit. The rate can be changed while a download runs.
+    """
+
+    def __init__(self, rate: float = 0, burst: float = 1.0):
+        self.rate = rate
+        self.burst = burst  # seconds of traffic allowed at once after a pause
+        self._tokens = 0.0
+        self._last = time.monotonic()
+
+    def consume(self, amount: int, should_stop: Callable[[], bool] = None) -> None:
+        now = time.monotonic()
+        if self.rate <= 0:
+            self._last = now
+            return
+        self._tokens = min(self.rate * self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+        self._tokens -= amount
+        while self._tokens < 0:
+            if should_stop is not None and should_stop():
+                return
+            time.sleep(min(0.2, -self._tokens / self.rate))
+            now = time.monotonic()
+            self._tokens += (now - self._last) * self.rate
+            self._last = now
+
+
+class _StripAuthRedirectHandler(urllib.request.HTTPRedirectHandler):
+    # Blobs redirect to a CDN, which rejects the registry token
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        new = super().redirect_request(req, fp, code, msg, headers, newurl)
+        if new is not None and urllib.parse.urlparse(newurl).netloc != urllib.parse.urlparse(req.full_url).netloc:
+            new.remove_header('Authorization')
+        return new
+
+
+class RegistryClient:
+    """Read-only client of a Docker registry (v2 API), with anonymous token auth."""
+
+    def __init__(self, registry_url: str = REGISTRY_URL, timeout: float = REGISTRY_TIMEOUT):
+        self.registry_url = registry_url.rstrip('/')
+        self.timeout = timeout
+        self._opener = urllib.request.build_opener(_StripAuthRedirectHandler)
+        self._tokens: Dict[str, str] = {}  # repository -> bearer token
+
+    def _open(self, repository: str, path: str, headers: Dict[str, str] = None):
+        url = f"{self.registry_url}/v2/{repository}/{path}"
+        for attempt in range(2):
+            request = urllib.request.Request(url, headers=dict(headers or {}))
+            token = self._tokens.get(repository)
+            if token:
+                request.add_header('Authorization', f'Bearer {token}')
+            try:
+                return self._opener.open(request, timeout=self.timeout)
+            except urllib.error.HTTPError as e:
+                challenge = e.headers.get('WWW-Authenticate', '')
+                e.close()
+                if e.code != 401 or attempt or not challenge.lower().startswith('bearer'):
+                    raise PrefetchError(f"GET {url}: {e.code} {e.reason}")
+                self._tokens[repository] = self._fetch_token(repository, challenge)
+            except OSError as e:  # URLError, timeouts
+                raise PrefetchError(f"GET {url}: {e}")
+
+    def _fetch_token(self, repository: str, challenge: str) -> str:
+        params = dict(_CHALLENGE_RE.findall(challenge))
+        realm = params.pop('realm', '')
+        params.setdefault('scope', f'repository:{repository}:pull')
+        try:
+            with urllib.request.urlopen(f"{realm}?{urllib.parse.urlencode(params)}", timeout=self.timeout) as response:
+                answer = json.load(response)
+        except (OSError, ValueError) as e:
+            raise PrefetchError(f"Registry authentication failed: {e}")
+        return answer.get('token') or answer.get('access_token') or ''
+
+    def get_manifest(self, repository: str, reference: str) -> Tuple[str, dict]:
+        """(digest, manifest) of a tag or digest, the manifest can be an index."""
+        with self._open(repository, f'manifests/{reference}', {'Accept': _MANIFEST_TYPES}) as response:
+            body = response.read()
+            digest = response.headers.get('Docker-Content-Digest') or f'sha256:{hashlib.sha256(body).hexdigest()}'
+        try:
+            return digest, json.loads(body)
+        except ValueError:
+            raise PrefetchError(f"Invalid manifest for {repository}:{reference}")
+
+    def get_blob(self, repository: str, digest: str) -> bytes:
+        with self._open(repository, f'blobs/{digest}') as response:
+            return response.read()
+
+    def open_blob(self, repository: str, digest: str, offset: int = 0):
+        """Open response of a blob, from `offset` when the registry honours ranges (status 206)."""
+        headers = {'Range': f'bytes={offset}-'} if offset else {}
+        return self._open(repository, f'blobs/{digest}', headers)
+
+    def resolve(self, repository: str, tag: str, platform: Tuple[str, str] = PREFETCH_PLATFORM) -> RemoteImage:
+        digest, manifest = self.get_manifest(repository, tag)
+        manifest_digest = digest
+        if manifest.get('mediaType') in _INDEX_TYPES or 'manifests' in manifest:
+            for entry in manifest.get('manifests', []):
+                entry_platform = entry.get('platform') or {}
+                if (entry_platform.get('os'), entry_platform.get('architecture')) == platform:
+                    manifest_digest, manifest = self.get_manifest(repository, entry['digest'])
+                    break
+            else:
+                raise PrefetchError(f"{repository}:{tag} has no {'/'.join(platform)} image")
+        config_digest = manifest['config']['digest']
+        config_bytes = self.get_blob(repository, config_digest)
+        if f'sha256:{hashlib.sha256(config_bytes).hexdigest()}' != config_digest:
+            raise PrefetchError(f"Image configuration {config_digest[:19]} does not match its digest")
+        layers = [(layer['digest'], int(layer.get('size') or 0)) for layer in manifest.get('layers', [])]
+        return RemoteImage(digest, manifest_digest, config_digest, config_bytes, layers)
+
+
+def _hex(digest: str) -> str:
+    return digest.split(':', 1)[-1]
+
+
+def _abort_response(response) -> None:
+    """Unblock a `read()` of `response` in progress in another thread by shutting its socket down."""
+    sock = getattr(getattr(getattr(response, 'fp', None), 'raw', None), '_sock', None)
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except (AttributeError, OSError):
+        pass  # already closed
+
+
+def _popen_kwargs() -> dict:
+    return {'creationflags': subprocess.CREATE_NO_WINDOW} if os.name == 'nt' else {}
+
+
+def inspect_image(image: str, docker_command: List[str], timeout: float = 30) -> Optional[dict]:
+    """`docker image inspect` of an image, None if the daemon does not have it.
+
+    Args:
+        docker_command: `['docker']`, or an ssh command followed by `docker` for a remote daemon
+    Raises:
+        PrefetchError: the daemon could not be reached
+    """
+    try:
+        result = subprocess.run(docker_command + ['image', 'inspect', image], capture_output=True,
+                                timeout=timeout, **_popen_kwargs())
+    except subprocess.TimeoutExpired:
+        raise PrefetchError("docker image inspect timed out")
+    if result.returncode != 0:
+        error = result.stderr.decode(errors='replace').strip()
+        if 'no such' in error.lower():
+            return None
+        raise PrefetchError(f"Docker is not available: {error}")
+    return json.loads(result.stdout)[0]
+
+
+def is_current(local: Optional[dict], remote: RemoteImage) -> bool:
+    """Whether the inspected local image is the remote one."""
+    if local is None:
+        return False
+    # Classic daemons identify an image by its config, containerd ones by its manifest
+    if local.get('Id') in (remote.config_digest, remote.manifest_digest, remote.digest):
+        return True
+    return any(repo_digest.endswith('@' + remote.digest) for repo_digest in local.get('RepoDigests') or [])
+
+
+def shared_layers(remote: RemoteImage, local: Optional[dict]) -> set:
+    """Layers a daemon already has: the common base of its image and the new one.
+
+    A layer is only reused with the same layers below it, hence the prefix.
+    """
+    local_layers = ((local or {}).get('RootFS') or {}).get('Layers') or []
+    shared = set()
+    for (digest, _), diff_id, local_diff_id in zip(remote.layers, remote.diff_ids, local_layers):
+        if diff_id != local_diff_id:
+            break
+        shared.add(digest)
+    return shared
+
+
+class _CountingReader:
+    def __init__(self, f, on_read: Callable[[int], None]):
+        self._f = f
+        self._on_read = on_read
+
+    def read(self, size=-1):
+        data = self._f.read(size)
+        self._on_read(len(data))
+        return data
+
+
+def load_image(docker_command: List[str], image: str, remote: RemoteImage, blob_path: Callable[[str], Path],
+               skipped: set = frozenset(), on_sent: Callable[[int], None] = None,
+               timeout: float = LOAD_TIMEOUT,
+               on_started: Callable[[subprocess.Popen], None] = None) -> str:
+    """Stream a docker-archive of `remote`, tagged `image`, to `docker load`.
+
+    Layers in `skipped` are left out of the archive, the daemon has them and does not
+    read them. `on_sent` is called with the number of layer bytes written, as they are,
+    `on_started` with the docker load process, so that another thread can kill it.
+
+    Returns:
+        str: the output of docker load
+    Raises:
+        PrefetchError: docker load failed
+    """
+    config_name = f'{_hex(remote.config_digest)}.json'
+    layer_names = [f'{_hex(digest)}.tar' for digest, _ in remote.layers]
+    manifest = [{'Config': config_name, 'RepoTags': [image], 'Layers': layer_names}]
+    process = subprocess.Popen(docker_command + ['load'], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                               stderr=subprocess.PIPE, **_popen_kwargs())
+    if on_started is not None:
+        on_started(process)
+    try:
+        with tarfile.open(fileobj=process.stdin, mode='w|', bufsize=CHUNK_SIZE) as archive:
+            _add_bytes(archive, 'manifest.json', json.dumps(manifest).encode())
+            _add_bytes(archive, config_name, remote.config_bytes)
+            for (digest, _), name in zip(remote.layers, layer_names):
+                if digest in skipped:
+                    continue
+                path = blob_path(digest)
+                info = tarfile.TarInfo(name)
+                info.size = path.stat().st_size
+                with open(path, 'rb') as f:
+                    archive.addfile(info, _CountingReader(f, on_sent) if on_sent else f)
+    except OSError:
+        pass  # docker load exited early, its error is reported below
+    except BaseException:
+        process.kill()
+        process.communicate()
+        raise
+    try:
+        stdout, stderr = process.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.communicate()
+        raise PrefetchError("docker load timed out")
+    if process.returncode != 0:
+        raise PrefetchError(f"docker load failed: {stderr.decode(errors='replace').strip()}")
+    return stdout.decode(errors='replace').strip()
+
+
+def _add_bytes(archive: tarfile.TarFile, name: str, data: bytes) -> None:
+    info = tarfile.TarInfo(name)
+    info.size = len(data)
+    info.mtime = int(time.time())
+    archive.addfile(info, io.BytesIO(data))
+
+
+class ImagePrefetcher:
+    """Downloads the new version of an image, if any, and loads it into the local daemon.
+
+    Args:
+        image: `repository:tag`, on Docker Hub unless `registry_url` says otherwise
+        cache_dir: where layers are downloaded, kept across runs to resume
+        bandwidth_limit: bytes per second, 0 for unlimited
+        docker_command: how the daemon is reached, `['docker']` by default
+    """
+
+    def __init__(self, image: str = f'{DOCKER_IMAGE}:{DOCKER_TAG}', cache_dir: str = None,
+                 bandwidth_limit: float = IMAGE_PREFETCH_BANDWIDTH_LIMIT, registry_url: str = REGISTRY_URL,
+                 docker_command: List[str] = None):
+        self.image = image
+        self.repository, self.tag = split_image(image)
+        self.registry_repository = self.repository if '/' in self.repository else f'library/{self.repository}'
+        self.cache_dir = Path(cache_dir) if cache_dir else Path.home() / CONFIG_DIR / 'image_cache'
+        self.limiter = RateLimiter(bandwidth_limit)
+        self.registry = RegistryClient(registry_url)
+        self.docker_command = docker_command or ['docker']
+        self.downloaded = 0
+        self._lock = threading.Lock()
+        self._interrupted = False
+        self._abort: Optional[Callable[[], None]] = None  # aborts the blocking call in progress
+
+    def set_bandwidth_limit(self, bandwidth_limit: float) -> None:
+        self.limiter.rate = bandwidth_limit
+
+    def interrupt(self) -> None:
+        """Stop the running prefetch from another thread, without waiting for its download
+        or `docker load`: the download socket is shut down and `docker load` is killed."""
+        with self._lock:
+            self._interrupted = True
+            abort, self._abort = self._abort, None
+        if abort is not None:
+            abort()
+
+    def _set_abort(self, abort: Optional[Callable[[], None]]) -> None:
+        """Register how to abort the blocking call about to start, None once it is over."""
+        with self._lock:
+            self._abort = abort
+            interrupted = self._interrupted
+        if abort is not None and interrupted:
+            abort()
+
+    def resolve(self) -> RemoteImage:
+        """The current version of the image on the registry."""
+        return self.registry.resolve(self.registry_repository, self.tag)
+
+    def run(self, should_stop: Callable[[], bool] = None,
+            on_progress: Callable[[int, int], None] = None) -> PrefetchResult:
+        """Prefetch the image. Never raises, the outcome is in the result's `status`."""
+        requested_stop = should_stop or (lambda: False)
+        should_stop = lambda: self._interrupted or requested_stop()
+        self._interrupted = False
+        self.downloaded = 0
+        digest = ''
+        try:
+            local = inspect_image(self.image, self.docker_command)
+            remote = self.resolve()
+            digest = remote.digest
+            if is_current(local, remote):
+                return PrefetchResult(self.image, 'up_to_date', digest, message=f"{self.image} is up to date")
+            self.prune(remote)
+            skipped = shared_layers(remote, local)
+            self.download(remote, skipped, should_stop, on_progress)
+            if should_stop():
+                raise PrefetchInterrupted()
+            try:
+                output = self._load(remote, skipped)
+            except PrefetchError:
+                if not skipped or should_stop():
+                    raise
+                # Daemons storing images in containerd need every layer in the archive
+                logging.info("Loading without the local layers failed, retrying with all of them")
+                self.download(remote, set(), should_stop, on_progress)
+                output = self._load(remote, set())
+            logging.info(output)
+            self.prune(None)
+            return PrefetchResult(self.image, 'loaded', digest, self.downloaded,
+                                  f"New version of {self.image} downloaded, it is used from the next (re)start")
+        except PrefetchInterrupted:
+            return PrefetchResult(self.image, 'paused', digest, self.downloaded, "Image prefetch paused")
+        except (PrefetchError, OSError, KeyError, ValueError) as e:
+            if should_stop():  # the download or docker load was aborted by the pause
+                return PrefetchResult(self.image, 'paused', digest, self.downloaded, "Image prefetch paused")
+            return PrefetchResult(self.image, 'failed', digest, self.downloaded, f"Image prefetch failed: {e}")
+
+    def _load(self, remote: RemoteImage, skipped: set) -> str:
+        try:
+            return load_image(self.docker_command, self.image, remote, self.blob_path, skipped,
+                              on_started=lambda process: self._set_abort(process.kill))
+        finally:
+            self._set_abort(None)
+
+    def blob_path(self, digest: str) -> Path:
+        return self.cache_dir / _hex(digest)
+
+    def prune(self, remote: Optional[RemoteImage]) -> None:
+        """Delete cached files that are not part of `remote` (all of them when None)."""
+        if not self.cache_dir.is_dir():
+            return
+        keep = set() if remote is None else {_hex(digest) for digest, _ in remote.layers}
+        for path in self.cache_dir.iterdir():
+            if path.name.split('.', 1)[0] not in keep:
+                path.unlink()
+
+    def download(self, remote: RemoteImage, skipped: set, should_stop: Callable[[], bool],
+                 on_progress: Optional[Callable[[int, int], None]] = None) -> None:
+        """Download the layers of `remote` that are not in `skipped` and not cached yet.
+
+        Raises:
+            PrefetchInterrupted: `should_stop` returned True, the partial layer is kept
+            PrefetchError: a layer could not be downloaded or verified
+        """
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        needed = [(digest, size) for digest, size in remote.layers if digest not in skipped]
+        total = sum(size for _, size in needed)
+        done = sum(self._cached_size(digest) for digest, _ in needed)
+
+        def progress(amount):
+            nonlocal done
+            done += amount
+            if on_progress is not None:
+                on_progress(done, total)
+
+        progress(0)
+        for digest, size in needed:
+            self._download_blob(digest, size, should_stop, progress)
+
+    def _cached_size(self, digest: str) -> int:
+        path = self.blob_path(digest)
+        for candidate in (path, path.with_suffix('.partial')):
+            if candidate.exists():
+                return candidate.stat().st_size
+        return 0
+
+    def _download_blob(self, digest: str, size: int, should_stop: Callable[[], bool],
+                       progress: Callable[[int], None]) -> None:
+        path = self.blob_path(digest)
+        if path.exists():
+            return
+        partial = path.with_suffix('.partial')
+        offset = partial.stat().st_size if partial.exists() else 0
+        hasher = hashlib.sha256()
+        if offset:
+            with open(partial, 'rb') as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                    hasher.update(chunk)
+        if size and offset >= size:  # paused before the verification, or larger than announced
+            if offset == size and f'sha256:{hasher.hexdigest()}' == digest:
+                os.replace(partial, path)
+                return
+            progress(-offset)
+            partial.unlink()
+            hasher = hashlib.sha256()
+            offset = 0
+        response = self.registry.open_blob(self.registry_repository, digest, offset)
+        self._set_abort(lambda: _abort_response(response))
+        try:
+            with response:
+                if offset and response.status != 206:  # no range support, start over
+                    progress(-offset)
+                    hasher = hashlib.sha256()
+                    offset = 0
+                with open(partial, 'ab' if offset else 'wb') as f:
+                    while True:
+                        try:
+                            chunk = response.read(CHUNK_SIZE)
+                        except OSError as e:
+                            if should_stop():
+                                raise PrefetchInterrupted()
+                            raise PrefetchError(f"Download of {digest[:19]} interrupted: {e}")
+                        if should_stop():  # the chunk is dropped, the download resumes before it
+                            raise PrefetchInterrupted()
+                        if not chunk:
+                            break
+                        self.limiter.consume(len(chunk), should_stop)
+                        f.write(chunk)
+                        hasher.update(chunk)
+                        self.downloaded += len(chunk)
+                        progress(len(chunk))
+        finally:
+            self._set_abort(None)
+        if size and partial.stat().st_size < size:
+            raise PrefetchError(f"Download of {digest[:19]} interrupted, it resumes next time")
+        if f'sha256:{hasher.hexdigest()}' != digest:
+            progress(-partial.stat().st_size)
+            partial.unlink()
+            raise PrefetchError(f"Layer {digest[:19]} does not match its digest, it is downloaded again next time")
+        os.replace(partial, path)
+
+
+class ImagePrefetchThread(QThread):
+    """Runs an ImagePrefetcher off the GUI thread. `pause()` stops it, the next run resumes."""
+
+    progress = pyqtSignal(object, object)  # downloaded bytes, total bytes
+    prefetch_finished = pyqtSignal(object)  # PrefetchResult
+
+    def __init__(self, prefetcher: ImagePrefetcher):
+        super().__init__()
+        self.prefetcher = prefetcher
+        self._paused = False
+
+    def pause(self) -> None:
+        self._paused = True
+        self.prefetcher.interrupt()
+
+    def run(self):
+        result = self.prefetcher.run(should_stop=lambda: self._paused, on_progress=self.progress.emit)
+        self.prefetch_finished.emit(result)
+
@@ -0,0 +1,228 @@
+"""Create or replace a node container in as few docker calls as possible, timing each phase.
+
+A launch used to chain `docker images -q`, `docker ps -a`, `docker container inspect`,
+`docker rm -f` and `docker run`, each from a new thread. Here one `docker inspect` of
+the image and the container answers both "is the image there" and "does the container
+exist", the container is only removed when it exists, and `docker run` is split into
+`docker create` and `docker start` - the two daemon requests the CLI makes for `run`
+anyway - so that their latency can be told apart.
+
+Phases, in order: image check, remove, create, start and first heartbeat, the first
+`get_node_info` the node answers once started.
+"""
+import os
+import json
+import time
+import subprocess
+from dataclasses import dataclass, field, replace
+from typing import Callable, Dict, List, Optional, Tuple
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from utils.const import DOCKER_IMAGE, DOCKER_TAG
+
+PHASE_LABELS = {
+    'image_check': 'Image check',
+    'remove': 'Remove',
+    'create': 'Create',
+    'start': 'Start',
+    'first_heartbeat': 'First heartbeat',
+}
+PHASE_PROGRESS = {
+    'image_check': 'Checking image and container...',
+    'remove': 'Removing existing container...',
+    'create': 'Creating container...',
+    'start': 'Starting container...',
+    'first_heartbeat': 'Waiting for the first heartbeat...',
+}
+COMMAND_TIMEOUT = 60  # seconds, for one docker command
+HEARTBEAT_TIMEOUT = 300  # seconds a started node has to answer its first heartbeat
+HEARTBEAT_POLL_INTERVAL = 1  # seconds between two heartbeat attempts
+
+
+@dataclass
+class LaunchTimings:
+    container: str
+    phases: Dict[str, float] = field(default_factory=dict)  # phase -> seconds, in the order they ran
+    current: str = ''  # phase in progress
+
+    @property
+    def total(self) -> float:
+        return sum(self.phases.values())
+
+    def summary(self) -> str:
+        """One line for the log: `image check 0.04s, remove 0.31s, ...`."""
+        return ', '.join(f"{PHASE_LABELS[phase].lower()} {seconds:.2f}s" for phase, seconds in self.phases.items())
+
+    def progress_text(self) -> str:
+        """Finished phases with their time, then the phase in progress, one per line."""
+        lines = [f"{PHASE_LABELS[phase]}: {seconds:.2f}s" for phase, seconds in self.phases.items()]
+        if self.current:
+            lines.append(PHASE_PROGRESS[self.current])
+        return '\n'.join(lines)
+
+
+@dataclass
+class LaunchResult:
+    stdout: str = ''
+    stderr: str = ''
+    return_code: int = 0
+    image_missing: bool = False
+    replaced: bool = False  # an existing container was removed
+    error: str = ''  # set when the launch could not go as far as `docker create`
+
+    def as_tuple(self) -> Tuple[str, str, int]:
+        return self.stdout, self.stderr, self.return_code
+
+
+def create_command(run_command: List[str]) -> List[str]:
+    """The `docker create` equivalent of a detached `docker run` command."""
+    if run_command[:2] != ['docker', 'run']:
+        raise ValueError(f"Not a docker run command: {' '.join(run_command)}")
+    return ['docker', 'create'] + [arg for arg in run_command[2:] if arg not in ('-d', '--detach')]
+
+
+def _missing_objects(stderr: str) -> List[str]:
+    """Names `docker inspect` reported as not found."""
+    missing = []
+    for line in stderr.splitlines():
+        if 'no such' in line.lower():
+            missing.append(line.rsplit(': ', 1)[-1].strip())
+    return missing
+
+
+class LaunchPipeline:
+    """Launch of one container from its `docker run` command (DockerCommandHandler.get_launch_command).
+
+    Args:
+        on_phase: called with a copy of the timings whenever a phase starts or ends,
+            from the launching thread
+        stop_if_image_missing: report a missing image instead of letting `docker create`
+            pull it, the launcher shows its pull dialog instead
+    """
+
+    def __init__(self, container_name: str, run_command: List[str], image: str = f'{DOCKER_IMAGE}:{DOCKER_TAG}',
+                 remote_ssh_command: List[str] = None,
+                 on_phase: Callable[[LaunchTimings], None] = None, stop_if_image_missing: bool = False):
+        self.container_name = container_name
+        self.run_command = run_command
+        self.image = image
+        self.remote_ssh_command = remote_ssh_command
+        self.on_phase = on_phase
+        self.stop_if_image_missing = stop_if_image_missing
+        self.timings = LaunchTimings(container_name)
+        self._started_at = None
+
+    def _report(self) -> None:
+        if self.on_phase is not None:
+            self.on_phase(replace(self.timings, phases=dict(self.timings.phases)))
+
+    def _execute(self, command: List[str], timeout: Optional[float] = COMMAND_TIMEOUT) -> Tuple[str, str, int]:
+        full_command = (self.remote_ssh_command or []) + command
+        kwargs = {'creationflags': subprocess.CREATE_NO_WINDOW} if os.name == 'nt' else {}
+        try:
+            result = subprocess.run(full_command, capture_output=True, text=True, timeout=timeout, **kwargs)
+        except subprocess.TimeoutExpired:
+            return '', f"Command timed out after {timeout} seconds: {' '.join(command)}", -1
+        except OSError as e:
+            return '', str(e), -1
+        return result.stdout, result.stderr, result.returncode
+
+    def _phase(self, phase: str, command: List[str], timeout: Optional[float] = COMMAND_TIMEOUT) -> Tuple[str, str, int]:
+        self.timings.current = phase
+        self._report()
+        start = time.monotonic()
+        output = self._execute(command, timeout)
+        self.timings.phases[phase] = time.monotonic() - start
+        self.timings.current = ''
+        self._report()
+        return output
+
+    def launch(self) -> LaunchResult:
+        """Replace the container by a new one and start it. Never raises."""
+        try:
+            command = create_command(self.run_command)
+        except ValueError as e:
+            return LaunchResult(return_code=-1, error=str(e))
+
+        # One inspect for the image and the container, the missing ones are reported on stderr
+        _, stderr, return_code = self._phase(
+            'image_check', ['docker', 'inspect', '--format', '{{.Id}}', self.image, self.container_name])
+        missing = _missing_objects(stderr)
+        if return_code != 0 and not missing:
+            return LaunchResult(stderr=stderr, return_code=return_code,
+                                error=f"Failed to inspect the image and container: {stderr.strip()}")
+        image_missing = self.image in missing
+        exists = self.container_name not in missing
+        if image_missing and self.stop_if_image_missing:
+            return LaunchResult(return_code=-1, image_missing=True, error=f"Image {self.image} not found")
+
+        if exists:
+            _, stderr, return_code = self._phase('remove', ['docker', 'rm', '-f', self.container_name])
+            if return_code != 0 and 'no such container' not in stderr.lower():
+                return LaunchResult(stderr=stderr, return_code=return_code,
+                                    error=f"Failed to remove existing container: {stderr.strip()}")
+
+        # Without the image, `docker create` pulls it first, which takes as long as it takes
+        stdout, stderr, return_code = self._phase('create', command, None if image_missing else COMMAND_TIMEOUT)
+        if return_code != 0:
+            return LaunchResult(stdout, stderr, return_code, image_missing, exists)
+        container_id = stdout.strip()
+        _, stderr, return_code = self._phase('start', ['docker', 'start', self.container_name])
+        self._started_at = time.monotonic()
+        return LaunchResult(container_id, stderr, return_code, image_missing, exists)
+
+    def wait_for_heartbeat(self, should_stop: Callable[[], bool] = None,
+                           timeout: float = HEARTBEAT_TIMEOUT) -> Optional[float]:
+        """Seconds from the start of the container to its first node info, None if it did not
+        come within `timeout` or `should_stop` returned True.
+        """
+        should_stop = should_stop or (lambda: False)
+        started_at = self._started_at or time.monotonic()
+        self.timings.current = 'first_heartbeat'
+        self._report()
+        command = ['docker', 'exec', self.container_name, 'get_node_info']
+        while not should_stop() and time.monotonic() - started_at < timeout:
+            attempt = time.monotonic()
+            stdout, _, return_code = self._execute(command, COMMAND_TIMEOUT)
+            if return_code == 0:
+                try:
+                    json.loads(stdout)
+                except ValueError:
+                    pass
+                else:
+                    self.timings.phases['first_heartbeat'] = time.monotonic() - started_at
+                    break
+            # Sleep in short steps so that a cancel is not held up
+            while not should_stop() and time.monotonic() - attempt < HEARTBEAT_POLL_INTERVAL:
+                time.sleep(0.1)
+        self.timings.current = ''
+        self._report()
+        return self.timings.phases.get('first_heartbeat')
+
+
+class LaunchPipelineThread(QThread):
+    """Runs a LaunchPipeline off the GUI thread, then waits for the node's first heartbeat
+    when `wait_for_heartbeat` is set. `cancel()` only stops that wait.
+    """
+
+    phase_changed = pyqtSignal(object)  # LaunchTimings
+    launch_finished = pyqtSignal(object)  # LaunchResult
+    heartbeat_finished = pyqtSignal(object)  # LaunchTimings, without first_heartbeat when it did not come
+
+    def __init__(self, pipeline: LaunchPipeline, wait_for_heartbeat: bool = False):
+        super().__init__()
+        self.pipeline = pipeline
+        pipeline.on_phase = self.phase_changed.emit
+        self.wait_for_heartbeat = wait_for_heartbeat
+        self._cancelled = False
+
+    def cancel(self) -> None:
+        self._cancelled = True
+
+    def run(self):
+        result = self.pipeline.launch()
+        self.launch_finished.emit(result)
+        if self.wait_for_heartbeat and result.return_code == 0 and not result.error:
+            self.pipeline.wait_for_heartbeat(lambda: self._cancelled)
+            self.heartbeat_finished.emit(replace(self.pipeline.timings, phases=dict(self.pipeline.timings.phases)))
@@ -0,0 +1,193 @@
+"""In-memory store of the launcher log entries shown in the console views.
+
+Entries are structured records kept in a fixed size ring buffer. Every entry gets an
+increasing sequence number; per-container and per-level indexes hold the sequence numbers
+of their entries in order, so evicting the oldest entry is O(1) on every index and a
+filtered query only walks the entries of the most selective index.
+"""
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional
+
+DEFAULT_LOG_MAX_ENTRIES = 5000
+
+DEBUG = 'DEBUG'
+INFO = 'INFO'
+WARNING = 'WARNING'
+ERROR = 'ERROR'
+LOG_LEVELS = (DEBUG, INFO, WARNING, ERROR)
+
+# add_log only receives a color, map it to the level it is used for
+COLOR_LEVELS = {
+    'red': ERROR,
+    'yellow': WARNING,
+    'orange': WARNING,
+}
+
+
+def level_from_color(color: str, debug: bool = False) -> str:
+    if color in COLOR_LEVELS:
+        return COLOR_LEVELS[color]
+    return DEBUG if debug else INFO
+
+
+@dataclass(slots=True)
+class LogEntry:
+    time: float
+    message: str
+    color: str = "gray"
+    debug: bool = False
+    level: str = INFO
+    container: Optional[str] = None
+    source: Optional[str] = None
+    seq: int = -1
+    search_text: str = field(default='', repr=False)  # lower-cased message, built once
+
+    def format(self) -> str:
+        return f"{datetime.fromtimestamp(self.time):[%Y-%m-%d %H:%M:%S]} {self.message}"
+
+
+@dataclass(frozen=True)
+class LogFilter:
+    """Filter of the console view. Empty fields match everything."""
+    levels: Optional[frozenset] = None
+    container: Optional[str] = None
+    source: Optional[str] = None
+    text: str = ''
+
+    def __post_init__(self):
+        # Matching is case-insensitive, entries keep a lower-cased copy of their message
+        object.__setattr__(self, 'text', self.text.lower())
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.levels or self.container or self.source or self.text)
+
+    def matches(self, entry: LogEntry) -> bool:
+        if self.levels and entry.level not in self.levels:
+            return False
+        if self.container and entry.container != self.container:
+            return False
+        if self.source and entry.source != self.source:
+            return False
+        if self.text and self.text not in entry.search_text:
+            return False
+        return True
+
+
+class LogStore:
+    """Ring buffer of log entries, the oldest entries are dropped once it is full."""
+
+    def __init__(self, max_entries: int = DEFAULT_LOG_MAX_ENTRIES):
+        self._max_entries = max(1, int(max_entries))
+        self._slots: List[Optional[LogEntry]] = [None] * self._max_entries
+        self._next_seq = 0  # sequence number of the next entry
+        self._first_seq = 0  # sequence number of the oldest entry kept
+        self._by_container: Dict[Optional[str], deque] = {}
+        self._by_level: Dict[str, deque] = {}
+        self._last_query = None  # (filter, matching sequence numbers, next sequence number) of the previous query
+
+    @property
+    def max_entries(self) -> int:
+        return self._max_entries
+
+    def set_max_entries(self, max_entries: int) -> None:
+        max_entries = max(1, int(max_entries))
+        if max_entries == self._max_entries:
+            return
+        entries = self.tail(max_entries)
+        self._max_entries = max_entries
+        self.clear()
+        self.extend(entries)
+
+    def append(self, entry: LogEntry) -> LogEntry:
+        if self._next_seq - self._first_seq >= self._max_entries:
+            self._evict_oldest()
+        entry.seq = self._next_seq
+        entry.search_text = entry.message.lower()
+        self._slots[entry.seq % self._max_entries] = entry
+        self._next_seq += 1
+        self._by_container.setdefault(entry.container, deque()).append(entry.seq)
+        self._by_level.setdefault(entry.level, deque()).append(entry.seq)
+        return entry
+
+    def _evict_oldest(self) -> None:
+        seq = self._first_seq
+        entry = self._slots[seq % self._max_entries]
+        self._slots[seq % self._max_entries] = None
+        self._first_seq += 1
+        # The oldest entry is always at the head of its indexes
+        for index, key in ((self._by_container, entry.container), (self._by_level, entry.level)):
+            seqs = index[key]
+            seqs.popleft()
+            if not seqs:
+                del index[key]
+
+    def extend(self, entries: Iterable[LogEntry]) -> None:
+        for entry in entries:
+            self.append(entry)
+
+    def clear(self) -> None:
+        self._slots = [None] * self._max_entries
+        self._first_seq = self._next_seq
+        self._by_container.clear()
+        self._by_level.clear()
+        self._last_query = None
+
+    def tail(self, count: Optional[int] = None) -> List[LogEntry]:
+        """The last `count` entries (all of them when count is None), oldest first."""
+        start = self._first_seq
+        if count is not None:
+            start = max(start, self._next_seq - count)
+        return [self._slots[seq % self._max_entries] for seq in range(start, self._next_seq)]
+
+    def has_container(self, name: Optional[str]) -> bool:
+        return name in self._by_container
+
+    def containers(self) -> List[str]:
+        return sorted(name for name in self._by_container if name)
+
+    def count_by_level(self) -> Dict[str, int]:
+        return {level: len(seqs) for level, seqs in self._by_level.items()}
+
+    def query(self, log_filter: LogFilter) -> List[LogEntry]:
+        """Entries matching the filter, oldest first."""
+        if log_filter.is_empty:
+            return self.tail()
+        slots, size, first = self._slots, self._max_entries, self._first_seq
+
+        previous = self._last_query
+        if (previous is not None and previous[0].text and log_filter.text.startswith(previous[0].text)
+                and (previous[0].levels, previous[0].container, previous[0].source)
+                == (log_filter.levels, log_filter.container, log_filter.source)):
+            # The search text was extended: narrow the previous result instead of starting over
+            candidates = [seq for seq in previous[1] if seq >= first]
+            candidates.extend(range(previous[2], self._next_seq))
+        else:
+            candidates = self._candidates(log_filter)
+
+        matches = [seq for seq in candidates if log_filter.matches(slots[seq % size])]
+        self._last_query = (log_filter, matches, self._next_seq)
+        return [slots[seq % size] for seq in matches]
+
+    def _candidates(self, log_filter: LogFilter):
+        """Sequence numbers worth checking, taken from the smallest matching index."""
+        options = []
+        if log_filter.container:
+            options.append(list(self._by_container.get(log_filter.container, ())))
+        if log_filter.levels:
+            seqs = []
+            for level in log_filter.levels:
+                seqs.extend(self._by_level.get(level, ()))
+            seqs.sort()
+            options.append(seqs)
+        if options:
+            return min(options, key=len)
+        return range(self._first_seq, self._next_seq)
+
+    def __len__(self) -> int:
+        return self._next_seq - self._first_seq
+
+    def __iter__(self) -> Iterator[LogEntry]:
+        return iter(self.tail())
@@ -0,0 +1,188 @@
+"""Metrics agent streaming the state of the r1node containers of a host.
+
+The launcher pushes this file to a host over SSH (`ssh ... python3 - <args>` with the
+source on stdin, nothing is installed on the host) and reads its stdout for as long as
+the connection lives. Every INTERVAL seconds the agent looks at the local containers
+whose name starts with the prefix and prints only what changed, one JSON document per
+line:
+
+    {"type": "hello", "version": 1, "host": ..., "interval": ..., "ts": ...}
+    {"type": "containers", "ts": ..., "changed": [{name, id, image, state, status, running}], "removed": [names]}
+    {"type": "node_info", "ts": ..., "container": ..., "info": {...}}           # when it changed
+    {"type": "samples", "ts": ..., "container": ..., "timestamps": [...], "cpu_load": [...], ...,
+     "uptime": ..., "current_epoch_avail": ..., "version": ...}
+    {"type": "error", "ts": ..., "container": ..., "message": ...}
+    {"type": "heartbeat", "ts": ...}                                            # when nothing changed
+
+`samples` only carries the samples of the node history newer than the ones already
+sent. The first `containers` message of a session lists every container, even when
+there is none: a launcher reconnecting replaces what it knew with it. The agent exits when its output is closed, i.e. when the launcher drops the
+connection. It only needs Python 3.6+ and the docker CLI, and must stay self-contained:
+it is run on hosts where the launcher is not installed.
+"""
+import os
+import argparse
+import json
+import signal
+import socket
+import subprocess
+import sys
+import time
+from bisect import bisect_right
+
+AGENT_VERSION = 1
+DEFAULT_INTERVAL = 10  # seconds
+DEFAULT_PREFIX = 'r1node'
+COMMAND_TIMEOUT = 20  # seconds
+
+SAMPLE_FIELDS = (
+    'cpu_load', 'cpu_temp', 'occupied_memory', 'total_memory',
+    'gpu_load', 'gpu_occupied_memory', 'gpu_temp', 'gpu_total_memory',
+)
+NODE_INFO_FIELDS = ('address', 'alias', 'eth_address', 'version_long', 'version_short', 'info')
+# Node state of the history sent along with its new samples
+HISTORY_STATE_FIELDS = ('uptime', 'current_epoch_avail', 'version')
+
+
+def _run(command):
+    result = subprocess.run(
+        command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, stdin=subprocess.DEVNULL,
+        universal_newlines=True, timeout=COMMAND_TIMEOUT
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip() or 'exit code {}'.format(result.returncode))
+    return result.stdout
+
+
+class MetricsAgent:
+    def __init__(self, docker='docker', prefix=DEFAULT_PREFIX, interval=DEFAULT_INTERVAL, out=None):
+        self.docker = docker
+        self.prefix = prefix
+        self.interval = interval
+        self.out = out or sys.stdout
+        self.containers = {}  # name -> state sent
+        self.node_infos = {}  # name -> node info sent
+        self.last_sample = {}  # name -> last sample timestamp sent
+        self.polled = False
+
+    def emit(self, message_type, **fields):
+        fields['type'] = message_type
+        fields['ts'] = time.time()
+        self.out.write(json.dumps(fields, separators=(',', ':')) + '\n')
+        self.out.flush()
+
+    def list_containers(self):
+        output = _run([
+            self.docker, 'ps', '-a', '--no-trunc', '--filter', 'name=' + self.prefix,
+            '--format', '{{.Names}}\t{{.ID}}\t{{.Image}}\t{{.State}}\t{{.Status}}',
+        ])
+        containers = {}
+        for line in output.splitlines():
+            parts = line.split('\t')
+            if len(parts) != 5 or not parts[0].startswith(self.prefix):
+                continue  # the docker name filter also matches in the middle of names
+            name, container_id, image, state, status = parts
+            containers[name] = {
+                'name': name, 'id': container_id, 'image': image, 'state': state,
+                'status': status, 'running': state == 'running',
+            }
+        return containers
+
+    def exec_json(self, name, command):
+        return json.loads(_run([self.docker, 'exec', name, command]))
+
+    def poll(self):
+        """Look at the containers once and emit what changed. Returns the number of messages."""
+        sent = 0
+        containers = self.list_containers()
+        # The status text ("Up 5 minutes") changes all the time, it is not a state change
+        changed = [
+            container for name, container in containers.items()
+            if {k: v for k, v in self.containers.get(name, {}).items() if k != 'status'}
+            != {k: v for k, v in container.items() if k != 'status'}
+        ]
+        removed = sorted(set(self.containers) - set(containers))
+        if changed or removed or not self.polled:
+            self.emit('containers', changed=changed, removed=removed)
+            sent += 1
+        self.polled = True
+        for name in removed:
+            self.node_infos.pop(name, None)
+        self.containers = containers
+
+        for name, container in containers.items():
+            if not container['running']:
+                continue
+            try:
+                info = self.exec_json(name, 'get_node_info')
+                info = {field: info.get(field) for field in NODE_INFO_FIELDS}
+                if info != self.node_infos.get(name):
+                    self.node_infos[name] = info
+                    self.emit('node_info', container=name, info=info)
+                    sent += 1
+                sent += self.emit_samples(name, self.exec_json(name, 'get_node_history'))
+            except Exception as e:
+                self.emit('error', container=name, message=str(e))
+                sent += 1
+        return sent
+
+    def emit_samples(self, name, history):
+        timestamps = history.get('timestamps') or []
+        last = self.last_sample.get(name)
+        # ISO timestamps of one node share a format, they sort as strings
+        start = 0 if last is None else bisect_right(timestamps, last)
+        if start >= len(timestamps):
+            return 0
+        count = len(timestamps)
+        samples = {'timestamps': timestamps[start:]}
+        for field in SAMPLE_FIELDS:
+            series = history.get(field)
+            if series is None:
+                continue
+            # Series are aligned on the most recent sample
+            offset = count - len(series)
+            samples[field] = [series[idx - offset] if idx >= offset else None for idx in range(start, count)]
+        for field in HISTORY_STATE_FIELDS:
+            samples[field] = history.get(field)
+        self.last_sample[name] = timestamps[-1]
+        self.emit('samples', container=name, **samples)
+        return 1
+
+    def run(self, once=False):
+        self.emit('hello', version=AGENT_VERSION, host=socket.gethostname(), interval=self.interval,
+                  prefix=self.prefix)
+        while True:
+            started = time.monotonic()
+            try:
+                sent = self.poll()
+            except Exception as e:
+                self.emit('error', container=None, message=str(e))
+                sent = 1
+            if not sent:
+                self.emit('heartbeat')
+            if once:
+                return
+            time.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--interval', type=float, default=DEFAULT_INTERVAL)
+    parser.add_argument('--prefix', default=DEFAULT_PREFIX)
+    parser.add_argument('--docker', default='docker', help='docker CLI to use')
+    parser.add_argument('--once', action='store_true', help='poll once and exit')
+    args = parser.parse_args(argv)
+    # Exit quietly when the launcher goes away
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        MetricsAgent(args.docker, args.prefix, args.interval).run(once=args.once)
+    except BrokenPipeError:
+        # Nobody reads the output anymore, do not fail flushing it at exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,206 @@
+"""Rolling statistics over node metrics.
+
+Samples are fed incrementally as new NodeHistory payloads arrive. Every (metric, window)
+pair keeps its own rolling state, so a summary never re-scans the history:
+
+- min / max use monotonic deques (amortized O(1) per sample),
+- mean uses a running sum,
+- percentiles use a `PercentileSketch`, a histogram with logarithmic buckets (O(1) per
+  sample, a few hundred buckets whatever the window length, 1% relative error).
+
+Windows are measured back from the newest sample, not from the wall clock, so a node
+that stopped reporting keeps showing the statistics of its last known period.
+"""
+import math
+from bisect import bisect_right
+from collections import deque
+from typing import Dict, Iterable, Optional, Tuple
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+# Metrics tracked per node and the windows (seconds) kept for each of them
+TRACKED_METRICS = ('cpu_load', 'cpu_temp', 'occupied_memory', 'gpu_load', 'gpu_occupied_memory', 'gpu_temp')
+DEFAULT_WINDOWS = (HOUR, DAY)
+PERCENTILE_ACCURACY = 0.01  # relative error of the percentiles
+
+
+class PercentileSketch:
+    """Counts of values in buckets growing geometrically, samples can be added and removed.
+
+    A value `v > 0` falls in bucket `k = ceil(log(v) / log(gamma))`, i.e. `gamma^(k-1) < v <= gamma^k`,
+    and a percentile is answered with the middle of its bucket, within `relative_accuracy`
+    of the exact value. Negative values use mirrored buckets, values near zero share one.
+    """
+
+    MIN_VALUE = 1e-9  # below this (in absolute value) a sample counts as zero
+
+    def __init__(self, relative_accuracy: float = PERCENTILE_ACCURACY):
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self._counts: Dict[Tuple[int, int], int] = {}  # (sign, k) -> number of samples
+        self.count = 0
+
+    def _bucket(self, value: float) -> Tuple[int, int]:
+        if abs(value) < self.MIN_VALUE:
+            return 0, 0
+        sign = 1 if value > 0 else -1
+        return sign, math.ceil(math.log(abs(value)) / self._log_gamma)
+
+    def add(self, value: float) -> None:
+        bucket = self._bucket(value)
+        self._counts[bucket] = self._counts.get(bucket, 0) + 1
+        self.count += 1
+
+    def remove(self, value: float) -> None:
+        """Remove a value added before."""
+        bucket = self._bucket(value)
+        remaining = self._counts[bucket] - 1
+        if remaining:
+            self._counts[bucket] = remaining
+        else:
+            del self._counts[bucket]
+        self.count -= 1
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Nearest-rank percentile, `pct` in [0, 100]."""
+        if not self.count:
+            return None
+        rank = min(max(1, math.ceil(pct / 100 * self.count)), self.count)
+        seen = 0
+        for sign, k in sorted(self._counts, key=lambda bucket: (bucket[0], bucket[0] * bucket[1])):
+            seen += self._counts[(sign, k)]
+            if seen >= rank:
+                return sign * 2 * self.gamma ** k / (self.gamma + 1)
+
+
+class RollingWindowStats:
+    """Min / max / mean / percentile over the samples of the last `window` seconds."""
+
+    def __init__(self, window: float):
+        self.window = window
+        self._samples = deque()  # (timestamp, value) in arrival order
+        self._min = deque()  # increasing values, candidates for the minimum
+        self._max = deque()  # decreasing values, candidates for the maximum
+        self._sketch = PercentileSketch()
+        self._sum = 0.0
+
+    def add(self, timestamp: float, value: float) -> None:
+        self._samples.append((timestamp, value))
+        self._sum += value
+        self._sketch.add(value)
+        while self._min and self._min[-1][1] > value:
+            self._min.pop()
+        self._min.append((timestamp, value))
+        while self._max and self._max[-1][1] < value:
+            self._max.pop()
+        self._max.append((timestamp, value))
+        self._evict(timestamp - self.window)
+
+    def _evict(self, cutoff: float) -> None:
+        samples = self._samples
+        while samples and samples[0][0] <= cutoff:
+            timestamp, value = samples.popleft()
+            self._sum -= value
+            self._sketch.remove(value)
+            if self._min and self._min[0][0] == timestamp:
+                self._min.popleft()
+            if self._max and self._max[0][0] == timestamp:
+                self._max.popleft()
+        if not samples:
+            self._sum = 0.0  # drop accumulated float error when the window empties
+
+    @property
+    def count(self) -> int:
+        return len(self._samples)
+
+    @property
+    def min(self) -> Optional[float]:
+        return self._min[0][1] if self._min else None
+
+    @property
+    def max(self) -> Optional[float]:
+        return self._max[0][1] if self._max else None
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self._sum / len(self._samples) if self._samples else None
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Nearest-rank percentile, `pct` in [0, 100], within PERCENTILE_ACCURACY."""
+        value = self._sketch.percentile(pct)
+        if value is None:
+            return None
+        return min(max(value, self.min), self.max)  # exact at the ends
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        return {
+            'count': self.count,
+            'min': self.min,
+            'max': self.max,
+            'mean': self.mean,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+        }
+
+
+class NodeMetricsStats:
+    """Rolling statistics for every tracked metric and window of a single node."""
+
+    def __init__(self, metrics: Iterable[str] = TRACKED_METRICS, windows: Iterable[float] = DEFAULT_WINDOWS):
+        self.metrics = tuple(metrics)
+        self.windows = tuple(windows)
+        self._stats = {
+            (metric, window): RollingWindowStats(window)
+            for metric in self.metrics
+            for window in self.windows
+        }
+        self.last_timestamp = None
+
+    def ingest(self, history) -> int:
+        """Feed the samples of a NodeHistory that were not seen yet.
+
+        Each payload repeats the whole history, so the start of the new tail is located
+        with a binary search on the (sorted) timestamps and only that tail is processed.
+        Returns the number of new timestamps consumed.
+        """
+        timestamps = history.timestamps
+        if not timestamps:
+            return 0
+        start = 0
+        if self.last_timestamp is not None:
+            start = bisect_right(timestamps, self.last_timestamp)
+        if start >= len(timestamps):
+            return 0
+        count = len(timestamps)
+        for metric in self.metrics:
+            series = getattr(history, metric, None)
+            if not series:
+                continue
+            # Series are aligned on the most recent sample, like the plots do
+            offset = count - len(series)
+            stats = self._stats
+            for idx in range(max(start, offset), count):
+                value = series[idx - offset]
+                if value is None or value != value:  # None or NaN
+                    continue
+                for window in self.windows:
+                    stats[(metric, window)].add(timestamps[idx], value)
+        self.last_timestamp = timestamps[-1]
+        return count - start
+
+    def get(self, metric: str, window: float) -> RollingWindowStats:
+        return self._stats[(metric, window)]
+
+    def summary(self, metric: str, window: float) -> Dict[str, Optional[float]]:
+        return self._stats[(metric, window)].summary()
+
+    def has_data(self, metric: str) -> bool:
+        return any(self._stats[(metric, window)].count for window in self.windows)
+
+
+def format_window(window: float) -> str:
+    """Short label of a window length, e.g. 3600 -> '1h', 86400 -> '24h'."""
+    if window % HOUR == 0:
+        return f"{int(window // HOUR)}h"
+    return f"{int(window // 60)}m"
@@ -0,0 +1,219 @@
+"""Launcher side of the metrics agent (utils/metrics_agent.py).
+
+RemoteMetricsStreamThread pushes the agent to a host over one SSH session
+(`<ssh prefix> python3 - <args>`, the agent source on stdin) and turns the
+newline-delimited JSON it prints into Qt signals, so the launcher only handles what
+changed instead of polling every container of every host on each tick. The session is
+opened on the shared master connection of the host (utils.ssh_mux) and reopened with a
+backoff when it drops. Without a remote host the agent runs locally with the launcher's
+own interpreter, which is how it is tested.
+
+The agent is sent as the source of utils/metrics_agent.py: the build scripts bundle the
+file as data (`--add-data`), it is looked up in the PyInstaller bundle when frozen.
+"""
+import os
+import sys
+import json
+import math
+import time
+import logging
+import subprocess
+import tempfile
+import threading
+from array import array
+from bisect import bisect_right
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from models.NodeInfo import NodeInfo
+from utils.ssh_mux import get_ssh_multiplexer
+from utils.state_store import METRIC_FIELDS, MetricSamples
+
+AGENT_PATH = os.path.join(
+    getattr(sys, '_MEIPASS', os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'utils', 'metrics_agent.py'
+)
+AGENT_INTERVAL = 10  # seconds
+REMOTE_PYTHON = 'python3'
+HISTORY_STATE_FIELDS = ('uptime', 'current_epoch_avail', 'version')  # see utils/metrics_agent.py
+RECONNECT_DELAY = 5  # seconds, doubled after each failed session
+MAX_RECONNECT_DELAY = 120  # seconds
+
+
+def agent_command(remote_ssh_command: List[str] = None, interval: float = AGENT_INTERVAL,
+                  prefix: str = 'r1node', python: str = None, docker: str = None) -> List[str]:
+    """Command running the agent read from stdin, on the host of `remote_ssh_command` or locally."""
+    if python is None:
+        python = REMOTE_PYTHON if remote_ssh_command else sys.executable
+    command = [python, '-', '--interval', str(interval), '--prefix', prefix]
+    if docker:
+        command += ['--docker', docker]
+    return list(remote_ssh_command or []) + command
+
+
+def samples_from_message(message: dict) -> MetricSamples:
+    """MetricSamples of a `samples` message of the agent (ISO timestamps, None for missing values)."""
+    nan = math.nan
+    timestamps = array('d', [
+        datetime.fromisoformat(value).timestamp() if isinstance(value, str) else value
+        for value in message['timestamps']
+    ])
+    series = {}
+    for field in METRIC_FIELDS:
+        values = message.get(field)
+        if values is None or (field.startswith('gpu_') and all(value is None for value in values)):
+            series[field] = None if field.startswith('gpu_') else array('d', [nan]) * len(timestamps)
+        else:
+            series[field] = array('d', [nan if value is None else value for value in values])
+    return MetricSamples(timestamps=timestamps, **series)
+
+
+class RemoteMetricsStreamThread(QThread):
+    """ Thread running the metrics agent on a host and following its output.
+
+    `containers` mirrors the state of the r1node containers of the host as reported by
+    the agent. With a `store`, node info and samples are also written to the state store
+    from this thread, so the UI only has to redraw.
+    """
+    agent_started = pyqtSignal(dict)  # hello message: host, version, interval
+    containers_changed = pyqtSignal(dict)  # name -> container state, the whole mirror
+    node_info_received = pyqtSignal(str, object)  # container, NodeInfo
+    samples_received = pyqtSignal(str, object)  # container, MetricSamples of the new samples
+    node_state_received = pyqtSignal(str, dict)  # container, uptime / current_epoch_avail / version
+    stream_error = pyqtSignal(str)
+
+    def __init__(self, remote_ssh_command: List[str] = None, interval: float = AGENT_INTERVAL,
+                 prefix: str = 'r1node', store=None, python: str = None, docker: str = None,
+                 reconnect: bool = True):
+        super().__init__()
+        self.remote_ssh_command = remote_ssh_command
+        self.interval = interval
+        self.prefix = prefix
+        self.store = store
+        self.python = python
+        self.docker = docker
+        self.reconnect = reconnect
+        self.process = None
+        self.containers: Dict[str, dict] = {}
+        self._last_sample: Dict[str, str] = {}  # container -> timestamp of the last sample received
+        self._resync = False
+        self.messages = 0
+        self.last_message_at: Optional[float] = None
+        self._stopping = threading.Event()
+
+    def get_command(self) -> List[str]:
+        return agent_command(self.remote_ssh_command, self.interval, self.prefix, self.python, self.docker)
+
+    def run(self):
+        delay = RECONNECT_DELAY
+        try:
+            with open(AGENT_PATH, 'r') as f:
+                source = f.read()
+        except OSError as e:
+            error_msg = f"Metrics agent source not available: {str(e)}"
+            logging.error(error_msg)
+            self.stream_error.emit(error_msg)
+            return
+        while not self._stopping.is_set():
+            if self.remote_ssh_command:
+                # Start the session on the shared master: a master started by this session
+                # would keep its output open after the agent exits
+                get_ssh_multiplexer().ensure(self.remote_ssh_command)
+            received = self._run_session(source)
+            if not self.reconnect or self._stopping.wait(delay):
+                break
+            delay = RECONNECT_DELAY if received else min(MAX_RECONNECT_DELAY, delay * 2)
+
+    def _run_session(self, source: str) -> int:
+        """Run the agent once, until it exits. Returns the number of messages received."""
+        full_command = self.get_command()
+        logging.info(f"Starting metrics agent: {' '.join(full_command)}")
+        received = 0
+        try:
+            kwargs = {'creationflags': subprocess.CREATE_NO_WINDOW} if os.name == 'nt' else {}
+            with tempfile.TemporaryFile(mode='w+') as stderr:
+                self.process = subprocess.Popen(
+                    full_command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=stderr,
+                    text=True, errors='replace', bufsize=1, **kwargs
+                )
+                # The agent is compiled once its whole source is read, then stdin is unused
+                self.process.stdin.write(source)
+                self.process.stdin.close()
+                for line in iter(self.process.stdout.readline, ''):
+                    try:
+                        message = json.loads(line)
+                    except ValueError:
+                        logging.warning(f"Metrics agent: unreadable line {line[:200]!r}")
+                        continue
+                    received += 1
+                    self._handle_message(message)
+                return_code = self.process.wait()
+                if not self._stopping.is_set():
+                    stderr.seek(0)
+                    detail = stderr.read().strip()[-500:]
+                    self.stream_error.emit(f"Metrics agent exited with code {return_code}: {detail}")
+        except Exception as e:
+            if not self._stopping.is_set():
+                error_msg = f"Error running metrics agent: {str(e)}"
+                logging.error(error_msg)
+                self.stream_error.emit(error_msg)
+        return received
+
+    def _handle_message(self, message: dict) -> None:
+        self.messages += 1
+        self.last_message_at = time.time()
+        message_type = message.get('type')
+        try:
+            if message_type == 'containers':
+                if self._resync:
+                    # First message of a session: every container of the host, replaces the mirror
+                    self._resync = False
+                    self.containers = {}
+                for name in message.get('removed', ()):
+                    self.containers.pop(name, None)
+                for container in message.get('changed', ()):
+                    self.containers[container['name']] = container
+                self.containers_changed.emit(dict(self.containers))
+            elif message_type == 'node_info':
+                node_info = NodeInfo.from_dict(message['info'])
+                if self.store is not None:
+                    self.store.save_node_info(message['container'], node_info)
+                self.node_info_received.emit(message['container'], node_info)
+            elif message_type == 'samples':
+                # A new session sends the whole history again, only the new samples are forwarded
+                timestamps = message['timestamps']
+                last = self._last_sample.get(message['container'])
+                start = 0 if last is None else bisect_right(timestamps, last)
+                if start >= len(timestamps):
+                    return
+                if start:
+                    message = dict(message)
+                    for field in ('timestamps',) + METRIC_FIELDS:
+                        if message.get(field) is not None:
+                            message[field] = message[field][start:]
+                self._last_sample[message['container']] = timestamps[-1]
+                samples = samples_from_message(message)
+                if self.store is not None:
+                    self.store.add_metric_samples(message['container'], samples)
+                self.samples_received.emit(message['container'], samples)
+                state = {field: message[field] for field in HISTORY_STATE_FIELDS if message.get(field) is not None}
+                if state:
+                    self.node_state_received.emit(message['container'], state)
+            elif message_type == 'error':
+                container = message.get('container')
+                self.stream_error.emit(f"{container}: {message.get('message')}" if container else message.get('message', ''))
+            elif message_type == 'hello':
+                self._resync = True
+                self.agent_started.emit(message)
+        except Exception as e:
+            logging.error(f"Metrics agent: could not process {message_type} message: {str(e)}")
+
+    def stop(self):
+        """Stop the agent and do not reconnect."""
+        self._stopping.set()
+        if self.process and self.process.poll() is None:
+            try:
+                self.process.terminate()
+            except Exception as e:
+                logging.error(f"Error stopping metrics agent: {e}")
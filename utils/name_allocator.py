@@ -0,0 +1,180 @@
+"""Names and volumes of new node containers.
+
+Names follow the launcher's sequence: `r1node`, then `r1node1`, `r1node2`... with the
+volumes given by get_volume_name (`r1vol`, `r1vol1`...). The names in use are collected
+once, from one `docker ps -a` of the host and the launcher configuration, then new
+names are handed out from the next index after the highest one in use. Allocating N
+names costs N set lookups instead of docker calls for every candidate, and names are
+reserved as they are handed out, so a batch of new nodes never gets the same name twice.
+HostNameAllocators keeps one allocator per host, so reservations last across dialogs and
+the host is only listed again when its containers changed.
+
+Like the sequence it replaces, the allocator does not fill the gaps left by removed
+nodes: the volume of a removed node may still hold its identity.
+"""
+import os
+import heapq
+import logging
+import subprocess
+import threading
+from typing import Iterable, List, Optional, Tuple
+
+from utils.const import DOCKER_CONTAINER_NAME
+from utils.docker_utils import get_volume_name
+
+LIST_TIMEOUT = 20  # seconds, for the container listing
+LIST_COMMAND = ['ps', '-a', '--format', '{{.Names}}']  # after the docker command of the host
+
+
+def _name_index(name: str, prefix: str) -> Optional[int]:
+    """Index of a name of the sequence: 0 for the prefix alone, None for other names."""
+    if name == prefix:
+        return 0
+    suffix = name[len(prefix):] if name.startswith(prefix) else ''
+    return int(suffix) if suffix.isdigit() else None
+
+
+def list_container_names(docker_command: List[str] = None) -> List[str]:
+    """Names of every container of the host, running or not, in one call. Empty when docker
+    cannot be reached.
+    """
+    kwargs = {'creationflags': subprocess.CREATE_NO_WINDOW} if os.name == 'nt' else {}
+    try:
+        result = subprocess.run((docker_command or ['docker']) + LIST_COMMAND,
+                                capture_output=True, text=True, timeout=LIST_TIMEOUT, **kwargs)
+    except (OSError, subprocess.TimeoutExpired) as e:
+        logging.warning(f"Could not list the containers: {e}")
+        return []
+    if result.returncode != 0:
+        logging.warning(f"Could not list the containers: {result.stderr.strip()}")
+        return []
+    return parse_container_names(result.stdout)
+
+
+def parse_container_names(output: str) -> List[str]:
+    """Names of the output of LIST_COMMAND."""
+    return [name.strip() for name in output.splitlines() if name.strip()]
+
+
+class NameAllocator:
+    """Hands out (container name, volume name) pairs that are not used yet.
+
+    Args:
+        used_names: container names taken, in docker or in the configuration
+        used_volumes: volume names taken by the configured containers
+        prefix: start of every name of the sequence
+    """
+
+    def __init__(self, used_names: Iterable[str] = (), used_volumes: Iterable[str] = (),
+                 prefix: str = DOCKER_CONTAINER_NAME):
+        self.prefix = prefix
+        self._used_names = set(used_names)
+        self._used_volumes = {volume for volume in used_volumes if volume}
+        indexes = [_name_index(name, prefix) for name in self._used_names]
+        self._next_index = max((index for index in indexes if index is not None), default=-1) + 1
+        self._released = []  # heap of the indexes given back before being used
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_host(cls, config_names: Iterable[str] = (), config_volumes: Iterable[str] = (),
+                  docker_command: List[str] = None, prefix: str = DOCKER_CONTAINER_NAME) -> 'NameAllocator':
+        """Allocator for a host: its containers (one listing) plus the configured ones."""
+        used_names = set(config_names)
+        used_names.update(list_container_names(docker_command))
+        return cls(used_names, config_volumes, prefix)
+
+    def name_for(self, index: int) -> str:
+        return self.prefix if index == 0 else f"{self.prefix}{index}"
+
+    def _is_free(self, name: str, volume: str) -> bool:
+        return name not in self._used_names and volume not in self._used_volumes
+
+    def _take(self, index: int) -> Tuple[str, str]:
+        name = self.name_for(index)
+        volume = get_volume_name(name)
+        self._used_names.add(name)
+        self._used_volumes.add(volume)
+        return name, volume
+
+    def allocate(self) -> Tuple[str, str]:
+        """Reserve the next free (container name, volume name)."""
+        with self._lock:
+            while self._released:
+                index = heapq.heappop(self._released)
+                name = self.name_for(index)
+                if self._is_free(name, get_volume_name(name)):
+                    return self._take(index)
+            # Past the highest index in use, a name is only taken if marked used since
+            while not self._is_free(self.name_for(self._next_index), get_volume_name(self.name_for(self._next_index))):
+                self._next_index += 1
+            self._next_index += 1
+            return self._take(self._next_index - 1)
+
+    def reserve(self, count: int) -> List[Tuple[str, str]]:
+        """Reserve `count` (container name, volume name) pairs at once, for bulk node creation."""
+        return [self.allocate() for _ in range(max(0, count))]
+
+    def is_used(self, name: str) -> bool:
+        """Whether a name is in use or reserved."""
+        with self._lock:
+            return name in self._used_names
+
+    def release(self, name: str) -> None:
+        """Give back a reserved name whose container was not created, it is handed out again first."""
+        index = _name_index(name, self.prefix)
+        with self._lock:
+            if name not in self._used_names:
+                return
+            self._used_names.discard(name)
+            self._used_volumes.discard(get_volume_name(name))
+            if index is not None:
+                heapq.heappush(self._released, index)
+
+    def mark_used(self, name: str, volume: str = None) -> None:
+        """Record a container created without the allocator."""
+        with self._lock:
+            self._used_names.add(name)
+            if volume:
+                self._used_volumes.add(volume)
+            index = _name_index(name, self.prefix)
+            if index is not None and index >= self._next_index:
+                self._next_index = index + 1
+
+
+class HostNameAllocators:
+    """One NameAllocator per host, kept while it knows every configured container.
+
+    The allocator of a host is dropped when the configuration holds a container it does
+    not know (created by another launcher instance, or imported): the host must then be
+    listed again before names are handed out.
+    """
+
+    def __init__(self, prefix: str = DOCKER_CONTAINER_NAME):
+        self.prefix = prefix
+        self._allocators = {}
+        self._lock = threading.Lock()
+
+    def get(self, host: str, config_names: Iterable[str]) -> Optional[NameAllocator]:
+        """The allocator of a host, None when it must be built again from a listing."""
+        with self._lock:
+            allocator = self._allocators.get(host)
+            if allocator is not None and not all(allocator.is_used(name) for name in config_names):
+                del self._allocators[host]
+                allocator = None
+            return allocator
+
+    def build(self, host: str, host_names: Iterable[str], config_names: Iterable[str] = (),
+              config_volumes: Iterable[str] = ()) -> NameAllocator:
+        """Allocator for the names listed on a host plus the configured ones, kept for the host."""
+        allocator = NameAllocator(list(config_names) + list(host_names), config_volumes, self.prefix)
+        with self._lock:
+            self._allocators[host] = allocator
+        return allocator
+
+    def invalidate(self, host: str = None) -> None:
+        """Drop the allocator of a host, or of every host."""
+        with self._lock:
+            if host is None:
+                self._allocators.clear()
+            else:
+                self._allocators.pop(host, None)
@@ -0,0 +1,30 @@
+"""Helpers for the JSON config files of older launcher versions.
+
+The launcher state now lives in the SQLite state store (see utils.state_store), these
+files are only read to migrate them. Released launchers write them in place without any
+lock, so a file caught in the middle of a write fails to parse: the migration is then
+skipped and tried again on the next start.
+"""
+import os
+import json
+from typing import Any, Optional, Tuple
+
+
+def file_signature(path: str) -> Optional[Tuple[int, int]]:
+    """(mtime in ns, size) of a file, None if it does not exist."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def read_json(path: str) -> Tuple[Any, Optional[Tuple[int, int]]]:
+    """Read a JSON file.
+
+    Returns:
+        tuple: (data, signature of the file that was read)
+    """
+    signature = file_signature(path)
+    with open(path, 'r') as f:
+        return json.load(f), signature
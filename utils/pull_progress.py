@@ -0,0 +1,284 @@
+"""Parser of the `docker pull` output.
+
+A pull prints thousands of lines (one per layer and status change, and progress lines
+when attached to a terminal). The parser matches each line against one precompiled
+pattern, keeps the state of every layer in a plain dict and records which layers changed,
+so the UI can apply the changes at its own pace instead of once per line.
+
+The progress objects of the Engine API (utils.docker_api) go through `feed_event()`
+instead: they carry the exact bytes of each layer, from which the throughput and the
+ETA of every layer and of the whole pull are derived.
+"""
+import re
+import time
+from collections import deque
+from typing import Dict, Optional
+
+# `<layer id>: <status>`, layer ids are short (12 hex) or full digests
+_LAYER_RE = re.compile(r'(sha256:[0-9a-f]{64}|[0-9a-f]{12}): (.*)')
+# `Downloading [=====>    ]  12.3MB/45.6MB`
+_BYTES_RE = re.compile(r'([\d.]+)\s*([kMG]?B)/([\d.]+)\s*([kMG]?B)')
+_PERCENT_RE = re.compile(r'(\d{1,3})%')
+
+_UNITS = {'B': 1, 'kB': 1e3, 'MB': 1e6, 'GB': 1e9}
+
+# Share of a layer's progress done when its download is over, the rest is the extraction
+DOWNLOAD_SHARE = 80
+
+# Throughput is measured over the last RATE_WINDOW seconds
+RATE_WINDOW = 5.0
+
+# Status prefixes -> (phase, progress of the layer); None: computed from the bytes
+_STATUSES = (
+    ('Pulling fs layer', 'waiting', 0),
+    ('Waiting', 'waiting', 0),
+    ('Downloading', 'downloading', None),
+    ('Verifying Checksum', 'downloaded', DOWNLOAD_SHARE),
+    ('Download complete', 'downloaded', DOWNLOAD_SHARE),
+    ('Extracting', 'extracting', None),
+    ('Pull complete', 'done', 100),
+    ('Already exists', 'done', 100),
+)
+
+
+class PullProgressParser:
+    """State of a docker pull, fed line by line.
+
+    `layers` maps a layer id to a dict with the keys `status` (last status text), `phase`,
+    `progress` (0-100), `current` and `total` (bytes, when the output reports them), and
+    with Engine API events `rate` (bytes per second) and `eta` (seconds).
+    """
+
+    def __init__(self):
+        self.layers: Dict[str, dict] = {}
+        self.message = ''  # last line that is not about a layer ("Pulling from ...", "Digest: ...")
+        self.lines = 0
+        self._changed = set()
+        self._message_changed = False
+        self._samples = deque()  # (time, downloaded bytes) of the last RATE_WINDOW seconds
+
+    def feed(self, line: str) -> bool:
+        """Parse one output line. Returns True when it changed the state."""
+        self.lines += 1
+        line = line.strip()
+        if not line:
+            return False
+        match = _LAYER_RE.match(line)
+        if match is None:
+            if line != self.message:
+                self.message = line
+                self._message_changed = True
+                return True
+            return False
+        layer_id, status = match.group(1), match.group(2)
+        layer = self.layers.get(layer_id)
+        if layer is None:
+            layer = self._new_layer(layer_id)
+        if layer['status'] == status:
+            return False
+        layer['status'] = status
+        self._apply_status(layer, status)
+        self._changed.add(layer_id)
+        return True
+
+    def _new_layer(self, layer_id: str) -> dict:
+        layer = self.layers[layer_id] = {
+            'status': '', 'phase': 'waiting', 'progress': 0, 'current': None, 'total': None,
+            'rate': None, 'eta': None, 'sample': None,
+        }
+        return layer
+
+    def feed_event(self, event: dict, now: float = None) -> bool:
+        """Apply one progress object of the Engine API `/images/create` stream.
+
+        Returns True when it changed the state.
+        """
+        status = event.get('status') or ''
+        layer_id = event.get('id')
+        if not layer_id or status.startswith('Pulling from'):  # the id of this one is the tag
+            if status and status != self.message:
+                self.message = f"{layer_id}: {status}" if layer_id else status
+                self._message_changed = True
+                return True
+            return False
+        now = time.monotonic() if now is None else now
+        layer = self.layers.get(layer_id) or self._new_layer(layer_id)
+        detail = event.get('progressDetail') or {}
+        current, total = detail.get('current'), detail.get('total')
+        for prefix, phase, progress in _STATUSES:
+            if status.startswith(prefix):
+                break
+        else:
+            phase, progress = layer['phase'], layer['progress']
+        layer['phase'] = phase
+        if phase == 'downloading' and current is not None and total:
+            self._update_rate(layer, current, now)
+            layer['current'], layer['total'] = current, total
+            progress = int(min(1.0, current / total) * DOWNLOAD_SHARE)
+        elif phase == 'extracting' and current is not None and total:
+            progress = DOWNLOAD_SHARE + int(min(1.0, current / total) * (100 - DOWNLOAD_SHARE))
+        elif progress is None:
+            progress = layer['progress']
+        if phase in ('downloaded', 'extracting', 'done'):
+            if layer['total']:
+                layer['current'] = layer['total']
+            layer['rate'], layer['eta'] = None, None
+        layer['progress'] = max(layer['progress'], progress)
+        layer['status'] = self._format_status(status, layer)
+        self._changed.add(layer_id)
+        if phase in ('downloading', 'downloaded'):
+            self._record_download(now)
+        return True
+
+    @staticmethod
+    def _update_rate(layer: dict, current: int, now: float) -> None:
+        # Per layer: rate between two updates, smoothed
+        sample = layer['sample']
+        if sample is not None and now > sample[0] and current >= sample[1]:
+            rate = (current - sample[1]) / (now - sample[0])
+            layer['rate'] = rate if layer['rate'] is None else 0.3 * rate + 0.7 * layer['rate']
+        layer['sample'] = (now, current)
+        if layer['rate'] and layer['total']:
+            layer['eta'] = max(0.0, (layer['total'] - current) / layer['rate'])
+
+    def _record_download(self, now: float) -> None:
+        downloaded = self.downloaded_bytes()
+        if downloaded is None:
+            return
+        samples = self._samples
+        samples.append((now, downloaded[0]))
+        while len(samples) > 2 and now - samples[1][0] >= RATE_WINDOW:
+            samples.popleft()
+
+    @staticmethod
+    def _format_status(status: str, layer: dict) -> str:
+        if layer['phase'] != 'downloading' or not layer['total']:
+            return status
+        text = f"{status} {format_bytes(layer['current'])}/{format_bytes(layer['total'])}"
+        if layer['rate']:
+            text += f" {format_bytes(layer['rate'])}/s"
+        if layer['eta'] is not None:
+            text += f" ETA {format_duration(layer['eta'])}"
+        return text
+
+    def rate(self) -> Optional[float]:
+        """Overall download throughput in bytes per second, over the last RATE_WINDOW seconds."""
+        samples = self._samples
+        if len(samples) < 2 or samples[-1][0] <= samples[0][0]:
+            return None
+        return max(0.0, (samples[-1][1] - samples[0][1]) / (samples[-1][0] - samples[0][0]))
+
+    def eta(self) -> Optional[float]:
+        """Seconds left to download the layers whose size is known, None while unknown."""
+        downloaded, rate = self.downloaded_bytes(), self.rate()
+        if downloaded is None or not rate:
+            return None
+        return max(0.0, (downloaded[1] - downloaded[0]) / rate)
+
+    def summary(self) -> str:
+        """`12.3 MB / 45.6 MB, 3.2 MB/s, ETA 0:10` when the sizes are known, '' otherwise."""
+        downloaded = self.downloaded_bytes()
+        if downloaded is None:
+            return ''
+        text = f"{format_bytes(downloaded[0])} / {format_bytes(downloaded[1])}"
+        rate, eta = self.rate(), self.eta()
+        if rate:
+            text += f", {format_bytes(rate)}/s"
+        if eta is not None and downloaded[0] < downloaded[1]:
+            text += f", ETA {format_duration(eta)}"
+        return text
+
+    @staticmethod
+    def _apply_status(layer: dict, status: str) -> None:
+        for prefix, phase, progress in _STATUSES:
+            if status.startswith(prefix):
+                break
+        else:
+            return  # unknown status, only its text is shown
+        layer['phase'] = phase
+        if progress is None:
+            fraction = None
+            match = _BYTES_RE.search(status)
+            if match is not None:
+                current = float(match.group(1)) * _UNITS[match.group(2)]
+                total = float(match.group(3)) * _UNITS[match.group(4)]
+                if phase == 'downloading':
+                    layer['current'], layer['total'] = current, total
+                if total > 0:
+                    fraction = min(1.0, current / total)
+            else:
+                match = _PERCENT_RE.search(status)
+                if match is not None:
+                    fraction = min(100, int(match.group(1))) / 100
+            if fraction is None:
+                return
+            if phase == 'downloading':
+                progress = int(fraction * DOWNLOAD_SHARE)
+            else:
+                progress = DOWNLOAD_SHARE + int(fraction * (100 - DOWNLOAD_SHARE))
+        layer['progress'] = max(layer['progress'], progress)
+
+    def take_changes(self) -> tuple:
+        """Layers changed since the last call, and whether `message` changed.
+
+        Returns:
+            tuple: (list of layer ids, in order of appearance, message changed)
+        """
+        changed = [layer_id for layer_id in self.layers if layer_id in self._changed]
+        message_changed = self._message_changed
+        self._changed.clear()
+        self._message_changed = False
+        return changed, message_changed
+
+    @property
+    def total_layers(self) -> int:
+        return len(self.layers)
+
+    @property
+    def pulled_layers(self) -> int:
+        return sum(1 for layer in self.layers.values() if layer['phase'] == 'done')
+
+    def overall_progress(self) -> int:
+        """Progress of the whole pull, 0-100. 100 once the image is up to date."""
+        if not self.layers:
+            return 100 if 'Image is up to date' in self.message else 0
+        return int(sum(layer['progress'] for layer in self.layers.values()) / len(self.layers))
+
+    def downloaded_bytes(self) -> Optional[tuple]:
+        """(downloaded, total) bytes of the layers whose size is known, None if none is."""
+        sized = [layer for layer in self.layers.values() if layer['total']]
+        if not sized:
+            return None
+        current = sum(layer['total'] if layer['phase'] in ('downloaded', 'extracting', 'done') else layer['current']
+                      for layer in sized)
+        return current, sum(layer['total'] for layer in sized)
+
+
+def format_bytes(size: float) -> str:
+    for unit in ('B', 'kB', 'MB'):
+        if size < 1000:
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1000
+    return f"{size:.2f} GB"
+
+
+def format_duration(seconds: float) -> str:
+    seconds = int(round(seconds))
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+
+
+class Throttle:
+    """Lets an action through at most `rate` times per second."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate
+        self._last = -float('inf')
+
+    def ready(self) -> bool:
+        now = time.monotonic()
+        if now - self._last >= self.interval:
+            self._last = now
+            return True
+        return False
@@ -0,0 +1,160 @@
+"""Graceful shutdown of several node containers at once.
+
+`docker stop -t N` sends SIGTERM, gives the node N seconds to save its state, then
+kills it. Every container is stopped from its own worker, so the shutdown of a host
+takes as long as its slowest node instead of the sum of all of them, and each node
+gets its own grace period.
+
+The end of a container is not guessed with a sleep: a `docker wait` started before the
+stop returns as soon as the container has exited, with its exit code, which also tells
+whether the node was killed at the end of its grace period.
+"""
+import os
+import time
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from typing import Callable, Dict, List, Optional, Tuple
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from utils.const import SHUTDOWN_GRACE_PERIOD
+
+MAX_SHUTDOWN_WORKERS = 16  # containers stopped at the same time
+COMMAND_TIMEOUT = 30  # seconds for a docker command, on top of the grace period for `docker stop`
+KILLED_EXIT_CODE = 137  # 128 + SIGKILL
+
+
+@dataclass
+class ContainerShutdown:
+    container: str
+    grace_period: int
+    phase: str = 'pending'  # pending, stopping, stopped, removed, not_running, failed
+    exit_code: Optional[int] = None
+    error: str = ''
+    duration: float = 0.0  # seconds from the stop request to the exit of the container
+
+    @property
+    def done(self) -> bool:
+        return self.phase in ('stopped', 'removed', 'not_running', 'failed')
+
+    @property
+    def killed(self) -> bool:
+        """The node did not exit within its grace period."""
+        return self.exit_code == KILLED_EXIT_CODE
+
+
+def _popen_kwargs() -> dict:
+    return {'creationflags': subprocess.CREATE_NO_WINDOW} if os.name == 'nt' else {}
+
+
+class ShutdownCoordinator:
+    """Stops a set of containers of one host concurrently.
+
+    Args:
+        docker_command: how docker is run on the host, e.g. an ssh prefix + ['docker']
+        remove: also remove each container once it has exited
+        on_update: called with a copy of a container's state whenever its phase changes,
+            from a worker thread
+    """
+
+    def __init__(self, docker_command: List[str] = None, remove: bool = False,
+                 on_update: Callable[[ContainerShutdown], None] = None,
+                 max_workers: int = MAX_SHUTDOWN_WORKERS):
+        self.docker_command = docker_command or ['docker']
+        self.remove = remove
+        self.on_update = on_update
+        self.max_workers = max_workers
+
+    def shutdown(self, grace_periods: Dict[str, Optional[int]]) -> Dict[str, ContainerShutdown]:
+        """Stop every container, given as {name: grace period in seconds, None for the default}.
+        Never raises, the outcome of each container is in its phase.
+        """
+        states = {name: ContainerShutdown(name, SHUTDOWN_GRACE_PERIOD if grace is None else max(0, int(grace)))
+                  for name, grace in grace_periods.items()}
+        if not states:
+            return states
+        stdout, stderr, return_code = self._execute(['ps', '--format', '{{.Names}}'])
+        if return_code != 0:
+            for state in states.values():
+                state.phase, state.error = 'failed', f"Failed to list containers: {stderr.strip()}"
+                self._report(state)
+            return states
+        running = set(stdout.split())
+
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(states))),
+                                thread_name_prefix="Shutdown") as executor:
+            for state in states.values():
+                executor.submit(self._shutdown_one, state, state.container in running)
+        return states
+
+    def _report(self, state: ContainerShutdown) -> None:
+        if self.on_update is not None:
+            self.on_update(replace(state))
+
+    def _execute(self, args: List[str], timeout: float = COMMAND_TIMEOUT) -> Tuple[str, str, int]:
+        try:
+            result = subprocess.run(self.docker_command + args, capture_output=True, text=True, timeout=timeout,
+                                    **_popen_kwargs())
+        except subprocess.TimeoutExpired:
+            return '', f"Command timed out after {timeout} seconds: docker {' '.join(args)}", -1
+        except OSError as e:
+            return '', str(e), -1
+        return result.stdout, result.stderr, result.returncode
+
+    def _shutdown_one(self, state: ContainerShutdown, running: bool) -> None:
+        try:
+            if running:
+                self._stop(state)
+            else:
+                state.phase = 'not_running'
+            if self.remove and state.phase in ('stopped', 'not_running'):
+                _, stderr, return_code = self._execute(['rm', state.container])
+                if return_code == 0:
+                    state.phase = 'removed'
+                elif 'no such container' not in stderr.lower():
+                    state.phase, state.error = 'failed', f"Failed to remove: {stderr.strip()}"
+        except Exception as e:
+            state.phase, state.error = 'failed', f"Error: {str(e)}"
+        self._report(state)
+
+    def _stop(self, state: ContainerShutdown) -> None:
+        state.phase = 'stopping'
+        self._report(state)
+        start = time.monotonic()
+        # Returns when the container exits, whatever stopped it, with its exit code
+        waiter = subprocess.Popen(self.docker_command + ['wait', state.container], stdout=subprocess.PIPE,
+                                  stderr=subprocess.PIPE, text=True, **_popen_kwargs())
+        try:
+            _, stderr, return_code = self._execute(['stop', '-t', str(state.grace_period), state.container],
+                                                   state.grace_period + COMMAND_TIMEOUT)
+            if return_code != 0 and 'no such container' not in stderr.lower():
+                state.phase, state.error = 'failed', f"Failed to stop: {stderr.strip()}"
+                return
+            stdout, _ = waiter.communicate(timeout=COMMAND_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            state.phase, state.error = 'failed', "The container did not report its exit"
+            return
+        finally:
+            if waiter.poll() is None:
+                waiter.kill()
+                waiter.communicate()
+        state.duration = time.monotonic() - start
+        state.exit_code = int(stdout.strip()) if stdout.strip().lstrip('-').isdigit() else None
+        state.phase = 'stopped'
+
+
+class ShutdownThread(QThread):
+    """Runs a ShutdownCoordinator off the GUI thread."""
+
+    container_updated = pyqtSignal(object)  # ContainerShutdown
+    shutdown_finished = pyqtSignal(object)  # {name: ContainerShutdown}
+
+    def __init__(self, grace_periods: Dict[str, Optional[int]], docker_command: List[str] = None,
+                 remove: bool = False):
+        super().__init__()
+        self.grace_periods = grace_periods
+        self.coordinator = ShutdownCoordinator(docker_command, remove, self.container_updated.emit)
+
+    def run(self):
+        self.shutdown_finished.emit(self.coordinator.shutdown(self.grace_periods))
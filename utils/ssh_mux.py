@@ -0,0 +1,235 @@
+"""Persistent, multiplexed SSH connections to the remote hosts.
+
+Every remote docker command runs as `ssh <options> user@host docker ...`. Without
+multiplexing each of them opens a new TCP connection and does a full key exchange and
+authentication, which costs seconds per refresh. With OpenSSH connection sharing the
+master connection to a host listens on a control socket, and commands reuse it: they
+only open a new channel on the existing connection.
+
+- Masters are only started by `ensure()`, in the background with their descriptors
+  detached. Commands run with ControlMaster=no: they use a live master but never become
+  one, a command that did would keep its captured output open for as long as the master
+  lives. Without a master, they connect directly.
+
+- ControlPersist keeps an idle master alive for CONTROL_PERSIST seconds, after which it
+  exits on its own.
+- ServerAlive probes tear down a master whose connection died, commands then connect
+  directly until `ensure()` starts a new one (a stale socket is replaced by it).
+- `check()` asks the master whether it is alive without touching the network, and
+  `ensure()` starts a master when there is none.
+- The masters started by the launcher are closed when it exits.
+
+Windows builds of OpenSSH do not support connection sharing, commands are left as is there.
+"""
+import os
+import atexit
+import hashlib
+import logging
+import subprocess
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Idle time after which a master connection exits
+CONTROL_PERSIST = 600  # seconds
+# A master whose connection misses SERVER_ALIVE_COUNT probes sent every
+# SERVER_ALIVE_INTERVAL seconds is closed
+SERVER_ALIVE_INTERVAL = 15  # seconds
+SERVER_ALIVE_COUNT = 3
+CONNECT_TIMEOUT = 10  # seconds
+# Short directory: unix socket paths are limited to ~100 characters
+CONTROL_DIR = os.path.join(str(Path.home()), ".ratio1", "cm")
+
+_MUX_OPTION_KEYS = ('controlmaster', 'controlpath', 'controlpersist')
+
+
+def _option_keys(ssh_command: List[str]) -> set:
+    keys = set()
+    for i, arg in enumerate(ssh_command):
+        if arg == '-o' and i + 1 < len(ssh_command):
+            keys.add(ssh_command[i + 1].split('=', 1)[0].strip().lower())
+        elif arg.startswith('-o') and len(arg) > 2:
+            keys.add(arg[2:].split('=', 1)[0].strip().lower())
+    return keys
+
+
+class SSHMultiplexer:
+    """Adds connection sharing options to ssh commands and manages the master connections.
+
+    Commands are lists as built from `AnsibleHostsManager.get_ssh_command()`: `ssh`, the
+    options, then the destination (`user@host`) last.
+    """
+
+    def __init__(self, control_dir: str = CONTROL_DIR, control_persist: int = CONTROL_PERSIST):
+        self.control_dir = control_dir
+        self.control_persist = control_persist
+        self.enabled = os.name != 'nt'
+        self._masters: Dict[str, List[str]] = {}  # control path -> wrapped command using it
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def control_path(self, ssh_command: List[str]) -> str:
+        """Control socket of a command, one per destination and connection options."""
+        key = hashlib.sha1("\0".join(ssh_command).encode()).hexdigest()[:16]
+        return os.path.join(self.control_dir, key)
+
+    def is_multiplexed(self, ssh_command: Optional[List[str]]) -> bool:
+        return bool(ssh_command) and 'controlpath' in _option_keys(ssh_command)
+
+    def wrap(self, ssh_command: Optional[List[str]]) -> Optional[List[str]]:
+        """Return the ssh command with the connection sharing options added.
+
+        The command uses the master of its host when `ensure()` started one, and connects
+        directly otherwise.
+
+        Commands that already configure connection sharing, or that are not ssh commands,
+        are returned unchanged.
+        """
+        if not self.enabled or not ssh_command or os.path.basename(ssh_command[0]) != 'ssh':
+            return ssh_command
+        if _option_keys(ssh_command) & set(_MUX_OPTION_KEYS) or '-S' in ssh_command:
+            return ssh_command
+        control_path = self.control_path(ssh_command)
+        os.makedirs(self.control_dir, mode=0o700, exist_ok=True)
+        wrapped = ssh_command[:1] + [
+            '-o', 'ControlMaster=no',
+            '-o', f'ControlPath={control_path}',
+            '-o', f'ControlPersist={self.control_persist}',
+            '-o', f'ServerAliveInterval={SERVER_ALIVE_INTERVAL}',
+            '-o', f'ServerAliveCountMax={SERVER_ALIVE_COUNT}',
+        ] + ssh_command[1:]
+        with self._lock:
+            self._masters.setdefault(control_path, wrapped)
+        return wrapped
+
+    def _control(self, ssh_command: List[str], operation: str, timeout: float = 5) -> bool:
+        """Send a control command (check / exit) to the master of a wrapped command."""
+        command = ssh_command[:-1] + ['-O', operation, ssh_command[-1]]
+        try:
+            result = subprocess.run(command, capture_output=True, text=True, timeout=timeout)
+            return result.returncode == 0
+        except (subprocess.TimeoutExpired, OSError):
+            return False
+
+    def check(self, ssh_command: List[str]) -> bool:
+        """Whether a live master serves this (wrapped) command. Local, takes milliseconds."""
+        if not self.is_multiplexed(ssh_command):
+            return False
+        control_path = self.control_path_of(ssh_command)
+        if control_path and not os.path.exists(control_path):
+            return False  # no master was ever started, or it exited
+        return self._control(ssh_command, 'check')
+
+    def ensure(self, ssh_command: List[str], timeout: float = CONNECT_TIMEOUT) -> bool:
+        """Make sure a master connection is up, starting it if needed.
+
+        Concurrent callers for the same host wait for a single connection attempt.
+        Returns True when the host can be reached through the master.
+        """
+        if not self.is_multiplexed(ssh_command):
+            return False
+        control_path = self.control_path_of(ssh_command)
+        with self._lock:
+            lock = self._locks.setdefault(control_path, threading.Lock())
+        with lock:
+            if self.check(ssh_command):
+                return True
+            # -f -N: authenticate, then leave the master running in the background
+            command = _with_option(ssh_command, 'ControlMaster', 'auto')
+            command = command[:-1] + [
+                '-o', 'BatchMode=yes', '-o', f'ConnectTimeout={max(1, int(timeout))}', '-f', '-N', ssh_command[-1]
+            ]
+            # The master keeps the inherited descriptors open: no pipes, or waiting on
+            # them would last as long as the master
+            with tempfile.TemporaryFile(mode='w+') as stderr:
+                try:
+                    result = subprocess.run(
+                        command, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=stderr,
+                        timeout=timeout + 5
+                    )
+                except (subprocess.TimeoutExpired, OSError) as e:
+                    logging.warning(f"Could not open SSH master connection to {ssh_command[-1]}: {str(e)}")
+                    return False
+                if result.returncode != 0:
+                    stderr.seek(0)
+                    logging.warning(
+                        f"Could not open SSH master connection to {ssh_command[-1]}: {stderr.read().strip()}"
+                    )
+                    return False
+            return True
+
+    def ensure_async(self, ssh_command: List[str]) -> None:
+        """Start the master connection in the background, so the first command finds it up."""
+        if self.is_multiplexed(ssh_command):
+            threading.Thread(target=self.ensure, args=(ssh_command,), daemon=True,
+                             name=f"SSHMaster-{ssh_command[-1]}").start()
+
+    def close(self, ssh_command: List[str]) -> bool:
+        """Close the master connection of a (wrapped) command."""
+        if not self.is_multiplexed(ssh_command):
+            return False
+        return self._control(ssh_command, 'exit')
+
+    def close_all(self) -> None:
+        """Close every master connection opened through this multiplexer."""
+        with self._lock:
+            masters = list(self._masters.values())
+            self._masters.clear()
+        for ssh_command in masters:
+            control_path = self.control_path_of(ssh_command)
+            if control_path and os.path.exists(control_path):
+                self._control(ssh_command, 'exit', timeout=2)
+
+    @staticmethod
+    def control_path_of(ssh_command: List[str]) -> Optional[str]:
+        for i, arg in enumerate(ssh_command):
+            if arg == '-o' and i + 1 < len(ssh_command) and ssh_command[i + 1].lower().startswith('controlpath='):
+                return ssh_command[i + 1].split('=', 1)[1]
+        return None
+
+
+_multiplexer = None
+_multiplexer_lock = threading.Lock()
+
+
+def get_ssh_multiplexer() -> SSHMultiplexer:
+    """The SSHMultiplexer shared by every component of the launcher."""
+    global _multiplexer
+    with _multiplexer_lock:
+        if _multiplexer is None:
+            _multiplexer = SSHMultiplexer()
+            atexit.register(_multiplexer.close_all)
+        return _multiplexer
+
+
+def multiplexed(ssh_command: Optional[List[str]]) -> Optional[List[str]]:
+    """Shortcut for `get_ssh_multiplexer().wrap(ssh_command)`."""
+    return get_ssh_multiplexer().wrap(ssh_command)
+
+
+def _with_option(ssh_command: List[str], key: str, value: str) -> List[str]:
+    """The command with the `-o key=value` ssh option set.
+
+    ssh keeps the first value given for an option, so an existing value is replaced
+    rather than overridden.
+    """
+    prefix = key.lower() + '='
+    command = []
+    skip = False
+    for i, arg in enumerate(ssh_command):
+        if skip:
+            skip = False
+            continue
+        if arg == '-o' and i + 1 < len(ssh_command) and ssh_command[i + 1].lower().startswith(prefix):
+            skip = True
+            continue
+        if arg.lower().startswith('-o' + prefix):
+            continue
+        command.append(arg)
+    return command[:1] + ['-o', f'{key}={value}'] + command[1:]
+
+
+def without_master(ssh_command: List[str]) -> List[str]:
+    """The command with ControlMaster=no: it uses a live master but never starts one."""
+    return _with_option(ssh_command, 'ControlMaster', 'no')
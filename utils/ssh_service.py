@@ -2,6 +2,8 @@ import subprocess
 from typing import List, Tuple, Optional
 from dataclasses import dataclass
 
+from .ssh_mux import get_ssh_multiplexer, multiplexed
+
 @dataclass
 class SSHConfig:
     host: str
@@ -27,7 +29,8 @@ class SSHService:
             cmd.extend(['-i', config.private_key])
             
         cmd.extend([f'{config.user}@{config.host}'])
-        self.ssh_command = cmd
+        # Share one persistent connection between the commands sent to the host
+        self.ssh_command = multiplexed(cmd)
 
     def clear_configuration(self) -> None:
         """Clear SSH configuration."""
@@ -85,8 +88,11 @@ class SSHService:
         Returns:
             True if connection successful, False otherwise
         """
+        if get_ssh_multiplexer().check(self.ssh_command):
+            return True
         try:
-            cmd = self.ssh_command + ['-o', f'ConnectTimeout={timeout}', 'exit']
+            # Options go before the destination, anything after it is the remote command
+            cmd = self.ssh_command[:-1] + ['-o', f'ConnectTimeout={timeout}', self.ssh_command[-1], 'exit']
             process = subprocess.run(cmd, capture_output=True, timeout=timeout)
             return process.returncode == 0
         except (subprocess.TimeoutExpired, subprocess.CalledProcessError):
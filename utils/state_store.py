@@ -0,0 +1,595 @@
+"""Embedded SQLite store for the launcher state.
+
+A single database (`state.db` in the launcher config directory) holds the container
+configurations, the settings, the container registry, the last node info of every
+container and its metric samples. It replaces the JSON files, which are migrated once
+when the store first sees them (the files are left in place for older launchers).
+
+- The database runs in WAL mode with synchronous=NORMAL: readers never block the writer
+  and a commit does not wait for an fsync, so writing from the GUI thread is cheap.
+- SQLite provides what the atomic JSON writer and its lock file used to:
+  - a transaction is applied whole or not at all, a crash never leaves a partial write
+    (a power loss can drop the last commits, never corrupt the database);
+  - its file locks serialize writers across launcher instances, BEGIN IMMEDIATE takes
+    the write lock up front and busy_timeout waits for it, readers are never blocked;
+  - `table_version()` detects changes made by other instances without reading the
+    tables again.
+- Every statement is a module constant with parameters, so sqlite3 reuses the prepared
+  statement from its per-connection cache instead of compiling the SQL again.
+- Lookups go through primary keys or indexes; metric samples are keyed by
+  (container, timestamp) so the tail of a container's history is a range scan.
+- Writers group their statements with `transaction()`, a refresh is one commit.
+- `submit()` runs a write on the store writer thread, so the GUI thread never waits for
+  a commit; pending writes are finished when the store is closed.
+- `submit_coalesced()` queues small mutations (config and settings changes) under a key:
+  the writes queued within COALESCE_DELAY are committed together, and a value changed
+  several times in that window is only written once.
+"""
+import os
+import json
+import math
+import atexit
+import logging
+import sqlite3
+import threading
+import time
+from array import array
+from bisect import bisect_right
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from utils.const import CONFIG_DIR
+from utils.persistence import read_json
+
+STATE_DB_NAME = "state.db"
+SCHEMA_VERSION = 1
+# Metric samples older than this are deleted when new samples are recorded
+METRICS_RETENTION = 7 * 24 * 3600  # seconds
+# Coalesced writes wait this long for more writes to commit with
+COALESCE_DELAY = 0.1  # seconds
+
+CONTAINER_FIELDS = ('name', 'volume', 'created_at', 'last_used', 'node_address', 'eth_address', 'node_alias')
+REGISTRY_FIELDS = ('container_name', 'volume_name', 'created_at', 'last_used')
+METRIC_FIELDS = (
+    'cpu_load', 'cpu_temp', 'occupied_memory', 'total_memory',
+    'gpu_load', 'gpu_occupied_memory', 'gpu_temp', 'gpu_total_memory',
+)
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS containers (
+    name TEXT NOT NULL UNIQUE,
+    volume TEXT,
+    created_at TEXT,
+    last_used TEXT,
+    node_address TEXT,
+    eth_address TEXT,
+    node_alias TEXT
+);
+CREATE INDEX IF NOT EXISTS containers_volume ON containers (volume);
+CREATE INDEX IF NOT EXISTS containers_node_address ON containers (node_address);
+
+CREATE TABLE IF NOT EXISTS settings (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS registry (
+    container_name TEXT PRIMARY KEY,
+    volume_name TEXT,
+    created_at TEXT,
+    last_used TEXT
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS node_info (
+    container TEXT PRIMARY KEY,
+    address TEXT,
+    alias TEXT,
+    eth_address TEXT,
+    version_long TEXT,
+    version_short TEXT,
+    whitelist TEXT,
+    updated_at REAL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS node_info_address ON node_info (address);
+
+CREATE TABLE IF NOT EXISTS metric_samples (
+    container TEXT NOT NULL,
+    ts REAL NOT NULL,
+    {', '.join(f'{field} REAL' for field in METRIC_FIELDS)},
+    PRIMARY KEY (container, ts)
+) WITHOUT ROWID;
+"""
+
+# Tables whose changes are counted in meta ('version:<table>'), see StateStore.table_version()
+VERSIONED_TABLES = ('containers', 'settings', 'registry')
+
+_SCHEMA += "".join(
+    f"""
+INSERT OR IGNORE INTO meta (key, value) VALUES ('version:{table}', 0);
+CREATE TRIGGER IF NOT EXISTS {table}_{event.lower()}_version AFTER {event} ON {table}
+BEGIN
+    UPDATE meta SET value = value + 1 WHERE key = 'version:{table}';
+END;
+"""
+    for table in VERSIONED_TABLES
+    for event in ('INSERT', 'UPDATE', 'DELETE')
+)
+
+_SQL_GET_META = "SELECT value FROM meta WHERE key = ?"
+_SQL_TABLE_VERSIONS = "SELECT key, value FROM meta WHERE key >= 'version:' AND key < 'version;'"
+_SQL_SET_META = "INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value"
+
+_SQL_LOAD_CONTAINERS = f"SELECT {', '.join(CONTAINER_FIELDS)} FROM containers ORDER BY rowid"
+_SQL_CONTAINER_NAMES = "SELECT name FROM containers ORDER BY rowid"
+_SQL_UPSERT_CONTAINER = (
+    f"INSERT INTO containers ({', '.join(CONTAINER_FIELDS)}) VALUES ({', '.join('?' * len(CONTAINER_FIELDS))}) "
+    f"ON CONFLICT(name) DO UPDATE SET "
+    + ", ".join(f"{field} = excluded.{field}" for field in CONTAINER_FIELDS[1:])
+)
+_SQL_INSERT_CONTAINER_IF_MISSING = (
+    f"INSERT OR IGNORE INTO containers ({', '.join(CONTAINER_FIELDS)}) "
+    f"VALUES ({', '.join('?' * len(CONTAINER_FIELDS))})"
+)
+_SQL_DELETE_CONTAINER = "DELETE FROM containers WHERE name = ?"
+_SQL_DELETE_ALL_CONTAINERS = "DELETE FROM containers"
+
+_SQL_LOAD_SETTINGS = "SELECT key, value FROM settings"
+_SQL_GET_SETTING = "SELECT value FROM settings WHERE key = ?"
+_SQL_SET_SETTING = (
+    "INSERT INTO settings (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value"
+)
+_SQL_SET_SETTING_IF_MISSING = "INSERT OR IGNORE INTO settings (key, value) VALUES (?, ?)"
+_SQL_DELETE_ALL_SETTINGS = "DELETE FROM settings"
+
+_SQL_LOAD_REGISTRY = f"SELECT {', '.join(REGISTRY_FIELDS)} FROM registry"
+_SQL_UPSERT_REGISTRY = (
+    f"INSERT INTO registry ({', '.join(REGISTRY_FIELDS)}) VALUES ({', '.join('?' * len(REGISTRY_FIELDS))}) "
+    f"ON CONFLICT(container_name) DO UPDATE SET "
+    + ", ".join(f"{field} = excluded.{field}" for field in REGISTRY_FIELDS[1:])
+)
+_SQL_INSERT_REGISTRY_IF_MISSING = (
+    f"INSERT OR IGNORE INTO registry ({', '.join(REGISTRY_FIELDS)}) "
+    f"VALUES ({', '.join('?' * len(REGISTRY_FIELDS))})"
+)
+_SQL_DELETE_REGISTRY = "DELETE FROM registry WHERE container_name = ?"
+
+_SQL_UPSERT_NODE_INFO = (
+    "INSERT INTO node_info (container, address, alias, eth_address, version_long, version_short, whitelist, updated_at) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT(container) DO UPDATE SET address = excluded.address, alias = excluded.alias, "
+    "eth_address = excluded.eth_address, version_long = excluded.version_long, "
+    "version_short = excluded.version_short, whitelist = excluded.whitelist, updated_at = excluded.updated_at"
+)
+_SQL_GET_NODE_INFO = (
+    "SELECT address, alias, eth_address, version_long, version_short, whitelist, updated_at "
+    "FROM node_info WHERE container = ?"
+)
+
+_SQL_LAST_SAMPLE = "SELECT MAX(ts) FROM metric_samples WHERE container = ?"
+_SQL_INSERT_SAMPLE = (
+    f"INSERT OR IGNORE INTO metric_samples (container, ts, {', '.join(METRIC_FIELDS)}) "
+    f"VALUES (?, ?, {', '.join('?' * len(METRIC_FIELDS))})"
+)
+_SQL_LOAD_SAMPLES = (
+    f"SELECT ts, {', '.join(METRIC_FIELDS)} FROM metric_samples WHERE container = ? AND ts > ? ORDER BY ts"
+)
+_SQL_PRUNE_SAMPLES = "DELETE FROM metric_samples WHERE container = ? AND ts < ?"
+
+
+@dataclass(slots=True)
+class MetricSamples:
+    """Stored metric samples of a container, laid out like the NodeHistory series.
+
+    Missing values are NaN; a GPU series is None when the container never reported it.
+    """
+    timestamps: array
+    cpu_load: array
+    cpu_temp: array
+    occupied_memory: array
+    total_memory: array
+    gpu_load: Optional[array]
+    gpu_occupied_memory: Optional[array]
+    gpu_temp: Optional[array]
+    gpu_total_memory: Optional[array]
+
+
+def _log_write_error(future: Future) -> None:
+    if not future.cancelled() and future.exception() is not None:
+        logging.error(f"State store write failed: {future.exception()}")
+
+
+def _sample_value(value) -> Optional[float]:
+    # SQLite has no NaN, missing samples are stored as NULL
+    if value is None or value != value:
+        return None
+    return float(value)
+
+
+class StateStore:
+    """SQLite (WAL) store shared by the config manager, the registry and the main window.
+
+    The connection is shared between threads and serialized with a lock. Use
+    `get_state_store()` to get the store of a config directory.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._commits = 0
+        self._versions = {}
+        self._versions_stamp = None
+        self._writer = None
+        self._writer_lock = threading.Lock()
+        self._pending = {}  # key -> (write, args) of the coalesced writes, in queue order
+        self._flush_timer = None
+        # Transactions are managed explicitly, see transaction()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=10000")
+        with self._lock:
+            self._conn.executescript(_SCHEMA)
+        with self.transaction() as conn:
+            conn.execute(_SQL_SET_META, ('schema_version', str(SCHEMA_VERSION)))
+
+    @contextmanager
+    def transaction(self):
+        """Group statements into one transaction, nested calls join the outer one."""
+        with self._lock:
+            if self._depth:
+                self._depth += 1
+                try:
+                    yield self._conn
+                finally:
+                    self._depth -= 1
+                return
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._depth = 1
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            else:
+                self._conn.execute("COMMIT")
+                self._commits += 1
+            finally:
+                self._depth = 0
+
+    def table_version(self, *tables: str) -> Tuple[int, ...]:
+        """Change counters of versioned tables, bumped by triggers on every row change.
+
+        Works across connections and processes: comparing the counters with the ones seen
+        at the last read tells whether a table must be read again. The counters are only
+        queried again after a commit, detected with PRAGMA data_version (other
+        connections) and the local commit count.
+        """
+        with self._lock:
+            stamp = (self._conn.execute("PRAGMA data_version").fetchone()[0], self._commits)
+            if stamp != self._versions_stamp:
+                self._versions = {
+                    key[len('version:'):]: int(value)
+                    for key, value in self._conn.execute(_SQL_TABLE_VERSIONS)
+                }
+                self._versions_stamp = stamp
+            return tuple(self._versions[table] for table in tables)
+
+    def submit(self, write, *args, **kwargs) -> Future:
+        """Run `write(*args, **kwargs)` on the writer thread of the store.
+
+        Writes run one at a time in submission order; a failed write is logged.
+        """
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="StateWriter")
+            future = self._writer.submit(write, *args, **kwargs)
+        future.add_done_callback(_log_write_error)
+        return future
+
+    def submit_coalesced(self, key, write, *args) -> None:
+        """Queue `write(*args)`, replacing the pending write queued with the same key.
+
+        The writes queued within COALESCE_DELAY run together on the writer thread, in one
+        transaction and in the order their keys were first queued.
+        """
+        with self._writer_lock:
+            self._pending[key] = (write, args)
+            if self._flush_timer is None:
+                self._flush_timer = threading.Timer(COALESCE_DELAY, self._submit_pending)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+
+    def has_pending_writes(self) -> bool:
+        """Whether coalesced writes are queued and not committed yet."""
+        with self._writer_lock:
+            return bool(self._pending)
+
+    def _submit_pending(self) -> None:
+        with self._writer_lock:
+            if self._flush_timer is not threading.current_thread():
+                return  # cancelled by wait_for_writes()
+            self._flush_timer = None
+        self.submit(self._write_pending)
+
+    def _write_pending(self) -> None:
+        with self._writer_lock:
+            pending, self._pending = self._pending, {}
+        if pending:
+            with self.transaction():
+                for write, args in pending.values():
+                    write(*args)
+
+    def wait_for_writes(self) -> None:
+        """Finish the pending writes and stop the writer thread (it restarts on the next submit)."""
+        with self._writer_lock:
+            writer, self._writer = self._writer, None
+            timer, self._flush_timer = self._flush_timer, None
+        if timer is not None:
+            timer.cancel()
+        if writer is not None:
+            writer.shutdown(wait=True)
+        try:
+            self._write_pending()
+        except Exception as e:
+            logging.error(f"State store write failed: {str(e)}")
+
+    def close(self) -> None:
+        self.wait_for_writes()
+        with self._lock:
+            try:
+                self._conn.execute("PRAGMA optimize")
+            except sqlite3.Error:
+                pass
+            self._conn.close()
+
+    # Containers
+
+    def load_containers(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(_SQL_LOAD_CONTAINERS).fetchall()
+        return [dict(zip(CONTAINER_FIELDS, row)) for row in rows]
+
+    def container_names(self) -> List[str]:
+        with self._lock:
+            return [row[0] for row in self._conn.execute(_SQL_CONTAINER_NAMES)]
+
+    def upsert_containers(self, containers: Iterable[Dict[str, Any]]) -> None:
+        rows = [tuple(container.get(field) for field in CONTAINER_FIELDS) for container in containers]
+        with self.transaction() as conn:
+            conn.executemany(_SQL_UPSERT_CONTAINER, rows)
+
+    def upsert_container(self, container: Dict[str, Any]) -> None:
+        self.upsert_containers((container,))
+
+    def replace_containers(self, containers: Iterable[Dict[str, Any]]) -> None:
+        rows = [tuple(container.get(field) for field in CONTAINER_FIELDS) for container in containers]
+        with self.transaction() as conn:
+            conn.execute(_SQL_DELETE_ALL_CONTAINERS)
+            conn.executemany(_SQL_UPSERT_CONTAINER, rows)
+
+    def delete_container(self, name: str) -> None:
+        with self.transaction() as conn:
+            conn.execute(_SQL_DELETE_CONTAINER, (name,))
+
+    # Settings (values are stored as JSON)
+
+    def load_settings(self) -> Dict[str, Any]:
+        with self._lock:
+            rows = self._conn.execute(_SQL_LOAD_SETTINGS).fetchall()
+        return {key: json.loads(value) for key, value in rows}
+
+    def set_setting(self, key: str, value: Any) -> None:
+        with self.transaction() as conn:
+            conn.execute(_SQL_SET_SETTING, (key, json.dumps(value)))
+
+    def replace_settings(self, settings: Dict[str, Any]) -> None:
+        with self.transaction() as conn:
+            conn.execute(_SQL_DELETE_ALL_SETTINGS)
+            conn.executemany(_SQL_SET_SETTING, [(key, json.dumps(value)) for key, value in settings.items()])
+
+    # Container registry
+
+    def load_registry(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(_SQL_LOAD_REGISTRY).fetchall()
+        return {row[0]: dict(zip(REGISTRY_FIELDS, row)) for row in rows}
+
+    def upsert_registry_entry(self, entry: Dict[str, Any]) -> None:
+        with self.transaction() as conn:
+            conn.execute(_SQL_UPSERT_REGISTRY, tuple(entry.get(field) for field in REGISTRY_FIELDS))
+
+    def delete_registry_entry(self, container_name: str) -> None:
+        with self.transaction() as conn:
+            conn.execute(_SQL_DELETE_REGISTRY, (container_name,))
+
+    # Node info and metrics
+
+    def save_node_info(self, container: str, node_info, updated_at: float = None) -> None:
+        if updated_at is None:
+            updated_at = time.time()
+        with self.transaction() as conn:
+            conn.execute(_SQL_UPSERT_NODE_INFO, (
+                container, node_info.address, node_info.alias, node_info.eth_address,
+                node_info.version_long, node_info.version_short, json.dumps(list(node_info.whitelist)),
+                updated_at,
+            ))
+
+    def get_node_info(self, container: str) -> Optional[Dict[str, Any]]:
+        """Last node info recorded for a container, as NodeInfo.to_dict() lays it out."""
+        with self._lock:
+            row = self._conn.execute(_SQL_GET_NODE_INFO, (container,)).fetchone()
+        if row is None:
+            return None
+        address, alias, eth_address, version_long, version_short, whitelist, updated_at = row
+        return {
+            'address': address,
+            'alias': alias,
+            'eth_address': eth_address,
+            'version_long': version_long,
+            'version_short': version_short,
+            'info': {'whitelist': json.loads(whitelist or '[]')},
+            'updated_at': updated_at,
+        }
+
+    def add_metric_samples(self, container: str, history) -> int:
+        """Store the samples of a NodeHistory newer than the last stored one.
+
+        Each payload repeats the whole history, only its new tail is inserted. Series are
+        aligned on the most recent sample, like the plots do. Returns the number of rows.
+        """
+        timestamps = history.timestamps
+        if not timestamps:
+            return 0
+        with self.transaction() as conn:
+            last = conn.execute(_SQL_LAST_SAMPLE, (container,)).fetchone()[0]
+            start = 0 if last is None else bisect_right(timestamps, last)
+            count = len(timestamps)
+            if start >= count:
+                return 0
+            columns = []
+            for field in METRIC_FIELDS:
+                series = getattr(history, field, None) or ()
+                offset = count - len(series)
+                columns.append([
+                    _sample_value(series[idx - offset]) if idx >= offset else None
+                    for idx in range(start, count)
+                ])
+            rows = [
+                (container, timestamps[idx], *values)
+                for idx, values in zip(range(start, count), zip(*columns))
+            ]
+            conn.executemany(_SQL_INSERT_SAMPLE, rows)
+            conn.execute(_SQL_PRUNE_SAMPLES, (container, timestamps[-1] - METRICS_RETENTION))
+        return len(rows)
+
+    def load_metric_samples(self, container: str, since: float = -math.inf) -> MetricSamples:
+        """Samples of a container newer than `since` (POSIX seconds), oldest first."""
+        with self._lock:
+            rows = self._conn.execute(_SQL_LOAD_SAMPLES, (container, since)).fetchall()
+        nan = math.nan
+        columns = list(zip(*rows)) or [()] * (len(METRIC_FIELDS) + 1)
+        series = {}
+        for field, values in zip(METRIC_FIELDS, columns[1:]):
+            if field.startswith('gpu_') and all(value is None for value in values):
+                series[field] = None
+            else:
+                series[field] = array('d', [nan if value is None else value for value in values])
+        return MetricSamples(timestamps=array('d', columns[0]), **series)
+
+    def record_refresh(self, container: str, node_info=None, history=None, config: Dict[str, Any] = None,
+                       updated_at: float = None) -> None:
+        """Store the results of one refresh of a container in a single transaction.
+
+        `config` is the container configuration to save along, when the refresh changed it.
+        """
+        with self.transaction():
+            if config is not None:
+                self.upsert_container(config)
+            if node_info is not None:
+                self.save_node_info(container, node_info, updated_at)
+            if history is not None:
+                self.add_metric_samples(container, history)
+
+    # Migration from the JSON files
+
+    def _migrate_once(self, path: str, apply) -> bool:
+        """Run `apply(data)` on the content of a JSON file the first time the file is seen."""
+        if not path or not os.path.exists(path):
+            return False
+        key = f"migrated:{os.path.abspath(path)}"
+        with self._lock:
+            if self._conn.execute(_SQL_GET_META, (key,)).fetchone() is not None:
+                return False
+        try:
+            data, _ = read_json(path)
+        except Exception as e:
+            logging.error(f"Could not migrate {path}: {str(e)}")
+            return False
+        with self.transaction() as conn:
+            apply(conn, data)
+            conn.execute(_SQL_SET_META, (key, str(SCHEMA_VERSION)))
+        logging.info(f"Migrated {path} to {self.path}")
+        return True
+
+    def migrate_containers_json(self, path: str) -> bool:
+        """Import a containers.json of the ConfigManager, rows already stored win."""
+        def apply(conn, data):
+            conn.executemany(_SQL_INSERT_CONTAINER_IF_MISSING, [
+                tuple(item.get(field) for field in CONTAINER_FIELDS) for item in data if item.get('name')
+            ])
+        return self._migrate_once(path, apply)
+
+    def migrate_settings_json(self, path: str) -> bool:
+        def apply(conn, data):
+            conn.executemany(_SQL_SET_SETTING_IF_MISSING, [(key, json.dumps(value)) for key, value in data.items()])
+        return self._migrate_once(path, apply)
+
+    def migrate_registry_json(self, path: str) -> bool:
+        """Import the JSON file of the ContainerRegistry ({name: info})."""
+        def apply(conn, data):
+            conn.executemany(_SQL_INSERT_REGISTRY_IF_MISSING, [
+                tuple(info.get(field) for field in REGISTRY_FIELDS) for info in data.values()
+            ])
+        return self._migrate_once(path, apply)
+
+
+_stores: Dict[str, StateStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_state_store(config_dir: str = None) -> StateStore:
+    """The StateStore of a config directory (default: the launcher config directory).
+
+    Stores are shared per database file, so every component works on the same connection.
+    """
+    if config_dir is None:
+        config_dir = os.path.join(str(Path.home()), CONFIG_DIR)
+    path = os.path.abspath(os.path.join(config_dir, STATE_DB_NAME))
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = _stores[path] = StateStore(path)
+        return store
+
+
+def read_setting(key: str, default: Any = None, config_dir: str = None) -> Any:
+    """Value of a setting read straight from the database of a config directory.
+
+    Meant for start-up code that runs before the rest of the launcher, e.g. the logging
+    setup: the database is opened read-only, without a StateStore, schema or migration.
+    Returns `default` when the database or the setting does not exist yet; sqlite3 and
+    JSON errors are raised.
+    """
+    if config_dir is None:
+        config_dir = os.path.join(str(Path.home()), CONFIG_DIR)
+    path = os.path.abspath(os.path.join(config_dir, STATE_DB_NAME))
+    if not os.path.exists(path):
+        return default
+    conn = sqlite3.connect(f"{Path(path).as_uri()}?mode=ro", uri=True, timeout=10)
+    try:
+        row = conn.execute(_SQL_GET_SETTING, (key,)).fetchone()
+    finally:
+        conn.close()
+    return json.loads(row[0]) if row else default
+
+
+def close_state_stores() -> None:
+    """Close every open store."""
+    with _stores_lock:
+        stores = list(_stores.values())
+        _stores.clear()
+    for store in stores:
+        store.close()
+
+
+atexit.register(close_state_stores)
@@ -11,6 +11,7 @@ from utils.const import GITHUB_API_URL
 from ver import __VER__ as CURRENT_VERSION
 
 DOWNLOAD_DIR = 'downloads'
+LOG_SOURCE = 'updater'  # source of the console entries of this module
 
 class _UpdaterMixin:
 
@@ -33,14 +34,14 @@ class _UpdaterMixin:
   def _compare_versions(self, current_version, latest_version):
     latest_version = latest_version.lstrip('v').strip().replace('"', '').replace("'", '')
     result = False
-    self.add_log(f'Comparing versions: {current_version} -> {latest_version}')
+    self.add_log(f'Comparing versions: {current_version} -> {latest_version}', source=LOG_SOURCE)
     current_version_parts = [int(part) for part in current_version.split('.')]
     latest_version_parts = [int(part) for part in latest_version.split('.')]
     if latest_version_parts > current_version_parts:
       result = True
     else:
       if latest_version_parts < current_version_parts:
-        self.add_log('Your version is newer than the latest version. Are you a time traveler or a dev?')
+        self.add_log('Your version is newer than the latest version. Are you a time traveler or a dev?', source=LOG_SOURCE)
     return result
 
   def _download_update(self, download_url, download_dir):
@@ -54,7 +55,7 @@ class _UpdaterMixin:
     else:  # Linux
       local_filename = os.path.join(download_dir, 'EdgeNodeLauncher.AppImage')
     
-    self.add_log(f'Downloading to {local_filename}')
+    self.add_log(f'Downloading to {local_filename}', source=LOG_SOURCE)
     with requests.get(download_url, stream=True) as response:
       response.raise_for_status()
       with open(local_filename, 'wb') as file:
@@ -63,10 +64,10 @@ class _UpdaterMixin:
     return local_filename
 
   def _extract_zip(self, zip_path, extract_to):
-    self.add_log(f'Extracting {zip_path} to {extract_to}')
+    self.add_log(f'Extracting {zip_path} to {extract_to}', source=LOG_SOURCE)
     with zipfile.ZipFile(zip_path, 'r') as zip_ref:
       zip_ref.extractall(extract_to)
-    self.add_log(f'Extraction complete')
+    self.add_log(f'Extraction complete', source=LOG_SOURCE)
 
 
   def _replace_executable(self, download_path, executable_name):
@@ -74,7 +75,7 @@ class _UpdaterMixin:
     if current_executable.endswith('python.exe') or current_executable.endswith('python'):
       raise Exception('Cannot replace the current executable as it is running in a virtual environment.')
     
-    self.add_log(f'Preparing executable replacement of: {current_executable}')
+    self.add_log(f'Preparing executable replacement of: {current_executable}', source=LOG_SOURCE)
     
     if sys.platform == "win32":
       # For Windows, directly replace the .exe file
@@ -88,13 +89,13 @@ class _UpdaterMixin:
       # Create a batch script to replace the executable after the current process exits
       script_path = os.path.join(os.path.dirname(download_path), 'replace_executable.bat')
       
-      self.add_log(f"Executable to replace: {executable_basename} in {current_folder}", debug=True)
+      self.add_log(f"Executable to replace: {executable_basename} in {current_folder}", debug=True, source=LOG_SOURCE)
       
       # Use copy for direct file replacement
       copy_cmd = f'copy /Y /B "{new_executable}" "{current_executable}"'
       
-      self.add_log(f"Copy command: {copy_cmd}", debug=True)
-      self.add_log(f"Creating update script: {script_path}", debug=True)
+      self.add_log(f"Copy command: {copy_cmd}", debug=True, source=LOG_SOURCE)
+      self.add_log(f"Creating update script: {script_path}", debug=True, source=LOG_SOURCE)
       
       # Create the batch file with proper admin elevation
       with open(script_path, 'w') as script:
@@ -248,7 +249,7 @@ echo Done.
 """)
 
       # Execute the batch script with a hidden window
-      self.add_log(f'Batch script created: {script_path}')
+      self.add_log(f'Batch script created: {script_path}', source=LOG_SOURCE)
       
       # Use a different window style that will auto-close when finished
       startupinfo = None
@@ -260,7 +261,7 @@ echo Done.
               startupinfo.wShowWindow = 7  # SW_SHOWMINNOACTIVE
       
       # Run the updater script with a minimized window that will close itself
-      self.add_log(f'Executing updater script: {script_path}')
+      self.add_log(f'Executing updater script: {script_path}', source=LOG_SOURCE)
       
       # Start the script in a way that it will close itself when done
       if requires_admin:
@@ -302,7 +303,7 @@ echo Done.
       
       os.chmod(temp_script_path, 0o755)
       subprocess.Popen(['sh', temp_script_path])
-      self.add_log(f'Shell script created and executed: {temp_script_path}')
+      self.add_log(f'Shell script created and executed: {temp_script_path}', source=LOG_SOURCE)
 
     else:
       # For Linux, download the AppImage directly
@@ -311,7 +312,7 @@ echo Done.
 
       # Copy the new executable to a temporary location
       shutil.copy(new_executable, temp_executable)
-      self.add_log(f'New AppImage copied to temporary location: {temp_executable}')
+      self.add_log(f'New AppImage copied to temporary location: {temp_executable}', source=LOG_SOURCE)
 
       # Create a shell script to replace the executable after the current process exits
       script_path = os.path.join(os.path.dirname(download_path), 'replace_executable.sh')
@@ -328,7 +329,7 @@ echo Done.
       # Make the shell script executable and run it
       os.chmod(script_path, 0o755)
       subprocess.Popen(['sh', script_path])
-      self.add_log(f'Shell script created and executed: {script_path}')
+      self.add_log(f'Shell script created and executed: {script_path}', source=LOG_SOURCE)
 
     # Exit the current application
     QMessageBox.information(None, 'Update Complete', 'The application will now restart to complete the update.')    
@@ -341,7 +342,7 @@ echo Done.
       latest_version, download_urls = self.get_latest_release_version()
       latest_version = latest_version.lstrip('v').strip().replace('"', '').replace("'", '')
       if verbose:
-        self.add_log(f'Obtained latest version: {latest_version}')
+        self.add_log(f'Obtained latest version: {latest_version}', source=LOG_SOURCE)
       if self._compare_versions(CURRENT_VERSION, latest_version):
         reply = QMessageBox.question(None, 'Update Available',
                                     f'A new version v{latest_version} is available (current v{CURRENT_VERSION}). Do you want to update?',
@@ -367,7 +368,7 @@ echo Done.
               QMessageBox.information(None, 'Update Not Available', f'No update available for your OS: {platform_system}.')
               return
           except (KeyError, StopIteration) as e:
-            self.add_log(f"Failed to find download URL for your platform: {e}")
+            self.add_log(f"Failed to find download URL for your platform: {e}", source=LOG_SOURCE)
             QMessageBox.warning(None, 'Update Error', f'Could not find a compatible download for your system: {platform_system}.')
             return
               
@@ -378,7 +379,7 @@ echo Done.
             download_dir = os.path.join(os.getcwd(), DOWNLOAD_DIR)
             
           os.makedirs(download_dir, exist_ok=True)
-          self.add_log(f'Downloading update from {download_url} to {download_dir}...')
+          self.add_log(f'Downloading update from {download_url} to {download_dir}...', source=LOG_SOURCE)
           
           # Download the update
           try:
@@ -386,7 +387,7 @@ echo Done.
             
             # For macOS, extract the zip file
             if platform_system == 'Darwin':
-                self.add_log(f'Extracting update from {downloaded_file}...')
+                self.add_log(f'Extracting update from {downloaded_file}...', source=LOG_SOURCE)
                 self._extract_zip(downloaded_file, os.path.dirname(downloaded_file))
             
             # Show final confirmation before proceeding with update
@@ -397,10 +398,10 @@ echo Done.
             # Replace the executable
             self._replace_executable(downloaded_file, 'EdgeNodeLauncher')
           except Exception as e:
-            self.add_log(f"Error during download or installation: {str(e)}")
+            self.add_log(f"Error during download or installation: {str(e)}", source=LOG_SOURCE)
             QMessageBox.critical(None, 'Update Failed', f'Failed to download or install the update: {str(e)}')
       else:
         if verbose:
-          self.add_log("You are already using the latest version. Current: {}, Online: {}".format(CURRENT_VERSION, latest_version))
+          self.add_log("You are already using the latest version. Current: {}, Online: {}".format(CURRENT_VERSION, latest_version), source=LOG_SOURCE)
     except Exception as e:
-      self.add_log(f"Failed to check for updates: {e}")
+      self.add_log(f"Failed to check for updates: {e}", source=LOG_SOURCE)
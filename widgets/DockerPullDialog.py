@@ -4,10 +4,13 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtCore import Qt, QTimer, pyqtSignal, pyqtSlot
 from PyQt5.QtGui import QColor, QPalette
 import platform
-import re
 import logging
 from app_forms.frm_utils import LoadingIndicator
 from utils.const import DARK_STYLESHEET, LIGHT_COLORS, DARK_COLORS
+from utils.pull_progress import PullProgressParser
+
+# Maximum number of widget updates per second while pulling
+UI_UPDATES_PER_SECOND = 10
 
 class DockerPullDialog(QDialog):
     """Dialog for Docker image pull progress."""
@@ -97,216 +100,124 @@ class DockerPullDialog(QDialog):
         self.setLayout(layout)
         
         # Initialize layer tracking
-        self.layers = {}
+        self.parser = PullProgressParser()
+        self.layers = self.parser.layers
         self.layer_widgets = {}
         self.total_layers = 0
+        self._completed_layers = set()
+        self._prev_overall_progress = -10
+        self._pulling_message = "Pulling Docker image..."
+        
+        # Parsed lines are applied to the widgets at most UI_UPDATES_PER_SECOND times per second
+        self.update_timer = QTimer(self)
+        self.update_timer.setSingleShot(True)
+        self.update_timer.setInterval(1000 // UI_UPDATES_PER_SECOND)
+        self.update_timer.timeout.connect(self._apply_changes)
     
     @pyqtSlot(str)
     def update_pull_progress(self, line):
         """Update the pull progress based on Docker output.
         
+        Lines are only parsed here, the widgets are updated at most
+        UI_UPDATES_PER_SECOND times per second with what changed in between.
+        
         Args:
             line: Line of Docker pull output
         """
-        # Log the raw Docker pull output
-        logging.info(f"Docker pull output: {line.strip()}")
-        
-        # Process the line to extract layer information
-        if "Pulling from" in line:
-            repo_info = line.strip()
-            logging.info(f"Pulling Docker image repository: {repo_info}")
-            self.info_label.setText(f"Pulling image: {line}")
-            return
-            
-        # Match layer ID - handle both old and new Docker output formats
-        layer_match = re.search(r'([a-f0-9]{12}): (.*)', line)
-        digest_match = re.search(r'(sha256:[a-f0-9]{64}): (.*)', line)
-        
-        if layer_match or digest_match:
-            match = layer_match or digest_match
-            layer_id = match.group(1)
-            status = match.group(2)
-            
-            # Initialize layer if not seen before
-            if layer_id not in self.layers:
-                self.layers[layer_id] = {
-                    'id': layer_id,
-                    'status': status,
-                    'progress': 0
-                }
-                self.total_layers += 1
-                logging.info(f"New layer detected: {layer_id} - Total layers: {self.total_layers}")
-                
-                # Create progress bar for this layer
-                layer_layout = QHBoxLayout()
-                layer_label = QLabel(f"{layer_id[:8]}...")
-                layer_label.setFixedWidth(80)
-                layer_label.setStyleSheet("color: #60a5fa; font-weight: bold; font-family: monospace;")
-                
-                status_label = QLabel(status)
-                status_label.setStyleSheet("color: #e2e8f0; font-family: monospace;")
-                
-                layer_progress = QProgressBar()
-                layer_progress.setRange(0, 100)
-                layer_progress.setValue(0)
-                layer_progress.setStyleSheet("""
-                    QProgressBar {
-                        border: 1px solid #475569;
-                        border-radius: 4px;
-                        text-align: center;
-                        height: 16px;
-                        background-color: #334155;
-                    }
-                    QProgressBar::chunk {
-                        background-color: #2563eb;
-                        border-radius: 4px;
-                    }
-                """)
-                
-                layer_layout.addWidget(layer_label)
-                layer_layout.addWidget(layer_progress, 1)  # Give progress bar stretch factor
-                layer_layout.addWidget(status_label)
-                
-                self.layer_widgets[layer_id] = {
-                    'layout': layer_layout,
-                    'label': layer_label,
-                    'progress': layer_progress,
-                    'status': status_label
-                }
-                
-                self.layer_layout.addLayout(layer_layout)
-            
-            # Update layer status
-            self.layers[layer_id]['status'] = status
-            
-            # Update status label if it exists
-            if layer_id in self.layer_widgets and 'status' in self.layer_widgets[layer_id]:
-                self.layer_widgets[layer_id]['status'].setText(status)
-            
-            # Check for progress information
-            progress_match = re.search(r'(\d+)%', status)
-            if progress_match:
-                progress = int(progress_match.group(1))
-                self.layers[layer_id]['progress'] = progress
-                
-                # Log progress updates at 25% intervals to avoid excessive logging
-                prev_progress = getattr(self, f"_prev_progress_{layer_id}", -25)
-                if progress >= prev_progress + 25 or progress == 100:
-                    logging.info(f"Layer {layer_id}: {progress}% complete - Status: {status}")
-                    setattr(self, f"_prev_progress_{layer_id}", progress - (progress % 25))
-                
-                # Update progress bar
-                if layer_id in self.layer_widgets:
-                    self.layer_widgets[layer_id]['progress'].setValue(progress)
-            else:
-                # Log status updates without progress percentage
-                logging.info(f"Layer {layer_id} status update: {status}")
-            
-            # Update overall progress
-            self._update_overall_progress()
-            
-            # Process events to ensure UI updates
-            QApplication.processEvents()
-        # Handle newer Docker output format with direct status updates
-        elif "Downloading" in line or "Extracting" in line or "Download complete" in line or "Pull complete" in line:
-            # For newer Docker output that doesn't always include layer IDs
-            # Create a synthetic layer ID based on the line content
-            line_hash = str(hash(line) % 10000).zfill(12)  # Create a 12-char hash as ID
-            status = line.strip()
-            
-            # Initialize layer if not seen before
-            if line_hash not in self.layers:
-                self.layers[line_hash] = {
-                    'id': line_hash,
-                    'status': status,
-                    'progress': 0
-                }
-                self.total_layers += 1
-                logging.info(f"New status line detected: {status} - Total layers: {self.total_layers}")
-                
-                # Create progress bar for this status
-                layer_layout = QHBoxLayout()
-                layer_label = QLabel("Layer")
-                layer_label.setFixedWidth(80)
-                layer_label.setStyleSheet("color: #60a5fa; font-weight: bold; font-family: monospace;")
-                
-                status_label = QLabel(status)
-                status_label.setStyleSheet("color: #e2e8f0; font-family: monospace;")
-                
-                layer_progress = QProgressBar()
-                layer_progress.setRange(0, 100)
-                layer_progress.setValue(0)
-                layer_progress.setStyleSheet("""
-                    QProgressBar {
-                        border: 1px solid #475569;
-                        border-radius: 4px;
-                        text-align: center;
-                        height: 16px;
-                        background-color: #334155;
-                    }
-                    QProgressBar::chunk {
-                        background-color: #2563eb;
-                        border-radius: 4px;
-                    }
-                """)
-                
-                layer_layout.addWidget(layer_label)
-                layer_layout.addWidget(layer_progress, 1)  # Give progress bar stretch factor
-                layer_layout.addWidget(status_label)
-                
-                self.layer_widgets[line_hash] = {
-                    'layout': layer_layout,
-                    'label': layer_label,
-                    'progress': layer_progress,
-                    'status': status_label
-                }
-                
-                self.layer_layout.addLayout(layer_layout)
-            
-            # Update layer status
-            self.layers[line_hash]['status'] = status
-            
-            # Update status label if it exists
-            if line_hash in self.layer_widgets and 'status' in self.layer_widgets[line_hash]:
-                self.layer_widgets[line_hash]['status'].setText(status)
-            
-            # Check for progress information in newer format
-            progress_match = re.search(r'(\d+\.\d+)MB/(\d+\.\d+)MB', status)
-            if progress_match:
-                current = float(progress_match.group(1))
-                total = float(progress_match.group(2))
-                if total > 0:
-                    progress = int((current / total) * 100)
-                    self.layers[line_hash]['progress'] = progress
-                    
-                    # Update progress bar
-                    if line_hash in self.layer_widgets:
-                        self.layer_widgets[line_hash]['progress'].setValue(progress)
-            elif "Download complete" in status or "Pull complete" in status:
-                # Set to 100% when complete
-                self.layers[line_hash]['progress'] = 100
-                if line_hash in self.layer_widgets:
-                    self.layer_widgets[line_hash]['progress'].setValue(100)
-            
-            # Update overall progress
+        if self.parser.feed(line) and not self.update_timer.isActive():
+            self.update_timer.start()
+    
+    @pyqtSlot(dict)
+    def update_pull_event(self, event):
+        """Update the pull progress with an Engine API progress object.
+        
+        Args:
+            event: Progress object of the `/images/create` stream
+        """
+        if self.parser.feed_event(event) and not self.update_timer.isActive():
+            self.update_timer.start()
+    
+    def _apply_changes(self):
+        """Apply the changes parsed since the last update to the widgets."""
+        changed, message_changed = self.parser.take_changes()
+        if message_changed and 'Pulling from' in self.parser.message:
+            logging.info(f"Pulling Docker image repository: {self.parser.message}")
+            self._pulling_message = f"Pulling image: {self.parser.message}"
+            self.info_label.setText(self._pulling_message)
+        
+        # Bytes, throughput and ETA, known with the Engine API progress objects
+        summary = self.parser.summary()
+        if summary and changed:
+            self.info_label.setText(f"{self._pulling_message}\n{summary}")
+        
+        for layer_id in changed:
+            layer = self.parser.layers[layer_id]
+            widgets = self.layer_widgets.get(layer_id)
+            if widgets is None:
+                widgets = self._add_layer_row(layer_id)
+            widgets['status'].setText(layer['status'])
+            widgets['progress'].setValue(layer['progress'])
+            if layer['phase'] == 'done' and layer_id not in self._completed_layers:
+                self._completed_layers.add(layer_id)
+                logging.info(f"Layer {layer_id}: {layer['status']} "
+                             f"({len(self._completed_layers)}/{self.parser.total_layers} layers)")
+        
+        if changed:
             self._update_overall_progress()
-            
-            # Process events to ensure UI updates
-            QApplication.processEvents()
+    
+    def _add_layer_row(self, layer_id):
+        """Create the progress row of a layer."""
+        layer_layout = QHBoxLayout()
+        layer_label = QLabel(f"{layer_id[:8]}...")
+        layer_label.setFixedWidth(80)
+        layer_label.setStyleSheet("color: #60a5fa; font-weight: bold; font-family: monospace;")
+        
+        status_label = QLabel()
+        status_label.setStyleSheet("color: #e2e8f0; font-family: monospace;")
+        
+        layer_progress = QProgressBar()
+        layer_progress.setRange(0, 100)
+        layer_progress.setValue(0)
+        layer_progress.setStyleSheet("""
+            QProgressBar {
+                border: 1px solid #475569;
+                border-radius: 4px;
+                text-align: center;
+                height: 16px;
+                background-color: #334155;
+            }
+            QProgressBar::chunk {
+                background-color: #2563eb;
+                border-radius: 4px;
+            }
+        """)
+        
+        layer_layout.addWidget(layer_label)
+        layer_layout.addWidget(layer_progress, 1)  # Give progress bar stretch factor
+        layer_layout.addWidget(status_label)
+        
+        widgets = self.layer_widgets[layer_id] = {
+            'layout': layer_layout,
+            'label': layer_label,
+            'progress': layer_progress,
+            'status': status_label
+        }
+        self.layer_layout.addLayout(layer_layout)
+        self.total_layers = self.parser.total_layers
+        return widgets
     
     def _update_overall_progress(self):
         """Update the overall progress based on layer progress."""
+        self.total_layers = self.parser.total_layers
         if not self.total_layers:
             return
             
-        total_progress = sum(layer['progress'] for layer in self.layers.values())
-        overall_percent = int(total_progress / self.total_layers)
+        overall_percent = self.parser.overall_progress()
         
         # Log overall progress at 10% intervals to avoid excessive logging
-        prev_overall_progress = getattr(self, "_prev_overall_progress", -10)
-        if overall_percent >= prev_overall_progress + 10 or overall_percent == 100:
+        if overall_percent >= self._prev_overall_progress + 10 or overall_percent == 100:
             logging.info(f"Docker pull overall progress: {overall_percent}% complete ({self.total_layers} layers)")
-            setattr(self, "_prev_overall_progress", overall_percent - (overall_percent % 10))
+            self._prev_overall_progress = overall_percent - (overall_percent % 10)
         
         self.overall_progress.setValue(overall_percent)
     
@@ -346,6 +257,10 @@ class DockerPullDialog(QDialog):
             success: Whether the pull was successful
             message: Success or error message
         """
+        # Show what was parsed since the last update
+        self.update_timer.stop()
+        self._apply_changes()
+        
         # Update UI to show completion status
         if success:
             self.set_message("Docker image pull completed successfully!")
@@ -7,95 +7,20 @@ from PyQt5.QtWidgets import (
     QPushButton,
     QCheckBox
 )
-from PyQt5.QtCore import pyqtSignal, QThread, Qt, QTimer
-from PyQt5.QtGui import QFont, QColor
-import subprocess
-import os
+from PyQt5.QtCore import pyqtSignal, Qt, QTimer
+from PyQt5.QtGui import QFont, QColor, QIcon, QPainter, QPixmap
+from datetime import datetime
 
 from models.AnsibleHosts import AnsibleHostsManager
+from utils.ansible_inventory import InventoryWatcher
+from utils.host_prober import HostHealthProber, HostProbeResult, probe_ssh
+from utils.ssh_mux import multiplexed
 
-class SSHCheckThread(QThread):
-    status_updated = pyqtSignal(str, bool)  # host, is_online
-    
-    def __init__(self, host, ssh_command):
-        super().__init__()
-        self.host = host
-        self.ssh_command = ssh_command
-        
-    def run(self):
-        try:
-            print(f"Checking SSH connection to {self.host}...")
-            print(f"SSH command: {' '.join(self.ssh_command)}")
-            
-            # Define standard SSH options with appropriate timeouts
-            ssh_options = [
-                '-o', 'ConnectTimeout=5',
-                '-o', 'StrictHostKeyChecking=no',
-                '-o', 'BatchMode=yes',
-                '-o', 'ServerAliveInterval=2',
-                '-o', 'UserKnownHostsFile=/dev/null',
-            ]
-            
-            # Create a set of options already in the command
-            existing_options = set()
-            for i in range(len(self.ssh_command)):
-                if self.ssh_command[i] == '-o' and i + 1 < len(self.ssh_command):
-                    option_key = self.ssh_command[i+1].split('=')[0]
-                    existing_options.add(option_key)
-            
-            # Only add options that aren't already present
-            final_options = []
-            for i in range(0, len(ssh_options), 2):
-                if i + 1 < len(ssh_options):
-                    option_key = ssh_options[i+1].split('=')[0]
-                    if option_key not in existing_options:
-                        final_options.extend([ssh_options[i], ssh_options[i+1]])
-            
-            # Build the final command
-            cmd = self.ssh_command + final_options + ['echo', 'Connection successful']
-            
-            print(f"Full command: {' '.join(cmd)}")
-            
-            # Run the command with a timeout
-            result = subprocess.run(
-                cmd, 
-                capture_output=True, 
-                timeout=8,  # 8 second timeout
-                text=True
-            )
-            
-            # Check if the command was successful and returned the expected output
-            if result.returncode == 0 and 'Connection successful' in result.stdout:
-                print(f"SSH connection to {self.host} successful")
-                print(f"  stdout: {result.stdout.strip()}")
-                self.status_updated.emit(self.host, True)
-            else:
-                print(f"SSH connection to {self.host} failed with return code {result.returncode}")
-                print(f"  stdout: {result.stdout}")
-                print(f"  stderr: {result.stderr}")
-                self.status_updated.emit(self.host, False)
-                
-        except subprocess.TimeoutExpired as e:
-            print(f"SSH connection to {self.host} timed out after {e.timeout} seconds")
-            print(f"Command: {' '.join(e.cmd)}")
-            if hasattr(e, 'stdout') and e.stdout:
-                print(f"  stdout: {e.stdout}")
-            if hasattr(e, 'stderr') and e.stderr:
-                print(f"  stderr: {e.stderr}")
-            self.status_updated.emit(self.host, False)
-        except subprocess.CalledProcessError as e:
-            print(f"SSH connection to {self.host} failed with error: {str(e)}")
-            print(f"Return code: {e.returncode}")
-            if hasattr(e, 'stdout') and e.stdout:
-                print(f"  stdout: {e.stdout}")
-            if hasattr(e, 'stderr') and e.stderr:
-                print(f"  stderr: {e.stderr}")
-            self.status_updated.emit(self.host, False)
-        except Exception as e:
-            print(f"SSH check error for {self.host}: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            self.status_updated.emit(self.host, False)
+STATUS_COLORS = {
+    True: "#4CAF50",  # online
+    False: "#FF5252",  # offline
+    None: "#9E9E9E",  # not checked yet
+}
 
 class StatusIndicator(QLabel):
     def __init__(self, parent=None):
@@ -133,16 +58,26 @@ class HostSelector(QWidget):
     host_selected = pyqtSignal(str)  # Emitted when a host is selected
     mode_changed = pyqtSignal(bool)  # Emitted when mode is changed (True for multi-host)
     host_status_updated = pyqtSignal(str, bool)  # Emitted when host status is updated (host_name, is_online)
+    _probe_finished = pyqtSignal(object)  # HostProbeResult, emitted from the prober threads
 
     def __init__(self, parent=None):
         super().__init__(parent)
         self.hosts_manager = AnsibleHostsManager()
-        self.status_threads = {}  # Keep track of status check threads
-        self.status_indicators = {}  # Keep track of status indicators
         self._is_pro_mode = False  # Track pro mode state
+        self._status_icons = {}
+        # Every host is probed concurrently on a bounded pool, results are cached (TTL and
+        # backoff for failing hosts) and delivered to the GUI thread through a signal
+        self._probe_finished.connect(self._on_probe_result)
+        self.prober = HostHealthProber(self._probe_host, on_result=self._probe_finished.emit)
+        prober = self.prober
+        self.destroyed.connect(lambda *_: prober.shutdown())
         self.initUI()
         
-        # Set up timer for periodic status checks
+        # Reload the host list when the inventory files change
+        self.inventory_watcher = InventoryWatcher(self.hosts_manager.inventory, self)
+        self.inventory_watcher.inventory_changed.connect(self.refresh_hosts)
+        
+        # Set up timer for periodic status checks, only stale results are probed again
         self.status_timer = QTimer(self)
         self.status_timer.timeout.connect(self._check_current_host_status)
         self.status_timer.start(10000)  # Check every 10 seconds
@@ -197,7 +132,7 @@ class HostSelector(QWidget):
         self.setLayout(layout)
         
         # Connect signals
-        self.refresh_button.clicked.connect(self.refresh_hosts)
+        self.refresh_button.clicked.connect(lambda: self.refresh_hosts(force=True))
         self.host_combo.currentTextChanged.connect(self._on_host_selected)
         
         # Initial state
@@ -209,28 +144,82 @@ class HostSelector(QWidget):
         # Load hosts
         self.refresh_hosts()
 
-    def refresh_hosts(self):
-        """Refresh the list of available hosts."""
+    def refresh_hosts(self, force: bool = False):
+        """Refresh the list of available hosts and probe them.
+
+        Args:
+            force: Probe every host again, even the ones with a fresh cached status
+        """
         current_host = self.host_combo.currentText()  # Store current selection
         
         # Clear and reload hosts from the manager
+        self.host_combo.blockSignals(True)
         self.host_combo.clear()
         hosts = self.hosts_manager.get_host_names()
         for host in hosts:
             self.host_combo.addItem(host)
+            self._update_host_item(host, self.prober.get(host))
             
         # Restore previous selection if it exists
         if current_host and current_host in hosts:
             self.host_combo.setCurrentText(current_host)
         elif hosts:
             self.host_combo.setCurrentIndex(0)
+        self.host_combo.blockSignals(False)
+        if self.host_combo.currentText() != current_host:
+            self._on_host_selected(self.host_combo.currentText())
             
-        # Check status of current host
-        if self.host_combo.currentText():
-            self.check_host_status(self.host_combo.currentText())
+        # Check status of every host
+        self.probe_hosts(force=force)
+
+    def probe_hosts(self, force: bool = False):
+        """Probe the hosts of the dropdown concurrently, without blocking the UI."""
+        if not self._is_pro_mode:
+            return
+        hosts = [self.host_combo.itemText(i) for i in range(self.host_combo.count())]
+        self.prober.probe(hosts, force=force)
+
+    def _probe_host(self, host_name: str):
+        """Probe a single host, runs on a prober thread."""
+        ssh_command_str = self.hosts_manager.get_ssh_command(host_name)
+        if not ssh_command_str:
+            return False, "no SSH command available"
+        return probe_ssh(multiplexed(ssh_command_str.split()))
+
+    def _status_icon(self, is_online) -> QIcon:
+        """Status dot shown next to a host in the dropdown (None: not checked yet)."""
+        icon = self._status_icons.get(is_online)
+        if icon is None:
+            pixmap = QPixmap(12, 12)
+            pixmap.fill(Qt.transparent)
+            painter = QPainter(pixmap)
+            painter.setRenderHint(QPainter.Antialiasing)
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(QColor(STATUS_COLORS[is_online]))
+            painter.drawEllipse(1, 1, 10, 10)
+            painter.end()
+            icon = self._status_icons[is_online] = QIcon(pixmap)
+        return icon
+
+    def _update_host_item(self, host_name: str, result: HostProbeResult = None):
+        """Show the probe result of a host in the dropdown."""
+        index = self.host_combo.findText(host_name)
+        if index < 0:
+            return
+        if result is None:
+            self.host_combo.setItemIcon(index, self._status_icon(None))
+            self.host_combo.setItemData(index, "Not checked yet", Qt.ToolTipRole)
+            return
+        checked = datetime.fromtimestamp(result.checked_at).strftime('%H:%M:%S')
+        if result.online:
+            tooltip = f"Online ({result.latency * 1000:.0f} ms, checked {checked})"
+        else:
+            tooltip = f"Offline since {result.failures} check(s), last at {checked}: {result.error}"
+        self.host_combo.setItemIcon(index, self._status_icon(result.online))
+        self.host_combo.setItemData(index, tooltip, Qt.ToolTipRole)
             
     def check_host_status(self, host_name: str):
-        """Check if a host is online."""
+        """Show the cached status of a host and probe it if the status is stale."""
         if not host_name:
             return
             
@@ -240,79 +229,29 @@ class HostSelector(QWidget):
             # Emit a fake "online" status to avoid blocking the UI
             self.host_status_updated.emit(host_name, True)
             return
-            
-        try:
-            # Stop any running status check
-            if hasattr(self, 'status_thread') and self.status_thread and self.status_thread.isRunning():
-                try:
-                    self.status_thread.terminate()
-                    self.status_thread.wait(1000)  # Wait up to 1 second for thread to terminate
-                    if self.status_thread.isRunning():
-                        print(f"Warning: Status check thread for {host_name} could not be terminated")
-                except Exception as e:
-                    print(f"Error terminating status thread: {str(e)}")
-                
-            # Get SSH command for the host
-            ssh_command_str = self.hosts_manager.get_ssh_command(host_name)
-            if not ssh_command_str:
-                print(f"No SSH command available for host: {host_name}")
-                self.current_status.setProperty("is_online", False)
-                self.current_status.set_status(False)
-                self.host_status_updated.emit(host_name, False)
-                return
-                
-            # Get the host configuration to build the command properly
-            host_config = self.hosts_manager.get_host(host_name)
-            if not host_config:
-                print(f"No host configuration found for: {host_name}")
-                self.current_status.setProperty("is_online", False)
-                self.current_status.set_status(False)
-                self.host_status_updated.emit(host_name, False)
-                return
-                
-            # Convert the SSH command string to a list
-            # This is important because SSHCheckThread expects a list, not a string
-            ssh_command = ssh_command_str.split()
-            
-            print(f"Using SSH command: {ssh_command}")
-            
-            # Start status check thread
-            self.status_thread = SSHCheckThread(host_name, ssh_command)
-            self.status_thread.status_updated.connect(self._on_status_updated)
-            self.status_thread.start()
-            
-        except Exception as e:
-            print(f"Error checking host status: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            self.current_status.setProperty("is_online", False)
-            self.current_status.set_status(False)
-            self.host_status_updated.emit(host_name, False)
 
-    def _on_status_updated(self, host_name, is_online):
-        """Handle status update from the check thread.
-        
-        Updates the status indicator for the current host and emits a signal
-        if the status has changed.
+        result = self.prober.get(host_name)
+        if result is not None:
+            self.current_status.set_status(result.online)
+        self.prober.probe([host_name])
+
+    def _on_probe_result(self, result: HostProbeResult):
+        """Handle a probe result, delivered in the GUI thread.
+
+        Updates the status dot of the host in the dropdown, and the status indicator
+        and host_status_updated signal for the current host.
         """
-        print(f"Received status update for {host_name}: {'online' if is_online else 'offline'}")
+        self._update_host_item(result.host, result)
         
         # Update the status indicator if this is the current host
-        if host_name == self.host_combo.currentText():
-            # Check if status has changed
+        if result.host == self.host_combo.currentText():
             old_status = self.current_status.property("is_online")
-            if old_status != is_online:
-                print(f"Host {host_name} status changed: {old_status} -> {is_online}")
-            
-            # Update the status indicator
-            print(f"Setting status indicator for {host_name} to {'online' if is_online else 'offline'}")
-            self.current_status.set_status(is_online)
-            
-            # Force a repaint to ensure the UI updates
-            self.current_status.update()
+            if old_status != result.online:
+                print(f"Host {result.host} status changed: {old_status} -> {result.online}")
+            self.current_status.set_status(result.online)
             
             # Emit signal that host status has been updated
-            self.host_status_updated.emit(host_name, is_online)
+            self.host_status_updated.emit(result.host, result.online)
 
     def get_current_host(self):
         """Get the currently selected host name."""
@@ -522,16 +461,15 @@ class HostSelector(QWidget):
             # Force multi-host mode when pro mode is enabled
             self.mode_checkbox.setChecked(True)
             self.mode_checkbox.setEnabled(False)  # Disable checkbox in pro mode
+            self.probe_hosts()
         else:
             self.mode_checkbox.setEnabled(True)  # Re-enable checkbox in simple mode 
 
     def _check_current_host_status(self):
-        """Periodically check the status of the current host."""
+        """Periodically probe the hosts whose cached status is stale."""
         # Skip periodic checks in Simple mode
         if hasattr(self, '_is_pro_mode') and not self._is_pro_mode:
             return
             
         if self.isVisible() and self.host_combo.isVisible():
-            current_host = self.host_combo.currentText()
-            if current_host:
-                self.check_host_status(current_host) 
\ No newline at end of file
+            self.probe_hosts() 
\ No newline at end of file
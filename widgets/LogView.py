@@ -0,0 +1,162 @@
+from PyQt5.QtWidgets import QPlainTextEdit, QWidget, QHBoxLayout, QComboBox, QLineEdit
+from PyQt5.QtCore import QTimer, pyqtSignal
+from PyQt5.QtGui import QColor, QTextCharFormat, QTextCursor
+
+from utils.log_store import (
+    LogEntry, LogFilter, LogStore, DEFAULT_LOG_MAX_ENTRIES, DEBUG, INFO, WARNING, ERROR
+)
+
+
+class LogView(QPlainTextEdit):
+    """Read-only, bounded console view.
+
+    QPlainTextEdit lays out and paints only the visible blocks, and the document is capped
+    with setMaximumBlockCount, so appending stays cheap and memory stays bounded however
+    long the launcher runs. The entries themselves are kept in an indexed LogStore ring
+    buffer of the same size, which is queried when a filter is applied.
+    """
+
+    # Emitted when an entry for a container not seen before is added
+    containers_changed = pyqtSignal()
+
+    def __init__(self, parent=None, max_blocks: int = DEFAULT_LOG_MAX_ENTRIES, use_colors: bool = False):
+        super().__init__(parent)
+        self.setReadOnly(True)
+        self.setUndoRedoEnabled(False)
+        self.use_colors = use_colors
+        self.store = LogStore(max_blocks)
+        self.log_filter = LogFilter()
+        self.setMaximumBlockCount(max_blocks)
+        self._formats = {}
+
+    def set_max_blocks(self, max_blocks: int) -> None:
+        """Change the number of lines kept, the oldest lines are dropped first."""
+        max_blocks = max(1, int(max_blocks))
+        self.store.set_max_entries(max_blocks)
+        self.setMaximumBlockCount(max_blocks)
+
+    def append_entry(self, entry: LogEntry) -> None:
+        new_container = entry.container and not self.store.has_container(entry.container)
+        self.store.append(entry)
+        if self.log_filter.is_empty or self.log_filter.matches(entry):
+            self._append_text(entry.format(), entry.color if self.use_colors else None)
+        if new_container:
+            self.containers_changed.emit()
+
+    def append(self, text: str) -> None:
+        """Append a pre-formatted line (same call as QTextEdit.append)."""
+        self._append_text(text, None)
+
+    def apply_filter(self, log_filter: LogFilter) -> None:
+        """Show only the stored entries matching the filter, new entries are filtered too."""
+        self.log_filter = log_filter
+        self.render_entries(self.store.query(log_filter))
+
+    def render_entries(self, entries) -> None:
+        """Replace the displayed lines with the given entries."""
+        self.clear()
+        if self.use_colors:
+            for entry in entries:
+                self._append_text(entry.format(), entry.color)
+        else:
+            self.setPlainText("\n".join(entry.format() for entry in entries))
+        self._scroll_to_bottom()
+
+    def clear_log(self) -> None:
+        self.store.clear()
+        self.clear()
+
+    def _format_for(self, color):
+        fmt = self._formats.get(color)
+        if fmt is None:
+            fmt = QTextCharFormat()
+            if color:
+                fmt.setForeground(QColor(color))
+            self._formats[color] = fmt
+        return fmt
+
+    def _append_text(self, text, color):
+        scrollbar = self.verticalScrollBar()
+        follow = scrollbar.value() >= scrollbar.maximum() - 2
+        cursor = QTextCursor(self.document())
+        cursor.movePosition(QTextCursor.End)
+        if not self.document().isEmpty():
+            cursor.insertBlock()
+        cursor.insertText(text, self._format_for(color))
+        if follow:
+            # Only follow the output when the user is not reading older lines
+            self._scroll_to_bottom()
+
+    def _scroll_to_bottom(self):
+        scrollbar = self.verticalScrollBar()
+        scrollbar.setValue(scrollbar.maximum())
+
+
+class LogFilterBar(QWidget):
+    """Level / container filters and substring search for a LogView."""
+
+    LEVEL_CHOICES = (
+        ("All levels", None),
+        ("Info and above", frozenset((INFO, WARNING, ERROR))),
+        ("Warnings and errors", frozenset((WARNING, ERROR))),
+        ("Errors only", frozenset((ERROR,))),
+        ("Debug only", frozenset((DEBUG,))),
+    )
+    ALL_CONTAINERS = "All nodes"
+    SEARCH_DELAY = 150  # ms, wait for the user to stop typing before filtering
+
+    def __init__(self, log_view: LogView, parent=None):
+        super().__init__(parent)
+        self.log_view = log_view
+
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(6)
+
+        self.level_combo = QComboBox()
+        for text, levels in self.LEVEL_CHOICES:
+            self.level_combo.addItem(text, levels)
+
+        self.container_combo = QComboBox()
+        self.container_combo.setMinimumWidth(120)
+        self.container_combo.addItem(self.ALL_CONTAINERS, None)
+
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("Search log...")
+        self.search_edit.setClearButtonEnabled(True)
+
+        layout.addWidget(self.level_combo)
+        layout.addWidget(self.container_combo)
+        layout.addWidget(self.search_edit, 1)
+
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(self.SEARCH_DELAY)
+        self._search_timer.timeout.connect(self.apply)
+
+        self.level_combo.currentIndexChanged.connect(self.apply)
+        self.container_combo.currentIndexChanged.connect(self.apply)
+        self.search_edit.textChanged.connect(self._search_timer.start)
+        self.log_view.containers_changed.connect(self.refresh_containers)
+        self.refresh_containers()
+
+    def refresh_containers(self):
+        current = self.container_combo.currentData()
+        self.container_combo.blockSignals(True)
+        self.container_combo.clear()
+        self.container_combo.addItem(self.ALL_CONTAINERS, None)
+        for name in self.log_view.store.containers():
+            self.container_combo.addItem(name, name)
+        index = self.container_combo.findData(current)
+        self.container_combo.setCurrentIndex(max(index, 0))
+        self.container_combo.blockSignals(False)
+
+    def current_filter(self) -> LogFilter:
+        return LogFilter(
+            levels=self.level_combo.currentData(),
+            container=self.container_combo.currentData(),
+            text=self.search_edit.text().strip(),
+        )
+
+    def apply(self):
+        self.log_view.apply_filter(self.current_filter())
@@ -1,22 +1,26 @@
-from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QTextEdit, 
+from time import time
+
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QPlainTextEdit,
                              QPushButton, QHBoxLayout, QGroupBox)
 from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QTextCursor, QColor
+
+from utils.log_store import LogEntry, DEFAULT_LOG_MAX_ENTRIES, level_from_color
+from widgets.LogView import LogView, LogFilterBar
 
 class LogConsoleWidget(QWidget):
     """
     Widget for displaying log output
     """
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, max_lines=DEFAULT_LOG_MAX_ENTRIES):
         super().__init__(parent)
         
         # Initialize UI components
-        self.text_console = QTextEdit()
+        self.text_console = LogView(max_blocks=max_lines, use_colors=True)
+        self.filter_bar = LogFilterBar(self.text_console)
         self.btn_clear = QPushButton("Clear Log")
         
         # Configure console
-        self.text_console.setReadOnly(True)
-        self.text_console.setLineWrapMode(QTextEdit.NoWrap)
+        self.text_console.setLineWrapMode(QPlainTextEdit.NoWrap)
         
         # Setup UI layout
         self.init_ui()
@@ -33,7 +37,8 @@ class LogConsoleWidget(QWidget):
         log_group = QGroupBox("Console Log")
         log_layout = QVBoxLayout()
         
-        # Add console to layout
+        # Add filters and console to layout
+        log_layout.addWidget(self.filter_bar)
         log_layout.addWidget(self.text_console)
         
         # Set log group layout
@@ -53,7 +58,7 @@ class LogConsoleWidget(QWidget):
         """Connect widget signals to slots"""
         self.btn_clear.clicked.connect(self.clear_log)
     
-    def add_log(self, text, color="gray", debug=False):
+    def add_log(self, text, color="gray", debug=False, container=None, source=None, level=None):
         """
         Add a log entry to the console
         
@@ -61,24 +66,24 @@ class LogConsoleWidget(QWidget):
             text: Text to add
             color: Text color (name or hex code)
             debug: Whether this is a debug message
+            container: Container the entry relates to, used for filtering
+            source: Subsystem that produced the entry
+            level: Log level, derived from color/debug when not given
         """
         # Check if this is a debug message and if debug is enabled
         if not debug or self.is_debug_enabled():
-            # Move cursor to end
-            self.text_console.moveCursor(QTextCursor.End)
-            
-            # Set text color
-            self.text_console.setTextColor(QColor(color))
-            
-            # Append text
-            self.text_console.insertPlainText(text + "\n")
-            
-            # Scroll to bottom
-            self.text_console.ensureCursorVisible()
+            self.text_console.append_entry(LogEntry(
+                time=time(), message=text, color=color, debug=debug,
+                level=level or level_from_color(color, debug), container=container, source=source,
+            ))
+    
+    def set_max_lines(self, max_lines):
+        """Set the maximum number of lines kept in the console"""
+        self.text_console.set_max_blocks(max_lines)
     
     def clear_log(self):
         """Clear all log content"""
-        self.text_console.clear()
+        self.text_console.clear_log()
     
     def is_debug_enabled(self):
         """
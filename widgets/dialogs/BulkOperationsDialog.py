@@ -0,0 +1,195 @@
+from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QSpinBox,
+                             QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView)
+from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtGui import QFont, QColor
+
+from utils.bulk_operations import ContainerOperationResult
+
+COLUMNS = ('Node', 'Alias', 'Status', 'Time', 'Error')
+ERROR_COLOR = "#FF5252"
+SUCCESS_COLOR = "#4CAF50"
+PHASE_TEXT = {
+    'queued': 'Queued',
+    'stopping': 'Stopping...',
+    'removing': 'Removing...',
+    'starting': 'Starting...',
+    'done': 'Done',
+    'skipped': 'Skipped',
+    'failed': 'Failed',
+    'cancelled': 'Cancelled',
+}
+ACTION_TEXT = {'start': 'Starting', 'stop': 'Stopping', 'restart': 'Restarting'}
+
+
+class BulkOperationsDialog(QDialog):
+    """Start all, stop all or restart the checked nodes of the current host, concurrently.
+
+    Each row follows its container through the operation, the errors are gathered in the
+    status line once everything is done.
+    """
+    operation_finished = pyqtSignal(str, object)  # action, list of ContainerOperationResult
+
+    def __init__(self, docker_handler, config_manager, parent=None, icon=None):
+        super().__init__(parent)
+        self.docker_handler = docker_handler
+        self.config_manager = config_manager
+        self.thread = None
+        self._action = None
+        self._rows = {}  # container name -> row
+        self._volumes = {}  # container name -> volume name
+
+        self.setWindowTitle("Bulk Node Actions")
+        if icon:
+            self.setWindowIcon(icon)
+        self.setWindowModality(Qt.NonModal)
+        self.resize(800, 500)
+
+        layout = QVBoxLayout()
+        self.table = QTableWidget(0, len(COLUMNS))
+        self.table.setHorizontalHeaderLabels(COLUMNS)
+        self.table.setFont(QFont("Courier New", 9))
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        layout.addWidget(self.table, 1)
+
+        action_layout = QHBoxLayout()
+        self.start_all_button = QPushButton("Start All")
+        self.start_all_button.clicked.connect(lambda: self.run('start', self._all()))
+        action_layout.addWidget(self.start_all_button)
+        self.stop_all_button = QPushButton("Stop All")
+        self.stop_all_button.clicked.connect(lambda: self.run('stop', self._all()))
+        action_layout.addWidget(self.stop_all_button)
+        self.restart_button = QPushButton("Restart Checked")
+        self.restart_button.clicked.connect(lambda: self.run('restart', self._checked()))
+        action_layout.addWidget(self.restart_button)
+        action_layout.addStretch(1)
+        action_layout.addWidget(QLabel("At a time:"))
+        self.parallelism_spin = QSpinBox()
+        self.parallelism_spin.setRange(1, 64)
+        self.parallelism_spin.setValue(config_manager.get_bulk_parallelism())
+        self.parallelism_spin.setToolTip("Nodes handled at the same time, 1 for a rolling restart")
+        self.parallelism_spin.valueChanged.connect(config_manager.set_bulk_parallelism)
+        action_layout.addWidget(self.parallelism_spin)
+        action_layout.addWidget(QLabel("Grace period:"))
+        self.grace_period_spin = QSpinBox()
+        self.grace_period_spin.setRange(0, 3600)
+        self.grace_period_spin.setSuffix(" s")
+        self.grace_period_spin.setValue(config_manager.get_stop_grace_period())
+        self.grace_period_spin.setToolTip("Seconds a stopped node has to save its state before it is killed, "
+                                          "for every stop of the launcher")
+        self.grace_period_spin.valueChanged.connect(config_manager.set_stop_grace_period)
+        action_layout.addWidget(self.grace_period_spin)
+        layout.addLayout(action_layout)
+
+        bottom_layout = QHBoxLayout()
+        self.status_label = QLabel()
+        self.status_label.setWordWrap(True)
+        bottom_layout.addWidget(self.status_label, 1)
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.setEnabled(False)
+        self.cancel_button.clicked.connect(self.cancel)
+        bottom_layout.addWidget(self.cancel_button)
+        self.close_button = QPushButton("Close")
+        self.close_button.clicked.connect(self.close)
+        bottom_layout.addWidget(self.close_button)
+        layout.addLayout(bottom_layout)
+        self.setLayout(layout)
+
+        if parent and hasattr(parent, '_current_stylesheet'):
+            self.setStyleSheet(parent._current_stylesheet)
+
+        self.load_containers()
+
+    def load_containers(self):
+        """Fill the table with the containers of the launcher configuration."""
+        if self.is_running():
+            return
+        containers = sorted(self.config_manager.get_all_containers(), key=lambda config: config.name.lower())
+        self.table.setRowCount(len(containers))
+        self._rows, self._volumes = {}, {}
+        for row, config in enumerate(containers):
+            name_item = QTableWidgetItem(config.name)
+            name_item.setFlags(name_item.flags() | Qt.ItemIsUserCheckable)
+            name_item.setCheckState(Qt.Unchecked)
+            self.table.setItem(row, 0, name_item)
+            self.table.setItem(row, 1, QTableWidgetItem(config.node_alias or ''))
+            for column in range(2, len(COLUMNS)):
+                self.table.setItem(row, column, QTableWidgetItem(''))
+            self._rows[config.name] = row
+            self._volumes[config.name] = config.volume
+        self.status_label.setText(f"{len(containers)} nodes")
+
+    def _all(self) -> list:
+        return list(self._rows)
+
+    def _checked(self) -> list:
+        return [name for name, row in self._rows.items() if self.table.item(row, 0).checkState() == Qt.Checked]
+
+    def is_running(self) -> bool:
+        return self.thread is not None and self.thread.isRunning()
+
+    def run(self, action: str, names: list):
+        if self.is_running():
+            return
+        if not names:
+            self.status_label.setText("Check the nodes to restart first")
+            return
+        self._action = action
+        for name in self._rows:
+            row = self._rows[name]
+            for column in range(2, len(COLUMNS)):
+                self.table.item(row, column).setText('')
+        self._set_buttons(running=True)
+        self.status_label.setText(f"{ACTION_TEXT[action]} {len(names)} nodes, "
+                                  f"{self.parallelism_spin.value()} at a time...")
+        self.thread = self.docker_handler.run_bulk_operation(
+            action, [(name, self._volumes.get(name)) for name in names],
+            on_update=self._on_update, callback=self._on_finished, parallelism=self.parallelism_spin.value(),
+            stop_timeout=self.grace_period_spin.value())
+
+    def cancel(self):
+        if self.is_running():
+            self.thread.cancel()
+            self.cancel_button.setEnabled(False)
+            self.status_label.setText("Cancelling, the nodes already in progress are finished first...")
+
+    def _set_buttons(self, running: bool):
+        for button in (self.start_all_button, self.stop_all_button, self.restart_button):
+            button.setEnabled(not running)
+        self.parallelism_spin.setEnabled(not running)
+        self.grace_period_spin.setEnabled(not running)
+        self.cancel_button.setEnabled(running)
+
+    def _on_update(self, result: ContainerOperationResult):
+        row = self._rows.get(result.container)
+        if row is None:
+            return
+        status = self.table.item(row, 2)
+        status.setText(PHASE_TEXT.get(result.phase, result.phase))
+        if result.phase == 'failed':
+            status.setForeground(QColor(ERROR_COLOR))
+        elif result.phase == 'done':
+            status.setForeground(QColor(SUCCESS_COLOR))
+        else:
+            status.setData(Qt.ForegroundRole, None)
+        self.table.item(row, 3).setText(f"{result.duration:.1f}s" if result.finished and result.duration else '')
+        error = self.table.item(row, 4)
+        error.setText(result.error)
+        error.setToolTip(result.error)
+
+    def _on_finished(self, results: list):
+        self._set_buttons(running=False)
+        counts = {}
+        for result in results:
+            counts[result.phase] = counts.get(result.phase, 0) + 1
+        text = ', '.join(f"{count} {PHASE_TEXT.get(phase, phase).lower()}" for phase, count in sorted(counts.items()))
+        failed = [result for result in results if result.phase == 'failed']
+        if failed:
+            text += '\n' + '\n'.join(f"{result.container}: {result.error}" for result in failed[:5])
+            if len(failed) > 5:
+                text += f"\n... and {len(failed) - 5} more"
+        self.status_label.setText(text)
+        self.operation_finished.emit(self._action, results)
@@ -0,0 +1,159 @@
+from time import time
+
+from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QPushButton,
+                           QLabel, QPlainTextEdit)
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtGui import QFont
+
+from utils.log_store import LogEntry, WARNING, ERROR
+from widgets.LogView import LogView, LogFilterBar
+
+# Number of existing lines shown when a container log is opened for the first time
+INITIAL_TAIL_LINES = 500
+# Lines kept in the pane, older lines are dropped
+MAX_PANE_LINES = 10000
+# The pane renders at most BATCH_MAX_LINES lines every BATCH_INTERVAL milliseconds
+BATCH_INTERVAL = 250
+BATCH_MAX_LINES = 500
+
+
+class ContainerLogsDialog(QDialog):
+    """Live view of the stdout/stderr of an edge node container.
+
+    Closing the dialog stops the stream but keeps the lines and the log offset, so the
+    next time it is shown only the lines written in the meantime are read.
+    """
+
+    def __init__(self, parent, docker_handler, container_name, icon=None):
+        super().__init__(parent)
+        self.docker_handler = docker_handler
+        self.container_name = container_name
+        self.offset = None  # docker timestamp of the last line shown
+        self.stream = None
+        self.total_lines = 0
+        self.total_dropped = 0
+
+        self.setWindowTitle(f"Node Logs - {container_name}")
+        if icon:
+            self.setWindowIcon(icon)
+        self.setWindowModality(Qt.NonModal)
+        self.resize(900, 600)
+
+        layout = QVBoxLayout()
+
+        self.log_view = LogView(max_blocks=MAX_PANE_LINES)
+        self.log_view.setLineWrapMode(QPlainTextEdit.NoWrap)
+        self.log_view.setFont(QFont("Courier New"))
+        self.filter_bar = LogFilterBar(self.log_view)
+        self.filter_bar.container_combo.hide()  # a single container per pane
+        layout.addWidget(self.filter_bar)
+        layout.addWidget(self.log_view, 1)
+
+        bottom_layout = QHBoxLayout()
+        self.status_label = QLabel()
+        bottom_layout.addWidget(self.status_label, 1)
+
+        self.pause_button = QPushButton("Pause")
+        self.pause_button.setCheckable(True)
+        self.pause_button.toggled.connect(self._toggle_pause)
+        bottom_layout.addWidget(self.pause_button)
+
+        self.clear_button = QPushButton("Clear")
+        self.clear_button.clicked.connect(self.log_view.clear_log)
+        bottom_layout.addWidget(self.clear_button)
+
+        self.close_button = QPushButton("Close")
+        self.close_button.clicked.connect(self.close)
+        bottom_layout.addWidget(self.close_button)
+        layout.addLayout(bottom_layout)
+        self.setLayout(layout)
+
+        if parent and hasattr(parent, '_current_stylesheet'):
+            self.setStyleSheet(parent._current_stylesheet)
+
+        self.batch_timer = QTimer(self)
+        self.batch_timer.setInterval(BATCH_INTERVAL)
+        self.batch_timer.timeout.connect(self._render_batch)
+
+    def start_stream(self):
+        """Start following the log, resuming after the last line shown if any."""
+        if self.stream is not None and self.stream.isRunning():
+            return
+        self.stream = self.docker_handler.stream_container_logs(
+            self.container_name,
+            since=self.offset,
+            tail=None if self.offset else INITIAL_TAIL_LINES,
+        )
+        self.stream.stream_finished.connect(self._on_stream_finished)
+        self.stream.stream_error.connect(self._on_stream_error)
+        self.stream.start()
+        if not self.pause_button.isChecked():
+            self.batch_timer.start()
+        self._update_status("Streaming")
+
+    def stop_stream(self):
+        self.batch_timer.stop()
+        if self.stream is not None:
+            self.stream.stop()
+            if not self.stream.wait(2000) and self.stream.process is not None:
+                self.stream.process.kill()  # `docker logs -f` ignored the terminate
+                self.stream.wait()
+            self._render_remaining()  # keep what was already read, and its offset
+            self.stream = None
+
+    def _render_batch(self):
+        if self.stream is None:
+            return
+        lines, dropped = self.stream.drain(BATCH_MAX_LINES)
+        if dropped:
+            self.total_dropped += dropped
+            self.log_view.append_entry(LogEntry(
+                time=time(), message=f"... {dropped} lines skipped, the view could not keep up ...",
+                color="yellow", level=WARNING, container=self.container_name, source="docker logs",
+            ))
+        now = time()
+        for timestamp, text in lines:
+            self.log_view.append_entry(LogEntry(
+                time=timestamp or now, message=text, container=self.container_name, source="docker logs",
+            ))
+        self.total_lines += len(lines)
+        self.offset = self.stream.offset
+        if lines or dropped:
+            self._update_status("Paused" if self.pause_button.isChecked() else "Streaming")
+
+    def _render_remaining(self):
+        """Render every buffered line, batch after batch."""
+        while self.stream is not None and self.stream.pending:
+            self._render_batch()
+
+    def _toggle_pause(self, paused):
+        self.pause_button.setText("Resume" if paused else "Pause")
+        if paused:
+            # Lines keep being read; past the buffer size the oldest are dropped and counted
+            self.batch_timer.stop()
+        elif self.stream is not None:
+            self.batch_timer.start()
+        self._update_status("Paused" if paused else "Streaming")
+
+    def _update_status(self, state):
+        status = f"{state} {self.container_name}: {self.total_lines} lines"
+        if self.total_dropped:
+            status += f", {self.total_dropped} skipped"
+        self.status_label.setText(status)
+
+    def _on_stream_finished(self, return_code):
+        self.batch_timer.stop()
+        self._render_remaining()
+        self._update_status("Stopped" if return_code == 0 else f"Stopped (exit code {return_code})")
+
+    def _on_stream_error(self, message):
+        self.batch_timer.stop()
+        self.log_view.append_entry(LogEntry(
+            time=time(), message=message, color="red", level=ERROR,
+            container=self.container_name, source="docker logs",
+        ))
+        self._update_status("Error")
+
+    def closeEvent(self, event):
+        self.stop_stream()
+        event.accept()
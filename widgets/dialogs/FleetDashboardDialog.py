@@ -0,0 +1,339 @@
+import time
+from datetime import datetime
+
+from PyQt5.QtWidgets import (QApplication, QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QCheckBox,
+                             QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView)
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal
+from PyQt5.QtGui import QFont, QColor
+
+from utils.fleet import FleetCollector, FleetNodeStatus, inventory_targets, last_value
+from utils.metrics_stream import AGENT_INTERVAL, RemoteMetricsStreamThread
+from widgets.dialogs.ImageDistributionDialog import ImageDistributionDialog
+
+# Seconds between two automatic refreshes of the whole fleet
+AUTO_REFRESH_INTERVAL = 60
+# A host whose metrics agent sent nothing for this long is polled again
+STREAM_STALE_AFTER = 3 * AGENT_INTERVAL  # seconds
+
+COLUMNS = ('Host', 'Node', 'State', 'Address', 'Alias', 'Version', 'Uptime', 'Epoch avail', 'CPU', 'Memory')
+ERROR_COLOR = "#FF5252"
+
+
+class _SortItem(QTableWidgetItem):
+    """Table item sorted by a key of its own (numbers, missing values last) instead of its text."""
+
+    def __init__(self, text: str, key=None):
+        super().__init__(text)
+        self.key = key
+
+    def __lt__(self, other):
+        if isinstance(other, _SortItem):
+            mine, theirs = self.key, other.key
+            if mine is None or theirs is None:
+                # Missing values stay at the bottom in both orders
+                table = self.tableWidget()
+                descending = table is not None and table.horizontalHeader().sortIndicatorOrder() == Qt.DescendingOrder
+                return (mine is None) if descending else (mine is not None)
+            if type(mine) is type(theirs):
+                return mine < theirs
+        return super().__lt__(other)
+
+
+def _cells(status: FleetNodeStatus) -> list:
+    """(text, sort key) of each column."""
+    if status.epoch_avail is not None:
+        epoch = (f"{status.epoch_avail * 100:.2f}%", status.epoch_avail)
+    else:
+        epoch = ('', None)
+    cpu = (f"{status.cpu_load:.1f}%", status.cpu_load) if status.cpu_load is not None else ('', None)
+    if status.memory_used is not None and status.memory_total:
+        memory = (f"{status.memory_used:.1f}/{status.memory_total:.1f} GB", status.memory_used / status.memory_total)
+    else:
+        memory = ('', None)
+    return [
+        (status.host, status.host.lower()),
+        (status.container, status.container.lower()),
+        (status.status or ('Running' if status.running else 'Stopped'), (not status.running, status.status)),
+        (status.address, status.address),
+        (status.alias, status.alias.lower()),
+        (status.version, status.version),
+        (status.uptime, status.uptime),
+        epoch,
+        cpu,
+        memory,
+    ]
+
+
+class FleetDashboardDialog(QDialog):
+    """Every r1node container of every host of the inventory, in one sortable table.
+
+    Hosts are refreshed concurrently (utils.fleet) and each row is updated as soon as
+    its container has been read, slow or unreachable hosts do not hold the others.
+    With 'Stream Metrics' (the metrics_agent_enabled setting) each remote host runs the
+    metrics agent instead and its rows follow what the agent reports; a host whose agent
+    is silent is polled like the others.
+    """
+    _node_received = pyqtSignal(object)  # FleetNodeStatus, emitted from the collector threads
+    _host_done = pyqtSignal(str, list, str)  # host, container names, error
+
+    def __init__(self, parent=None, targets_provider=inventory_targets, icon=None, collector=None,
+                 config_manager=None):
+        super().__init__(parent)
+        self.targets_provider = targets_provider
+        self.config_manager = config_manager or getattr(parent, 'config_manager', None)
+        self._icon = icon
+        self._streams = {}  # host -> RemoteMetricsStreamThread
+        self._stream_nodes = {}  # (host, container) -> FleetNodeStatus built from the agent messages
+        self._distribution_dialog = None
+        self._rows = {}  # (host, container) -> item of the first column
+        self._pending_hosts = set()
+        self._node_received.connect(self._on_node)
+        self._host_done.connect(self._on_host_done)
+        self.collector = collector or FleetCollector(self._node_received.emit, self._host_done.emit)
+        collector = self.collector
+        self.destroyed.connect(lambda *_: collector.shutdown())
+
+        self.setWindowTitle("Fleet Dashboard")
+        if icon:
+            self.setWindowIcon(icon)
+        self.setWindowModality(Qt.NonModal)
+        self.resize(1100, 600)
+
+        layout = QVBoxLayout()
+        self.table = QTableWidget(0, len(COLUMNS))
+        self.table.setHorizontalHeaderLabels(COLUMNS)
+        self.table.setFont(QFont("Courier New", 9))
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.setSortingEnabled(True)
+        self.table.sortByColumn(0, Qt.AscendingOrder)
+        layout.addWidget(self.table, 1)
+
+        bottom_layout = QHBoxLayout()
+        self.status_label = QLabel()
+        bottom_layout.addWidget(self.status_label, 1)
+        self.stream_checkbox = QCheckBox("Stream Metrics")
+        self.stream_checkbox.setToolTip("Run a metrics agent on every remote host, which pushes what changed, "
+                                        "instead of polling the hosts")
+        self.stream_checkbox.setVisible(self.config_manager is not None)
+        if self.config_manager is not None:
+            self.stream_checkbox.setChecked(self.config_manager.get_metrics_agent_enabled())
+        self.stream_checkbox.toggled.connect(self._toggle_streaming)
+        bottom_layout.addWidget(self.stream_checkbox)
+        self.refresh_button = QPushButton("Refresh")
+        self.refresh_button.clicked.connect(self.refresh)
+        bottom_layout.addWidget(self.refresh_button)
+        self.distribute_button = QPushButton("Distribute Image")
+        self.distribute_button.setToolTip("Download the node image once and send it to every host")
+        self.distribute_button.clicked.connect(self.show_image_distribution)
+        bottom_layout.addWidget(self.distribute_button)
+        self.close_button = QPushButton("Close")
+        self.close_button.clicked.connect(self.close)
+        bottom_layout.addWidget(self.close_button)
+        layout.addLayout(bottom_layout)
+        self.setLayout(layout)
+
+        if parent and hasattr(parent, '_current_stylesheet'):
+            self.setStyleSheet(parent._current_stylesheet)
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(AUTO_REFRESH_INTERVAL * 1000)
+        self.refresh_timer.timeout.connect(self.refresh)
+        app = QApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.stop_streams)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+        self.refresh_timer.start()
+
+    def closeEvent(self, event):
+        self.refresh_timer.stop()
+        self.stop_streams()
+        super().closeEvent(event)
+
+    def refresh(self):
+        """Refresh every host, hosts still being read are left alone."""
+        targets = self.targets_provider()
+        # Hosts removed from the inventory
+        for key in [key for key in self._rows if key[0] not in targets]:
+            self._remove_row(key)
+        if self.stream_checkbox.isChecked():
+            remote = {host: ssh_command for host, ssh_command in targets.items() if ssh_command}
+            for host in [host for host in self._streams if host not in remote]:
+                self._stop_stream(host)
+            for host, ssh_command in remote.items():
+                if host not in self._streams:
+                    self._start_stream(host, ssh_command)
+            targets = {host: ssh_command for host, ssh_command in targets.items() if not self._is_streaming(host)}
+        else:
+            self.stop_streams()
+        self._pending_hosts.update(self.collector.collect(targets))
+        self._update_status()
+
+    def _toggle_streaming(self, enabled: bool):
+        if self.config_manager is not None:
+            self.config_manager.set_metrics_agent_enabled(enabled)
+        if self.isVisible():
+            self.refresh()
+
+    def _start_stream(self, host: str, ssh_command: list):
+        stream = RemoteMetricsStreamThread(ssh_command)
+        stream.setObjectName(host)
+        stream.containers_changed.connect(self._on_stream_containers)
+        stream.node_info_received.connect(self._on_stream_node_info)
+        stream.samples_received.connect(self._on_stream_samples)
+        stream.node_state_received.connect(self._on_stream_state)
+        stream.stream_error.connect(self._on_stream_error)
+        self._streams[host] = stream
+        stream.start()
+
+    def _stop_stream(self, host: str):
+        stream = self._streams.pop(host, None)
+        if stream is not None:
+            stream.stop()
+            stream.wait(2000)
+        for key in [key for key in self._stream_nodes if key[0] == host]:
+            del self._stream_nodes[key]
+
+    def stop_streams(self):
+        """Stop the metrics agents of every host."""
+        for host in list(self._streams):
+            self._stop_stream(host)
+
+    def _is_streaming(self, host: str) -> bool:
+        stream = self._streams.get(host)
+        return (stream is not None and stream.last_message_at is not None
+                and time.time() - stream.last_message_at < STREAM_STALE_AFTER)
+
+    def _stream_node(self, container: str):
+        """Host and FleetNodeStatus of a container reported by the stream sending the signal."""
+        host = self.sender().objectName()
+        if host not in self._streams:
+            return host, None  # stopped meanwhile
+        status = self._stream_nodes.get((host, container))
+        if status is None:
+            status = self._stream_nodes[(host, container)] = FleetNodeStatus(host=host, container=container)
+        return host, status
+
+    def _on_stream_containers(self, containers: dict):
+        host = self.sender().objectName()
+        if host not in self._streams:
+            return
+        for name, container in containers.items():
+            _, status = self._stream_node(name)
+            status.running, status.status = container['running'], container['status']
+            status.error, status.updated_at = '', time.time()
+            self._on_node(status)
+        for key in [key for key in self._rows if key[0] == host and key[1] not in containers]:
+            self._stream_nodes.pop(key, None)
+            self._remove_row(key)
+        self._update_status()
+
+    def _on_stream_node_info(self, container: str, node_info):
+        _, status = self._stream_node(container)
+        if status is not None:
+            status.address, status.alias, status.version = node_info.address, node_info.alias, node_info.version_short
+            status.updated_at = time.time()
+            self._on_node(status)
+
+    def _on_stream_samples(self, container: str, samples):
+        _, status = self._stream_node(container)
+        if status is not None:
+            status.cpu_load = last_value(samples.cpu_load)
+            status.memory_used = last_value(samples.occupied_memory)
+            status.memory_total = last_value(samples.total_memory)
+            status.updated_at = time.time()
+            self._on_node(status)
+
+    def _on_stream_state(self, container: str, state: dict):
+        _, status = self._stream_node(container)
+        if status is not None:
+            status.uptime = state.get('uptime', status.uptime)
+            status.epoch_avail = state.get('current_epoch_avail', status.epoch_avail)
+            status.version = status.version or state.get('version', '')
+            self._on_node(status)
+
+    def _on_stream_error(self, message: str):
+        host = self.sender().objectName()
+        if host in self._streams:
+            self._flag_host(host, message)
+
+    def show_image_distribution(self):
+        """Open the distribution of the node image to the hosts of the dashboard."""
+        dialog = self._distribution_dialog
+        running = dialog is not None and dialog.thread is not None and dialog.thread.isRunning()
+        if dialog is None or not (running or dialog.isVisible()):
+            parent = self.parent()
+            config_manager = getattr(parent, 'config_manager', None)
+            bandwidth_limit = config_manager.get_prefetch_bandwidth_limit() if config_manager else 0
+            dialog = self._distribution_dialog = ImageDistributionDialog(
+                self.targets_provider(), self, icon=self._icon, bandwidth_limit=bandwidth_limit)
+        dialog.show()
+        dialog.raise_()
+        dialog.activateWindow()
+
+    def _on_node(self, status: FleetNodeStatus):
+        # Rows move while sorting is on, fill the row with sorting off
+        sorting = self.table.isSortingEnabled()
+        self.table.setSortingEnabled(False)
+        if status.container:
+            self._remove_row((status.host, ''))  # the host answered again
+        first = self._rows.get(status.key)
+        if first is None:
+            row = self.table.rowCount()
+            self.table.insertRow(row)
+        else:
+            row = first.row()
+        tooltip = status.error or f"Updated {datetime.fromtimestamp(status.updated_at).strftime('%H:%M:%S')}"
+        for column, (text, key) in enumerate(_cells(status)):
+            item = _SortItem(text, key)
+            item.setToolTip(tooltip)
+            if status.error and column == 2:
+                item.setForeground(QColor(ERROR_COLOR))
+            self.table.setItem(row, column, item)
+            if column == 0:
+                self._rows[status.key] = item
+        self.table.setSortingEnabled(sorting)
+
+    def _on_host_done(self, host: str, containers: list, error: str):
+        self._pending_hosts.discard(host)
+        if error:
+            self._flag_host(host, error)
+        else:
+            # Containers removed from the host since the last refresh
+            for key in [key for key in self._rows if key[0] == host and key[1] not in containers]:
+                self._remove_row(key)
+        self._update_status()
+
+    def _flag_host(self, host: str, error: str):
+        """Keep the last known rows of the host and flag them, or show the host alone."""
+        keys = [key for key in self._rows if key[0] == host]
+        if not keys:
+            self._on_node(FleetNodeStatus(host=host, container='', status='Unreachable', error=error))
+        for key in keys:
+            row = self._rows[key].row()
+            for column in range(self.table.columnCount()):
+                item = self.table.item(row, column)
+                if item is not None:
+                    item.setToolTip(error)
+                    item.setForeground(QColor(ERROR_COLOR))
+
+    def _remove_row(self, key):
+        first = self._rows.pop(key, None)
+        if first is not None:
+            self.table.removeRow(first.row())
+
+    def _update_status(self):
+        hosts = {key[0] for key in self._rows}
+        nodes = sum(1 for key in self._rows if key[1])
+        text = f"{nodes} nodes on {len(hosts)} hosts"
+        if self._pending_hosts:
+            text += f" - refreshing {len(self._pending_hosts)} hosts..."
+        else:
+            text += f" - updated {datetime.now().strftime('%H:%M:%S')}"
+        self.status_label.setText(text)
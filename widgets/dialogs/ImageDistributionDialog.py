@@ -0,0 +1,142 @@
+from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QProgressBar,
+                             QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView)
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QFont, QColor
+
+from utils.image_distribution import HostDistribution, ImageDistributionThread
+from utils.pull_progress import format_bytes
+
+COLUMNS = ('Host', 'Status', 'Progress', 'Transferred')
+ERROR_COLOR = "#FF5252"
+PHASE_TEXT = {
+    'checking': 'Checking local image...',
+    'waiting': 'Waiting for the download',
+    'sending': 'Sending layers',
+    'loaded': 'Image loaded',
+    'up_to_date': 'Up to date',
+    'failed': 'Failed',
+    'cancelled': 'Cancelled',
+}
+
+
+class ImageDistributionDialog(QDialog):
+    """Per-host progress of an image distribution (utils.image_distribution).
+
+    The image is downloaded once by the launcher, then streamed to every host that
+    needs it, a few hosts at a time.
+    """
+
+    def __init__(self, targets: dict, parent=None, icon=None, bandwidth_limit: float = 0):
+        super().__init__(parent)
+        self.targets = targets
+        self.bandwidth_limit = bandwidth_limit
+        self.thread = None
+        self._rows = {}  # host -> row
+
+        self.setWindowTitle("Distribute Edge Node Image")
+        if icon:
+            self.setWindowIcon(icon)
+        self.setWindowModality(Qt.NonModal)
+        self.resize(800, 400)
+
+        layout = QVBoxLayout()
+        self.download_label = QLabel("Download from the registry: not started")
+        layout.addWidget(self.download_label)
+        self.download_bar = QProgressBar()
+        self.download_bar.setRange(0, 100)
+        layout.addWidget(self.download_bar)
+
+        self.table = QTableWidget(len(targets), len(COLUMNS))
+        self.table.setHorizontalHeaderLabels(COLUMNS)
+        self.table.setFont(QFont("Courier New", 9))
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        for row, host in enumerate(sorted(targets)):
+            self._rows[host] = row
+            self.table.setItem(row, 0, QTableWidgetItem(host))
+            self.table.setCellWidget(row, 2, QProgressBar())
+        layout.addWidget(self.table, 1)
+
+        bottom_layout = QHBoxLayout()
+        self.status_label = QLabel(f"{len(targets)} hosts")
+        bottom_layout.addWidget(self.status_label, 1)
+        self.start_button = QPushButton("Start")
+        self.start_button.clicked.connect(self.start)
+        bottom_layout.addWidget(self.start_button)
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.setEnabled(False)
+        self.cancel_button.clicked.connect(self.cancel)
+        bottom_layout.addWidget(self.cancel_button)
+        self.close_button = QPushButton("Close")
+        self.close_button.clicked.connect(self.close)
+        bottom_layout.addWidget(self.close_button)
+        layout.addLayout(bottom_layout)
+        self.setLayout(layout)
+
+        if parent and hasattr(parent, '_current_stylesheet'):
+            self.setStyleSheet(parent._current_stylesheet)
+
+    def start(self):
+        if self.thread is not None and self.thread.isRunning():
+            return
+        for row in self._rows.values():
+            self.table.cellWidget(row, 2).setValue(0)
+        self.thread = ImageDistributionThread(self.targets, bandwidth_limit=self.bandwidth_limit)
+        self.thread.host_updated.connect(self._on_host)
+        self.thread.download_progress.connect(self._on_download)
+        self.thread.distribution_finished.connect(self._on_finished)
+        self.start_button.setEnabled(False)
+        self.cancel_button.setEnabled(True)
+        self.status_label.setText(f"Distributing to {len(self.targets)} hosts...")
+        self.thread.start()
+
+    def cancel(self):
+        if self.thread is not None and self.thread.isRunning():
+            self.thread.cancel()
+            self.cancel_button.setEnabled(False)
+            self.status_label.setText("Cancelling...")
+
+    def closeEvent(self, event):
+        self.cancel()
+        if self.thread is not None:
+            self.thread.wait(3000)
+        super().closeEvent(event)
+
+    def _on_download(self, downloaded, total):
+        percent = int(downloaded * 100 / total) if total else 100
+        self.download_bar.setValue(percent)
+        self.download_label.setText(
+            f"Download from the registry: {format_bytes(downloaded)} / {format_bytes(total)}")
+
+    def _on_host(self, state: HostDistribution):
+        row = self._rows.get(state.host)
+        if row is None:
+            return
+        status = QTableWidgetItem(state.error if state.phase == 'failed' else PHASE_TEXT.get(state.phase, state.phase))
+        if state.error:
+            status.setToolTip(state.error)
+            status.setForeground(QColor(ERROR_COLOR))
+        self.table.setItem(row, 1, status)
+        bar = self.table.cellWidget(row, 2)
+        if state.phase in ('loaded', 'up_to_date'):
+            bar.setValue(100)
+        elif state.total:
+            bar.setValue(int(min(state.sent, state.total) * 100 / state.total))
+        if state.total:
+            transferred = f"{format_bytes(min(state.sent, state.total))} / {format_bytes(state.total)}"
+        else:
+            transferred = ''
+        self.table.setItem(row, 3, QTableWidgetItem(transferred))
+
+    def _on_finished(self, states: dict):
+        self.cancel_button.setEnabled(False)
+        self.start_button.setEnabled(True)
+        self.start_button.setText("Retry")
+        counts = {}
+        for state in states.values():
+            counts[state.phase] = counts.get(state.phase, 0) + 1
+        self.status_label.setText(', '.join(f"{count} {PHASE_TEXT.get(phase, phase).lower()}"
+                                            for phase, count in sorted(counts.items())))
@@ -0,0 +1,111 @@
+"""
+Benchmark: ConfigManager lookups and imports vs the previous list-backed implementation.
+
+Usage:
+  python xperimental/bench_config_manager.py [N1 N2 ...]
+
+For every size N a config with N containers is imported into a temporary directory, then
+every container is looked up by name. The legacy implementation scans the container list
+on every lookup and saves the whole file after every imported item.
+"""
+import os
+import sys
+import json
+import shutil
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.config_manager import ConfigManager, ContainerConfig
+
+# The legacy import saves after every item (quadratic), keep it out of the large sizes
+LEGACY_MAX_IMPORT = 2000
+
+
+class LegacyConfigManager:
+  """The list-backed container storage of the previous ConfigManager."""
+
+  def __init__(self, config_dir):
+    self.containers_file = os.path.join(config_dir, "containers.json")
+    self.containers = []
+
+  def save_containers(self):
+    with open(self.containers_file, 'w') as f:
+      json.dump([container.to_dict() for container in self.containers], f, indent=2)
+    return True
+
+  def add_container(self, container):
+    for existing in self.containers:
+      if existing.name == container.name:
+        existing.volume = container.volume
+        existing.created_at = container.created_at
+        existing.last_used = container.last_used
+        return self.save_containers()
+    self.containers.append(container)
+    return self.save_containers()
+
+  def get_container(self, container_name):
+    for container in self.containers:
+      if container.name == container_name:
+        return container
+    return None
+
+  def import_containers(self, import_file):
+    with open(import_file, 'r') as f:
+      data = json.load(f)
+    for item in data:
+      self.add_container(ContainerConfig.from_dict(item))
+    return True
+
+
+def P(msg):
+  print(msg, flush=True)
+  return
+
+
+def make_import_file(path, count):
+  items = [
+    ContainerConfig(
+      name="r1node" if i == 0 else f"r1node{i}",
+      volume="r1vol" if i == 0 else f"r1vol{i}",
+      created_at="2025-01-01T00:00:00",
+      node_address=f"0xai_{i:044d}",
+      node_alias=f"node-{i}",
+    ).to_dict()
+    for i in range(count)
+  ]
+  with open(path, 'w') as f:
+    json.dump(items, f)
+  return [item['name'] for item in items]
+
+
+def bench(factory, import_file, names):
+  work_dir = tempfile.mkdtemp(prefix="bench_cfg_")
+  try:
+    manager = factory(work_dir)
+    flush = getattr(manager, 'flush', lambda: True)  # include any deferred write in the timing
+    t_import = timeit.timeit(lambda: manager.import_containers(import_file) and flush(), number=1)
+    t_lookup = timeit.timeit(lambda: [manager.get_container(name) for name in names], number=1)
+    return t_import, t_lookup / len(names)
+  finally:
+    shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+  sizes = [int(arg) for arg in sys.argv[1:]] or [250, 1000, 2000, 8000]
+  tmp_dir = tempfile.mkdtemp(prefix="bench_cfg_src_")
+  try:
+    P(f"{'N':>6} | {'import legacy':>14} {'import indexed':>15} | {'lookup legacy':>14} {'lookup indexed':>15}")
+    for size in sizes:
+      import_file = os.path.join(tmp_dir, f"import_{size}.json")
+      names = make_import_file(import_file, size)
+      new_import, new_lookup = bench(ConfigManager, import_file, names)
+      if size <= LEGACY_MAX_IMPORT:
+        old_import, old_lookup = bench(LegacyConfigManager, import_file, names)
+        legacy_import, legacy_lookup = f"{old_import * 1e3:11.1f} ms", f"{old_lookup * 1e6:11.2f} us"
+      else:
+        legacy_import, legacy_lookup = "skipped", "skipped"
+      P(f"{size:>6} | {legacy_import:>14} {new_import * 1e3:12.1f} ms | {legacy_lookup:>14} {new_lookup * 1e6:12.2f} us")
+  finally:
+    shutil.rmtree(tmp_dir, ignore_errors=True)
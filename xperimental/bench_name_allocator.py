@@ -0,0 +1,83 @@
+"""
+Bench: names of new nodes, docker calls per candidate against utils.name_allocator.
+
+Usage:
+  python xperimental/bench_name_allocator.py [--existing N] [--new N] [--delay S]
+
+The host has --existing containers (half of them configured, the other half created
+outside the launcher) and --new nodes are created in a batch. The previous sequence
+ran `docker ps -a --filter` twice per name and could not reserve names: asked again
+before the container exists, it returns the same name. The allocator lists the host
+once and reserves each name it hands out.
+"""
+import os
+import sys
+import stat
+import time
+import argparse
+import subprocess
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fake_bulk import FAKE_DOCKER
+from utils.docker_utils import get_volume_name
+from utils.name_allocator import NameAllocator
+
+
+def previous_generate_container_name(config_names, prefix='r1node'):
+  """The previous lookup: highest index in docker and config, then a docker call per candidate."""
+  def docker_names(name_filter):
+    result = subprocess.run(['docker', 'ps', '-a', '--format', '{{.Names}}', '--filter', f'name={name_filter}'],
+                            capture_output=True, text=True)
+    return [name for name in result.stdout.split() if name.startswith(name_filter)]
+
+  def index(name):
+    suffix = name[len(prefix):]
+    return 0 if not suffix else int(suffix) if suffix.isdigit() else -1
+
+  highest = max([index(name) for name in docker_names(prefix) + list(config_names)], default=-1)
+  while True:
+    highest += 1
+    name = prefix if highest == 0 else f"{prefix}{highest}"
+    if name in docker_names(name) and name not in config_names:
+      continue
+    return name
+
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser()
+  parser.add_argument('--existing', type=int, default=40)
+  parser.add_argument('--new', type=int, default=20)
+  parser.add_argument('--delay', type=float, default=0.05, help='seconds per docker call')
+  args = parser.parse_args()
+
+  with tempfile.TemporaryDirectory() as tmp:
+    bin_dir, state = os.path.join(tmp, 'bin'), os.path.join(tmp, 'state')
+    os.makedirs(bin_dir)
+    os.makedirs(state)
+    path = os.path.join(bin_dir, 'docker')
+    with open(path, 'w') as f:
+      f.write(FAKE_DOCKER)
+    os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+    os.environ.update(PATH=bin_dir + os.pathsep + os.environ['PATH'], FAKE_STATE=state, FAKE_DELAY=str(args.delay))
+    existing = ['r1node'] + [f'r1node{i}' for i in range(1, args.existing)]
+    for name in existing:
+      with open(os.path.join(state, name), 'w') as f:
+        f.write('running')
+    config_names = existing[:args.existing // 2]
+
+    start = time.monotonic()
+    names = [previous_generate_container_name(config_names) for _ in range(args.new)]
+    print(f"previous: {time.monotonic() - start:6.2f}s for {args.new} names, {len(set(names))} distinct")
+
+    start = time.monotonic()
+    allocator = NameAllocator.from_host(config_names, [get_volume_name(name) for name in config_names])
+    listed = time.monotonic() - start
+    pairs = allocator.reserve(args.new)
+    elapsed = time.monotonic() - start
+    print(f"allocator: {elapsed:5.2f}s for {args.new} names ({listed:.2f}s listing), "
+          f"{len(set(pairs))} distinct: {pairs[0]} ... {pairs[-1]}")
+
+    allocator.release(pairs[3][0])
+    print(f"released {pairs[3][0]}, handed out again first: {allocator.allocate()}")
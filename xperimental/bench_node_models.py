@@ -0,0 +1,182 @@
+"""
+Microbenchmark: NodeHistory / NodeInfo models vs the previous list-based dataclasses.
+
+Usage:
+  python xperimental/bench_node_models.py [payload.json] [--samples N] [--save out.json]
+
+`payload.json` is a recorded `get_node_history` response (the JSON the container prints).
+Without it a payload of the same shape is generated, `--save` writes it to disk so the
+same payload can be replayed later.
+"""
+import os
+import sys
+import copy
+import json
+import random
+import timeit
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from models.NodeHistory import NodeHistory
+from models.NodeInfo import NodeInfo
+
+
+@dataclass
+class LegacyNodeHistory:
+  address: str
+  alias: str
+  cpu_load: List[float]
+  cpu_temp: List[float]
+  current_epoch: int
+  current_epoch_avail: float
+  eth_address: str
+  gpu_load: Optional[List[float]]
+  gpu_occupied_memory: Optional[List[float]]
+  gpu_temp: Optional[List[float]]
+  gpu_total_memory: Optional[List[float]]
+  last_epochs: List[int]
+  last_save_time: str
+  occupied_memory: List[float]
+  timestamps: List[str]
+  total_memory: List[float]
+  uptime: str
+  version: str
+
+  @classmethod
+  def from_dict(cls, data: dict) -> 'LegacyNodeHistory':
+    gpu_fields = ['gpu_load', 'gpu_occupied_memory', 'gpu_total_memory', 'gpu_temp']
+    for field in gpu_fields:
+      if field in data and all(v is None for v in data[field]):
+        data[field] = None
+    return cls(**{k: data.get(k) for k in cls.__dataclass_fields__})
+
+
+@dataclass
+class LegacyNodeInfo:
+  address: str
+  alias: str
+  eth_address: str
+  version_long: str
+  version_short: str
+  whitelist: List[str]
+
+  @classmethod
+  def from_dict(cls, data: dict) -> 'LegacyNodeInfo':
+    return cls(
+      address=data['address'],
+      alias=data.get('alias', ''),
+      eth_address=data.get('eth_address', ''),
+      version_long=data.get('version_long', ''),
+      version_short=data.get('version_short', ''),
+      whitelist=data.get('info', {}).get('whitelist', [])
+    )
+
+
+def P(msg):
+  print(msg, flush=True)
+  return
+
+
+def make_history_payload(samples, gpu=False):
+  start = datetime.now() - timedelta(seconds=samples * 10)
+  rnd = random.Random(42)
+  series = lambda lo, hi: [round(rnd.uniform(lo, hi), 2) for _ in range(samples)]
+  return {
+    'address': '0xai_' + 'A' * 44,
+    'alias': 'bench-node',
+    'cpu_load': series(0, 100),
+    'cpu_temp': [None] * samples,  # most hosts do not report a CPU temperature
+    'current_epoch': 1234,
+    'current_epoch_avail': 0.97,
+    'eth_address': '0x' + 'b' * 40,
+    'gpu_load': series(0, 100) if gpu else [None] * samples,
+    'gpu_occupied_memory': series(0, 24) if gpu else [None] * samples,
+    'gpu_temp': series(30, 90) if gpu else [None] * samples,
+    'gpu_total_memory': [24.0] * samples if gpu else [None] * samples,
+    'last_epochs': list(range(1200, 1234)),
+    'last_save_time': start.isoformat(),
+    'occupied_memory': series(1, 32),
+    'timestamps': [(start + timedelta(seconds=10 * i)).isoformat() for i in range(samples)],
+    'total_memory': [32.0] * samples,
+    'uptime': '12 days, 3:04:05',
+    'version': '2.5.0',
+  }
+
+
+def make_info_payload(whitelist_size):
+  return {
+    'address': '0xai_' + 'A' * 44,
+    'alias': 'bench-node',
+    'eth_address': '0x' + 'b' * 40,
+    'version_long': 'v2.5.0 | core v7.1.0 | SDK 2.7.0',
+    'version_short': 'v2.5.0',
+    'info': {'whitelist': ['0xai_%044d' % i for i in range(whitelist_size)]},
+  }
+
+
+def measure_memory(factory, payload, copies=20):
+  """Bytes each model keeps alive after the decoded payload dict is dropped.
+
+  The payload is decoded from JSON inside the measurement, the same way the launcher
+  receives it, so models that keep references to the decoded lists are charged for them.
+  """
+  raw = json.dumps(payload)
+  tracemalloc.start()
+  base = tracemalloc.take_snapshot()
+  objs = [factory(json.loads(raw)) for _ in range(copies)]
+  snap = tracemalloc.take_snapshot()
+  tracemalloc.stop()
+  retained = sum(stat.size_diff for stat in snap.compare_to(base, 'filename'))
+  del objs
+  return retained / copies
+
+
+def measure_time(factory, payload, number):
+  # the legacy model mutates its input, so every run gets a fresh copy
+  payloads = [copy.deepcopy(payload) for _ in range(number)]
+  it = iter(payloads)
+  return timeit.timeit(lambda: factory(next(it)), number=number) / number
+
+
+def run(name, legacy, current, payload, number):
+  t_old = measure_time(legacy, payload, number)
+  t_new = measure_time(current, payload, number)
+  m_old = measure_memory(legacy, payload)
+  m_new = measure_memory(current, payload)
+  P(f"{name}:")
+  P(f"  construct  legacy {t_old * 1e3:9.3f} ms   slotted {t_new * 1e3:9.3f} ms   x{t_old / t_new:5.2f}")
+  P(f"  memory     legacy {m_old / 1024:9.1f} KB   slotted {m_new / 1024:9.1f} KB   x{m_old / max(m_new, 1):5.2f}")
+  return
+
+
+if __name__ == '__main__':
+  args = sys.argv[1:]
+  samples = 8640  # one day of history at 10 s resolution
+  save_path = None
+  payload = None
+  if '--samples' in args:
+    samples = int(args[args.index('--samples') + 1])
+  if '--save' in args:
+    save_path = args[args.index('--save') + 1]
+  if args and not args[0].startswith('--'):
+    with open(args[0]) as f:
+      payload = json.load(f)
+    P(f"Loaded recorded payload {args[0]} ({len(payload['timestamps'])} samples)")
+
+  if payload is None:
+    payload = make_history_payload(samples)
+    P(f"Generated payload with {samples} samples")
+    if save_path:
+      with open(save_path, 'w') as f:
+        json.dump(payload, f)
+      P(f"Saved payload to {save_path}")
+
+  run("NodeHistory (no GPU)", LegacyNodeHistory.from_dict, NodeHistory.from_dict, payload, number=20)
+  gpu_payload = make_history_payload(len(payload['timestamps']), gpu=True)
+  run("NodeHistory (GPU)", LegacyNodeHistory.from_dict, NodeHistory.from_dict, gpu_payload, number=20)
+  info_payload = make_info_payload(500)
+  run("NodeInfo (500 whitelist)", LegacyNodeInfo.from_dict, NodeInfo.from_dict, info_payload, number=2000)
@@ -0,0 +1,139 @@
+"""
+Fake bulk: bulk start/stop/restart of many nodes against a stand-in `docker`.
+
+Usage:
+  python xperimental/fake_bulk.py [--nodes N] [--parallelism P] [--delay S] [--fail NAME]
+
+The fake `docker` keeps one file per container in a state directory and answers
+`ps`, `stop`, `wait`, `rm`, `run`, `create`, `start`, `inspect` and `exec`, each
+taking --delay seconds like a daemon call would (xperimental/fake_launch.py and
+fake_shutdown.py use it too).
+The scenario starts every node, restarts them, then stops them, once one at a time
+and once with the given parallelism, and prints the wall time of each.
+"""
+import os
+import sys
+import stat
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.bulk_operations import BulkOperation
+
+FAKE_DOCKER = r'''#!/usr/bin/env python3
+import os, sys, time
+state, delay, fail = os.environ['FAKE_STATE'], float(os.environ['FAKE_DELAY']), os.environ.get('FAKE_FAIL', '')
+image = os.environ.get('FAKE_IMAGE', 'image')
+args = sys.argv[1:]
+if args[0] == 'container':
+  args = args[1:]
+command = args[0]
+if command == 'ps':
+  for name in sorted(os.listdir(state)):
+    container_state = open(os.path.join(state, name)).read().split()[0]
+    if '-a' in args or container_state == 'running':
+      print(f"{name}\t{container_state}" if '{{.State}}' in args[-1] else name)
+  sys.exit(0)
+time.sleep(delay)
+if command == 'images':
+  print('sha256:1234' if os.environ.get('FAKE_HAS_IMAGE', '1') == '1' else '')
+  sys.exit(0)
+if command == 'inspect':
+  code = 0
+  for name in [arg for arg in args[1:] if not arg.startswith('-') and arg != '{{.Id}}']:
+    if (name == image and os.environ.get('FAKE_HAS_IMAGE', '1') == '1') or os.path.exists(os.path.join(state, name)):
+      print(f'sha256:{name}')
+    else:
+      print(f"Error: No such object: {name}", file=sys.stderr)
+      code = 1
+  sys.exit(code)
+if command == 'wait':
+  path = os.path.join(state, args[1])
+  while os.path.exists(path) and open(path).read() == 'running':
+    time.sleep(0.05)
+  content = open(path).read() if os.path.exists(path) else 'exited 0'
+  print(content.split()[-1] if content.startswith('exited') else 0)
+  sys.exit(0)
+if command == 'exec':
+  name = args[1]
+  path = os.path.join(state, name)
+  ready = os.path.exists(path) and time.time() - os.path.getmtime(path) > float(os.environ.get('FAKE_BOOT', '0'))
+  if not ready:
+    print(f"Error response from daemon: container {name} is not running", file=sys.stderr)
+    sys.exit(1)
+  print('{"address": "0xai_fake"}')
+  sys.exit(0)
+name = args[-1] if command in ('stop', 'rm', 'start') else args[args.index('--name') + 1]
+path = os.path.join(state, name)
+if name == fail and command in ('run', 'start'):
+  print(f"docker: Error response from daemon: {name} refused to start.", file=sys.stderr)
+  sys.exit(125)
+if command in ('run', 'create'):
+  if os.path.exists(path):
+    print(f'Conflict. The container name "/{name}" is already in use.', file=sys.stderr)
+    sys.exit(125)
+  open(path, 'w').write('running' if command == 'run' else 'created')
+elif not os.path.exists(path):
+  print(f"Error response from daemon: No such container: {name}", file=sys.stderr)
+  sys.exit(1)
+elif command == 'stop':
+  if open(path).read() == 'running':
+    # A node takes FAKE_EXIT_TIME seconds to exit after SIGTERM, it is killed after its grace period
+    grace = float(args[args.index('-t') + 1]) if '-t' in args else 10
+    exit_time = float(os.environ.get('FAKE_EXIT_TIME', '0'))
+    time.sleep(min(grace, exit_time))
+    open(path, 'w').write('exited 137' if exit_time > grace else 'exited 143')
+elif command == 'start':
+  open(path, 'w').write('running')
+elif command == 'rm':
+  os.remove(path)
+print(name)
+'''
+
+
+def launch_command(name, volume):
+  return ['docker', 'run', '-d', '--name', name, '-v', f'{volume}:/edge_node/_local_cache', 'image']
+
+
+def run(action, containers, parallelism):
+  start = time.monotonic()
+  results = BulkOperation(action, containers, launch_command, parallelism=parallelism).run()
+  elapsed = time.monotonic() - start
+  counts = {}
+  for result in results:
+    counts[result.phase] = counts.get(result.phase, 0) + 1
+  errors = [f"{result.container}: {result.error}" for result in results if result.error]
+  print(f"  {action:<8} {elapsed:6.2f}s  {counts}")
+  for error in errors:
+    print(f"           {error}")
+  return elapsed
+
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser()
+  parser.add_argument('--nodes', type=int, default=30)
+  parser.add_argument('--parallelism', type=int, default=8)
+  parser.add_argument('--delay', type=float, default=0.3, help='seconds per docker call')
+  parser.add_argument('--fail', default='edge_node_7', help='container that fails to start')
+  args = parser.parse_args()
+
+  with tempfile.TemporaryDirectory() as tmp:
+    bin_dir, state = os.path.join(tmp, 'bin'), os.path.join(tmp, 'state')
+    os.makedirs(bin_dir)
+    os.makedirs(state)
+    docker = os.path.join(bin_dir, 'docker')
+    with open(docker, 'w') as f:
+      f.write(FAKE_DOCKER)
+    os.chmod(docker, os.stat(docker).st_mode | stat.S_IEXEC)
+    os.environ.update(PATH=bin_dir + os.pathsep + os.environ['PATH'], FAKE_STATE=state,
+                      FAKE_DELAY=str(args.delay), FAKE_FAIL=args.fail)
+
+    containers = [(f'edge_node_{i}', f'edge_node_{i}_volume') for i in range(args.nodes)]
+    for parallelism in (1, args.parallelism):
+      print(f"{args.nodes} nodes, {parallelism} at a time, {args.delay}s per docker call:")
+      total = sum(run(action, containers, parallelism) for action in ('start', 'restart', 'stop'))
+      print(f"  total    {total:6.2f}s")
+      for name in os.listdir(state):
+        os.remove(os.path.join(state, name))
@@ -0,0 +1,187 @@
+"""
+Fake Docker Engine API serving `/_ping` and a simulated `/images/create` pull.
+
+Usage:
+  python xperimental/fake_engine_api.py [--layers N] [--size MB] [--bandwidth MB/s] [--unix PATH] [--gui]
+
+Without --gui, the pull client (utils.docker_api) and the progress parser run against the
+fake endpoint and print the overall bytes, throughput and ETA once per second. With
+--gui, the launcher's DockerPullDialog follows the same pull through DockerCommandHandler
+(DOCKER_HOST points to the fake endpoint). `--error` makes the pull fail like an unknown
+image would.
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+import socketserver
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.docker_api import DockerEngineAPI, DockerAPIError
+from utils.pull_progress import PullProgressParser, format_bytes
+
+
+def make_handler(layers, size_mb, bandwidth_mb, fail):
+  class FakeEngineHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+      pass
+
+    def do_GET(self):
+      if urlparse(self.path).path.endswith('/_ping'):
+        self._reply(200, b'OK', 'text/plain')
+      else:
+        self._reply(404, b'{"message":"page not found"}')
+
+    def do_POST(self):
+      url = urlparse(self.path)
+      if not url.path.endswith('/images/create'):
+        self._reply(404, b'{"message":"page not found"}')
+        return
+      query = parse_qs(url.query)
+      image, tag = query.get('fromImage', [''])[0], query.get('tag', ['latest'])[0]
+      self.send_response(200)
+      self.send_header('Content-Type', 'application/json')
+      self.send_header('Transfer-Encoding', 'chunked')
+      self.end_headers()
+      self._send({'status': f'Pulling from {image}', 'id': tag})
+      if fail:
+        self._send({'errorDetail': {'message': f'manifest for {image}:{tag} not found'},
+                    'error': f'manifest for {image}:{tag} not found'})
+        self._end()
+        return
+      rng = random.Random(image)
+      sizes = {f'{rng.getrandbits(48):012x}': int(rng.uniform(0.2, 1.8) * size_mb * 1e6 / layers) for _ in range(layers)}
+      for layer_id in sizes:
+        self._send({'status': 'Pulling fs layer', 'progressDetail': {}, 'id': layer_id})
+      # Layers download 3 at a time, sharing the bandwidth, like the daemon does
+      pending = list(sizes)
+      active = {}
+      step = 0.1
+      while pending or active:
+        while pending and len(active) < 3:
+          active[pending.pop(0)] = 0
+        share = bandwidth_mb * 1e6 * step / len(active)
+        time.sleep(step)
+        for layer_id in list(active):
+          total = sizes[layer_id]
+          active[layer_id] = min(total, active[layer_id] + int(share))
+          current = active[layer_id]
+          self._send({'status': 'Downloading', 'progressDetail': {'current': current, 'total': total},
+                      'progress': f'[=>  ] {format_bytes(current)}/{format_bytes(total)}', 'id': layer_id})
+          if current >= total:
+            del active[layer_id]
+            self._send({'status': 'Verifying Checksum', 'progressDetail': {}, 'id': layer_id})
+            self._send({'status': 'Download complete', 'progressDetail': {}, 'id': layer_id})
+      for layer_id, total in sizes.items():
+        for current in (total // 2, total):
+          self._send({'status': 'Extracting', 'progressDetail': {'current': current, 'total': total}, 'id': layer_id})
+        self._send({'status': 'Pull complete', 'progressDetail': {}, 'id': layer_id})
+      self._send({'status': 'Digest: sha256:' + '0' * 64})
+      self._send({'status': f'Status: Downloaded newer image for {image}:{tag}'})
+      self._end()
+
+    def _reply(self, code, body, content_type='application/json'):
+      self.send_response(code)
+      self.send_header('Content-Type', content_type)
+      self.send_header('Content-Length', str(len(body)))
+      self.end_headers()
+      self.wfile.write(body)
+
+    def _send(self, obj):
+      data = (json.dumps(obj) + '\r\n').encode()
+      self.wfile.write(f'{len(data):x}\r\n'.encode() + data + b'\r\n')
+      self.wfile.flush()
+
+    def _end(self):
+      self.wfile.write(b'0\r\n\r\n')
+      self.wfile.flush()
+
+  return FakeEngineHandler
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+  daemon_threads = True
+
+  def get_request(self):
+    request, _ = super().get_request()
+    return request, ('local', 0)
+
+
+def start_server(handler, unix_path=None):
+  if unix_path:
+    if os.path.exists(unix_path):
+      os.unlink(unix_path)
+    server = ThreadingUnixHTTPServer(unix_path, handler)
+    base_url = f'unix://{unix_path}'
+  else:
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    base_url = f'tcp://127.0.0.1:{server.server_address[1]}'
+  threading.Thread(target=server.serve_forever, daemon=True).start()
+  return server, base_url
+
+
+def run_headless(base_url):
+  api = DockerEngineAPI(base_url)
+  print(f"{base_url} available: {api.available()}")
+  parser = PullProgressParser()
+  start = last = time.monotonic()
+  events = 0
+
+  def on_event(event):
+    nonlocal last, events
+    events += 1
+    parser.feed_event(event)
+    now = time.monotonic()
+    if now - last >= 1:
+      last = now
+      print(f"{now - start:5.1f}s {parser.overall_progress():3d}%  {parser.summary()}")
+
+  try:
+    status = api.pull_image('ratio1/edge_node:mainnet', on_event=on_event)
+    print(f"{time.monotonic() - start:5.1f}s {parser.overall_progress():3d}%  {status} ({events} events)")
+  except DockerAPIError as e:
+    print(f"Pull failed: {e}")
+
+
+def run_gui(base_url):
+  os.environ['DOCKER_HOST'] = base_url
+  from PyQt5.QtWidgets import QApplication
+  from utils.docker_commands import DockerCommandHandler
+  from widgets.DockerPullDialog import DockerPullDialog
+  app = QApplication(sys.argv)
+  dialog = DockerPullDialog()
+  dialog.show()
+  handler = DockerCommandHandler('r1node')
+
+  def on_done(result):
+    dialog.set_pull_complete(result[2] == 0, result[1] or result[0])
+    app.quit()
+
+  handler.pull_image(on_done, lambda error: (print(error), app.quit()), dialog.update_pull_progress,
+                     dialog.update_pull_event)
+  app.exec_()
+
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+  parser.add_argument('--layers', type=int, default=6)
+  parser.add_argument('--size', type=float, default=300, help='image size in MB')
+  parser.add_argument('--bandwidth', type=float, default=60, help='MB/s')
+  parser.add_argument('--unix', help='serve on this unix socket instead of TCP')
+  parser.add_argument('--error', action='store_true')
+  parser.add_argument('--gui', action='store_true')
+  args = parser.parse_args()
+  server, base_url = start_server(make_handler(args.layers, args.size, args.bandwidth, args.error), args.unix)
+  if args.gui:
+    run_gui(base_url)
+  else:
+    run_headless(base_url)
+  server.shutdown()
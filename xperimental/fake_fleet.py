@@ -0,0 +1,137 @@
+"""
+Fake fleet: the fleet collector and dashboard against stand-in ssh and docker commands.
+
+Usage:
+  python xperimental/fake_fleet.py [--hosts N] [--gui]
+
+A temporary directory gets a fake `ssh` (runs the remote command locally, with the
+destination as FAKE_HOST) and a fake `docker` (answers `ps` and the `get_node_info` /
+`get_node_history` execs of 1-3 nodes per host, after a small random delay). Host
+`host-slow` outlives the per-host timeout and host `host-down` refuses connections,
+like an unreachable machine.
+"""
+import os
+import sys
+import stat
+import time
+import argparse
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.fleet import FleetCollector
+
+FAKE_SSH = r'''#!/bin/sh
+# ssh [options] destination command...
+while [ $# -gt 0 ]; do
+  case "$1" in
+    -o|-i|-p) shift 2 ;;
+    -*) shift ;;
+    *) break ;;
+  esac
+done
+FAKE_HOST="${1#*@}"; shift
+export FAKE_HOST
+case "$FAKE_HOST" in
+  host-down) echo "ssh: connect to host $FAKE_HOST port 22: Connection refused" >&2; exit 255 ;;
+  host-slow) sleep 30 ;;
+esac
+exec "$@"
+'''
+
+FAKE_DOCKER = r'''#!/usr/bin/env python3
+import os, sys, json, time, random, zlib
+host = os.environ.get("FAKE_HOST", "local")
+seed = zlib.crc32(host.encode())
+nodes = ["r1node"] + ["r1node%d" % i for i in range(2, 2 + seed % 3)]
+args = sys.argv[1:]
+time.sleep(random.uniform(0.05, 0.3))
+if args[0] == "ps":
+  for i, name in enumerate(nodes):
+    state = "exited" if (seed + i) % 5 == 0 else "running"
+    print("%s\t%s\t%s" % (name, "Up 3 hours" if state == "running" else "Exited (0) 1 hour ago", state))
+elif args[0] == "exec":
+  name, command = args[1], args[2]
+  key = zlib.crc32((host + name).encode())
+  if command == "get_node_info":
+    print(json.dumps({"address": "0xai_%08x" % key, "alias": "%s-%s" % (host, name), "eth_address": "0x%040x" % key,
+                      "version_long": "v2.7.%d" % (key % 10), "version_short": "v2.7.%d" % (key % 10),
+                      "info": {"whitelist": []}}))
+  else:
+    count = 24
+    print(json.dumps({
+      "address": "0xai_%08x" % key, "alias": name, "eth_address": "0x0", "version": "v2.7",
+      "cpu_load": [(key >> i) % 100 for i in range(count)], "cpu_temp": [50] * count,
+      "occupied_memory": [8 + (key >> i) % 20 for i in range(count)], "total_memory": [32] * count,
+      "timestamps": ["2026-10-19T%02d:00:00" % i for i in range(count)],
+      "current_epoch": 100, "current_epoch_avail": (key % 1000) / 1000, "last_epochs": [99],
+      "last_save_time": "2026-10-19T23:00:00", "uptime": "%d days" % (key % 30),
+    }))
+else:
+  sys.exit("fake docker: unsupported command %s" % args)
+'''
+
+
+def make_fake_bin():
+  directory = tempfile.mkdtemp(prefix='fake_fleet_')
+  for name, source in (('ssh', FAKE_SSH), ('docker', FAKE_DOCKER)):
+    path = os.path.join(directory, name)
+    with open(path, 'w') as f:
+      f.write(source)
+    os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+  return directory
+
+
+def fake_targets(directory, count):
+  hosts = [f'host-{i:02d}' for i in range(1, count + 1)] + ['host-slow', 'host-down']
+  return {host: [os.path.join(directory, 'ssh'), '-o', 'BatchMode=yes', f'root@{host}'] for host in hosts}
+
+
+def run_headless(targets, host_timeout):
+  done = threading.Event()
+  remaining = set(targets)
+  lock = threading.Lock()
+  start = time.perf_counter()
+
+  def on_node(status):
+    print(f"{time.perf_counter() - start:6.2f}s  {status.host:10} {status.container:9} {status.status:22} "
+          f"{status.version:8} cpu={status.cpu_load} epoch={status.epoch_avail} {status.error}")
+
+  def on_host_done(host, containers, error):
+    print(f"{time.perf_counter() - start:6.2f}s  {host} done: {len(containers)} containers {error}")
+    with lock:
+      remaining.discard(host)
+      if not remaining:
+        done.set()
+
+  collector = FleetCollector(on_node, on_host_done, host_timeout=host_timeout)
+  collector.collect(targets)
+  done.wait()
+  collector.shutdown()
+  print(f"{len(targets)} hosts in {time.perf_counter() - start:.2f}s")
+
+
+def run_gui(targets, host_timeout):
+  from PyQt5.QtWidgets import QApplication
+  from widgets.dialogs.FleetDashboardDialog import FleetDashboardDialog
+  app = QApplication(sys.argv)
+  dialog = FleetDashboardDialog(targets_provider=lambda: targets)
+  dialog.collector.host_timeout = host_timeout
+  dialog.show()
+  sys.exit(app.exec_())
+
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+  parser.add_argument('--hosts', type=int, default=20)
+  parser.add_argument('--timeout', type=float, default=5)
+  parser.add_argument('--gui', action='store_true')
+  args = parser.parse_args()
+  directory = make_fake_bin()
+  os.environ['PATH'] = directory + os.pathsep + os.environ['PATH']
+  targets = fake_targets(directory, args.hosts)
+  if args.gui:
+    run_gui(targets, args.timeout)
+  else:
+    run_headless(targets, args.timeout)
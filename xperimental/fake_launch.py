@@ -0,0 +1,79 @@
+"""
+Fake launch: the single node launch pipeline against the stand-in `docker` of fake_bulk.
+
+Usage:
+  python xperimental/fake_launch.py [--delay S] [--boot S]
+
+Replaces an existing container the way the launcher used to (`docker images -q`,
+`docker ps -a`, `docker container inspect`, `docker rm -f`, `docker run`) and with
+utils.launch_pipeline (one `docker inspect`, `rm -f`, `create`, `start`), then waits for
+the node's first heartbeat. Every fake daemon call takes --delay seconds, the node
+answers `get_node_info` --boot seconds after it started.
+"""
+import os
+import sys
+import stat
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fake_bulk import FAKE_DOCKER, launch_command
+from utils.launch_pipeline import LaunchPipeline
+
+NAME = 'edge_node_1'
+
+
+def docker(*args):
+  import subprocess
+  return subprocess.run(['docker'] + list(args), capture_output=True, text=True)
+
+
+def old_launch():
+  docker('images', '-q', 'image')
+  docker('ps', '-a', '--format', '{{.Names}}', '--filter', f'name={NAME}')
+  if docker('container', 'inspect', NAME).returncode == 0:
+    docker('rm', '-f', NAME)
+  return docker(*launch_command(NAME, 'volume')[1:]).returncode
+
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser()
+  parser.add_argument('--delay', type=float, default=0.2, help='seconds per docker call')
+  parser.add_argument('--boot', type=float, default=3, help='seconds before the node answers')
+  args = parser.parse_args()
+
+  with tempfile.TemporaryDirectory() as tmp:
+    bin_dir, state = os.path.join(tmp, 'bin'), os.path.join(tmp, 'state')
+    os.makedirs(bin_dir)
+    os.makedirs(state)
+    path = os.path.join(bin_dir, 'docker')
+    with open(path, 'w') as f:
+      f.write(FAKE_DOCKER)
+    os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+    os.environ.update(PATH=bin_dir + os.pathsep + os.environ['PATH'], FAKE_STATE=state,
+                      FAKE_DELAY=str(args.delay), FAKE_IMAGE='image', FAKE_BOOT=str(args.boot))
+    open(os.path.join(state, NAME), 'w').write('running')
+
+    start = time.monotonic()
+    code = old_launch()
+    print(f"previous chain: 5 docker calls, {time.monotonic() - start:.2f}s (exit code {code})")
+
+    phases = []
+    pipeline = LaunchPipeline(NAME, launch_command(NAME, 'volume'), image='image',
+                              on_phase=lambda timings: phases.append(timings))
+    start = time.monotonic()
+    result = pipeline.launch()
+    elapsed = time.monotonic() - start
+    calls = len(pipeline.timings.phases)
+    print(f"pipeline:       {calls} docker calls, {elapsed:.2f}s (exit code {result.return_code}, "
+          f"replaced {result.replaced})")
+    pipeline.wait_for_heartbeat(timeout=args.boot + 10)
+    print(f"  {pipeline.timings.summary()}")
+    print(f"  dialog text:\n    " + phases[-1].progress_text().replace('\n', '\n    '))
+
+    os.environ['FAKE_HAS_IMAGE'] = '0'
+    result = LaunchPipeline(NAME, launch_command(NAME, 'volume'), image='image',
+                            stop_if_image_missing=True).launch()
+    print(f"without the image: image_missing {result.image_missing}, error {result.error!r}")
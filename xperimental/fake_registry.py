@@ -0,0 +1,291 @@
+"""
+Fake registry: the image prefetcher against a local registry and a stand-in `docker`.
+
+Usage:
+  python xperimental/fake_registry.py [--layers N] [--size MB] [--bandwidth MB/s] [--limit MB/s] [--distribute N]
+
+The registry serves an index (linux/amd64 and linux/arm64) of random gzip layers behind
+an anonymous token challenge, honours Range requests and drops the connection once in
+the middle of a layer. The fake `docker` answers `image inspect` and `load` from a JSON
+state file, and checks the archive it is given: config, tags and the layers it does not
+have yet.
+
+The scenario: a first prefetch paused halfway, resumed from the partial layers, then a
+check that finds the image up to date, then a new version sharing its base layers with
+the loaded one, of which only the new layers are downloaded.
+
+With --distribute, the image goes to N fake hosts instead (utils.image_distribution),
+through a fake `ssh` that runs the command locally with a docker state per host: one
+host already has the previous version, `host-down` refuses connections. Every layer is
+downloaded from the registry once.
+"""
+import os
+import sys
+import gzip
+import json
+import stat
+import time
+import hashlib
+import argparse
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.image_distribution import ImageDistributor
+from utils.image_prefetch import ImagePrefetcher
+
+FAKE_SSH = r'''#!/bin/sh
+while [ $# -gt 0 ]; do
+  case "$1" in
+    -o|-i|-p) shift 2 ;;
+    -*) shift ;;
+    *) break ;;
+  esac
+done
+FAKE_HOST="${1#*@}"; shift
+export FAKE_HOST
+if [ "$FAKE_HOST" = host-down ]; then
+  echo "ssh: connect to host $FAKE_HOST port 22: Connection refused" >&2; exit 255
+fi
+exec "$@"
+'''
+
+FAKE_DOCKER = r'''#!/usr/bin/env python3
+import os, sys, gzip, json, tarfile, hashlib
+state_path = os.environ["FAKE_DOCKER_STATE"].replace("{host}", os.environ.get("FAKE_HOST", "local"))
+state = json.load(open(state_path)) if os.path.exists(state_path) else {"images": {}, "layers": []}
+args = sys.argv[1:]
+if args[:2] == ["image", "inspect"]:
+  image = state["images"].get(args[2])
+  if image is None:
+    sys.stderr.write("Error: No such image: %s\n" % args[2])
+    sys.exit(1)
+  print(json.dumps([image]))
+elif args == ["load"]:
+  files = {}
+  with tarfile.open(fileobj=sys.stdin.buffer, mode="r|") as archive:
+    for member in archive:
+      files[member.name] = archive.extractfile(member).read()
+  manifest = json.loads(files["manifest.json"])[0]
+  config_bytes = files[manifest["Config"]]
+  config = json.loads(config_bytes)
+  diff_ids = config["rootfs"]["diff_ids"]
+  for name, diff_id in zip(manifest["Layers"], diff_ids):
+    if diff_id in state["layers"]:
+      continue
+    if name not in files:
+      sys.stderr.write("open %s: no such file or directory\n" % name)
+      sys.exit(1)
+    if "sha256:" + hashlib.sha256(gzip.decompress(files[name])).hexdigest() != diff_id:
+      sys.stderr.write("layer %s does not match its diff id\n" % name)
+      sys.exit(1)
+    state["layers"].append(diff_id)
+  image_id = "sha256:" + hashlib.sha256(config_bytes).hexdigest()
+  for tag in manifest["RepoTags"]:
+    state["images"][tag] = {"Id": image_id, "RepoDigests": [], "RootFS": {"Layers": diff_ids}}
+  json.dump(state, open(state_path, "w"))
+  print("Loaded image: %s" % ", ".join(manifest["RepoTags"]))
+else:
+  sys.exit("fake docker: unsupported command %s" % args)
+'''
+
+
+class FakeImage:
+  def __init__(self, layers, size_mb, seed, base=None):
+    self.blobs = {}
+    self.layers = list(base.layers) if base else []
+    self.diff_ids = list(base.diff_ids) if base else []
+    if base:
+      self.blobs.update(base.blobs)
+    for _ in range(layers):
+      raw = os.urandom(int(size_mb * 1e6 / layers))
+      compressed = gzip.compress(raw, compresslevel=1)
+      digest = self._add(compressed)
+      self.layers.append((digest, len(compressed)))
+      self.diff_ids.append('sha256:' + hashlib.sha256(raw).hexdigest())
+    config = json.dumps({'architecture': 'amd64', 'os': 'linux', 'created': str(seed),
+                         'rootfs': {'type': 'layers', 'diff_ids': self.diff_ids}}).encode()
+    self.config_digest = self._add(config)
+    self.config = config
+    manifest = {'schemaVersion': 2, 'mediaType': 'application/vnd.docker.distribution.manifest.v2+json',
+                'config': {'mediaType': 'application/vnd.docker.container.image.v1+json',
+                           'digest': self.config_digest, 'size': len(config)},
+                'layers': [{'mediaType': 'application/vnd.docker.image.rootfs.diff.tar.gzip',
+                            'digest': digest, 'size': size} for digest, size in self.layers]}
+    self.manifest = json.dumps(manifest).encode()
+    self.manifest_digest = 'sha256:' + hashlib.sha256(self.manifest).hexdigest()
+    index = {'schemaVersion': 2, 'mediaType': 'application/vnd.docker.distribution.manifest.list.v2+json',
+             'manifests': [
+               {'mediaType': 'application/vnd.docker.distribution.manifest.v2+json', 'digest': 'sha256:' + 'a' * 64,
+                'size': 1, 'platform': {'architecture': 'arm64', 'os': 'linux'}},
+               {'mediaType': 'application/vnd.docker.distribution.manifest.v2+json', 'digest': self.manifest_digest,
+                'size': len(self.manifest), 'platform': {'architecture': 'amd64', 'os': 'linux'}}]}
+    self.index = json.dumps(index).encode()
+    self.index_digest = 'sha256:' + hashlib.sha256(self.index).hexdigest()
+
+  def _add(self, data):
+    digest = 'sha256:' + hashlib.sha256(data).hexdigest()
+    self.blobs[digest] = data
+    return digest
+
+
+def make_handler(server_state, bandwidth_mb):
+  class FakeRegistryHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+      pass
+
+    def do_GET(self):
+      image = server_state['image']
+      if self.path.startswith('/token'):
+        self._reply(200, json.dumps({'token': 'fake-token'}).encode())
+        return
+      if self.headers.get('Authorization') != 'Bearer fake-token':
+        host = self.headers['Host']
+        self._reply(401, b'{"errors":[{"code":"UNAUTHORIZED"}]}', extra={
+          'WWW-Authenticate': f'Bearer realm="http://{host}/token",service="fake-registry"'})
+        return
+      reference = self.path.rsplit('/', 1)[-1]
+      if '/manifests/' in self.path:
+        if reference in ('mainnet', image.index_digest):
+          self._reply(200, image.index, extra={'Docker-Content-Digest': image.index_digest})
+        elif reference == image.manifest_digest:
+          self._reply(200, image.manifest, extra={'Docker-Content-Digest': image.manifest_digest})
+        else:
+          self._reply(404, b'{"errors":[{"code":"MANIFEST_UNKNOWN"}]}')
+        return
+      data = image.blobs.get(reference)
+      if data is None:
+        self._reply(404, b'{"errors":[{"code":"BLOB_UNKNOWN"}]}')
+        return
+      start = 0
+      if self.headers.get('Range', '').startswith('bytes='):
+        start = int(self.headers['Range'][6:].split('-')[0])
+        server_state['ranges'] += 1
+      self.send_response(206 if start else 200)
+      self.send_header('Content-Length', str(len(data) - start))
+      self.end_headers()
+      drop = server_state['drop'] and len(data) > 1e6 and not start
+      step = max(1, int(bandwidth_mb * 1e6 / 20))
+      for position in range(start, len(data), step):
+        if drop and position - start > len(data) // 2:
+          server_state['drop'] = False
+          self.close_connection = True
+          return
+        try:
+          self.wfile.write(data[position:position + step])
+        except (BrokenPipeError, ConnectionResetError):
+          return  # the prefetch was paused
+        server_state['served'] += min(step, len(data) - position)
+        time.sleep(0.05)
+
+    def _reply(self, code, body, extra=None):
+      self.send_response(code)
+      self.send_header('Content-Type', 'application/json')
+      self.send_header('Content-Length', str(len(body)))
+      for key, value in (extra or {}).items():
+        self.send_header(key, value)
+      self.end_headers()
+      self.wfile.write(body)
+
+  return FakeRegistryHandler
+
+
+def make_fake_bin(directory):
+  for name, source in (('docker', FAKE_DOCKER), ('ssh', FAKE_SSH)):
+    path = os.path.join(directory, name)
+    with open(path, 'w') as f:
+      f.write(source)
+    os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+  os.environ['FAKE_DOCKER_STATE'] = os.path.join(directory, 'state-{host}.json')
+  return os.path.join(directory, 'docker')
+
+
+def run(prefetcher, label, stop_after=None):
+  start = time.monotonic()
+  last = [start]
+
+  def on_progress(done, total):
+    now = time.monotonic()
+    if now - last[0] >= 1:
+      last[0] = now
+      print(f"  {now - start:5.1f}s {done / 1e6:6.1f} / {total / 1e6:.1f} MB")
+
+  should_stop = (lambda: time.monotonic() - start > stop_after) if stop_after else None
+  result = prefetcher.run(should_stop=should_stop, on_progress=on_progress)
+  print(f"{label}: {result.status} in {time.monotonic() - start:.1f}s, {result.downloaded / 1e6:.1f} MB "
+        f"downloaded ({result.message})")
+  return result
+
+
+def run_distribution(directory, server_state, registry_url, args):
+  ssh = os.path.join(directory, 'ssh')
+  os.environ['PATH'] = directory + os.pathsep + os.environ['PATH']
+  hosts = [f'host-{i:02d}' for i in range(1, args.distribute + 1)] + ['host-down']
+  targets = {host: [ssh, '-o', 'BatchMode=yes', f'root@{host}'] for host in hosts}
+  start = time.monotonic()
+
+  def on_host(state):
+    if state.done or state.phase == 'sending' and state.sent == 0:
+      print(f"  {time.monotonic() - start:5.1f}s {state.host:9} {state.phase:10} "
+            f"{state.sent / 1e6:5.1f} / {state.total / 1e6:.1f} MB {state.error}")
+
+  def distribute(label, targets):
+    nonlocal start
+    start = time.monotonic()
+    server_state['served'] = 0
+    distributor = ImageDistributor('ratio1/edge_node:mainnet', on_host, cache_dir=os.path.join(directory, 'cache'),
+                                   bandwidth_limit=args.limit * 1e6, registry_url=registry_url)
+    distributor.distribute(targets)
+    print(f"{label}: {time.monotonic() - start:.1f}s, registry served {server_state['served'] / 1e6:.1f} MB")
+
+  distribute('Previous version to host-01', {'host-01': targets['host-01']})
+  image = server_state['image']
+  server_state['image'] = FakeImage(1, args.size / args.layers, seed=2, base=image)
+  distribute(f'New version to {len(targets)} hosts', targets)
+  distribute('Again', targets)
+
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+  parser.add_argument('--layers', type=int, default=4)
+  parser.add_argument('--size', type=float, default=20, help='image size in MB')
+  parser.add_argument('--bandwidth', type=float, default=10, help='MB/s served by the registry')
+  parser.add_argument('--limit', type=float, default=4, help='MB/s prefetch bandwidth limit, 0 for none')
+  parser.add_argument('--distribute', type=int, default=0, help='number of fake hosts to distribute the image to')
+  args = parser.parse_args()
+  directory = tempfile.mkdtemp(prefix='fake_registry_')
+  docker = make_fake_bin(directory)
+  image = FakeImage(args.layers, args.size, seed=1)
+  server_state = {'image': image, 'served': 0, 'ranges': 0, 'drop': False}
+  server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(server_state, args.bandwidth))
+  threading.Thread(target=server.serve_forever, daemon=True).start()
+
+  registry_url = f'http://127.0.0.1:{server.server_address[1]}'
+  if args.distribute:
+    run_distribution(directory, server_state, registry_url, args)
+    server.shutdown()
+    sys.exit(0)
+
+  def prefetcher():
+    return ImagePrefetcher('ratio1/edge_node:mainnet', cache_dir=os.path.join(directory, 'cache'),
+                           bandwidth_limit=args.limit * 1e6, registry_url=registry_url,
+                           docker_command=[docker])
+
+  expected = args.size / args.limit if args.limit else 0
+  run(prefetcher(), f'First run, paused after {expected / 2:.1f}s', stop_after=max(1.0, expected / 2))
+  server_state['drop'] = True
+  for _ in range(3):  # the dropped connection fails a run, the next one resumes it
+    if run(prefetcher(), 'Resumed').status != 'failed':
+      break
+  print(f"Registry served {server_state['served'] / 1e6:.1f} MB for a {sum(s for _, s in image.layers) / 1e6:.1f} MB "
+        f"image, {server_state['ranges']} ranged requests")
+  run(prefetcher(), 'Check again')
+  server_state['image'] = FakeImage(1, args.size / args.layers, seed=2, base=image)
+  server_state['served'] = 0
+  run(prefetcher(), 'New version')
+  print(f"Registry served {server_state['served'] / 1e6:.1f} MB for the new version")
+  server.shutdown()
@@ -0,0 +1,70 @@
+"""
+Fake shutdown: stopping many nodes against the stand-in `docker` of fake_bulk.
+
+Usage:
+  python xperimental/fake_shutdown.py [--nodes N] [--exit-time S] [--grace S] [--delay S]
+
+Every fake node takes --exit-time seconds to exit after SIGTERM. The nodes are stopped
+the way the launcher used to (`docker stop`, `sleep(2)`, `docker rm`, one node after the
+other) and with utils.shutdown (all at once, each waiting for its own exit). The last
+node gets a grace period shorter than its exit time, it is reported as killed.
+"""
+import os
+import sys
+import stat
+import time
+import argparse
+import subprocess
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fake_bulk import FAKE_DOCKER
+from utils.shutdown import ShutdownCoordinator
+
+
+def start_all(state, names):
+  for name in names:
+    with open(os.path.join(state, name), 'w') as f:
+      f.write('running')
+
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser()
+  parser.add_argument('--nodes', type=int, default=10)
+  parser.add_argument('--exit-time', type=float, default=1.5, help='seconds a node takes to exit')
+  parser.add_argument('--grace', type=int, default=5, help='grace period of every node but the last')
+  parser.add_argument('--delay', type=float, default=0.1, help='seconds per docker call')
+  args = parser.parse_args()
+
+  with tempfile.TemporaryDirectory() as tmp:
+    bin_dir, state = os.path.join(tmp, 'bin'), os.path.join(tmp, 'state')
+    os.makedirs(bin_dir)
+    os.makedirs(state)
+    path = os.path.join(bin_dir, 'docker')
+    with open(path, 'w') as f:
+      f.write(FAKE_DOCKER)
+    os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+    os.environ.update(PATH=bin_dir + os.pathsep + os.environ['PATH'], FAKE_STATE=state,
+                      FAKE_DELAY=str(args.delay), FAKE_EXIT_TIME=str(args.exit_time))
+    names = [f'edge_node_{i}' for i in range(args.nodes)]
+
+    start_all(state, names)
+    start = time.monotonic()
+    for name in names:
+      subprocess.run(['docker', 'stop', '-t', str(args.grace), name], capture_output=True)
+      time.sleep(2)
+      subprocess.run(['docker', 'rm', name], capture_output=True)
+    print(f"one after the other, with sleep(2): {time.monotonic() - start:.2f}s")
+
+    start_all(state, names)
+    grace_periods = {name: args.grace for name in names}
+    grace_periods[names[-1]] = max(0, int(args.exit_time) - 1)
+    start = time.monotonic()
+    states = ShutdownCoordinator(remove=True).shutdown(grace_periods)
+    print(f"shutdown coordinator:               {time.monotonic() - start:.2f}s")
+    for name in (names[0], names[-1]):
+      s = states[name]
+      print(f"  {name}: {s.phase}, grace {s.grace_period}s, exited in {s.duration:.2f}s "
+            f"with code {s.exit_code}{' (killed)' if s.killed else ''}")
+    print(f"  containers left: {len(os.listdir(state))}")